@@ -121,6 +121,8 @@ setup(
             "matplotlib",
         ],
         "database_access": ["psycopg2-binary"],
+        # reading and writing .parquet and .feather input files
+        "columnar": ["pyarrow"],
     },
     entry_points={"console_scripts": ["switch = switch_model.main:main"]},
 )
@@ -4,9 +4,11 @@ Electron/Theia/VSCode app.
 
 Info can be retrieved by running `switch <cmd> <args> --json` from
 Switch.app. This will launch the bundled switch.py script, which will write the
-required info to stdout. But if needed we could create an RPC interface for
-switch.py to avoid reloading Python each time. Commands and arguments are shown
-below.
+required info to stdout. To avoid reloading Python and re-importing modules
+for each query, the app can instead start `switch serve`, which answers the
+same queries via JSON-RPC over stdio or a Unix socket, from caches that are
+refreshed when the relevant files change (see serve()). Commands and arguments
+are shown below.
 
 `validate arguments` (maybe): check whether there are any arguments in
 options.txt that aren't defined in any active module
@@ -22,10 +24,13 @@ data needed by current modules. report cases where extra data will be ignored.
 report missing optional columns.
 """
 
-import importlib, os, pprint, json
+import ast, hashlib, importlib, inspect, os, pprint, json, sys, traceback
+from contextlib import redirect_stdout
 
 import switch_model
-from .utilities import unwrap, _ArgumentParser  # includes some extra actions for Switch
+
+# _ArgumentParser includes some extra actions for Switch
+from .basic_utilities import unwrap, _ArgumentParser
 
 argparser = _ArgumentParser()
 
@@ -120,113 +125,312 @@ def module_list():
     return avail_modules
 
 
+# Standard modules, in the order they are usually listed in modules.txt. Other
+# modules found in the switch_model package are reported after these, in
+# alphabetical order.
+builtin_module_order = [
+    # standard modules
+    "switch_model.timescales",
+    "switch_model.financials",
+    "switch_model.balancing.load_zones",
+    "switch_model.energy_sources.properties",
+    "switch_model.generators.core.build",
+    "switch_model.generators.core.dispatch",
+    "switch_model.reporting",
+    # either-or modules
+    "switch_model.generators.core.no_commit",
+    "switch_model.generators.core.commit.fuel_use",
+    "switch_model.generators.core.commit.operate",
+    "switch_model.energy_sources.fuel_costs.simple",
+    "switch_model.energy_sources.fuel_costs.markets",
+    # optional modules (ordering isn't generally important)
+    "switch_model.transmission.transport.build",
+    "switch_model.transmission.transport.dispatch",
+    "switch_model.transmission.copperplate",
+    "switch_model.transmission.local_td",
+    "switch_model.generators.extensions.storage",
+    "switch_model.generators.extensions.hydro_simple",
+    "switch_model.generators.extensions.hydro_system",
+    "switch_model.generators.core.gen_discrete_build",
+    "switch_model.generators.core.commit.discrete",
+    "switch_model.balancing.demand_response.simple",
+    "switch_model.balancing.demand_response.iterative",
+    "switch_model.balancing.demand_response.iterative.r_demand_system",
+    "switch_model.balancing.operating_reserves.areas",
+    "switch_model.balancing.operating_reserves.spinning_reserves",
+    "switch_model.balancing.operating_reserves.spinning_reserves_advanced",
+    "switch_model.balancing.planning_reserves",
+    "switch_model.energy_sources.fuel_costs.markets_expansion",
+    "switch_model.energy_sources.fuel_costs.simple_per_timepoint",
+    "switch_model.policies.carbon_policies",
+    "switch_model.policies.rps_simple",
+    "switch_model.balancing.unserved_load",
+    "switch_model.reporting.basic_exports",
+    "switch_model.reporting.dump",
+    "switch_model.balancing.diagnose_infeasibility",
+    "switch_model.hawaii.hydrogen",
+    "switch_model.hawaii.ev",
+    "switch_model.hawaii.ev_advanced",
+    "switch_model.hawaii.rps",
+    "switch_model.hawaii.fed_subsidies",
+    "switch_model.hawaii.smooth_dispatch",
+    "switch_model.hawaii.save_results",
+    "switch_model.hawaii.demand_response_simple",
+    "switch_model.hawaii.emission_rules",
+    "switch_model.hawaii.fuel_markets_expansion",
+    "switch_model.hawaii.heco_outlook_2019",
+    "switch_model.hawaii.heco_outlook_2020_06",
+    "switch_model.hawaii.heco_outlook_2020_08",
+    "switch_model.hawaii.heco_plan_2020_06",
+    "switch_model.hawaii.heco_plan_2020_08",
+    "switch_model.hawaii.hi_spinning_reserves",
+    "switch_model.hawaii.lake_wilson",
+    "switch_model.hawaii.lng_conversion",
+    "switch_model.hawaii.no_central_pv",
+    "switch_model.hawaii.no_onshore_wind",
+    "switch_model.hawaii.no_renewables",
+    "switch_model.hawaii.no_wind",
+    "switch_model.hawaii.oahu_plants",
+    "switch_model.hawaii.psip_2016_04",
+    "switch_model.hawaii.psip_2016_12",
+    "switch_model.hawaii.pumped_hydro",
+    "switch_model.hawaii.register_hi_storage_reserves",
+    "switch_model.hawaii.reserves",
+    "switch_model.hawaii.smooth_dispatch_quadratic",
+    "switch_model.hawaii.switch_patch",
+    "switch_model.hawaii.unserved_load",
+]
+
+switch_callbacks = [
+    "define_arguments",
+    "define_components",
+    "define_dynamic_components",
+    "load_inputs",
+    "pre_solve",
+    "pre_iterate",
+    "post_iterate",
+    "post_solve",
+]
+
+
 def find_switch_modules(path, prefix):
     """
-    pre-cached/pre-sorted wrapper for pkgutil.walk_packages
+    Find Switch modules (modules with any of the callbacks in switch_callbacks)
+    in the directories in path, using the same search as
+    pkgutil.walk_packages(). The source files are analyzed statically via the
+    module index (see ModuleIndex), so nothing is imported. Command modules
+    like switch_model.solve, which only define arguments and a main()
+    function, are omitted.
     """
+    index = get_module_index()
+    avail_modules = []
+    for entry in path:
+        for name, filename in iter_module_files(entry or ".", prefix):
+            info = index.get(filename)
+            if is_switch_module(info) and name not in avail_modules:
+                avail_modules.append(name)
+    index.save()
     if prefix == "switch_model.":
-        # return pre-determined list of built-in modules to avoid walking the
-        # tree more than necessary. This list can be regenerated by cd'ing
-        # to the switch root directory (which puts switch_model into the search
-        # path without a prefix), then running switch info --module-list and
-        # keeping (and re-sorting) the second set of switch_model.* modules.
-        return [
-            # standard modules
-            "switch_model.timescales",
-            "switch_model.financials",
-            "switch_model.balancing.load_zones",
-            "switch_model.energy_sources.properties",
-            "switch_model.generators.core.build",
-            "switch_model.generators.core.dispatch",
-            "switch_model.reporting",
-            # either-or modules
-            "switch_model.generators.core.no_commit",
-            "switch_model.generators.core.commit.fuel_use",
-            "switch_model.generators.core.commit.operate",
-            "switch_model.energy_sources.fuel_costs.simple",
-            "switch_model.energy_sources.fuel_costs.markets",
-            # optional modules (ordering isn't generally important)
-            "switch_model.transmission.transport.build",
-            "switch_model.transmission.transport.dispatch",
-            "switch_model.transmission.copperplate",
-            "switch_model.transmission.local_td",
-            "switch_model.generators.extensions.storage",
-            "switch_model.generators.extensions.hydro_simple",
-            "switch_model.generators.extensions.hydro_system",
-            "switch_model.generators.core.gen_discrete_build",
-            "switch_model.generators.core.commit.discrete",
-            "switch_model.balancing.demand_response.simple",
-            "switch_model.balancing.demand_response.iterative",
-            "switch_model.balancing.demand_response.iterative.r_demand_system",
-            "switch_model.balancing.operating_reserves.areas",
-            "switch_model.balancing.operating_reserves.spinning_reserves",
-            "switch_model.balancing.operating_reserves.spinning_reserves_advanced",
-            "switch_model.balancing.planning_reserves",
-            "switch_model.energy_sources.fuel_costs.markets_expansion",
-            "switch_model.energy_sources.fuel_costs.simple_per_timepoint",
-            "switch_model.policies.carbon_policies",
-            "switch_model.policies.rps_simple",
-            "switch_model.balancing.unserved_load",
-            "switch_model.reporting.basic_exports",
-            "switch_model.reporting.dump",
-            "switch_model.balancing.diagnose_infeasibility",
-            "switch_model.hawaii.hydrogen",
-            "switch_model.hawaii.ev",
-            "switch_model.hawaii.ev_advanced",
-            "switch_model.hawaii.rps",
-            "switch_model.hawaii.fed_subsidies",
-            "switch_model.hawaii.smooth_dispatch",
-            "switch_model.hawaii.save_results",
-            "switch_model.hawaii.demand_response_simple",
-            "switch_model.hawaii.emission_rules",
-            "switch_model.hawaii.fuel_markets_expansion",
-            "switch_model.hawaii.heco_outlook_2019",
-            "switch_model.hawaii.heco_outlook_2020_06",
-            "switch_model.hawaii.heco_outlook_2020_08",
-            "switch_model.hawaii.heco_plan_2020_06",
-            "switch_model.hawaii.heco_plan_2020_08",
-            "switch_model.hawaii.hi_spinning_reserves",
-            "switch_model.hawaii.lake_wilson",
-            "switch_model.hawaii.lng_conversion",
-            "switch_model.hawaii.no_central_pv",
-            "switch_model.hawaii.no_onshore_wind",
-            "switch_model.hawaii.no_renewables",
-            "switch_model.hawaii.no_wind",
-            "switch_model.hawaii.oahu_plants",
-            "switch_model.hawaii.psip_2016_04",
-            "switch_model.hawaii.psip_2016_12",
-            "switch_model.hawaii.pumped_hydro",
-            "switch_model.hawaii.register_hi_storage_reserves",
-            "switch_model.hawaii.reserves",
-            "switch_model.hawaii.smooth_dispatch_quadratic",
-            "switch_model.hawaii.switch_patch",
-            "switch_model.hawaii.unserved_load",
+        avail_modules = [m for m in builtin_module_order if m in avail_modules] + [
+            m for m in sorted(avail_modules) if m not in builtin_module_order
         ]
+    return avail_modules
+
+
+def is_switch_module(info):
+    callbacks = set(info["callbacks"])
+    return bool(callbacks - {"define_arguments"}) or (
+        bool(callbacks) and not info["has_main"]
+    )
+
+
+def iter_module_files(directory, prefix):
+    """
+    Yield (module name, source file) for all modules and packages in
+    directory and its packages, like pkgutil.walk_packages().
+    """
+    try:
+        entries = sorted(os.listdir(directory))
+    except OSError:
+        return
+    for entry in entries:
+        full_path = os.path.join(directory, entry)
+        if entry.endswith(".py") and entry != "__init__.py":
+            name = entry[:-3]
+            if name.isidentifier() and os.path.isfile(full_path):
+                yield prefix + name, full_path
+        elif entry.isidentifier() and os.path.isfile(
+            os.path.join(full_path, "__init__.py")
+        ):
+            yield prefix + entry, os.path.join(full_path, "__init__.py")
+            yield from iter_module_files(full_path, prefix + entry + ".")
+
+
+def find_module_file(module):
+    """
+    Return the source file for the named module without importing it (or its
+    parent packages), or None if it can't be found.
+    """
+    mod = sys.modules.get(module)
+    if mod is not None:
+        return module_file(mod)
+    parts = module.split(".")
+    for entry in sys.path:
+        base = os.path.join(entry or ".", *parts)
+        for filename in (base + ".py", os.path.join(base, "__init__.py")):
+            if os.path.isfile(filename):
+                return os.path.abspath(filename)
+    return None
+
+
+class ModuleIndex(object):
+    """
+    Persistent index of the Switch callbacks and argument definitions in
+    module source files, found by parsing the files with ast. Entries are
+    keyed by file path and reused as long as the file's modification time and
+    size (or failing that, its content hash) are unchanged. The index is saved
+    as json in the user's cache directory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.dirty = False
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = dict()
+
+    def get(self, filename):
+        """
+        Return a dict with the callbacks defined by filename (list), whether
+        it defines a main() function (has_main) and the arguments it defines
+        (see static_arguments()).
+        """
+        key = os.path.abspath(filename)
+        stat = os.stat(key)
+        entry = self.entries.get(key)
+        if (
+            entry is not None
+            and entry["mtime"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            return entry
+        with open(key, "rb") as f:
+            source = f.read()
+        digest = hashlib.sha1(source).hexdigest()
+        if entry is None or entry["hash"] != digest:
+            entry = analyze_module_source(source, key)
+            entry["hash"] = digest
+        entry["mtime"] = stat.st_mtime_ns
+        entry["size"] = stat.st_size
+        self.entries[key] = entry
+        self.dirty = True
+        return entry
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError:
+            # the index is only a cache; carry on without saving it
+            pass
+
+
+module_index = None
+
+
+def get_module_index():
+    global module_index
+    if module_index is None:
+        cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        module_index = ModuleIndex(
+            os.path.join(cache_dir, "switch_model", "module_index.json")
+        )
+    return module_index
+
+
+def analyze_module_source(source, filename):
+    try:
+        tree = ast.parse(source, filename=filename)
+    except (SyntaxError, ValueError):
+        return {"callbacks": [], "has_main": False, "arguments": []}
+    names = set()
+    functions = dict()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            names.add(node.name)
+            functions[node.name] = node
+        elif isinstance(node, ast.Assign):
+            names.update(t.id for t in node.targets if isinstance(t, ast.Name))
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((a.asname or a.name).split(".")[0] for a in node.names)
+    if "define_arguments" not in names:
+        arguments = []
+    elif "define_arguments" in functions:
+        arguments = static_arguments(functions["define_arguments"])
     else:
-        # lookup available packages
-        import pkgutil
-
-        switch_callbacks = [
-            "define_arguments",
-            "define_components",
-            "define_dynamic_components",
-            "load_inputs",
-            "pre_solve",
-            "pre_iterate",
-            "post_iterate",
-            "post_solve",
-        ]
-        avail_modules = []
+        arguments = None
+    return {
+        "callbacks": [c for c in switch_callbacks if c in names],
+        "has_main": "main" in names,
+        "arguments": arguments,
+    }
 
-        for info in pkgutil.walk_packages(path=path, prefix=prefix):
-            try:
-                mod = importlib.import_module(info.name)
-                if any(hasattr(mod, x) for x in switch_callbacks):
-                    avail_modules.append(info.name)
-            except:
-                # some kind of error, skip
-                pass
-        return avail_modules
+
+def static_arguments(func):
+    """
+    Return a list of [args, kwargs] for the parser.add_argument() calls in
+    define_arguments function definition `func`, or None if the function does
+    anything else or uses arguments that are not literal values (then the
+    module must be imported to find its arguments).
+    """
+    if not func.args.args:
+        return None
+    parser_name = func.args.args[0].arg
+    arguments = []
+    for i, stmt in enumerate(func.body):
+        if (
+            i == 0
+            and isinstance(stmt, ast.Expr)
+            and isinstance(stmt.value, ast.Constant)
+            and isinstance(stmt.value.value, str)
+        ):
+            continue  # docstring
+        if isinstance(stmt, ast.Pass):
+            continue
+        call = stmt.value if isinstance(stmt, ast.Expr) else None
+        if not (
+            isinstance(call, ast.Call)
+            and isinstance(call.func, ast.Attribute)
+            and call.func.attr == "add_argument"
+            and isinstance(call.func.value, ast.Name)
+            and call.func.value.id == parser_name
+        ):
+            return None
+        try:
+            args = [ast.literal_eval(a) for a in call.args]
+            kwargs = {k.arg: ast.literal_eval(k.value) for k in call.keywords}
+        except ValueError:
+            return None
+        if None in kwargs:
+            return None  # **kwargs
+        arguments.append([args, kwargs])
+    try:
+        # make sure the values can be stored in the index
+        if json.loads(json.dumps(arguments)) != arguments:
+            return None
+    except (TypeError, ValueError):
+        return None
+    return arguments
 
 
 def arg_dict(arg, *ops):
@@ -253,17 +457,28 @@ def module_arguments(module):
 
     result = dict()
 
-    mod = importlib.import_module(module)
-
-    if hasattr(mod, "define_arguments"):
-        mod_parser = _ArgumentParser()
-        mod.define_arguments(mod_parser)
-        for arg in mod_parser._actions:
-            if isinstance(arg, argparse._HelpAction):
-                # skip the default --help option
-                continue
-            else:
-                result.update(arg_dict(arg))
+    # use the arguments found by static analysis if possible
+    filename = find_module_file(module)
+    arguments = None
+    if filename is not None:
+        index = get_module_index()
+        arguments = index.get(filename)["arguments"]
+        index.save()
+
+    mod_parser = _ArgumentParser()
+    if arguments is not None:
+        for args, kwargs in arguments:
+            mod_parser.add_argument(*args, **kwargs)
+    else:
+        mod = importlib.import_module(module)
+        if hasattr(mod, "define_arguments"):
+            mod.define_arguments(mod_parser)
+    for arg in mod_parser._actions:
+        if isinstance(arg, argparse._HelpAction):
+            # skip the default --help option
+            continue
+        else:
+            result.update(arg_dict(arg))
 
     return result
 
@@ -302,3 +517,325 @@ def scenario_argument_values(scenario):
             module.define_arguments(argparser)
     options = argparser.parse_args(args)
     return vars(options)  # convert to dict
+
+
+def serve():
+    """
+    `serve [--socket <path>]`: run a long-lived process that answers info
+    queries via JSON-RPC 2.0, one request or response per line, over stdin and
+    stdout or a Unix socket. This avoids Python startup and module imports
+    for each query. Supported methods (with named params) are:
+
+        module_list()
+        module_arguments(module)
+        scenario_argument_values(scenario="")
+        info(module_list=False, module_arguments=None, scenario_argument_values=None)
+        shutdown()
+
+    info combines the others in the same way as `switch info`. Any request can
+    also give a "cwd" param with the model directory to use for that request.
+    Results are cached and reused until one of the files they were based on
+    changes (options.txt, scenarios.txt, modules.txt or module source code).
+    Modules whose source code has changed are reloaded before answering.
+    """
+    parser = _ArgumentParser(
+        allow_abbrev=False,
+        description="Answer Switch info queries via JSON-RPC.",
+    )
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help=(
+            "Listen on a Unix socket at the specified path instead of "
+            "reading requests from stdin and writing responses to stdout."
+        ),
+    )
+    options = parser.parse_args()
+
+    server = InfoServer()
+    if options.socket is None:
+        server.serve_stdio()
+    else:
+        server.serve_socket(options.socket)
+
+
+class InfoServer(object):
+    """
+    Answer JSON-RPC requests for info about models, caching the results until
+    the files they depend on change.
+    """
+
+    methods = (
+        "info",
+        "module_list",
+        "module_arguments",
+        "scenario_argument_values",
+        "shutdown",
+    )
+
+    def __init__(self):
+        # (cwd, method, args) -> (result, {path: file stamp})
+        self.cache = dict()
+        # path -> file stamp for source code of all imported modules
+        self.module_stamps = dict()
+        self.record_module_stamps()
+        self.running = True
+
+    def serve_stdio(self):
+        out = sys.stdout
+        for line in sys.stdin:
+            response = self.handle_line(line)
+            if response is not None:
+                out.write(response + "\n")
+                out.flush()
+            if not self.running:
+                break
+
+    def serve_socket(self, path):
+        import socketserver
+
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    response = server.handle_line(line.decode("utf-8"))
+                    if response is not None:
+                        self.wfile.write((response + "\n").encode("utf-8"))
+                        self.wfile.flush()
+                    if not server.running:
+                        break
+
+        if os.path.exists(path):
+            os.remove(path)  # left over from a previous run
+        try:
+            with socketserver.UnixStreamServer(path, Handler) as listener:
+                while self.running:
+                    listener.handle_request()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def handle_line(self, line):
+        """Return the json response for one line of input (None if no reply)."""
+        if not line.strip():
+            return None
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return json.dumps(rpc_error(None, -32700, f"Parse error: {e}"))
+        if isinstance(request, list):
+            responses = [self.handle_request(r) for r in request]
+            responses = [r for r in responses if r is not None]
+            return json.dumps(responses) if responses else None
+        response = self.handle_request(request)
+        return None if response is None else json.dumps(response)
+
+    def handle_request(self, request):
+        if not isinstance(request, dict) or "method" not in request:
+            return rpc_error(
+                request.get("id") if isinstance(request, dict) else None,
+                -32600,
+                "Invalid request",
+            )
+        req_id = request.get("id")
+        method = request["method"]
+        params = request.get("params", {})
+        if method not in self.methods:
+            response = rpc_error(req_id, -32601, f"Method not found: {method}")
+        elif not isinstance(params, dict):
+            response = rpc_error(req_id, -32602, "Params must be given by name.")
+        elif not self.valid_params(method, params):
+            response = rpc_error(req_id, -32602, f"Invalid params for {method}.")
+        else:
+            try:
+                # keep anything printed by modules out of the response stream
+                with redirect_stdout(sys.stderr):
+                    result = self.call(method, dict(params))
+                response = {"jsonrpc": "2.0", "id": req_id, "result": result}
+            except Exception as e:
+                response = rpc_error(
+                    req_id, -32000, f"{type(e).__name__}: {e}", traceback.format_exc()
+                )
+        # no responses for notifications (requests without an id)
+        return response if "id" in request else None
+
+    def valid_params(self, method, params):
+        if method in ("info", "shutdown"):
+            func = getattr(self, method)
+        else:
+            func = globals()[method]
+        params = {k: v for k, v in params.items() if k != "cwd"}
+        try:
+            inspect.signature(func).bind(**params)
+        except TypeError:
+            return False
+        return True
+
+    def shutdown(self):
+        self.running = False
+
+    def call(self, method, params):
+        if method == "shutdown":
+            return self.shutdown()
+        cwd = params.pop("cwd", None)
+        orig_dir = os.getcwd()
+        if cwd is not None:
+            os.chdir(cwd)
+        try:
+            self.reload_changed_modules()
+            if method == "info":
+                return self.info(**params)
+            else:
+                return self.cached(method, **params)
+        finally:
+            os.chdir(orig_dir)
+            self.record_module_stamps()
+
+    def info(
+        self, module_list=False, module_arguments=None, scenario_argument_values=None
+    ):
+        output = []
+        if module_list:
+            output.append(self.cached("module_list"))
+        if module_arguments is not None:
+            output.append(self.cached("module_arguments", module=module_arguments))
+        if scenario_argument_values is not None:
+            output.append(
+                self.cached(
+                    "scenario_argument_values", scenario=scenario_argument_values
+                )
+            )
+        if len(output) == 1:
+            output = output[0]
+        return output
+
+    def cached(self, method, **kwargs):
+        key = (os.getcwd(), method, json.dumps(kwargs, sort_keys=True))
+        try:
+            result, stamps = self.cache[key]
+            if all(file_stamp(p) == s for p, s in stamps.items()):
+                return result
+        except KeyError:
+            pass
+        result = globals()[method](**kwargs)
+        deps = globals()[method + "_dependencies"](**kwargs)
+        self.cache[key] = (result, {p: file_stamp(p) for p in deps})
+        return result
+
+    def record_module_stamps(self):
+        for path in module_files():
+            if path not in self.module_stamps:
+                self.module_stamps[path] = file_stamp(path)
+
+    def reload_changed_modules(self):
+        """
+        Reload any imported modules whose source code has changed. Raises
+        ModuleReloadError if any of them can't be reloaded; those modules are
+        tried again on the next request.
+        """
+        changed = {p for p, s in self.module_stamps.items() if file_stamp(p) != s}
+        if not changed:
+            return
+        failed = []
+        for name, mod in list(sys.modules.items()):
+            path = module_file(mod)
+            if path in changed and name != __name__:
+                try:
+                    importlib.reload(mod)
+                except Exception as e:
+                    failed.append(f"{name}: {type(e).__name__}: {e}")
+                    changed.discard(path)
+        for path in changed:
+            self.module_stamps[path] = file_stamp(path)
+        if failed:
+            raise ModuleReloadError(
+                "Unable to reload changed module(s):\n" + "\n".join(failed)
+            )
+
+
+class ModuleReloadError(RuntimeError):
+    pass
+
+
+def rpc_error(req_id, code, message, data=None):
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "id": req_id, "error": error}
+
+
+def file_stamp(path):
+    """Return a value that changes when the file or directory changes."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def module_file(mod):
+    path = getattr(mod, "__file__", None) if mod is not None else None
+    return None if path is None else os.path.abspath(path)
+
+
+def module_files():
+    """Source files of all imported Switch modules and local modules."""
+    switch_dir = os.path.dirname(os.path.abspath(switch_model.__file__))
+    cwd = os.getcwd()
+    result = []
+    for mod in list(sys.modules.values()):
+        path = module_file(mod)
+        if path is not None and path.endswith(".py"):
+            if path.startswith(switch_dir) or path.startswith(cwd):
+                result.append(path)
+    return result
+
+
+def module_list_dependencies():
+    """
+    Directories and .py files that pkgutil.walk_packages() would search for
+    local modules; directories change when files are added or removed.
+    """
+    paths = ["."]
+    dirs = ["."]
+    while dirs:
+        d = dirs.pop()
+        for entry in os.scandir(d):
+            if entry.is_file() and entry.name.endswith(".py"):
+                paths.append(entry.path)
+            elif entry.is_dir() and os.path.exists(
+                os.path.join(entry.path, "__init__.py")
+            ):
+                paths.append(entry.path)
+                dirs.append(entry.path)
+    return paths
+
+
+def module_arguments_dependencies(module):
+    return [find_module_file(module)]
+
+
+def scenario_argument_values_dependencies(scenario):
+    from . import solve
+
+    args = solve.get_option_file_args()
+    parser = _ArgumentParser(allow_abbrev=False, add_help=False)
+    solve.add_module_args(parser)
+    parser.add_argument("--scenario-list", default="scenarios.txt")
+    module_options = parser.parse_known_args(args=args)[0]
+    paths = [
+        "options.txt",
+        "modules.txt",
+        os.path.join(module_options.inputs_dir, "modules.txt"),
+    ]
+    if module_options.module_list is not None:
+        paths.append(module_options.module_list)
+    if scenario != "":
+        paths.append(module_options.scenario_list)
+    # source code that defines the arguments
+    for m in solve.get_module_list(args):
+        path = module_file(sys.modules.get(m))
+        if path is not None:
+            paths.append(path)
+    return paths
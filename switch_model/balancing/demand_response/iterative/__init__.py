@@ -303,6 +303,8 @@ def define_components(m):
 
     # variable to store the baseline data
     m.base_data = None
+    # list of bids received from the demand module in each iteration
+    m.dr_bids_received = []
 
     # # TODO: create a data file that lists which timepoints are grouped into each flat
     # # pricing block; also enforce a requirement that no block can span periods.
@@ -664,6 +666,30 @@ def post_iterate(m):
     #     import pdb; pdb.set_trace()
 
 
+def save_iteration_state(m):
+    """Return the bids and prior solution data needed to resume iteration."""
+    return dict(
+        calibrated=m.base_data is not None,
+        bids=m.dr_bids_received,
+        prev_marginal_cost=m.prev_marginal_cost,
+        prev_demand=m.prev_demand,
+        prev_SystemCost=m.prev_SystemCost,
+    )
+
+
+def load_iteration_state(m, state):
+    """Restore the demand system and bids saved by save_iteration_state()."""
+    if state["calibrated"]:
+        calibrate_model(m)
+    for bids in state["bids"]:
+        record_bids(m, bids)
+    if state["bids"]:
+        reconstruct_bid_components(m)
+    m.prev_marginal_cost = state["prev_marginal_cost"]
+    m.prev_demand = state["prev_demand"]
+    m.prev_SystemCost = state["prev_SystemCost"]
+
+
 def update_demand(m):
     """
     This should be called after solving the model, in order to calculate new bids
@@ -1012,6 +1038,16 @@ def add_bids(m, bids):
     and wtp is the net private benefit from consuming/selling the amount of power in that bid.
     Then add that set of bids to the model
     """
+    record_bids(m, bids)
+
+    print("len(m.DR_BID_LIST): {l}".format(l=len(m.DR_BID_LIST)))
+    print("m.DR_BID_LIST: {b}".format(b=[x for x in m.DR_BID_LIST]))
+
+    reconstruct_bid_components(m)
+
+
+def record_bids(m, bids):
+    """Add a new bid number to m.DR_BID_LIST and store the bid data for it."""
     # create a bid ID and add it to the list of bids
     if len(m.DR_BID_LIST) == 0:
         b = 1
@@ -1019,6 +1055,8 @@ def add_bids(m, bids):
         b = max(m.DR_BID_LIST) + 1
 
     m.DR_BID_LIST.add(b)
+    # keep the raw bids, so they can be saved in iteration checkpoints
+    m.dr_bids_received.append(bids)
 
     # add the bids for each load zone and timepoint to the dr_bid list
     for z, ts, prices, demand, wtp in bids:
@@ -1030,9 +1068,8 @@ def add_bids(m, bids):
                 m.dr_bid[b, z, tp, prod] = demand[prod][i]
                 m.dr_price[b, z, tp, prod] = prices[prod][i]
 
-    print("len(m.DR_BID_LIST): {l}".format(l=len(m.DR_BID_LIST)))
-    print("m.DR_BID_LIST: {b}".format(b=[x for x in m.DR_BID_LIST]))
 
+def reconstruct_bid_components(m):
     # reconstruct the components that depend on m.DR_BID_LIST, m.dr_bid_benefit and m.dr_bid
     m.DRBidWeight.reconstruct()
     m.DR_Convex_Bid_Weight.reconstruct()
@@ -14,8 +14,23 @@ the model becomes infeasible when specifying `--no-relax Constraint1
 Constraint2`, we know that Constraint1 and Constraint2 cannot be satisfied at
 the same time. Users should then look for inconsistencies in the data used for
 these two constraints.
+
+For large models, it is usually better to solve with `--diagnose-infeasibility`
+instead of adding this module to the module list. Then, if the model turns out
+to be infeasible, Switch searches the already-constructed instance for a
+minimal set of conflicting constraints, using find_conflicting_constraints()
+below. That first applies a deletion filter to whole constraint families
+(optionally testing families in parallel with `--diagnosis-workers`), then
+applies an elastic filter and a deletion filter to the individual constraints
+in the remaining families. Only the constraints in those families receive
+relaxation variables, so the model never grows much, and the conflicting set
+is identified automatically instead of through rounds of `--no-relax`.
 """
 
+import multiprocessing
+import os
+
+from pyomo.opt import TerminationCondition
 from switch_model.utilities import make_iterable
 import pyomo.environ as pyo
 
@@ -304,3 +319,463 @@ def assign_relaxation_prices(m):
     # is not very useful and makes solutions much slower.
     m.Total_Constraint_Relaxations = pyo.Objective(rule=cost_rule, sense=pyo.minimize)
     m.Minimize_System_Cost.deactivate()
+
+
+# Diagnosis of infeasible models after construction (--diagnose-infeasibility).
+# These functions are called by switch_model.solve.solve() when the solver
+# reports that the model has no solution. They work on the constructed instance
+# and do not need this module to be in the module list.
+
+feasible_conditions = {
+    TerminationCondition.optimal,
+    TerminationCondition.locallyOptimal,
+    TerminationCondition.globallyOptimal,
+    TerminationCondition.feasible,
+}
+infeasible_conditions = {
+    TerminationCondition.infeasible,
+    TerminationCondition.infeasibleOrUnbounded,
+}
+
+
+class DiagnosisError(RuntimeError):
+    """
+    Raised when the search for conflicting constraints cannot continue, e.g.,
+    because the solver stopped at a time or iteration limit, so feasibility
+    could not be determined.
+    """
+
+    pass
+
+
+# model used by worker processes for parallel tests (inherited via fork)
+_worker_model = None
+
+
+def diagnose_infeasibility(m):
+    """
+    Find and report a minimal set of conflicting constraints in an infeasible
+    model. The conflicts are logged and saved in conflicting_constraints.csv
+    in the outputs directory.
+    """
+    m.logger.error(
+        "\nSearching for a minimal set of conflicting constraints "
+        "(--diagnose-infeasibility). This may take a while..."
+    )
+    try:
+        conflicts = find_conflicting_constraints(m, workers=m.options.diagnosis_workers)
+    except DiagnosisError as e:
+        m.logger.error(f"Unable to diagnose infeasibility: {e}")
+        return
+    if conflicts is None:
+        m.logger.error(
+            "The model is feasible when solved without an objective function, "
+            "so the solver may have stopped for another reason (e.g., the "
+            "model is unbounded or a time or iteration limit was reached)."
+        )
+        return
+
+    m.logger.error(
+        "The following constraints cannot all be satisfied at the same time "
+        "(*_bounds refers to the upper or lower bounds on a variable):"
+    )
+    for family, key in conflicts:
+        m.logger.error("    " + conflict_name(family, key))
+
+    if not os.path.isdir(m.options.outputs_dir):
+        os.makedirs(m.options.outputs_dir)
+    # imported here to avoid a circular import with switch_model.reporting
+    from switch_model.reporting import write_table
+
+    write_table(
+        m,
+        [
+            (family, "" if key is None else repr(list(make_iterable(key))))
+            for family, key in conflicts
+        ],
+        output_file=os.path.join(m.options.outputs_dir, "conflicting_constraints.csv"),
+        headings=("constraint", "index"),
+        values=lambda m, family, key: (family, key),
+    )
+
+
+def conflict_name(family, key):
+    if key is None:
+        return family
+    else:
+        return family + repr(list(make_iterable(key)))
+
+
+def find_conflicting_constraints(m, workers=1):
+    """
+    Return a minimal list of (family, index) pairs for constraints that cannot
+    all be satisfied simultaneously, or None if the model is feasible.
+
+    Families are the names of Constraint components, plus "<var>_bounds" for
+    the explicit upper and lower bounds of each Var (bounds implied by the
+    domain of the Var, e.g., NonNegativeReals, are never relaxed).
+
+    This first applies a deletion filter to whole families: each family is
+    deactivated in turn and stays deactivated if the model is still
+    infeasible without it. If workers > 1, the families are first tested
+    individually in parallel; families whose removal makes the model feasible
+    must be part of the conflict and are not tested again. Then an elastic
+    filter is applied to the remaining families: relaxation variables are
+    added to each of their constraints and the total violation is minimized,
+    then constraints that must be violated are made firm again until the
+    model becomes infeasible. Finally, a deletion filter is applied to the
+    firm constraints (in chunks, falling back to one at a time). The model is
+    restored to its original state before returning.
+    """
+    families = constraint_families(m)
+    with feasibility_objective(m) as objective:
+        if not is_infeasible(m):
+            return None
+
+        try:
+            # deletion filter over constraint families
+            kept = family_deletion_filter(m, families, workers)
+
+            # deletion and elastic filters over individual constraints
+            for name in families:
+                if name in kept:
+                    set_family_active(families[name], False)
+            rows = [
+                (name, key, kind, obj)
+                for name in kept
+                for (key, kind, obj) in family_rows(families[name])
+            ]
+            firm = elastic_filter(m, rows, objective)
+            conflicts = deletion_filter(
+                firm, lambda test_rows: rows_infeasible(m, rows, test_rows)
+            )
+        finally:
+            for family in families.values():
+                set_family_active(family, True)
+
+    return [(rows[i][0], rows[i][1]) for i in conflicts]
+
+
+def constraint_families(m):
+    """
+    Return a dict of constraint families in the model, keyed by name. Each
+    family is a tuple of (kind, component, elements), where kind is
+    "constraint" or "bounds" and elements is a list of (index, data) pairs for
+    the active constraints or the variables with explicit bounds.
+    """
+    families = dict()
+    for c in m.component_objects(pyo.Constraint, active=True, descend_into=True):
+        elements = [(k, cd) for k, cd in c.items() if cd.active]
+        if elements:
+            families[c.name] = ("constraint", c, elements)
+    for v in m.component_objects(pyo.Var, descend_into=True):
+        elements = []
+        for k, vd in v.items():
+            if vd.fixed:
+                continue
+            lb, ub = explicit_bounds(vd)
+            if lb is not None or ub is not None:
+                elements.append((k, (vd, lb, ub)))
+        if elements:
+            families[v.name + "_bounds"] = ("bounds", v, elements)
+    return families
+
+
+def explicit_bounds(vd):
+    """
+    Return the upper and lower bounds of a VarData that are tighter than the
+    bounds implied by its domain, or None for each bound that is not.
+    """
+    dom_lb, dom_ub = vd.domain.bounds()
+    lb, ub = vd.lb, vd.ub
+    if lb is not None and dom_lb is not None and lb <= dom_lb:
+        lb = None
+    if ub is not None and dom_ub is not None and ub >= dom_ub:
+        ub = None
+    return lb, ub
+
+
+def set_family_active(family, active):
+    """
+    Activate or deactivate all the constraints in a family, or restore or
+    relax the explicit bounds on all the variables in a family.
+    """
+    kind, component, elements = family
+    if kind == "constraint":
+        for k, cd in elements:
+            if active:
+                cd.activate()
+            else:
+                cd.deactivate()
+    else:
+        for k, (vd, lb, ub) in elements:
+            if lb is not None:
+                vd.setlb(lb if active else None)
+            if ub is not None:
+                vd.setub(ub if active else None)
+
+
+def family_rows(family):
+    """Yield (index, kind, data) for each element of a family."""
+    kind, component, elements = family
+    for k, obj in elements:
+        yield (k, kind, obj)
+
+
+class feasibility_objective(object):
+    """
+    Context manager that replaces the active objective(s) of the model with
+    a constant (zero) objective while testing for feasibility.
+    """
+
+    def __init__(self, m):
+        self.m = m
+
+    def __enter__(self):
+        self.objectives = [
+            o for o in self.m.component_data_objects(pyo.Objective, active=True)
+        ]
+        for o in self.objectives:
+            o.deactivate()
+        self.m.Diagnose_Infeasibility_Objective = pyo.Objective(expr=0)
+        return self.m.Diagnose_Infeasibility_Objective
+
+    def __exit__(self, *exc):
+        self.m.del_component("Diagnose_Infeasibility_Objective")
+        for o in self.objectives:
+            o.activate()
+
+
+def solve_for_diagnosis(m):
+    # imported here because switch_model.solve imports this module
+    from switch_model.solve import options_string_to_dict
+
+    return m.solver.solve(
+        m,
+        load_solutions=False,
+        options=options_string_to_dict(m.options.solver_options_string),
+    )
+
+
+def is_infeasible(m):
+    """
+    Solve the model and report whether it is infeasible. The objective should
+    be constant, so the model cannot be unbounded. Raises DiagnosisError if
+    the solver stops for any other reason (e.g., a time limit), since
+    treating that as infeasibility would add constraints to the conflict
+    that do not belong there.
+    """
+    return termination_is_infeasible(solve_for_diagnosis(m))
+
+
+def termination_is_infeasible(results):
+    """
+    Return True if `results` show that the model is infeasible or False if a
+    feasible solution was found; raise DiagnosisError otherwise.
+    """
+    condition = results.solver.termination_condition
+    if condition in infeasible_conditions:
+        return True
+    elif condition in feasible_conditions:
+        return False
+    else:
+        raise DiagnosisError(
+            f"The solver stopped with termination condition '{condition}', so "
+            "feasibility could not be determined. Consider increasing the "
+            "solver's time or iteration limits."
+        )
+
+
+def family_deletion_filter(m, families, workers):
+    """
+    Return the set of family names that remain after applying a deletion
+    filter to the model's constraint families. Families in the set are
+    active when this returns; the others are deactivated.
+    """
+    names = list(families)
+    needed = set()
+    if workers > 1 and len(names) > 1:
+        # screen each family individually, in parallel; any family whose
+        # removal makes the model feasible is part of every conflicting set
+        # among these constraints.
+        m.logger.info(f"Testing {len(names)} constraint families in parallel...")
+        needed = {
+            name
+            for name, infeasible in zip(
+                names, parallel_map(m, test_without_family, names, workers)
+            )
+            if not infeasible
+        }
+
+    for name in names:
+        if name in needed:
+            continue
+        set_family_active(families[name], False)
+        if is_infeasible(m):
+            # not needed to produce the infeasibility
+            m.logger.info(f"Dropped constraint family {name}.")
+        else:
+            set_family_active(families[name], True)
+            needed.add(name)
+    m.logger.info("Conflicting constraint families: " + ", ".join(sorted(needed)) + ".")
+    return needed
+
+
+def test_without_family(name):
+    """Report whether _worker_model is infeasible without family `name`."""
+    m = _worker_model
+    family = constraint_families(m)[name]
+    set_family_active(family, False)
+    try:
+        return is_infeasible(m)
+    finally:
+        set_family_active(family, True)
+
+
+def parallel_map(m, func, items, workers):
+    """
+    Apply func to each item in a pool of worker processes that share a copy of
+    model m. The workers are started by forking this process, so they inherit
+    the constructed model; where that is unavailable (e.g., on Windows), the
+    items are processed serially instead.
+    """
+    global _worker_model
+    _worker_model = m
+    try:
+        try:
+            ctx = multiprocessing.get_context("fork")
+        except ValueError:
+            m.logger.info("Parallel diagnosis is not available on this platform.")
+            return [func(item) for item in items]
+        with ctx.Pool(min(workers, len(items))) as pool:
+            return pool.map(func, items)
+    finally:
+        _worker_model = None
+
+
+def elastic_filter(m, rows, objective):
+    """
+    Add relaxation variables to the constraints described by `rows` (a list of
+    (family, index, kind, data) tuples), then repeatedly minimize the total
+    violation (using `objective`, which is reset to zero afterwards) and make
+    the violated constraints firm again, until the model becomes infeasible. Returns a list of positions in `rows` for the firm
+    constraints, which include at least one conflicting set. All rows are
+    deactivated when this returns.
+    """
+    slack_index = []
+    for i, (family, key, kind, obj) in enumerate(rows):
+        if kind == "constraint":
+            lower, upper = obj.lower, obj.upper
+        else:
+            vd, lower, upper = obj
+        if lower is not None:
+            slack_index.append((i, 1))
+        if upper is not None:
+            slack_index.append((i, -1))
+    m.Diagnose_Infeasibility_Slack = pyo.Var(slack_index, within=pyo.NonNegativeReals)
+    slack = m.Diagnose_Infeasibility_Slack
+
+    def relaxation(i):
+        return sum(d * slack[i, d] for d in [1, -1] if (i, d) in slack)
+
+    # relax the constraints, saving the original forms of the constraints
+    original_exprs = dict()
+    bound_rows = []
+    for i, (family, key, kind, obj) in enumerate(rows):
+        if kind == "constraint":
+            original_exprs[i] = obj.expr
+            obj.set_value((obj.lower, obj.body + relaxation(i), obj.upper))
+            obj.activate()
+        else:
+            bound_rows.append(i)
+
+    def bound_rule(m, i):
+        vd, lower, upper = rows[i][3]
+        return (lower, vd + relaxation(i), upper)
+
+    m.Diagnose_Infeasibility_Bounds = pyo.Constraint(bound_rows, rule=bound_rule)
+
+    try:
+        firm = []
+        objective.set_value(pyo.quicksum(slack.values()))
+        while True:
+            results = solve_for_diagnosis(m)
+            if termination_is_infeasible(results):
+                break
+            m.solutions.load_from(results)
+            violated = {
+                i for (i, d), s in slack.items() if not s.fixed and s.value > 1e-7
+            }
+            if not violated:
+                # shouldn't happen, since these families are infeasible
+                raise DiagnosisError(
+                    "Unable to identify conflicting constraints: the model "
+                    "is feasible when relaxation variables are added to "
+                    "the conflicting constraint families."
+                )
+            m.logger.info(
+                f"Elastic filter: {len(violated)} constraint(s) violated; "
+                "making these firm and solving again."
+            )
+            for i in sorted(violated):
+                firm.append(i)
+                for d in [1, -1]:
+                    if (i, d) in slack:
+                        slack[i, d].fix(0)
+    finally:
+        # restore the original constraints and remove the relaxations
+        for i, expr in original_exprs.items():
+            rows[i][3].set_value(expr)
+            rows[i][3].deactivate()
+        objective.set_value(0)
+        m.del_component("Diagnose_Infeasibility_Bounds")
+        m.del_component("Diagnose_Infeasibility_Slack")
+    return firm
+
+
+def set_row_active(row, active):
+    family, key, kind, obj = row
+    if kind == "constraint":
+        if active:
+            obj.activate()
+        else:
+            obj.deactivate()
+    else:
+        set_family_active((kind, None, [(key, obj)]), active)
+
+
+def rows_infeasible(m, rows, test_rows):
+    """
+    Report whether the model is infeasible when only the constraints in
+    positions `test_rows` of `rows` are active (or firm, for bounds).
+    """
+    for i in test_rows:
+        set_row_active(rows[i], True)
+    try:
+        return is_infeasible(m)
+    finally:
+        for i in test_rows:
+            set_row_active(rows[i], False)
+
+
+def deletion_filter(items, infeasible):
+    """
+    Return a minimal sublist of `items` such that infeasible(sublist) is True,
+    assuming infeasible(items) is True. Items are dropped in chunks, starting
+    with half the list; when a chunk cannot be dropped, the chunk size is
+    halved, down to single items.
+    """
+    needed = []
+    remaining = list(items)
+    chunk = max(1, len(remaining) // 2)
+    while remaining:
+        candidates, rest = remaining[:chunk], remaining[chunk:]
+        if infeasible(needed + rest):
+            # candidates are not needed to produce the infeasibility
+            remaining = rest
+        elif chunk > 1:
+            chunk = max(1, chunk // 2)
+        else:
+            needed.append(candidates[0])
+            remaining = rest
+    return needed
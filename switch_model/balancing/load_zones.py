@@ -156,6 +156,10 @@ def load_inputs(mod, switch_data, inputs_dir):
     loads.csv
         LOAD_ZONE, TIMEPOINT, zone_demand_mw
 
+    loads can also be provided as a timepoint x zone matrix in loads.npy,
+    with labels in loads_rows.csv and loads_columns.csv (see `switch
+    convert-inputs --matrix`).
+
     zone_coincident_peak_demand.csv*
         LOAD_ZONE, PERIOD, zone_expected_coincident_peak_demand
 
@@ -169,7 +173,9 @@ def load_inputs(mod, switch_data, inputs_dir):
         param=(mod.zone_ccs_distance_km, mod.zone_dbid),
     )
     switch_data.load_aug(
-        filename=os.path.join(inputs_dir, "loads.csv"), param=(mod.zone_demand_mw)
+        filename=os.path.join(inputs_dir, "loads.csv"),
+        param=(mod.zone_demand_mw),
+        matrix_sets=(mod.LOAD_ZONES, mod.TIMEPOINTS),
     )
     switch_data.load_aug(
         optional=True,
@@ -189,16 +195,15 @@ def post_solve(instance, outdir):
     become a column.
 
     """
+    components = instance.Zone_Power_Injections + instance.Zone_Power_Withdrawals
+    # evaluate each component for all zones and timepoints at once
+    component_values = [instance.solution_values(c) for c in components]
     write_table(
         instance,
         instance.LOAD_ZONES,
         instance.TIMEPOINTS,
         output_file=os.path.join(outdir, "load_balance.csv"),
-        headings=("load_zone", "timestamp")
-        + tuple(instance.Zone_Power_Injections + instance.Zone_Power_Withdrawals),
+        headings=("load_zone", "timestamp") + tuple(components),
         values=lambda m, z, t: (z, m.tp_timestamp[t])
-        + tuple(
-            getattr(m, component)[z, t]
-            for component in (m.Zone_Power_Injections + m.Zone_Power_Withdrawals)
-        ),
+        + tuple(vals[z, t] for vals in component_values),
     )
@@ -173,16 +173,20 @@ def gen_unit_contingency(m):
     contingencies of individual generation units that have discrete sizes
     specified. Caution, this adds binary variables to the model for every
     GEN_TPS for DISCRETELY_SIZED_GENS. This many binary variables can impact
-    runtime.
+    runtime. With --cluster-unit-commitment, identical projects in the same
+    load zone share one binary variable per timepoint instead (see
+    DISCRETE_GEN_CLUSTERS in generators.core.commit.operate), which gives
+    the same largest contingency with fewer binary variables.
 
-    UNIT_CONTINGENCY_DISPATCH_POINTS is a subset of GEN_TPS for
-    DISCRETELY_SIZED_GENS
+    UNIT_CONTINGENCY_DISPATCH_POINTS is the set of DISCRETE_CLUSTER_TPS,
+    i.e., (c, t) tuples for each cluster of DISCRETELY_SIZED_GENS and the
+    timepoints when it is active.
 
-    GenIsCommitted[(g,t) in UNIT_CONTINGENCY_DISPATCH_POINTS] is a binary
-    variable that tracks whether generation projects at least one units
-    committed.
+    GenIsCommitted[(c,t) in UNIT_CONTINGENCY_DISPATCH_POINTS] is a binary
+    variable that tracks whether the projects in each cluster have at least
+    one unit committed.
 
-    Enforce_GenIsCommitted[(g,t) in UNIT_CONTINGENCY_DISPATCH_POINTS] is a
+    Enforce_GenIsCommitted[(c,t) in UNIT_CONTINGENCY_DISPATCH_POINTS] is a
     constraint that enforces the tracking behavior of GenIsCommitted.
 
     GenUnitLargestContingency[(b,t) in BALANCING_AREA_TIMEPOINTS] is a
@@ -190,20 +194,14 @@ def gen_unit_contingency(m):
     area, accounting for all of the discretely sized units that are currently
     committed. This is added to the dynamic list Spinning_Reserve_Contingencies.
 
-    Enforce_GenUnitLargestContingency[(g,t) in UNIT_CONTINGENCY_DISPATCH_POINTS]
+    Enforce_GenUnitLargestContingency[(c,t) in UNIT_CONTINGENCY_DISPATCH_POINTS]
     is a constraint that enforces the behavior of GenUnitLargestContingency,
     by making GenUnitLargestContingency >= the capacity of each of the
     committed units in its balancing area.
 
     """
-    # UNIT_CONTINGENCY_DISPATCH_POINTS duplicates
-    # GEN_DISPATCH_POINTS_DISCRETE from generators.core.commit.discrete. I
-    # justify the duplication because I don't think discrete unit commitment
-    # should be a prerequisite for this functionality.
     m.UNIT_CONTINGENCY_DISPATCH_POINTS = Set(
-        dimen=2,
-        initialize=m.GEN_TPS,
-        filter=lambda m, g, tp: g in m.DISCRETELY_SIZED_GENS,
+        dimen=2, initialize=lambda m: list(m.DISCRETE_CLUSTER_TPS)
     )
     m.GenIsCommitted = Var(
         m.UNIT_CONTINGENCY_DISPATCH_POINTS,
@@ -212,12 +210,17 @@ def gen_unit_contingency(m):
     )
     m.Enforce_GenIsCommitted = Constraint(
         m.UNIT_CONTINGENCY_DISPATCH_POINTS,
-        rule=lambda m, g, tp: m.CommitGen[g, tp]
-        <= m.GenIsCommitted[g, tp]
-        * (
-            m._gen_max_cap_for_binary_constraints
-            if g not in m.CAPACITY_LIMITED_GENS
-            else m.gen_capacity_limit_mw[g]
+        rule=lambda m, c, tp: sum(
+            m.CommitGen[g, tp] for g in m.GENS_IN_DISCRETE_CLUSTER[c]
+        )
+        <= m.GenIsCommitted[c, tp]
+        * sum(
+            (
+                m._gen_max_cap_for_binary_constraints
+                if g not in m.CAPACITY_LIMITED_GENS
+                else m.gen_capacity_limit_mw[g]
+            )
+            for g in m.GENS_IN_DISCRETE_CLUSTER[c]
         ),
     )
     m.GenUnitLargestContingency = Var(
@@ -225,11 +228,11 @@ def gen_unit_contingency(m):
         doc="Largest generating unit that could drop offline.",
     )
 
-    def Enforce_GenUnitLargestContingency_rule(m, g, t):
-        b = m.zone_balancing_area[m.gen_load_zone[g]]
+    def Enforce_GenUnitLargestContingency_rule(m, c, t):
+        b = m.zone_balancing_area[m.gen_load_zone[c]]
         return (
             m.GenUnitLargestContingency[b, t]
-            >= m.GenIsCommitted[g, t] * m.gen_unit_size[g]
+            >= m.GenIsCommitted[c, t] * m.gen_unit_size[c]
         )
 
     m.Enforce_GenUnitLargestContingency = Constraint(
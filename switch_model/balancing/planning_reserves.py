@@ -27,6 +27,14 @@ capacity value timeseries will default to their capacity factor timeseries.
 By default, storage and transmission will be credited with their expected
 net power delivery.
 
+Requirements with prr_enforcement_timescale = 'all_timepoints' produce one
+constraint per timepoint, but usually only a few of these bind. With
+--planning-reserve-row-generation, these requirements are initially enforced
+only in the peak and near-peak timepoints of each period. This module is then
+added to the iteration list (if not already there), and after each solve,
+post_iterate() checks all the other timepoints against the solution and adds
+constraints for any where the requirement is violated, until there are none.
+
 References:
 
 North American Electric Reliability Corporation brief definition and
@@ -47,6 +55,7 @@ https://www.caiso.com/Documents/Jan29_2016_Comments_2017Track1Proposals_Resource
 """
 
 import os
+import numpy as np
 from pyomo.environ import *
 
 dependencies = (
@@ -65,6 +74,33 @@ optional_prerequisites = (
 )
 
 
+def define_arguments(argparser):
+    group = argparser.add_argument_group(__name__)
+    group.add_argument(
+        "--planning-reserve-row-generation",
+        default=False,
+        dest="planning_reserve_row_generation",
+        action="store_true",
+        help=(
+            "Enforce 'all_timepoints' planning reserve requirements only in "
+            "peak and near-peak timepoints at first, then iteratively add "
+            "constraints for any other timepoints where the requirement is "
+            "violated by the solution."
+        ),
+    )
+    group.add_argument(
+        "--planning-reserve-initial-timepoints",
+        default=5,
+        type=int,
+        dest="planning_reserve_initial_timepoints",
+        help=(
+            "Number of peak-load timepoints per period to enforce initially "
+            "for 'all_timepoints' planning reserve requirements when using "
+            "--planning-reserve-row-generation (default is 5)."
+        ),
+    )
+
+
 def define_dynamic_lists(model):
     """
     CAPACITY_FOR_RESERVES is a list of model components than can contribute
@@ -105,6 +141,12 @@ def define_components(model):
 
     PRR_TIMEPOINTS is a sparse set of (prr, t)
 
+    PRR_ENFORCED_TIMEPOINTS is the subset of PRR_TIMEPOINTS where
+    Enforce_Planning_Reserve_Margin is currently constructed. This is the same
+    as PRR_TIMEPOINTS unless --planning-reserve-row-generation is specified,
+    in which case it starts with peak and near-peak timepoints for
+    'all_timepoints' requirements and is extended during iteration.
+
     gen_capacity_value[g, t] is a ratio of how much of a generator's installed
     capacity should be credited towards capacity reserve requirements. This
     defaults to gen_max_capacity_factor for renewable projects with variable
@@ -151,23 +193,24 @@ def define_components(model):
         ),
     )
 
-    def get_peak_timepoints(m, prr):
+    def get_peak_timepoints(m, prr, n=1):
         """
         Return the set of timepoints with peak load within a planning reserve
-        requirement area for each period. For this calculation, load is defined
+        requirement area for each period (or the n timepoints with the
+        highest load in each period). For this calculation, load is defined
         statically (zone_demand_mw), ignoring the impact of all distributed
         energy resources.
         """
         peak_timepoint_list = []
         ZONES = [z for (_prr, z) in m.PRR_ZONES if _prr == prr]
         for p in m.PERIODS:
-            peak_load = 0.0
-            for t in m.TPS_IN_PERIOD[p]:
-                load = sum(m.zone_demand_mw[z, t] for z in ZONES)
-                if load >= peak_load:
-                    peak_timepoint = t
-                    peak_load = load
-            peak_timepoint_list.append(peak_timepoint)
+            loads = [
+                (sum(m.zone_demand_mw[z, t] for z in ZONES), t)
+                for t in m.TPS_IN_PERIOD[p]
+            ]
+            # stable sort, so the latest timepoint wins ties (as before)
+            ranked = sorted(range(len(loads)), key=lambda i: loads[i][0])
+            peak_timepoint_list.extend(loads[i][1] for i in reversed(ranked[-n:]))
         return peak_timepoint_list
 
     def PRR_TIMEPOINTS_init(m):
@@ -195,6 +238,41 @@ def define_components(model):
         ),
     )
 
+    def PRR_ENFORCED_TIMEPOINTS_init(m):
+        if not m.options.planning_reserve_row_generation:
+            return list(m.PRR_TIMEPOINTS)
+        PRR_ENFORCED_TIMEPOINTS = []
+        for prr in m.PLANNING_RESERVE_REQUIREMENTS:
+            if m.prr_enforcement_timescale[prr] == "all_timepoints":
+                PEAK_TIMEPOINTS = set(
+                    get_peak_timepoints(
+                        m, prr, m.options.planning_reserve_initial_timepoints
+                    )
+                )
+                PRR_ENFORCED_TIMEPOINTS.extend(
+                    (prr, t) for t in m.TIMEPOINTS if t in PEAK_TIMEPOINTS
+                )
+            else:
+                PRR_ENFORCED_TIMEPOINTS.extend(
+                    (_prr, t) for (_prr, t) in m.PRR_TIMEPOINTS if _prr == prr
+                )
+        return PRR_ENFORCED_TIMEPOINTS
+
+    model.PRR_ENFORCED_TIMEPOINTS = Set(
+        dimen=2,
+        within=model.PRR_TIMEPOINTS,
+        initialize=PRR_ENFORCED_TIMEPOINTS_init,
+        doc=(
+            "The subset of PRR_TIMEPOINTS where planning reserve constraints "
+            "are currently constructed."
+        ),
+    )
+    if model.options.planning_reserve_row_generation and not any(
+        __name__ in level for level in model.iterate_modules
+    ):
+        # use iteration to add violated constraints (innermost level)
+        model.iterate_modules.append([__name__])
+
     model.gen_can_provide_cap_reserves = Param(
         model.GENERATION_PROJECTS,
         within=Boolean,
@@ -274,20 +352,20 @@ def define_components(model):
     model.REQUIREMENTS_FOR_CAPACITY_RESERVES.append("CapacityRequirements")
 
 
+def Enforce_Planning_Reserve_Margin_rule(m, prr, t):
+    return sum(
+        getattr(m, reserve_cap)[prr, t] for reserve_cap in m.CAPACITY_FOR_RESERVES
+    ) >= sum(
+        getattr(m, cap_requirement)[prr, t]
+        for cap_requirement in m.REQUIREMENTS_FOR_CAPACITY_RESERVES
+    )
+
+
 def define_dynamic_components(model):
     """ """
     model.Enforce_Planning_Reserve_Margin = Constraint(
-        model.PRR_TIMEPOINTS,
-        rule=lambda m, prr, t: (
-            sum(
-                getattr(m, reserve_cap)[prr, t]
-                for reserve_cap in m.CAPACITY_FOR_RESERVES
-            )
-            >= sum(
-                getattr(m, cap_requirement)[prr, t]
-                for cap_requirement in m.REQUIREMENTS_FOR_CAPACITY_RESERVES
-            )
-        ),
+        model.PRR_ENFORCED_TIMEPOINTS,
+        rule=Enforce_Planning_Reserve_Margin_rule,
         doc=(
             "Ensures that the sum of CAPACITY_FOR_RESERVES satisfies the sum "
             "of REQUIREMENTS_FOR_CAPACITY_RESERVES for each of PRR_TIMEPOINTS."
@@ -295,6 +373,59 @@ def define_dynamic_components(model):
     )
 
 
+def post_iterate(m):
+    """
+    Add planning reserve constraints for any timepoints where the requirement
+    is violated by the current solution. Returns True (converged) when there
+    are none.
+    """
+    if not m.options.planning_reserve_row_generation:
+        return True
+
+    # check all unenforced timepoints at once, using the cached, vectorized
+    # solution values for the components
+    keys = [k for k in m.PRR_TIMEPOINTS if k not in m.PRR_ENFORCED_TIMEPOINTS]
+    if not keys:
+        return True
+    capacity = np.zeros(len(keys))
+    for component in m.CAPACITY_FOR_RESERVES:
+        vals = m.solution_values(getattr(m, component))
+        capacity += np.array([vals[k] for k in keys], dtype=float)
+    requirement = np.zeros(len(keys))
+    for component in m.REQUIREMENTS_FOR_CAPACITY_RESERVES:
+        vals = m.solution_values(getattr(m, component))
+        requirement += np.array([vals[k] for k in keys], dtype=float)
+    tolerance = 1e-6 * np.maximum(1.0, np.abs(requirement))
+    violated = np.flatnonzero(requirement - capacity > tolerance)
+
+    for i in violated:
+        prr, t = keys[i]
+        m.PRR_ENFORCED_TIMEPOINTS.add((prr, t))
+        m.Enforce_Planning_Reserve_Margin.add(
+            (prr, t), Enforce_Planning_Reserve_Margin_rule(m, prr, t)
+        )
+    m.logger.info(
+        f"Planning reserve row generation: added {len(violated)} constraints "
+        f"for violated timepoints ({len(m.PRR_ENFORCED_TIMEPOINTS)} of "
+        f"{len(m.PRR_TIMEPOINTS)} now enforced)."
+    )
+    return len(violated) == 0
+
+
+def save_iteration_state(m):
+    return list(m.PRR_ENFORCED_TIMEPOINTS)
+
+
+def load_iteration_state(m, enforced):
+    """Re-add the planning reserve constraints generated before a checkpoint."""
+    for prr, t in enforced:
+        if (prr, t) not in m.PRR_ENFORCED_TIMEPOINTS:
+            m.PRR_ENFORCED_TIMEPOINTS.add((prr, t))
+            m.Enforce_Planning_Reserve_Margin.add(
+                (prr, t), Enforce_Planning_Reserve_Margin_rule(m, prr, t)
+            )
+
+
 def load_inputs(model, switch_data, inputs_dir):
     """
     Files or columns marked with * are optional. See notes above on default
@@ -0,0 +1,379 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+"""
+Utility functions for Switch that don't depend on Pyomo or pandas.
+
+These are used by the command-line tools (switch info, switch upgrade, option
+parsing for switch solve-scenarios, etc.), so they can start without importing
+the modeling libraries. They are also available from switch_model.utilities.
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import textwrap
+import time
+import types
+
+# Define string_types (same as six.string_types). This is useful for
+# distinguishing between strings and other iterables.
+try:
+    # Python 2
+    string_types = (basestring,)
+except NameError:
+    # Python 3
+    string_types = (str,)
+
+
+def unique_list(seq):
+    """
+    Create a list with the unique elements from seq, preserving original order.
+
+    This is often useful instead of `set()` when creating Pyomo Sets from unique
+    members of a collection, since Pyomo >= 5.7 always creates ordered sets and
+    deprecates use of Python's unordered sets for initialization.
+    """
+    # from https://stackoverflow.com/a/17016257/
+    # Note that this solution depends on Python's order-preserving dicts
+    # in version 3.7+, which is fine since Switch requires Python >= 3.7.
+    return list(dict.fromkeys(seq))
+
+
+def make_iterable(item):
+    """Return an iterable for the one or more items passed."""
+    if isinstance(item, string_types):
+        i = iter([item])
+    else:
+        try:
+            # check if it's iterable
+            i = iter(item)
+        except TypeError:
+            i = iter([item])
+    return i
+
+
+class StepTimer(object):
+    """
+    Keep track of elapsed time for steps of a process.
+    Use timer = StepTimer() to create a timer, then retrieve elapsed time and/or
+    reset the timer at each step by calling timer.step_time()
+    """
+
+    def __init__(self):
+        self.start_time = self.last_start = time.time()
+
+    def step_time(self):
+        """
+        Reset timer to current time and return time elapsed since last step.
+        """
+        last_start = self.last_start
+        self.last_start = now = time.time()
+        return now - last_start
+
+    def total_time(self):
+        return time.time() - self.start_time
+
+
+def unwrap(message, **kwargs):
+    """
+    Dedent and unwrap message, preserving double line breaks
+    """
+    # split paragraphs
+    paras = textwrap.dedent(message).split("\n\n")
+    # unwrap each paragraph
+    paras = [p.replace(" \n", " ").replace("\n", " ").strip() for p in paras]
+    return "\n\n".join(paras)
+
+
+def wrap(message, width=80, indent=0):
+    """
+    Wrap message, preserving double line breaks
+    """
+    ind = " " * indent
+    paras = message.split("\n\n")
+    paras = [
+        "\n".join(
+            textwrap.wrap(
+                p,
+                width=80,
+                initial_indent=ind,
+                subsequent_indent=ind,
+                replace_whitespace=False,
+            )
+        )
+        for p in paras
+    ]
+    return "\n\n".join(paras)
+
+
+def rewrap(message, **kwargs):
+    return wrap(unwrap(message), **kwargs)
+
+
+class InputError(Exception):
+    """Exception raised for errors in the input.
+
+    Attributes:
+        expression -- input expression in which the error occurred
+        message -- explanation of the error
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return str(self.value)
+
+
+# Define an argument parser that accepts the allow_abbrev flag to
+# prevent partial matches, even on versions of Python before 3.5.
+# See https://bugs.python.org/issue14910
+# This is needed because the parser may sometimes be called with only a subset
+# of the eventual argument list (e.g., to parse module-related arguments before
+# loading the modules and adding their arguments to the list), and without this
+# flag, the parser could match arguments that are meant to be used later
+# (It's not likely, but for example if the user specifies a flag "--exclude",
+# which will be consumed by one of their modules, the default parser would
+# match that to "--exclude-modules" during the early, partial parse.)
+if sys.version_info >= (3, 5):
+    _ArgumentParserAllowAbbrev = argparse.ArgumentParser
+else:
+    # patch ArgumentParser to accept the allow_abbrev flag
+    # (works on Python 2.7 and maybe others)
+    class _ArgumentParserAllowAbbrev(argparse.ArgumentParser):
+        def __init__(self, *args, **kwargs):
+            if not kwargs.get("allow_abbrev", True):
+                if hasattr(self, "_get_option_tuples"):
+                    # force self._get_option_tuples to return an empty list (of partial matches)
+                    # see https://bugs.python.org/issue14910#msg204678
+                    def new_get_option_tuples(self, option_string):
+                        return []
+
+                    self._get_option_tuples = types.MethodType(
+                        new_get_option_tuples, self
+                    )
+                else:
+                    raise RuntimeError(
+                        "Incompatible argparse module detected. This software requires "
+                        "Python 3.5 or later, or an earlier version of argparse that defines "
+                        "ArgumentParser._get_option_tuples()"
+                    )
+            # consume the allow_abbrev argument if present
+            kwargs.pop("allow_abbrev", None)
+            return argparse.ArgumentParser.__init__(self, *args, **kwargs)
+
+
+class ExtendAction(argparse.Action):
+    """Create or extend list with the provided items"""
+
+    # from https://stackoverflow.com/a/41153081/3830997
+    def __call__(self, parser, namespace, values, option_string=None):
+        items = getattr(namespace, self.dest) or []
+        items.extend(values)
+        setattr(namespace, self.dest, items)
+
+
+class IncludeAction(argparse.Action):
+    """Flag the specified items for inclusion in the model"""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        items = getattr(namespace, self.dest) or []
+        items.append(("include", values))
+        setattr(namespace, self.dest, items)
+
+
+class ExcludeAction(argparse.Action):
+    """Flag the specified items for exclusion from the model"""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        items = getattr(namespace, self.dest) or []
+        items.append(("exclude", values))
+        setattr(namespace, self.dest, items)
+
+
+# Test whether we need to issue warnings about the Python parsing bug.
+# (applies to at least Python 2.7.11 and 3.6.2)
+# This bug messes up solve-scenarios if the user specifies
+# --scenario x --solver-options-string="a=b c=d"
+test_parser = argparse.ArgumentParser()
+test_parser.add_argument("--arg1", nargs="+", default=[])
+bad_equal_parser = (
+    len(test_parser.parse_known_args(["--arg1", "a", "--arg2=a=1 b=2"])[1]) == 0
+)
+
+
+# TODO: merge the _ArgumentParserAllowAbbrev code into this class
+class _ArgumentParser(_ArgumentParserAllowAbbrev):
+    """
+    Custom version of ArgumentParser:
+    - warns about a bug in standard Python ArgumentParser for --arg="some words"
+    - allows use of 'extend', 'include' and 'exclude' actions to accumulate lists
+      with multiple calls
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(_ArgumentParser, self).__init__(*args, **kwargs)
+        self.register("action", "extend", ExtendAction)
+        self.register("action", "include", IncludeAction)
+        self.register("action", "exclude", ExcludeAction)
+
+    def parse_known_args(self, args=None, namespace=None):
+        # parse_known_args parses arguments like --list-arg a b --other-arg="something with space"
+        # as list_arg=['a', 'b', '--other-arg="something with space"'].
+        # See https://bugs.python.org/issue34390.
+        # We issue a warning to avoid this.
+        if bad_equal_parser and args is not None:
+            for a in args:
+                if a.startswith("--") and "=" in a:
+                    print(
+                        "Warning: argument '{}' may be parsed incorrectly. It is "
+                        "safer to use ' ' instead of '=' as a separator.".format(a)
+                    )
+                    time.sleep(2)  # give users a chance to see it
+        return super(_ArgumentParser, self).parse_known_args(args, namespace)
+
+
+def approx_equal(a, b, tolerance=0.01):
+    return abs(a - b) <= (abs(a) + abs(b)) / 2.0 * tolerance
+
+
+def warn(message):
+    """
+    Send warning message to sys.stderr.
+    Unlike warnings.warn, this does not add the current line of code to the message.
+    TODO: replace all calls to this with model.logger.warn()
+    """
+    sys.stderr.write("WARNING: " + message + "\n")
+
+
+class TeeStream(object):
+    """
+    Virtual stream that writes output to both stream1 and stream2. Attributes
+    of stream1 will be reported to callers if needed. For example, specifying
+    `sys.stdout=TeeStream(sys.stdout, log_file_handle)` will copy
+    output destined for sys.stdout to log_file_handle as well.
+    """
+
+    def __init__(self, stream1, stream2):
+        self.stream1 = stream1
+        self.stream2 = stream2
+
+    def __getattr__(self, *args, **kwargs):
+        """
+        Provide stream1 attributes when attributes are requested for this class.
+        This supports code that assumes sys.stdout is an object with its own
+        methods, etc.
+        """
+        return getattr(self.stream1, *args, **kwargs)
+
+    def write(self, text):
+        self.stream1.write(text)
+        self.stream2.write(text)
+        return len(text)
+
+    def flush(self):
+        self.stream1.flush()
+        self.stream2.flush()
+
+
+class LogOutput(object):
+    """
+    Copy output sent to stdout or stderr to a log file in the specified
+    directory. Takes no action if directory is None. Log file is named based on
+    the current date and time. Directory will be created if needed, and file
+    will have microseconds added to the name if needed to avoid overwriting
+    existing any existing file.
+
+    TODO:
+    - make this thread-aware (register and lookup an output stream for this
+      particular thread),
+    - accept model as argument instead of logs_dir and get the file name from
+      model.options or else create a name as shown here
+    - allow nesting (requesting same log file that is already open), so we can
+      wrap the body of solve.main but also wrap solve.solve, solve.presolve,
+      etc., so we can
+    - make sure it appends to existing files rather than replacing
+    - wrap all our API code (solve.main, solve.iterate, solve.solve,
+      model.pre_solve, model.post_solve, model.__init__, etc.) with
+      LogOutput(model) so that all log messages for one model will go to the
+      same file, even if multiple models are processed at the same time in
+      different threads or sequentially in the same thread.
+    - Alternatively, treat logging as app-specific rather than model-specific,
+      so switch solve or switch solve-scenarios identifies the active log file
+      and log level when it first starts, and sticks with that until it exits.
+    - Once all modules use loggers instead of print, it may be possible to have
+      this work by creating file handlers for the root logger, each of which has
+      a filter that only accepts messages if the current thread matches the
+      thread that created that logger (i.e., only accepts messages from the
+      thread that created it). Then the handler is removed when the block
+      finishes.
+
+    Note: Python/pyomo holds logging info on a singleton basis (in the logging module
+    for each pyomo module name), so we either need to
+        (1) patch the logging module to have/lookup different loggers per
+            thread, probably based on thread ID, then wrap our API with a logger
+            configuration (or stdout capture), so every operation on a particular
+            model is wrapped with logger configuration for that model; or
+        (2) treat logging as an application setting (either switch solve or
+            switch solve-scenarios), not a model setting, so we just start
+            logging/capture at startup and continue till the app exits; or
+        (3) like (1) but with locks on our API to prevent multithreading, so we
+            don't have to patch the logging module, just reconfigure the root logger
+            at the start of each function (but this precludes any multithreaded
+            loading/running of Switch models). (preferred)
+    """
+
+    def __init__(self, logs_dir):
+        self.logs_dir = logs_dir
+
+    def __enter__(self):
+        """start copying output to log file"""
+        if self.logs_dir is not None:
+            log_file_path = self.make_file_path()
+            self.log_file = open(log_file_path, "w", buffering=1)
+            self.stdout = sys.stdout
+            self.stderr = sys.stderr
+            sys.stdout = TeeStream(sys.stdout, self.log_file)
+            # sys.stderr = TeeStream(sys.stderr, self.log_file)
+            print("logging output to " + str(log_file_path))
+
+    def __exit__(self, type, value, traceback):
+        """restore original output streams and close log file"""
+        if self.logs_dir is not None:
+            sys.stdout = self.stdout
+            sys.stderr = self.stderr
+            self.log_file.close()
+
+    def make_file_path(self):
+        """
+        Create a log file on disk and return the file name (guaranteed unique).
+        When this function returns, the file exists but is empty and closed.
+        """
+        path = lambda format: os.path.join(
+            self.logs_dir, datetime.datetime.now().strftime(format) + ".log"
+        )
+        # make sure logs directory exists
+        if not os.path.exists(self.logs_dir):
+            os.makedirs(self.logs_dir)
+        file_path = path("%Y-%m-%d_%H-%M-%S")
+        while True:
+            try:
+                f = os.open(file_path, os.O_CREAT | os.O_EXCL)
+                # succeeded
+                os.close(f)
+                break
+            except FileExistsError:
+                # try again with microseconds in name and a little delay
+                file_path = path("%Y-%m-%d_%H-%M-%S.%f")
+        return file_path
+
+
+def iteritems(obj):
+    """Iterator of key, value pairs for obj;
+    equivalent to obj.items() on Python 3+ and obj.iteritems() on Python 2"""
+    try:
+        return obj.iteritems()
+    except AttributeError:  # Python 3+
+        return obj.items()
@@ -0,0 +1,860 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+"""
+Measure Switch performance on synthetic models of different sizes.
+
+This is run via `switch benchmark`. It generates synthetic input directories
+scaled by number of load zones, generation projects per zone, timepoints per
+period and investment periods, for one or more module stacks, then builds and
+solves each one, recording the time and peak memory used for each phase:
+
+    define      create the abstract model (create_model)
+    load        read the input files (read_inputs)
+    construct   check the data and construct the model instance
+    write       write the instance to an .lp file
+    solve       solve the instance (iterating if needed)
+    post_solve  run post-solve functions and write outputs
+
+Sizes are chosen with --size (small, medium or large; default is small and
+medium) or given directly with --scale ZONES PROJECTS TIMEPOINTS PERIODS (may be
+repeated). Stacks are chosen with --stacks, as any of base, commit, storage,
+transport, reserves and markets, or several of these joined with "+", e.g.,
+"commit+storage" (default is each of these separately). Every stack includes
+the core modules, unserved_load and either fuel_costs.simple or (with markets)
+fuel_costs.markets; reserves also adds commit and local_td. Arguments that are not
+recognized by `switch benchmark` are passed to each model, e.g.,
+`--solver appsi_highs`.
+
+Each case is run in a fresh process, so memory use and caches from one case
+don't affect the next. On Linux, peak memory is measured separately for each
+phase (the peak resident set size is reset at the start of each phase);
+elsewhere, it is the peak for the process so far. With --repeat N, each case is
+run N times and the lowest time and memory for each phase are reported.
+
+Results are saved as JSON (benchmark.json by default). With --baseline FILE,
+the results are compared with an earlier results file, and phases that are
+slower or use more memory than the baseline by more than --time-tolerance or
+--memory-tolerance (and by more than a small absolute margin, to ignore
+noise in fast phases) are reported as regressions. Cases that fail, phases or
+objective values that are missing and baseline cases that were not run are also
+reported as regressions. The command exits with status 1 if there are any
+regressions or if any case fails (with or without --baseline), so it can be
+used in automated checks.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import switch_model
+
+phases = ["define", "load", "construct", "write", "solve", "post_solve"]
+
+sizes = {
+    # zones, projects per zone, timepoints per period, periods
+    "small": (3, 6, 48, 1),
+    "medium": (8, 10, 96, 2),
+    "large": (20, 15, 336, 3),
+}
+
+features = ["base", "commit", "storage", "transport", "reserves", "markets"]
+
+# extra arguments needed by some features
+feature_args = {"reserves": ["--spinning-requirement-rule", "3+5"]}
+
+# minimum changes to count as a regression, to ignore noise in fast phases
+min_time_change = 0.1  # seconds
+min_memory_change = 10.0  # MB
+
+
+def define_arguments(parser):
+    parser.add_argument(
+        "--size",
+        nargs="+",
+        choices=list(sizes),
+        default=None,
+        help="Predefined model sizes to run (default is small and medium).",
+    )
+    parser.add_argument(
+        "--scale",
+        nargs=4,
+        type=int,
+        action="append",
+        default=[],
+        metavar=("ZONES", "PROJECTS", "TIMEPOINTS", "PERIODS"),
+        help="""
+            Run a model with the specified number of load zones, generation
+            projects per zone, timepoints per period and periods. May be given
+            more than once.
+        """,
+    )
+    parser.add_argument(
+        "--stacks",
+        nargs="+",
+        default=features,
+        help="""
+            Module stacks to benchmark, each one of {} or several of these
+            joined with "+" (default is each of these separately).
+        """.format(", ".join(features)),
+    )
+    parser.add_argument(
+        "--phases",
+        nargs="+",
+        choices=phases,
+        default=phases,
+        help="""
+            Phases to run (default is all). Phases that are needed by later
+            phases are always run, but only the requested ones are reported.
+        """,
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Number of times to run each case (default is 1).",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for the random values in the synthetic inputs (default is 0).",
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark.json",
+        help="File to save results in (default is benchmark.json).",
+    )
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help="Earlier results file to compare with.",
+    )
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.25,
+        help="""
+            Fractional increase in time for a phase that counts as a
+            regression (default is 0.25).
+        """,
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.15,
+        help="""
+            Fractional increase in peak memory for a phase that counts as a
+            regression (default is 0.15).
+        """,
+    )
+    parser.add_argument(
+        "--work-dir",
+        default=None,
+        help="""
+            Directory for the synthetic inputs and outputs of each case; these
+            are kept for inspection (default is a temporary directory, which
+            is removed afterwards).
+        """,
+    )
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    parser = argparse.ArgumentParser(
+        allow_abbrev=False,
+        description="Measure Switch performance on synthetic models.",
+    )
+    define_arguments(parser)
+    options, model_args = parser.parse_known_args(args=args)
+
+    scales = [sizes[s] for s in (options.size or [])] + [
+        tuple(s) for s in options.scale
+    ]
+    if not scales:
+        scales = [sizes["small"], sizes["medium"]]
+    stacks = []
+    for stack in options.stacks:
+        parts = stack.split("+")
+        for f in parts:
+            if f not in features:
+                parser.error(
+                    "Unknown feature {} in stack {}; use any of {}.".format(
+                        f, stack, ", ".join(features)
+                    )
+                )
+        stacks.append("+".join(f for f in features if f in parts))
+
+    work_dir = options.work_dir or tempfile.mkdtemp(prefix="switch_benchmark_")
+    cases = []
+    try:
+        for stack in stacks:
+            for scale in scales:
+                case = run_case(stack, scale, options, model_args, work_dir=work_dir)
+                print(format_case(case, options.phases))
+                cases.append(case)
+    finally:
+        if options.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        "switch_version": switch_model.__version__,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "model_args": model_args,
+        "cases": cases,
+    }
+    with open(options.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print("Saved results in {}.".format(options.output))
+
+    if options.baseline is None:
+        problems = [
+            "{}: {}".format(c["name"], c["error"]) for c in cases if "error" in c
+        ]
+        heading = "Failed cases:"
+    else:
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+        problems = compare_results(
+            baseline, results, options.time_tolerance, options.memory_tolerance
+        )
+        heading = "Regressions compared to {}:".format(options.baseline)
+    if problems:
+        print("\n" + heading)
+        for r in problems:
+            print("  " + r)
+        sys.exit(1)
+    elif options.baseline is not None:
+        print("\nNo regressions compared to {}.".format(options.baseline))
+
+
+def case_name(stack, scale):
+    return "{}_z{}_g{}_t{}_p{}".format(stack, *scale)
+
+
+def run_case(stack, scale, options, model_args, work_dir):
+    """
+    Generate inputs for one case and run it options.repeat times, each in a
+    fresh process. Returns a dict of results for the case.
+    """
+    name = case_name(stack, scale)
+    case_dir = os.path.join(work_dir, name)
+    inputs_dir = os.path.join(case_dir, "inputs")
+    write_inputs(inputs_dir, scale, stack.split("+"), seed=options.seed)
+    args = [
+        "--inputs-dir",
+        inputs_dir,
+        "--outputs-dir",
+        os.path.join(case_dir, "outputs"),
+        "--module-list",
+        os.path.join(inputs_dir, "modules.txt"),
+    ]
+    for f in stack.split("+"):
+        args.extend(feature_args.get(f, []))
+    args.extend(model_args)
+    last = max(phases.index(p) for p in options.phases)
+    run_phases = phases[: last + 1]
+
+    runs = []
+    for i in range(options.repeat):
+        # spawn a new process for each run, to isolate memory use and caches
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            runs.append(
+                executor.submit(
+                    run_phases_in_process, args, run_phases, case_dir
+                ).result()
+            )
+
+    result = {
+        "name": name,
+        "stack": stack,
+        "zones": scale[0],
+        "projects_per_zone": scale[1],
+        "timepoints_per_period": scale[2],
+        "periods": scale[3],
+    }
+    result.update({k: v for k, v in runs[0].items() if k != "phases"})
+    # report a failure in any of the runs
+    errors = [r["error"] for r in runs if "error" in r]
+    if errors:
+        result["error"] = errors[0]
+    result["phases"] = dict()
+    for p in options.phases:
+        measured = [r["phases"][p] for r in runs if p in r["phases"]]
+        if measured:
+            result["phases"][p] = {
+                "time": min(m["time"] for m in measured),
+                "peak_memory_mb": min(m["peak_memory_mb"] for m in measured),
+            }
+    return result
+
+
+def run_phases_in_process(args, run_phases, case_dir):
+    """
+    Run the requested phases for one model and return a dict with the time and
+    peak memory for each phase, the model size and any error message.
+    """
+    from pyomo.environ import Constraint, Objective, Var, value
+    from switch_model import solve
+    from switch_model.utilities import create_model
+
+    logger = solve.make_logger(solve.parse_pre_module_options(args + ["--quiet"]))
+    result = {"phases": dict(), "memory_method": memory_method()}
+    state = dict()
+
+    def define():
+        state["model"] = create_model(
+            solve.get_module_list(args), args=args, logger=logger
+        )
+        solve.add_extra_suffixes(state["model"])
+
+    def load():
+        state["data"] = state["model"].read_inputs()
+
+    def construct():
+        instance = state["model"].load_inputs(data=state.pop("data"))
+        instance.pre_solve()
+        state["instance"] = instance
+
+    def write():
+        state["instance"].write(
+            os.path.join(case_dir, "model.lp"),
+            io_options={"symbolic_solver_labels": False},
+        )
+
+    def solve_instance():
+        instance = state["instance"]
+        os.makedirs(instance.options.outputs_dir, exist_ok=True)
+        if instance.iterate_modules:
+            solve.iterate(instance)
+        else:
+            solve.solve(instance)
+
+    def post_solve():
+        state["instance"].post_solve()
+
+    steps = {
+        "define": define,
+        "load": load,
+        "construct": construct,
+        "write": write,
+        "solve": solve_instance,
+        "post_solve": post_solve,
+    }
+    for p in run_phases:
+        reset_peak_memory()
+        start = time.perf_counter()
+        try:
+            steps[p]()
+        except Exception as e:
+            result["error"] = "{} phase failed: {}: {}".format(p, type(e).__name__, e)
+            break
+        result["phases"][p] = {
+            "time": time.perf_counter() - start,
+            "peak_memory_mb": peak_memory_mb(),
+        }
+        if p == "construct":
+            instance = state["instance"]
+            result["variables"] = sum(
+                1 for v in instance.component_data_objects(Var, active=True)
+            )
+            result["constraints"] = sum(
+                1 for c in instance.component_data_objects(Constraint, active=True)
+            )
+        elif p == "solve":
+            obj = next(state["instance"].component_data_objects(Objective, active=True))
+            result["objective"] = value(obj)
+    return result
+
+
+def memory_method():
+    return "phase" if os.path.exists("/proc/self/clear_refs") else "process"
+
+
+def reset_peak_memory():
+    """Reset the peak resident set size for this process, if possible."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_memory_mb():
+    """Return the peak resident set size in MB (since the last reset on Linux)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # reported in bytes on macOS and kB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def format_case(case, report_phases):
+    parts = []
+    for p in report_phases:
+        if p in case["phases"]:
+            m = case["phases"][p]
+            parts.append(
+                "{} {:.2f} s/{:.0f} MB".format(p, m["time"], m["peak_memory_mb"])
+            )
+    text = "{}: {}".format(case["name"], ", ".join(parts))
+    if "variables" in case:
+        text += " ({} vars, {} constraints)".format(
+            case["variables"], case["constraints"]
+        )
+    if "error" in case:
+        text += "\n  ERROR: " + case["error"]
+    return text
+
+
+def compare_results(baseline, results, time_tolerance, memory_tolerance):
+    """
+    Compare results with baseline and return a list of descriptions of
+    phases that got slower or used more memory than allowed, cases that
+    failed, phases or objective values that are missing and baseline cases
+    that are missing from results.
+    """
+    new_cases = {c["name"]: c for c in results["cases"]}
+    old_cases = {c["name"]: c for c in baseline["cases"]}
+    regressions = []
+    for case in results["cases"]:
+        if "error" in case:
+            regressions.append("{}: {}".format(case["name"], case["error"]))
+        old = old_cases.get(case["name"])
+        if old is None:
+            continue
+        for p, o in old["phases"].items():
+            if p not in case["phases"]:
+                regressions.append("{} {}: phase did not run".format(case["name"], p))
+                continue
+            m = case["phases"][p]
+            if (
+                m["time"] > o["time"] * (1 + time_tolerance)
+                and m["time"] - o["time"] > min_time_change
+            ):
+                regressions.append(
+                    "{} {}: time {:.2f} s vs. {:.2f} s (+{:.0%})".format(
+                        case["name"], p, m["time"], o["time"], m["time"] / o["time"] - 1
+                    )
+                )
+            if (
+                m["peak_memory_mb"] > o["peak_memory_mb"] * (1 + memory_tolerance)
+                and m["peak_memory_mb"] - o["peak_memory_mb"] > min_memory_change
+            ):
+                regressions.append(
+                    "{} {}: peak memory {:.0f} MB vs. {:.0f} MB (+{:.0%})".format(
+                        case["name"],
+                        p,
+                        m["peak_memory_mb"],
+                        o["peak_memory_mb"],
+                        m["peak_memory_mb"] / o["peak_memory_mb"] - 1,
+                    )
+                )
+        if "objective" in old:
+            if "objective" not in case:
+                regressions.append(
+                    "{}: no objective vs. {}".format(case["name"], old["objective"])
+                )
+            elif abs(case["objective"] - old["objective"]) > 1e-6 * max(
+                1.0, abs(old["objective"])
+            ):
+                regressions.append(
+                    "{}: objective {} vs. {}".format(
+                        case["name"], case["objective"], old["objective"]
+                    )
+                )
+    for name in old_cases:
+        if name not in new_cases:
+            regressions.append("{}: missing from results".format(name))
+    return regressions
+
+
+###############
+# synthetic inputs
+
+# technology: energy source, heat rate, variable O&M, overnight cost, fixed O&M,
+# max age, min load fraction (with commit)
+techs = {
+    "gas_cc": ("NaturalGas", 7.0, 3.5, 1100000.0, 14000.0, 30, 0.4),
+    "gas_ct": ("NaturalGas", 10.0, 5.0, 800000.0, 10000.0, 30, 0.2),
+    "coal": ("Coal", 9.5, 4.0, 3000000.0, 40000.0, 40, 0.5),
+    "wind": ("Wind", None, 0.0, 1000000.0, 30000.0, 25, None),
+    "solar": ("Solar", None, 0.0, 700000.0, 15000.0, 25, None),
+    "battery": ("Electricity", None, 0.5, 300000.0, 5000.0, 15, None),
+}
+fuel_prices = {"NaturalGas": 4.0, "Coal": 2.0}
+fuel_co2 = {"NaturalGas": 0.05306, "Coal": 0.09552}
+
+
+def write_csv(path, headers, rows):
+    with open(path, "w") as f:
+        f.write(",".join(headers) + "\n")
+        for row in rows:
+            f.write(",".join("." if v is None else str(v) for v in row) + "\n")
+
+
+def write_inputs(inputs_dir, scale, stack_features, seed=0):
+    """
+    Write a synthetic inputs directory with the specified scale (zones,
+    projects per zone, timepoints per period, periods) for the specified
+    features. The values are random but repeatable for a given seed.
+    """
+    n_zones, n_projects, n_timepoints, n_periods = scale
+    rand = random.Random(seed)
+    commit = "commit" in stack_features or "reserves" in stack_features
+    storage = "storage" in stack_features
+    markets = "markets" in stack_features
+    os.makedirs(inputs_dir, exist_ok=True)
+    path = lambda f: os.path.join(inputs_dir, f)
+
+    modules = [
+        "switch_model",
+        "switch_model.timescales",
+        "switch_model.financials",
+        "switch_model.balancing.load_zones",
+        "switch_model.energy_sources.properties",
+        "switch_model.generators.core.build",
+        "switch_model.generators.core.dispatch",
+        "switch_model.reporting",
+        "switch_model.balancing.unserved_load",
+    ]
+    if commit:
+        modules += [
+            "switch_model.generators.core.commit.operate",
+            "switch_model.generators.core.commit.fuel_use",
+        ]
+    else:
+        modules.append("switch_model.generators.core.no_commit")
+    if markets:
+        modules.append("switch_model.energy_sources.fuel_costs.markets")
+    else:
+        modules.append("switch_model.energy_sources.fuel_costs.simple")
+    if storage:
+        modules.append("switch_model.generators.extensions.storage")
+    if "transport" in stack_features:
+        modules += [
+            "switch_model.transmission.transport.build",
+            "switch_model.transmission.transport.dispatch",
+        ]
+    if "reserves" in stack_features:
+        # the spinning reserve rules use load from local_td
+        modules += [
+            "switch_model.transmission.local_td",
+            "switch_model.balancing.operating_reserves.areas",
+            "switch_model.balancing.operating_reserves.spinning_reserves",
+        ]
+    with open(path("modules.txt"), "w") as f:
+        f.write("\n".join(modules) + "\n")
+    with open(path("switch_inputs_version.txt"), "w") as f:
+        f.write(switch_model.__version__ + "\n")
+
+    # timescales: hourly timepoints in day-long timeseries
+    periods = [2030 + 10 * i for i in range(n_periods)]
+    tps_per_ts = min(n_timepoints, 24)
+    n_ts = max(1, n_timepoints // tps_per_ts)
+    write_csv(
+        path("periods.csv"),
+        ["INVESTMENT_PERIOD", "period_start", "period_end"],
+        [(p, p, p + 9) for p in periods],
+    )
+    timeseries = []
+    timepoints = []
+    for p in periods:
+        for d in range(n_ts):
+            ts = "{}_d{}".format(p, d)
+            timeseries.append((ts, p, 24 / tps_per_ts, tps_per_ts, 3652.5 / n_ts))
+            for h in range(tps_per_ts):
+                timepoints.append(
+                    (len(timepoints) + 1, "{}{:03d}{:02d}".format(p, d, h), ts, h)
+                )
+    write_csv(
+        path("timeseries.csv"),
+        [
+            "TIMESERIES",
+            "ts_period",
+            "ts_duration_of_tp",
+            "ts_num_tps",
+            "ts_scale_to_period",
+        ],
+        timeseries,
+    )
+    write_csv(
+        path("timepoints.csv"),
+        ["timepoint_id", "timestamp", "timeseries"],
+        [tp[:3] for tp in timepoints],
+    )
+    write_csv(
+        path("financials.csv"),
+        ["base_financial_year", "discount_rate", "interest_rate"],
+        [(periods[0], 0.05, 0.07)],
+    )
+
+    # load zones, grouped into regions of up to 5 zones
+    zones = ["z{}".format(i + 1) for i in range(n_zones)]
+    region = {z: "r{}".format(i // 5 + 1) for i, z in enumerate(zones)}
+    peak = {z: rand.uniform(500, 2000) for z in zones}
+    if "reserves" in stack_features:
+        write_csv(
+            path("load_zones.csv"),
+            [
+                "LOAD_ZONE",
+                "zone_balancing_area",
+                "existing_local_td",
+                "local_td_annual_cost_per_mw",
+            ],
+            [(z, region[z], round(1.5 * peak[z], 1), 66000.0) for z in zones],
+        )
+    else:
+        write_csv(path("load_zones.csv"), ["LOAD_ZONE"], [(z,) for z in zones])
+    write_csv(
+        path("loads.csv"),
+        ["LOAD_ZONE", "TIMEPOINT", "zone_demand_mw"],
+        [
+            (
+                z,
+                tp,
+                round(
+                    peak[z]
+                    * (0.75 + 0.2 * rand.random())
+                    * (0.7 + 0.3 * abs(12 - abs(h * 24 // tps_per_ts - 12)) / 12),
+                    2,
+                ),
+            )
+            for z in zones
+            for tp, stamp, ts, h in timepoints
+        ],
+    )
+
+    # energy sources and fuel costs
+    write_csv(
+        path("fuels.csv"),
+        ["fuel", "co2_intensity", "upstream_co2_intensity"],
+        [(f, fuel_co2[f], 0.0) for f in fuel_prices],
+    )
+    write_csv(
+        path("non_fuel_energy_sources.csv"),
+        ["energy_source"],
+        [("Wind",), ("Solar",), ("Electricity",)],
+    )
+    if markets:
+        regions = sorted(set(region.values()))
+        rfm = lambda r, f: "{}_{}".format(r, f)
+        write_csv(
+            path("regional_fuel_markets.csv"),
+            ["regional_fuel_market", "fuel"],
+            [(rfm(r, f), f) for r in regions for f in fuel_prices],
+        )
+        write_csv(
+            path("fuel_supply_curves.csv"),
+            [
+                "regional_fuel_market",
+                "period",
+                "tier",
+                "unit_cost",
+                "max_avail_at_cost",
+            ],
+            [
+                (
+                    rfm(r, f),
+                    p,
+                    tier,
+                    round(price * (1 + 0.25 * tier) * rand.uniform(0.9, 1.1), 4),
+                    round(2e7 * rand.uniform(0.5, 1.5)) if tier < 2 else None,
+                )
+                for r in regions
+                for f, price in fuel_prices.items()
+                for p in periods
+                for tier in range(3)
+            ],
+        )
+        write_csv(
+            path("zone_to_regional_fuel_market.csv"),
+            ["load_zone", "regional_fuel_market"],
+            [(z, rfm(region[z], f)) for z in zones for f in fuel_prices],
+        )
+    else:
+        write_csv(
+            path("fuel_cost.csv"),
+            ["load_zone", "fuel", "period", "fuel_cost"],
+            [
+                (z, f, p, round(price * rand.uniform(0.9, 1.1), 4))
+                for z in zones
+                for f, price in fuel_prices.items()
+                for p in periods
+            ],
+        )
+
+    # generation projects
+    tech_list = [t for t in techs if storage or t != "battery"]
+    info_headers = [
+        "GENERATION_PROJECT",
+        "gen_tech",
+        "gen_load_zone",
+        "gen_energy_source",
+        "gen_max_age",
+        "gen_is_variable",
+        "gen_full_load_heat_rate",
+        "gen_variable_om",
+        "gen_connect_cost_per_mw",
+        "gen_capacity_limit_mw",
+        "gen_scheduled_outage_rate",
+        "gen_forced_outage_rate",
+    ]
+    if commit:
+        info_headers += ["gen_min_load_fraction", "gen_startup_fuel", "gen_startup_om"]
+    if storage:
+        info_headers += ["gen_storage_efficiency"]
+    build_headers = [
+        "GENERATION_PROJECT",
+        "build_year",
+        "gen_overnight_cost",
+        "gen_fixed_om",
+    ]
+    if storage:
+        build_headers += [
+            "gen_storage_energy_overnight_cost",
+            "gen_storage_energy_fixed_om",
+        ]
+    existing_headers = ["GENERATION_PROJECT", "build_year", "build_gen_predetermined"]
+    if storage:
+        existing_headers += ["build_gen_energy_predetermined"]
+    gen_info, build_costs, existing, cap_factors = [], [], [], []
+    n_existing = sum(
+        1
+        for i in range(n_projects)
+        if tech_list[i % len(tech_list)] in ("gas_cc", "coal")
+    )
+    for z in zones:
+        for i in range(n_projects):
+            tech = tech_list[i % len(tech_list)]
+            source, heat_rate, var_om, capital, fixed_om, max_age, min_load = techs[
+                tech
+            ]
+            g = "{}_{}_{}".format(z, tech, i + 1)
+            variable = tech in ("wind", "solar")
+            row = [
+                g,
+                tech,
+                z,
+                source,
+                max_age,
+                int(variable),
+                heat_rate,
+                var_om,
+                round(rand.uniform(50000, 150000), 1),
+                round(rand.uniform(200, 800), 1) if variable else None,
+                0.0 if variable else 0.04,
+                0.0 if variable else 0.05,
+            ]
+            if commit:
+                # startup fuel and O&M for thermal plants
+                thermal = heat_rate is not None
+                row += [min_load, 5.0 if thermal else None, 10.0 if thermal else None]
+            if storage:
+                row += [0.85 if tech == "battery" else None]
+            gen_info.append(row)
+            cost_scale = rand.uniform(0.9, 1.1)
+            if tech == "battery":
+                storage_costs = [150000.0, 2000.0]
+            elif storage:
+                storage_costs = [None, None]
+            else:
+                storage_costs = []
+            for p in periods:
+                build_costs.append(
+                    [g, p, round(capital * cost_scale, 1), fixed_om] + storage_costs
+                )
+            if tech in ("gas_cc", "coal"):
+                # existing thermal capacity, enough to serve about half the load
+                build_year = periods[0] - 10
+                build_costs.append(
+                    [g, build_year, round(capital * cost_scale, 1), fixed_om]
+                    + storage_costs
+                )
+                existing.append(
+                    [
+                        g,
+                        build_year,
+                        round(0.5 * peak[z] / n_existing, 1),
+                    ]
+                    + ([None] if storage else [])
+                )
+            if variable:
+                site = rand.uniform(0.7, 1.2)
+                for tp, stamp, ts, h in timepoints:
+                    hour = h * 24 // tps_per_ts
+                    if tech == "solar":
+                        cf = max(0.0, 1 - abs(hour - 12) / 6) * 0.8 * site
+                    else:
+                        cf = rand.uniform(0.1, 0.6) * site
+                    cap_factors.append((g, tp, round(min(cf, 1.0), 4)))
+    write_csv(path("gen_info.csv"), info_headers, gen_info)
+    write_csv(path("gen_build_costs.csv"), build_headers, build_costs)
+    write_csv(path("gen_build_predetermined.csv"), existing_headers, existing)
+    write_csv(
+        path("variable_capacity_factors.csv"),
+        ["GENERATION_PROJECT", "timepoint", "gen_max_capacity_factor"],
+        cap_factors,
+    )
+
+    # transmission: a chain of lines between neighboring zones, plus a line
+    # to the zone three steps ahead from every third zone
+    if "transport" in stack_features:
+        pairs = [(i, i + 1) for i in range(n_zones - 1)]
+        pairs += [(i, i + 3) for i in range(0, n_zones - 3, 3)]
+        write_csv(
+            path("transmission_lines.csv"),
+            [
+                "TRANSMISSION_LINE",
+                "trans_lz1",
+                "trans_lz2",
+                "trans_length_km",
+                "trans_efficiency",
+                "existing_trans_cap",
+            ],
+            [
+                (
+                    "{}-{}".format(zones[a], zones[b]),
+                    zones[a],
+                    zones[b],
+                    round(rand.uniform(50, 400), 1),
+                    0.95,
+                    round(rand.uniform(100, 500), 1),
+                )
+                for a, b in pairs
+            ],
+        )
+        write_csv(
+            path("trans_params.csv"),
+            [
+                "trans_capital_cost_per_mw_km",
+                "trans_lifetime_yrs",
+                "trans_fixed_om_fraction",
+            ],
+            [(1000.0, 20, 0.03)],
+        )
+
+
+if __name__ == "__main__":
+    main()
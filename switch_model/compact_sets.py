@@ -0,0 +1,230 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+"""
+Compact, array-backed Pyomo Sets for large families of tuples.
+
+Sets like GEN_TPS can have millions of members. Regular Pyomo Sets store each
+member as a Python tuple in a dict, and related sets (VARIABLE_GEN_TPS,
+FUEL_BASED_GEN_TPS, GEN_TP_FUELS) store their own copies, so these sets can
+use more memory than anything else in the model before any variables are
+created.
+
+CompactTuples stores members grouped by their first element ("rows"), with
+the second element of each member stored as an integer position in a shared
+list of possible second elements ("cols"), CSR-style. Subsets of rows share
+the same integer array, and an optional third element can be added to each
+row (e.g., the fuels for each generator) without storing anything per member.
+
+CompactSet wraps a CompactTuples object as a read-only, ordered Pyomo Set,
+using Pyomo's SetOf protocol, so it can be used as an index for Vars,
+Expressions and Constraints and for iteration and membership tests, just like
+a regular Set. It is declared like a regular Set, but its initialize rule must
+return a CompactTuples object.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+from pyomo.core.base.set import OrderedSetOf
+from pyomo.environ import Set
+
+
+class CompactTuples(Sequence):
+    """
+    Read-only, ordered sequence of tuples (a, b) or (a, b, c), grouped by a.
+
+    rows: list of first elements
+    cols: list of possible second elements
+    col_idx: integer array of positions in `cols`; the second elements for
+        row i are cols[col_idx[start[i]:end[i]]], in order
+    extras: optional list with a sequence of third elements for each row;
+        if given, each (a, b) pair is expanded into (a, b, c) for each c in
+        extras[i]
+
+    Normally these are created with from_rows() and subset().
+    """
+
+    def __init__(self, rows, cols, col_idx, start, end, extras=None, shared=None):
+        self.rows = list(rows)
+        self.cols = cols
+        self.col_idx = col_idx
+        self.start = np.asarray(start, dtype=np.int64)
+        self.end = np.asarray(end, dtype=np.int64)
+        self.extras = None if extras is None else [tuple(e) for e in extras]
+        self.row_pos = {a: i for i, a in enumerate(self.rows)}
+        if shared is None:
+            # lookup for second elements and whether every row's col_idx is
+            # increasing (allowing binary search); shared with subsets
+            increasing = all(
+                np.all(np.diff(col_idx[s:e]) > 0)
+                for s, e in zip(self.start.tolist(), self.end.tolist())
+            )
+            shared = ({b: j for j, b in enumerate(cols)}, increasing)
+        self.shared = shared
+        self.col_pos, self.increasing = shared
+        # position of the first member of each row
+        counts = self.end - self.start
+        if self.extras is not None:
+            counts = counts * np.array([len(e) for e in self.extras], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    @classmethod
+    def from_rows(cls, rows, cols, row_members):
+        """
+        Create a CompactTuples object with (a, b) pairs for each a in `rows`
+        and each b in the corresponding element of `row_members`. All of the
+        b values must be in `cols`.
+        """
+        cols = list(cols)
+        col_pos = {b: j for j, b in enumerate(cols)}
+        rows = list(rows)
+        chunks = []
+        for members in row_members:
+            chunks.append(np.fromiter((col_pos[b] for b in members), dtype=np.int32))
+        lengths = np.array([len(c) for c in chunks], dtype=np.int64)
+        end = np.cumsum(lengths)
+        start = end - lengths
+        col_idx = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int32)
+        return cls(rows, cols, col_idx, start, end)
+
+    def subset(self, rows, extras=None):
+        """
+        Return a CompactTuples object with the members of the specified rows
+        (in the order given), optionally adding a sequence of third elements
+        for each row. The new object shares its arrays with this one.
+        """
+        rows = list(rows)
+        idx = [self.row_pos[a] for a in rows]
+        return CompactTuples(
+            rows,
+            self.cols,
+            self.col_idx,
+            self.start[idx],
+            self.end[idx],
+            extras=extras,
+            shared=self.shared,
+        )
+
+    def assign(self, other):
+        """Replace the members of this object with those of `other`."""
+        self.__dict__.update(other.__dict__)
+
+    def row(self, a):
+        """Return a list of the second elements of the members starting with a."""
+        i = self.row_pos[a]
+        s, e = int(self.start[i]), int(self.end[i])
+        return [self.cols[j] for j in self.col_idx[s:e].tolist()]
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __iter__(self):
+        cols = self.cols
+        for i, (a, s, e) in enumerate(
+            zip(self.rows, self.start.tolist(), self.end.tolist())
+        ):
+            bs = [cols[j] for j in self.col_idx[s:e].tolist()]
+            if self.extras is None:
+                for b in bs:
+                    yield (a, b)
+            else:
+                cs = self.extras[i]
+                for b in bs:
+                    for c in cs:
+                        yield (a, b, c)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[i] for i in range(*k.indices(len(self)))]
+        n = len(self)
+        if k < 0:
+            k += n
+        if not 0 <= k < n:
+            raise IndexError("CompactTuples index out of range")
+        i = int(np.searchsorted(self.offsets, k, side="right")) - 1
+        k -= int(self.offsets[i])
+        b_pos = int(self.start[i])
+        if self.extras is None:
+            b_pos += k
+            return (self.rows[i], self.cols[self.col_idx[b_pos]])
+        cs = self.extras[i]
+        b_pos += k // len(cs)
+        return (self.rows[i], self.cols[self.col_idx[b_pos]], cs[k % len(cs)])
+
+    def locate(self, item):
+        """Return the position of item in this sequence, or None if absent."""
+        dimen = 2 if self.extras is None else 3
+        if type(item) is not tuple or len(item) != dimen:
+            return None
+        try:
+            i = self.row_pos[item[0]]
+            j = self.col_pos[item[1]]
+        except (KeyError, TypeError):
+            return None
+        s, e = int(self.start[i]), int(self.end[i])
+        if self.increasing:
+            k = s + int(np.searchsorted(self.col_idx[s:e], j))
+            if k >= e or self.col_idx[k] != j:
+                return None
+        else:
+            found = np.flatnonzero(self.col_idx[s:e] == j)
+            if not len(found):
+                return None
+            k = s + int(found[0])
+        k -= s
+        if self.extras is not None:
+            cs = self.extras[i]
+            try:
+                c = cs.index(item[2])
+            except ValueError:
+                return None
+            k = k * len(cs) + c
+        return int(self.offsets[i]) + k
+
+    def __contains__(self, item):
+        return self.locate(item) is not None
+
+    def index(self, item, *args):
+        k = self.locate(item)
+        if k is None:
+            raise ValueError(f"{item!r} is not in CompactTuples")
+        return k
+
+    def __repr__(self):
+        return f"<CompactTuples with {len(self)} members>"
+
+
+class CompactSet(OrderedSetOf):
+    """
+    Read-only, ordered Pyomo Set backed by a CompactTuples object. This is
+    declared like a regular Set, e.g.,
+    `mod.GEN_TPS = CompactSet(dimen=2, initialize=rule)`, where rule(m)
+    returns a CompactTuples object. The CompactTuples object is available as
+    the `tuples` attribute after the model is constructed.
+    """
+
+    def __init__(self, initialize, dimen, **kwds):
+        self._init_rule = initialize
+        self._compact_dimen = dimen
+        # the set refers to this object, which receives the members when the
+        # set is constructed
+        self._tuples = CompactTuples.from_rows([], [], [])
+        kwds.setdefault("ctype", Set)
+        super().__init__(self._tuples, **kwds)
+
+    def construct(self, data=None):
+        # SetOf.__init__ calls this before the set has been added to a model;
+        # the members are created later, when the model is constructed.
+        if self._constructed or self.parent_block() is None:
+            return
+        self._constructed = True
+        self._tuples.assign(self._init_rule(self.parent_block()))
+
+    @property
+    def tuples(self):
+        return self._tuples
+
+    @property
+    def dimen(self):
+        return self._compact_dimen
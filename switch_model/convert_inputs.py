@@ -0,0 +1,234 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+"""
+Convert the .csv, .tab and .tsv files in an inputs directory to typed,
+columnar files (Apache Parquet or Feather).
+
+This is run via `switch convert-inputs [--inputs-dir inputs] [--format
+parquet|feather] [--remove-csv]`. Each table is converted to a file with the
+same name and a .parquet or .feather extension. Text is converted to numbers
+the same way Pyomo does when it reads .csv files, and "." (missing value) is
+stored as null. Columns that mix text and numbers can't be stored with a
+single type, so tables with these are left as they are.
+
+switch_model.utilities.load_aug() reads the columnar version of a table in
+place of the .csv file named by the module, if it exists, so the original
+files can be kept for tools and modules that read them directly. Use
+--remove-csv to delete the original files after conversion. This requires the
+pyarrow package.
+
+With --matrix, the specified tables (by default, variable_capacity_factors.csv
+and loads.csv) are instead converted to wide, memory-mapped matrices. Each
+table must have two index columns and one value column. The matrix is stored
+in <name>.npy, with one row per unique value in the second column and one
+column per unique value in the first column; these labels are stored in
+<name>_rows.csv and <name>_columns.csv. Missing values are stored as NaN.
+"""
+
+import argparse
+import csv
+import importlib.util
+import os
+
+from switch_model.basic_utilities import InputError
+
+
+def read_text_table(path):
+    """
+    Read a .csv, .tab or .tsv file and return a list of column names and a
+    list of columns of values, converted the same way as Pyomo's DataPortal.
+    """
+    from pyomo.dataportal.process_data import _process_token
+
+    delimiter = "," if path.endswith(".csv") else "\t"
+    with open(path, newline="") as f:
+        rows = [row for row in csv.reader(f, delimiter=delimiter) if row != []]
+    if not rows:
+        return [], []
+    headers = rows[0]
+    for i, row in enumerate(rows[1:], start=2):
+        if len(row) != len(headers):
+            raise InputError(
+                f"Line {i} of {path} has {len(row)} cells; expected {len(headers)}."
+            )
+    columns = [
+        [None if v in {".", ""} else _process_token(v) for v in col]
+        for col in zip(*rows[1:])
+    ] or [[] for h in headers]
+    return headers, columns
+
+
+def column_type(values):
+    """Return the pyarrow type for a list of values, or None if mixed."""
+    import pyarrow
+
+    types = {type(v) for v in values if v is not None}
+    if not types or types == {str}:
+        return pyarrow.string()
+    elif types == {bool}:
+        return pyarrow.bool_()
+    elif types == {int}:
+        if all(-(2**63) <= v < 2**63 for v in values if v is not None):
+            return pyarrow.int64()
+        return None
+    elif types <= {int, float}:
+        return pyarrow.float64()
+    else:
+        return None
+
+
+def convert_file(path, fmt):
+    """
+    Convert one text table to the specified format. Returns the path of the
+    new file, or None if the table can't be converted.
+    """
+    import pyarrow, pyarrow.feather, pyarrow.parquet
+
+    headers, columns = read_text_table(path)
+    if not headers:
+        return None
+    fields = []
+    for h, col in zip(headers, columns):
+        t = column_type(col)
+        if t is None:
+            print(f"Skipping {path}: column {h} has a mix of types.")
+            return None
+        fields.append(pyarrow.field(h, t))
+    table = pyarrow.Table.from_arrays(
+        [pyarrow.array(col, type=f.type) for col, f in zip(columns, fields)],
+        schema=pyarrow.schema(fields),
+    )
+    new_path = os.path.splitext(path)[0] + "." + fmt
+    if fmt == "parquet":
+        pyarrow.parquet.write_table(table, new_path)
+    else:
+        pyarrow.feather.write_feather(table, new_path)
+    return new_path
+
+
+def convert_to_matrix(path):
+    """
+    Convert a text table with two index columns and one value column to a
+    .npy matrix with label files. Returns the path of the new matrix.
+    """
+    import numpy
+
+    headers, columns = read_text_table(path)
+    if len(headers) != 3:
+        raise InputError(
+            f"{path} has {len(headers)} columns; a table with two index "
+            "columns and one value column is needed to create a matrix."
+        )
+    col_keys, row_keys, values = columns
+    if None in col_keys or None in row_keys:
+        raise InputError(f"Missing values found in index columns of {path}.")
+    col_labels = list(dict.fromkeys(col_keys))
+    row_labels = list(dict.fromkeys(row_keys))
+    col_pos = {c: i for i, c in enumerate(col_labels)}
+    row_pos = {r: i for i, r in enumerate(row_labels)}
+    rows = [row_pos[r] for r in row_keys]
+    cols = [col_pos[c] for c in col_keys]
+    matrix = numpy.full((len(row_labels), len(col_labels)), numpy.nan)
+    try:
+        matrix[rows, cols] = [numpy.nan if v is None else v for v in values]
+    except (TypeError, ValueError):
+        raise InputError(f"Column {headers[2]} of {path} must be numeric.")
+
+    root = os.path.splitext(path)[0]
+    numpy.save(root + ".npy", matrix)
+    for suffix, header, labels in [
+        ("_rows.csv", headers[1], row_labels),
+        ("_columns.csv", headers[0], col_labels),
+    ]:
+        with open(root + suffix, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow([header])
+            w.writerows([l] for l in labels)
+    return root + ".npy"
+
+
+def convert_inputs_dir(inputs_dir, fmt="parquet", remove_csv=False):
+    converted = 0
+    for f in sorted(os.listdir(inputs_dir)):
+        path = os.path.join(inputs_dir, f)
+        if not (os.path.isfile(path) and f.endswith((".csv", ".tab", ".tsv"))):
+            continue
+        try:
+            new_path = convert_file(path, fmt)
+        except InputError as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        if new_path is None:
+            continue
+        converted += 1
+        if remove_csv:
+            os.remove(path)
+    return converted
+
+
+def convert_matrices(inputs_dir, files, remove_csv=False):
+    converted = 0
+    for f in files:
+        path = os.path.join(inputs_dir, f)
+        if not os.path.isfile(path):
+            continue
+        try:
+            convert_to_matrix(path)
+        except InputError as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        converted += 1
+        if remove_csv:
+            os.remove(path)
+    return converted
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Convert Switch input tables to Parquet or Feather files."
+    )
+    parser.add_argument(
+        "--inputs-dir",
+        default="inputs",
+        help="Directory containing the input files to convert (default is inputs).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["parquet", "feather"],
+        default="parquet",
+        help="File format to create (default is parquet).",
+    )
+    parser.add_argument(
+        "--remove-csv",
+        action="store_true",
+        default=False,
+        help="Delete each .csv, .tab or .tsv file after converting it.",
+    )
+    parser.add_argument(
+        "--matrix",
+        nargs="*",
+        default=None,
+        metavar="FILE",
+        help="Convert the specified tables (default is variable_capacity_factors.csv "
+        "and loads.csv) to memory-mapped matrices instead of columnar files.",
+    )
+    options = parser.parse_args(args=args)
+    if options.matrix is not None:
+        files = options.matrix or ["variable_capacity_factors.csv", "loads.csv"]
+        converted = convert_matrices(options.inputs_dir, files, options.remove_csv)
+        print(f"Converted {converted} file(s) in {options.inputs_dir} to matrices.")
+        return
+    if importlib.util.find_spec("pyarrow") is None:
+        parser.error(
+            "The pyarrow package is needed to convert inputs. Please install "
+            "it, e.g., with `pip install pyarrow`."
+        )
+    converted = convert_inputs_dir(
+        options.inputs_dir, options.format, options.remove_csv
+    )
+    print(f"Converted {converted} file(s) in {options.inputs_dir} to {options.format}.")
+
+
+if __name__ == "__main__":
+    main()
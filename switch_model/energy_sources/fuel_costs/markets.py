@@ -9,9 +9,8 @@ model.
 from __future__ import division
 
 import os
-import csv
 from pyomo.environ import *
-from switch_model.utilities import unique_list
+from switch_model.utilities import find_columnar_file, read_input_rows, unique_list
 
 dependencies = (
     "switch_model.timescales",
@@ -295,9 +294,9 @@ def define_components(mod):
     def zone_fuel_cost_adder_validate(model, val, z, fuel, p):
         rfm = model.zone_fuel_rfm[z, fuel]
         for rfm_supply_tier in model.SUPPLY_TIERS_FOR_RFM_PERIOD[rfm, p]:
-            if val + model.rfm_supply_tier_cost[
-                rfm_supply_tier
-            ] < 0 and model.rfm_supply_tier_limit[rfm_supply_tier] == float("inf"):
+            if value(
+                val + model.rfm_supply_tier_cost[rfm_supply_tier]
+            ) < 0 and model.rfm_supply_tier_limit[rfm_supply_tier] == float("inf"):
                 return False
         return True
 
@@ -473,74 +472,69 @@ def load_inputs(mod, switch_data, inputs_dir):
     # Load a simple specifications of costs if the file exists. The
     # actual loading, error checking, and casting into a supply curve is
     # slightly complicated, so I moved that logic to a separate function.
-    path = os.path.join(inputs_dir, "fuel_cost.csv")
+    path = find_columnar_file(os.path.join(inputs_dir, "fuel_cost.csv"))
     if os.path.isfile(path):
         _load_simple_cost_data(mod, switch_data, path)
 
 
 def _load_simple_cost_data(mod, switch_data, path):
-    with open(path, "r") as simple_cost_file:
-        simple_cost_dat = list(csv.DictReader(simple_cost_file, delimiter=","))
-        # Scan once for error checking
-        fname = os.path.basename(path)
-        for row in simple_cost_dat:
-            z = row["load_zone"]
-            f = row["fuel"]
-            p = int(row["period"])
-            f_cost = float(row["fuel_cost"])
-            # Basic data validity checks
-            if z not in switch_data.data(name="LOAD_ZONES"):
-                raise ValueError(
-                    f"Load zone {z} in {fname} is not "
-                    f"a known load zone from load_zones.csv."
-                )
-            if f not in switch_data.data(name="FUELS"):
-                raise ValueError(
-                    f"Fuel {f} in {fname} is not a known fuel from fuels.csv."
-                )
-            if p not in switch_data.data(name="PERIODS"):
-                raise ValueError(
-                    f"Period {p} in {fname} is not a known investment period."
-                )
-            # Make sure they aren't overriding a supply curve or
-            # regional fuel market defined in previous files.
-            for z, rfm in switch_data.data(name="ZONE_RFMS"):
-                if z == z and switch_data.data(name="rfm_fuel")[rfm] == f:
-                    raise ValueError(
-                        f"The supply for fuel '{f}' for load_zone '{z}' was "
-                        f"already registered with the regional fuel market "
-                        f"'{rfm}', so you cannot specify a simple fuel cost for "
-                        f"it in {fname}. You either need to delete that entry "
-                        f"from zone_to_regional_fuel_market.csv, or remove those "
-                        f"entries in {fname}."
-                    )
-            # Make a new single-load zone regional fuel market.
-            rfm = z + "_" + f
-            if rfm in switch_data.data(name="REGIONAL_FUEL_MARKETS"):
+    simple_cost_dat = read_input_rows(path)
+    # Scan once for error checking
+    fname = os.path.basename(path)
+    for row in simple_cost_dat:
+        z = row["load_zone"]
+        f = row["fuel"]
+        p = int(row["period"])
+        f_cost = float(row["fuel_cost"])
+        # Basic data validity checks
+        if z not in switch_data.data(name="LOAD_ZONES"):
+            raise ValueError(
+                f"Load zone {z} in {fname} is not "
+                f"a known load zone from load_zones.csv."
+            )
+        if f not in switch_data.data(name="FUELS"):
+            raise ValueError(f"Fuel {f} in {fname} is not a known fuel from fuels.csv.")
+        if p not in switch_data.data(name="PERIODS"):
+            raise ValueError(f"Period {p} in {fname} is not a known investment period.")
+        # Make sure they aren't overriding a supply curve or
+        # regional fuel market defined in previous files.
+        for z, rfm in switch_data.data(name="ZONE_RFMS"):
+            if z == z and switch_data.data(name="rfm_fuel")[rfm] == f:
                 raise ValueError(
-                    f"Trying to construct a simple Regional Fuel Market called "
-                    f"{rfm} from data in {fname}, but an RFM of that name already "
-                    f"exists. Bailing out!"
+                    f"The supply for fuel '{f}' for load_zone '{z}' was "
+                    f"already registered with the regional fuel market "
+                    f"'{rfm}', so you cannot specify a simple fuel cost for "
+                    f"it in {fname}. You either need to delete that entry "
+                    f"from zone_to_regional_fuel_market.csv, or remove those "
+                    f"entries in {fname}."
                 )
-        # Scan again and actually import the data
-        for row in simple_cost_dat:
-            z = row["load_zone"]
-            f = row["fuel"]
-            p = int(row["period"])
-            f_cost = float(row["fuel_cost"])
-            # Make a new single-load zone regional fuel market unless we
-            # already defined one in this loop for a different period.
-            rfm = z + "_" + f
-            if rfm not in switch_data.data(name="REGIONAL_FUEL_MARKETS"):
-                switch_data.data(name="REGIONAL_FUEL_MARKETS").append(rfm)
-                switch_data.data(name="rfm_fuel")[rfm] = f
-                switch_data.data(name="ZONE_RFMS").append((z, rfm))
-            # Make a single supply tier for this RFM and period
-            st = 0
-            switch_data.data(name="RFM_SUPPLY_TIERS").append((rfm, p, st))
-            switch_data.data(name="rfm_supply_tier_cost")[rfm, p, st] = f_cost
-            # No need to specify an upper limit, since default is infinity
-            # (and this creates inf values in the data portal that could get
-            # written out to .dat files for PySP, which would be unable to read
-            # those values in Pyomo 5.7+)
-            # switch_data.data(name="rfm_supply_tier_limit")[rfm, p, st] = float("inf")
+        # Make a new single-load zone regional fuel market.
+        rfm = z + "_" + f
+        if rfm in switch_data.data(name="REGIONAL_FUEL_MARKETS"):
+            raise ValueError(
+                f"Trying to construct a simple Regional Fuel Market called "
+                f"{rfm} from data in {fname}, but an RFM of that name already "
+                f"exists. Bailing out!"
+            )
+    # Scan again and actually import the data
+    for row in simple_cost_dat:
+        z = row["load_zone"]
+        f = row["fuel"]
+        p = int(row["period"])
+        f_cost = float(row["fuel_cost"])
+        # Make a new single-load zone regional fuel market unless we
+        # already defined one in this loop for a different period.
+        rfm = z + "_" + f
+        if rfm not in switch_data.data(name="REGIONAL_FUEL_MARKETS"):
+            switch_data.data(name="REGIONAL_FUEL_MARKETS").append(rfm)
+            switch_data.data(name="rfm_fuel")[rfm] = f
+            switch_data.data(name="ZONE_RFMS").append((z, rfm))
+        # Make a single supply tier for this RFM and period
+        st = 0
+        switch_data.data(name="RFM_SUPPLY_TIERS").append((rfm, p, st))
+        switch_data.data(name="rfm_supply_tier_cost")[rfm, p, st] = f_cost
+        # No need to specify an upper limit, since default is infinity
+        # (and this creates inf values in the data portal that could get
+        # written out to .dat files for PySP, which would be unable to read
+        # those values in Pyomo 5.7+)
+        # switch_data.data(name="rfm_supply_tier_limit")[rfm, p, st] = float("inf")
@@ -0,0 +1,74 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+"""
+Indexed expressions that are calculated when they are accessed instead of
+being stored.
+
+Some indexed Expressions just pass through to another component, e.g.,
+GenCapacityInTP[g, t] is GenCapacity[g, tp_period[t]] and TxPowerSent is
+DispatchTx, or build a short term from other components, e.g.,
+DispatchUpperLimit. A regular Expression creates and stores an
+ExpressionData object for every index, so these can add millions of small
+Python objects to a large model and take a lot of time to construct.
+
+ExpressionView is declared the same way as an indexed Expression, e.g.,
+`mod.GenCapacityInTP = ExpressionView(mod.GEN_TPS, rule=rule)`, and supports
+the same read-only operations: m.GenCapacityInTP[g, t], membership tests,
+len(), keys(), values() and items(). But nothing is stored for each index;
+instead, rule(m, g, t) is called each time an element is accessed, and the
+result (a variable, named expression or small expression object) is returned
+directly. It has ctype Expression, so it is included with other Expressions
+in generic outputs and can be evaluated the same way. Unlike Expressions,
+elements cannot be modified after construction, and the rule should be
+cheap, since it is called each time an element is used.
+"""
+
+from pyomo.core.base.indexed_component import IndexedComponent
+from pyomo.environ import Expression
+
+
+class ExpressionView(IndexedComponent):
+    """
+    Read-only indexed Expression whose elements are calculated by `rule` on
+    each access instead of being stored. `rule(m, *index)` should return a
+    Pyomo expression, component element or number.
+    """
+
+    def __init__(self, *args, rule, **kwds):
+        kwds.setdefault("ctype", Expression)
+        IndexedComponent.__init__(self, *args, **kwds)
+        if not self.is_indexed():
+            raise ValueError("ExpressionView must be indexed.")
+        self._rule = rule
+
+    def construct(self, data=None):
+        self._constructed = True
+
+    def _getitem_when_not_present(self, index):
+        # IndexedComponent.__getitem__ calls this for any valid index that has
+        # no entry in self._data, which is every index here. The standard
+        # version would create and store a new element; instead, we return
+        # the rule's result without storing it. Pyomo has already validated
+        # and normalized the index, so multi-dimensional indexes are tuples.
+        if index.__class__ is tuple:
+            return self._rule(self.parent_block(), *index)
+        else:
+            return self._rule(self.parent_block(), index)
+
+    def __len__(self):
+        return len(self.index_set())
+
+    def __contains__(self, idx):
+        return idx in self.index_set()
+
+    def __setitem__(self, index, val):
+        raise TypeError(f"Elements of {self.name} cannot be modified.")
+
+    def _pprint(self):
+        return (
+            [("Size", len(self)), ("Index", self.index_set())],
+            self.items(),
+            ("Expression",),
+            lambda k, v: [v],
+        )
@@ -9,7 +9,6 @@ from __future__ import print_function
 from __future__ import division
 from pyomo.environ import *
 import os
-import pandas as pd
 
 dependencies = "switch_model.timescales"
 
@@ -36,7 +35,7 @@ def capital_recovery_factor(ir, t):
     rate, paid over 20 years is 0.09439. If the principal was $100, loan\
     payments would be $9.44
     """
-    return 1 / t if ir == 0 else ir / (1 - (1 + ir) ** -t)
+    return 1 / t if value(ir) == 0 else ir / (1 - (1 + ir) ** -t)
 
 
 def uniform_series_to_present_value(dr, t):
@@ -61,7 +60,7 @@ def uniform_series_to_present_value(dr, t):
         round(1/capital_recovery_factor(.07,20),7)
     True
     """
-    return t if dr == 0 else (1 - (1 + dr) ** -t) / dr
+    return t if value(dr) == 0 else (1 - (1 + dr) ** -t) / dr
 
 
 def future_to_present_value(dr, t):
@@ -330,6 +329,8 @@ def load_inputs(mod, switch_data, inputs_dir):
 
 
 def post_solve(instance, outdir):
+    import pandas as pd
+
     m = instance
     # Overall electricity costs, if appropriate (some models may be gas-only)
 
@@ -341,15 +342,16 @@ def post_solve(instance, outdir):
     # this problem.
 
     if hasattr(m, "zone_total_demand_in_period_mwh"):
+        system_cost = m.solution_values(m.SystemCostPerPeriod)
         normalized_dat = [
             {
                 "PERIOD": p,
-                "SystemCostPerYear_Real": value(
+                "SystemCostPerYear_Real": (
                     # dividing SystemCostPerPeriod[p] by m.bring_annual_costs_to_base_year[p]
                     # undoes the conversion from real $/year to NPV $/period, so
                     # this expression is a cost per year in period p
-                    m.SystemCostPerPeriod[p]
-                    / m.bring_annual_costs_to_base_year[p]
+                    system_cost[p]
+                    / value(m.bring_annual_costs_to_base_year[p])
                 ),
                 "SystemDemandPerYear_MWh": value(
                     # zone_total_demand_in_period_mwh is a total value for the period,
@@ -375,15 +377,28 @@ def post_solve(instance, outdir):
     # as annual costs for analysis and reporting. Maybe they should be in two
     # separate files? Or at least rename the NPV terms to say they are per period
     # and the real terms to say they are per year, real.
+    # retrieve all cost component values at once (cached for other modules)
+    costs = {
+        c: m.solution_values(c)
+        for c in list(m.Cost_Components_Per_Period) + list(m.Cost_Components_Per_TP)
+    }
+    tp_costs_per_year = {
+        (tp_cost, p): sum(
+            costs[tp_cost][t] * value(m.tp_weight_in_year[t])
+            for t in m.TPS_IN_PERIOD[p]
+        )
+        for p in m.PERIODS
+        for tp_cost in m.Cost_Components_Per_TP
+    }
     annualized_costs = [
         {
             "PERIOD": p,
             "Component": annual_cost,
             "Component_type": "annual",
-            "AnnualCost_NPV": value(
-                getattr(m, annual_cost)[p] * m.bring_future_costs_to_base_year[p]
+            "AnnualCost_NPV": (
+                costs[annual_cost][p] * value(m.bring_future_costs_to_base_year[p])
             ),
-            "AnnualCost_Real": value(getattr(m, annual_cost)[p]),
+            "AnnualCost_Real": costs[annual_cost][p],
         }
         for p in m.PERIODS
         for annual_cost in m.Cost_Components_Per_Period
@@ -392,19 +407,11 @@ def post_solve(instance, outdir):
             "PERIOD": p,
             "Component": tp_cost,
             "Component_type": "timepoint",
-            "AnnualCost_NPV": value(
-                sum(
-                    getattr(m, tp_cost)[t] * m.tp_weight_in_year[t]
-                    for t in m.TPS_IN_PERIOD[p]
-                )
-                * m.bring_future_costs_to_base_year[p]
-            ),
-            "AnnualCost_Real": value(
-                sum(
-                    getattr(m, tp_cost)[t] * m.tp_weight_in_year[t]
-                    for t in m.TPS_IN_PERIOD[p]
-                )
+            "AnnualCost_NPV": (
+                tp_costs_per_year[tp_cost, p]
+                * value(m.bring_future_costs_to_base_year[p])
             ),
+            "AnnualCost_Real": tp_costs_per_year[tp_cost, p],
         }
         for p in m.PERIODS
         for tp_cost in m.Cost_Components_Per_TP
@@ -427,13 +427,7 @@ def define_components(mod):
     )
     mod.min_data_check("build_gen_predetermined")
 
-    def gen_build_can_operate_in_period(m, g, build_year, period):
-        if build_year in m.PERIODS:
-            # always build at start of period
-            online = m.period_start[build_year]
-        else:
-            online = build_year
-        retirement = online + m.gen_max_age[g]
+    def gen_build_can_operate_in_period(m, online, retirement, build_year, period):
         if build_year == period:
             # always allow operation during the period it is built, even
             # if asset life isn't enough to cover the period
@@ -455,30 +449,65 @@ def define_components(mod):
             can_run = online < m.period_end[period] <= retirement
         return can_run
 
+    # Lifecycle index for all generator vintages, built in one pass over
+    # GEN_BLD_YRS and PERIODS: m.gen_build_lifecycle_dict[g, bld_yr] gives
+    # (online year, retirement year, list of operable periods), and
+    # m.gen_period_builds_dict[g, period] gives the build years that can
+    # operate in that period. The lifecycle sets below are all derived from
+    # these, so they can be constructed in time proportional to their size,
+    # instead of rescanning GEN_BLD_YRS for each generator and period. The
+    # dicts are discarded after the last of these sets is constructed.
+    def gen_build_lifecycle(m):
+        try:
+            return m.gen_build_lifecycle_dict
+        except AttributeError:
+            pass
+        lifecycle = m.gen_build_lifecycle_dict = dict()
+        builds = m.gen_period_builds_dict = dict()
+        for g, bld_yr in m.GEN_BLD_YRS:
+            if bld_yr in m.PERIODS:
+                # always build at start of period
+                online = m.period_start[bld_yr]
+            else:
+                online = bld_yr
+            retirement = online + m.gen_max_age[g]
+            periods = [
+                p
+                for p in m.PERIODS
+                if gen_build_can_operate_in_period(m, online, retirement, bld_yr, p)
+            ]
+            lifecycle[g, bld_yr] = (online, retirement, periods)
+            for p in periods:
+                builds.setdefault((g, p), []).append(bld_yr)
+        return lifecycle
+
+    def gen_build_lifecycle_cleanup(m):
+        for name in ["gen_build_lifecycle_dict", "gen_period_builds_dict"]:
+            if hasattr(m, name):
+                delattr(m, name)
+
     # The set of periods when a project built in a certain year will be online
     mod.PERIODS_FOR_GEN_BLD_YR = Set(
         mod.GEN_BLD_YRS,
         dimen=1,
         within=mod.PERIODS,
         ordered=True,
-        initialize=lambda m, g, bld_yr: [
-            period
-            for period in m.PERIODS
-            if gen_build_can_operate_in_period(m, g, bld_yr, period)
-        ],
+        initialize=lambda m, g, bld_yr: gen_build_lifecycle(m)[g, bld_yr][2],
     )
+
     # The set of build years that could be online in the given period
     # for the given project (possibly empty).
+    def BLD_YRS_FOR_GEN_PERIOD_init(m, g, period):
+        gen_build_lifecycle(m)
+        return m.gen_period_builds_dict.get((g, period), [])
+
     mod.BLD_YRS_FOR_GEN_PERIOD = Set(
         mod.GENERATION_PROJECTS,
         mod.PERIODS,
         dimen=1,
-        initialize=lambda m, g, period: unique_list(
-            bld_yr
-            for (gen, bld_yr) in m.GEN_BLD_YRS
-            if gen == g and gen_build_can_operate_in_period(m, g, bld_yr, period)
-        ),
+        initialize=BLD_YRS_FOR_GEN_PERIOD_init,
     )
+
     # The set of periods when a generator is available to run
     mod.PERIODS_FOR_GEN = Set(
         mod.GENERATION_PROJECTS,
@@ -548,14 +577,21 @@ def define_components(mod):
 
     # set of years when a generator vintage (generator/build-year combination)
     # can have operation suspended and avoid fixed O&M charges.
+    def GEN_BLD_SUSPEND_YRS_init(m):
+        lifecycle = gen_build_lifecycle(m)
+        result = [
+            (g, bld_yr, sus_yr)
+            for (g, bld_yr), (online, retirement, periods) in lifecycle.items()
+            for sus_yr in periods
+        ]
+        # this is the last set that uses the lifecycle index
+        gen_build_lifecycle_cleanup(m)
+        return result
+
     mod.GEN_BLD_SUSPEND_YRS = Set(
         dimen=3,
         within=mod.GEN_BLD_YRS * mod.PERIODS,
-        initialize=lambda m: [
-            (g, bld_yr, sus_yr)
-            for g, bld_yr in m.GEN_BLD_YRS
-            for sus_yr in m.PERIODS_FOR_GEN_BLD_YR[g, bld_yr]
-        ],
+        initialize=GEN_BLD_SUSPEND_YRS_init,
     )
 
     # SuspendGen[g, bld_yr, sus_yr] shows how much capacity of project `g`
@@ -861,6 +897,9 @@ def post_solve(m, outdir):
     # report total generator and storage capacity in place for each generator in
     # each period. Also show capital and fixed O&M recovery per year in that
     # period (these are the costs Switch seeks to minimize)
+    gen_capacity = m.solution_values(m.GenCapacity)
+    gen_capital_costs = m.solution_values(m.GenCapitalCosts)
+    gen_fixed_om_costs = m.solution_values(m.GenFixedOMCosts)
     write_table(
         m,
         m.GENERATION_PROJECTS,
@@ -884,7 +923,7 @@ def post_solve(m, outdir):
             m.gen_tech[g],
             m.gen_load_zone[g],
             m.gen_energy_source[g],
-            m.GenCapacity[g, p],
+            gen_capacity[g, p],
             sum(
                 m.SuspendGen[g, bld_yr, p] for bld_yr in m.BLD_YRS_FOR_GEN_PERIOD[g, p]
             ),
@@ -894,13 +933,13 @@ def post_solve(m, outdir):
                 and (g, p) in m.StorageEnergyCapacity
                 else "."
             ),
-            m.GenCapitalCosts[g, p]
+            gen_capital_costs[g, p]
             + (
                 m.StorageEnergyCapitalCost[g, p]
                 if hasattr(m, "StorageEnergyCapitalCost")
                 and (g, p) in m.StorageEnergyCapitalCost
                 else 0.0
             ),
-            m.GenFixedOMCosts[g, p],
+            gen_fixed_om_costs[g, p],
         ),
     )
@@ -6,6 +6,7 @@ Defines model components to force discrete unit commitment for
 generation technologies that have gen_unit_size specified.
 """
 
+import os
 from pyomo.environ import *
 
 dependencies = (
@@ -30,15 +31,19 @@ def define_components(mod):
     DISCRETE_GEN_TPS is a subset of GEN_TPS
     that only includes projects that have gen_unit_size defined.
 
-    CommitGenUnits[(g, bld_yr) in GEN_BLD_YRS_DISCRETE] is an
-    integer decision variable of how many units to commit.
+    CommitGenUnits[(c, t) in DISCRETE_CLUSTER_TPS] is an integer decision
+    variable of how many units to commit in each cluster of discretely
+    sized projects (see DISCRETE_GEN_CLUSTERS in
+    generators.core.commit.operate). Normally each project is its own
+    cluster; with --cluster-unit-commitment, identical projects in the same
+    load zone share a single variable.
 
-    Commit_Units_Consistency[(g, bld_yr) in
-    GEN_BLD_YRS_DISCRETE] is a constraint that forces the
-    continous decision variable CommitGen to be equal to CommitGenUnits
-    * gen_unit_size * gen_availability. The use of gen_availability here
-    is a rough estimation to approximate forced or scheduled outages as
-    a linear derating factor.
+    Commit_Units_Consistency[(c, t) in DISCRETE_CLUSTER_TPS] is a
+    constraint that forces the total of the continous decision variable
+    CommitGen for the projects in each cluster to be equal to
+    CommitGenUnits * gen_unit_size * gen_availability. The use of
+    gen_availability here is a rough estimation to approximate forced or
+    scheduled outages as a linear derating factor.
 
     Josiah's note: I have trouble wrapping my head around this
     estimation method of dealing with outages. It seems reasonable if
@@ -60,11 +65,59 @@ def define_components(mod):
             (g, t) for g in m.DISCRETELY_SIZED_GENS for t in m.TPS_FOR_GEN[g]
         ],
     )
-    mod.CommitGenUnits = Var(mod.DISCRETE_GEN_TPS, within=NonNegativeIntegers)
+    mod.CommitGenUnits = Var(mod.DISCRETE_CLUSTER_TPS, within=NonNegativeIntegers)
     mod.Commit_Units_Consistency = Constraint(
-        mod.DISCRETE_GEN_TPS,
-        rule=lambda m, g, t: (
-            m.CommitGen[g, t]
-            == m.CommitGenUnits[g, t] * m.gen_unit_size[g] * m.gen_availability[g]
+        mod.DISCRETE_CLUSTER_TPS,
+        rule=lambda m, c, t: (
+            sum(m.CommitGen[g, t] for g in m.GENS_IN_DISCRETE_CLUSTER[c])
+            == m.CommitGenUnits[c, t] * m.gen_unit_size[c] * m.gen_availability[c]
+        ),
+    )
+
+
+def post_solve(m, outputs_dir):
+    """
+    With --cluster-unit-commitment, write gen_commit_units.csv, showing how
+    many units are committed in each project. The integer number of units
+    committed in each cluster is assigned to its projects in proportion to
+    their committed capacity, giving any leftover units to the projects
+    with the largest fractional shares.
+    """
+    if not m.options.cluster_unit_commitment:
+        return
+    import switch_model.reporting as reporting
+
+    cluster = {
+        g: c for c in m.DISCRETE_GEN_CLUSTERS for g in m.GENS_IN_DISCRETE_CLUSTER[c]
+    }
+    units = {}
+    for c, t in m.DISCRETE_CLUSTER_TPS:
+        unit_mw = value(m.gen_unit_size[c] * m.gen_availability[c])
+        shares = {
+            g: max(value(m.CommitGen[g, t]) / unit_mw, 0.0)
+            for g in m.GENS_IN_DISCRETE_CLUSTER[c]
+        }
+        for g, s in shares.items():
+            units[g, t] = int(s + 1e-6)
+        # the shares add up to the committed units, so this is only negative
+        # if rounding pushed a project's share past the next whole unit
+        leftover = max(
+            int(round(value(m.CommitGenUnits[c, t])))
+            - sum(units[g, t] for g in shares),
+            0,
+        )
+        for g in sorted(shares, key=lambda g: units[g, t] - shares[g])[:leftover]:
+            units[g, t] += 1
+
+    reporting.write_table(
+        m,
+        m.DISCRETE_GEN_TPS,
+        output_file=os.path.join(outputs_dir, "gen_commit_units.csv"),
+        headings=("generation_project", "timepoint", "cluster", "CommitGenUnits"),
+        values=lambda m, g, t: (
+            g,
+            t,
+            cluster[g],
+            units[g, t],
         ),
     )
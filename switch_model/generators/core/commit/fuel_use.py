@@ -64,8 +64,7 @@ from __future__ import division
 
 import os
 from pyomo.environ import *
-import csv
-from switch_model.utilities import approx_equal
+from switch_model.utilities import approx_equal, find_columnar_file, read_input_rows
 
 dependencies = (
     "switch_model.timescales",
@@ -191,9 +190,9 @@ def load_inputs(mod, switch_data, inputs_dir):
 
     """
 
-    path = os.path.join(inputs_dir, "gen_inc_heat_rates.csv")
+    path = find_columnar_file(os.path.join(inputs_dir, "gen_inc_heat_rates.csv"))
     if os.path.isfile(path):
-        (fuel_rate_segments, min_load, full_hr) = _parse_inc_heat_rate_file(
+        fuel_rate_segments, min_load, full_hr = _parse_inc_heat_rate_file(
             path, id_column="GENERATION_PROJECT"
         )
         # Check implied minimum loading level for consistency with
@@ -254,47 +253,46 @@ def _parse_inc_heat_rate_file(path, id_column):
     full_load_hr = {}
     # Scan the file and stuff the data into dictionaries for easy access.
     # Parse the file and stuff data into dictionaries indexed by units.
-    with open(path, "r") as hr_file:
-        dat = list(csv.DictReader(hr_file, delimiter=","))
-        for row in dat:
-            u = row[id_column]
-            p1 = float(row["power_start_mw"])
-            p2 = row["power_end_mw"]
-            ihr = row["incremental_heat_rate_mbtu_per_mwhr"]
-            fr = row["fuel_use_rate_mmbtu_per_h"]
-            # Does this row give the first point?
-            if p2 == "." and ihr == ".":
-                fr = float(fr)
-                if u in fuel_rate_points:
-                    raise ValueError(
-                        "Error processing incremental heat rates for "
-                        + u
-                        + " in "
-                        + path
-                        + ". More than one row has "
-                        + "a fuel use rate specified."
-                    )
-                fuel_rate_points[u] = {p1: fr}
-            # Does this row give a line segment?
-            elif fr == ".":
-                p2 = float(p2)
-                ihr = float(ihr)
-                if u not in ihr_dat:
-                    ihr_dat[u] = []
-                ihr_dat[u].append((p1, p2, ihr))
-            # Throw an error if the row's format is not recognized.
-            else:
+    dat = read_input_rows(path)
+    for row in dat:
+        u = row[id_column]
+        p1 = float(row["power_start_mw"])
+        p2 = row["power_end_mw"]
+        ihr = row["incremental_heat_rate_mbtu_per_mwhr"]
+        fr = row["fuel_use_rate_mmbtu_per_h"]
+        # Does this row give the first point?
+        if p2 == "." and ihr == ".":
+            fr = float(fr)
+            if u in fuel_rate_points:
                 raise ValueError(
-                    "Error processing incremental heat rates for row "
+                    "Error processing incremental heat rates for "
                     + u
                     + " in "
                     + path
-                    + ". Row format not recognized for "
-                    + "row "
-                    + str(row)
-                    + ". See documentation for acceptable "
-                    + "formats."
+                    + ". More than one row has "
+                    + "a fuel use rate specified."
                 )
+            fuel_rate_points[u] = {p1: fr}
+        # Does this row give a line segment?
+        elif fr == ".":
+            p2 = float(p2)
+            ihr = float(ihr)
+            if u not in ihr_dat:
+                ihr_dat[u] = []
+            ihr_dat[u].append((p1, p2, ihr))
+        # Throw an error if the row's format is not recognized.
+        else:
+            raise ValueError(
+                "Error processing incremental heat rates for row "
+                + u
+                + " in "
+                + path
+                + ". Row format not recognized for "
+                + "row "
+                + str(row)
+                + ". See documentation for acceptable "
+                + "formats."
+            )
 
     # Make sure that each project that has incremental heat rates defined
     # also has a starting point defined.
@@ -321,9 +319,9 @@ def _parse_inc_heat_rate_file(path, id_column):
         # Sort the line segments by their domains.
         ihr_dat[u].sort()
         # Assume that the maximum power output is the rated capacity.
-        (junk, capacity, junk) = ihr_dat[u][len(ihr_dat[u]) - 1]
+        junk, capacity, junk = ihr_dat[u][len(ihr_dat[u]) - 1]
         # Retrieve the first incremental heat rate for error checking.
-        (min_power, junk, ihr_prev) = ihr_dat[u][0]
+        min_power, junk, ihr_prev = ihr_dat[u][0]
         min_cap_factor[u] = min_power / capacity
         # Process each line segment.
         for p_start, p_end, ihr in ihr_dat[u]:
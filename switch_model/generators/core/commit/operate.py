@@ -13,6 +13,7 @@ from __future__ import division
 
 import os, itertools
 from pyomo.environ import *
+from switch_model.expression_views import ExpressionView
 
 dependencies = (
     "switch_model.timescales",
@@ -24,6 +25,38 @@ dependencies = (
 )
 
 
+def define_arguments(argparser):
+    argparser.add_argument(
+        "--min-up-down-formulation",
+        dest="min_up_down_formulation",
+        default="window",
+        choices=["window", "cumulative"],
+        help=(
+            "Formulation to use for minimum uptime and downtime constraints. "
+            "'window' (the default) sums startups or shutdowns over the "
+            "lookback window in each constraint. 'cumulative' tracks "
+            "cumulative startups and shutdowns within each timeseries and "
+            "uses the difference between two points, which gives a more "
+            "compact model when minimum up or down times span many "
+            "timepoints."
+        ),
+    )
+    argparser.add_argument(
+        "--cluster-unit-commitment",
+        dest="cluster_unit_commitment",
+        action="store_true",
+        default=False,
+        help=(
+            "Group discretely sized projects in the same load zone that have "
+            "identical technical parameters into clusters, and commit units "
+            "in each cluster together with one integer (or binary) variable "
+            "per timepoint, instead of one per project. This affects "
+            "generators.core.commit.discrete and the gen_unit_contingency "
+            "option of the spinning reserve modules."
+        ),
+    )
+
+
 def define_components(mod):
     """
 
@@ -142,6 +175,11 @@ def define_components(mod):
     Enforce_Min_Uptime and Enforce_Min_Downtime constraints, and are
     probably not useful elsewhere.
 
+    tp_position_in_ts[t in TIMEPOINTS] is the zero-based position of each
+    timepoint within its timeseries, used to find the lookback windows for
+    these constraints (which wrap around the end of each timeseries) by
+    direct indexing.
+
     Enforce_Min_Uptime[(g, t) in UPTIME_CONSTRAINED_GEN_TPS] and
     Enforce_Min_Downtime[(g, t) in DOWNTIME_CONSTRAINED_GEN_TPS]
     are constraints that ensure that unit commitment respects the minimum
@@ -164,6 +202,17 @@ def define_components(mod):
     at some point in the lookback window can be startup now, possibly
     replacing other units that were shutdown recently.
 
+    By default, each of these constraints includes the startup or shutdown
+    variables for every timepoint in the lookback window. If the
+    --min-up-down-formulation cumulative option is used, the model instead
+    tracks CumulativeStartupGenCapacity[(g, t) in UPTIME_CONSTRAINED_GEN_TPS]
+    and CumulativeShutdownGenCapacity[(g, t) in DOWNTIME_CONSTRAINED_GEN_TPS],
+    the total capacity started up or shut down from the start of the
+    timeseries through timepoint t (defined by Track_Cumulative_Startup and
+    Track_Cumulative_Shutdown). Then the startups or shutdowns in each window
+    are calculated as the difference between two of these, so each constraint
+    has only a few terms, regardless of the length of the window.
+
     -- Dispatch limits based on committed capacity --
 
     gen_min_load_fraction[g] describes the minimum loading level of a
@@ -214,6 +263,27 @@ def define_components(mod):
     lowered, that is how much downramp potential each project has
     in each timepoint: DispatchGen - DispatchLowerLimit
 
+    -- Clusters of discretely sized projects --
+
+    DISCRETE_GEN_CLUSTERS is a set of clusters of DISCRETELY_SIZED_GENS
+    whose units are committed together by modules that use integer or
+    binary commitment variables, such as generators.core.commit.discrete.
+    Normally each project is a cluster of its own. With
+    --cluster-unit-commitment, projects in the same load zone with the same
+    technology, energy source, unit size, availability, heat rate, costs,
+    minimum load, minimum up and down times, active timepoints and
+    commitment limits are placed in the same cluster. This gives one
+    integer variable per cluster and timepoint instead of one per project,
+    which can make models with large fleets of identical units much faster
+    to solve. Each cluster is identified by the name of its first project,
+    so gen_unit_size[c], gen_availability[c], gen_load_zone[c] and
+    TPS_FOR_GEN[c] give the shared values for cluster c.
+
+    GENS_IN_DISCRETE_CLUSTER[c in DISCRETE_GEN_CLUSTERS] is the set of
+    projects in each cluster.
+
+    DISCRETE_CLUSTER_TPS is a set of (c, t) tuples showing the timepoints
+    when each cluster is active.
 
     """
 
@@ -229,7 +299,7 @@ def define_components(mod):
             m.gen_max_commit_fraction[g, t] if g in m.BASELOAD_GENS else 0.0
         ),
     )
-    mod.CommitLowerLimit = Expression(
+    mod.CommitLowerLimit = ExpressionView(
         mod.GEN_TPS,
         rule=lambda m, g, t: (
             m.GenCapacityInTP[g, t]
@@ -237,7 +307,7 @@ def define_components(mod):
             * m.gen_min_commit_fraction[g, t]
         ),
     )
-    mod.CommitUpperLimit = Expression(
+    mod.CommitUpperLimit = ExpressionView(
         mod.GEN_TPS,
         rule=lambda m, g, t: (
             m.GenCapacityInTP[g, t]
@@ -299,15 +369,65 @@ def define_components(mod):
     def hrs_to_num_tps(m, hrs, t):
         return int(round(hrs / m.ts_duration_of_tp[m.tp_ts[t]]))
 
+    mod.tp_position_in_ts = Param(
+        mod.TIMEPOINTS,
+        within=NonNegativeIntegers,
+        initialize=lambda m, t: m.TPS_IN_TS[m.tp_ts[t]].ord(t) - 1,
+    )
+
     def time_window(m, t, hrs, add_one=False):
         """Return a the set of timepoints, starting at t and going
         back the specified number of hours"""
         n = hrs_to_num_tps(m, hrs, t)
         if add_one:
             n += 1
-        window = [m.TPS_IN_TS[m.tp_ts[t]].prevw(t, i) for i in range(n)]
+        tps = m.TPS_IN_TS[m.tp_ts[t]]
+        pos = m.tp_position_in_ts[t]
+        num_tps = len(tps)
+        # note: Pyomo's ordered sets are indexed from 1
+        window = [tps.at((pos - i) % num_tps + 1) for i in range(n)]
         return window
 
+    def window_total(m, cumulative, g, t, hrs):
+        """
+        Return an expression for the sum of the variable tracked by
+        `cumulative` over the timepoints starting at t and going back the
+        specified number of hours (wrapping around the start of the
+        timeseries, like time_window()).
+        """
+        n = hrs_to_num_tps(m, hrs, t)
+        tps = m.TPS_IN_TS[m.tp_ts[t]]
+        pos = m.tp_position_in_ts[t]
+        num_tps = len(tps)
+        # windows longer than the timeseries include every timepoint one or
+        # more times, then a partial window
+        full_cycles, n = divmod(n, num_tps)
+        ts_total = cumulative[g, tps.last()]
+        total = full_cycles * ts_total if full_cycles else 0
+        if n > 0:
+            # add everything from the start of the timeseries through t
+            total += cumulative[g, t]
+            if pos - n >= 0:
+                # window starts after the first timepoint in the timeseries;
+                # subtract everything before the window
+                total -= cumulative[g, tps.at(pos - n + 1)]
+            elif pos - n < -1:
+                # window wraps around to the end of the timeseries; add
+                # the part of the timeseries after the start of the window
+                total += ts_total - cumulative[g, tps.at(pos - n + num_tps + 1)]
+        return total
+
+    def cumulative_rule(cumulative, change):
+        def rule(m, g, t):
+            prior = (
+                getattr(m, cumulative)[g, m.tp_previous[t]]
+                if m.tp_position_in_ts[t] > 0
+                else 0.0
+            )
+            return getattr(m, cumulative)[g, t] == prior + getattr(m, change)[g, t]
+
+        return rule
+
     mod.UPTIME_CONSTRAINED_GEN_TPS = Set(
         dimen=2,
         initialize=lambda m: [
@@ -328,16 +448,51 @@ def define_components(mod):
             if hrs_to_num_tps(m, m.gen_min_downtime[g], t) > 0
         ],
     )
-    mod.Enforce_Min_Uptime = Constraint(
-        mod.UPTIME_CONSTRAINED_GEN_TPS,
-        doc="All capacity turned on in the last x hours must still be on now",
-        rule=lambda m, g, t: (
-            m.CommitGen[g, t]
-            >= sum(
+    cumulative = mod.options.min_up_down_formulation == "cumulative"
+    if cumulative:
+        mod.CumulativeStartupGenCapacity = Var(
+            mod.UPTIME_CONSTRAINED_GEN_TPS, within=NonNegativeReals
+        )
+        mod.Track_Cumulative_Startup = Constraint(
+            mod.UPTIME_CONSTRAINED_GEN_TPS,
+            rule=cumulative_rule("CumulativeStartupGenCapacity", "StartupGenCapacity"),
+        )
+        mod.CumulativeShutdownGenCapacity = Var(
+            mod.DOWNTIME_CONSTRAINED_GEN_TPS, within=NonNegativeReals
+        )
+        mod.Track_Cumulative_Shutdown = Constraint(
+            mod.DOWNTIME_CONSTRAINED_GEN_TPS,
+            rule=cumulative_rule(
+                "CumulativeShutdownGenCapacity", "ShutdownGenCapacity"
+            ),
+        )
+
+    def recent_startups(m, g, t):
+        if cumulative:
+            return window_total(
+                m, m.CumulativeStartupGenCapacity, g, t, m.gen_min_uptime[g]
+            )
+        else:
+            return sum(
                 m.StartupGenCapacity[g, t_prior]
                 for t_prior in time_window(m, t, m.gen_min_uptime[g])
             )
-        ),
+
+    def recent_shutdowns(m, g, t):
+        if cumulative:
+            return window_total(
+                m, m.CumulativeShutdownGenCapacity, g, t, m.gen_min_downtime[g]
+            )
+        else:
+            return sum(
+                m.ShutdownGenCapacity[g, t_prior]
+                for t_prior in time_window(m, t, m.gen_min_downtime[g])
+            )
+
+    mod.Enforce_Min_Uptime = Constraint(
+        mod.UPTIME_CONSTRAINED_GEN_TPS,
+        doc="All capacity turned on in the last x hours must still be on now",
+        rule=lambda m, g, t: m.CommitGen[g, t] >= recent_startups(m, g, t),
     )
     # Matthias notes on Enforce_Min_Downtime: The max(...) term finds the
     # largest fraction of capacity that could have been committed in the last
@@ -374,10 +529,7 @@ def define_components(mod):
                     )
                 )
             )
-            - sum(
-                m.ShutdownGenCapacity[g, t_prior]
-                for t_prior in time_window(m, t, m.gen_min_downtime[g])
-            )
+            - recent_shutdowns(m, g, t)
         ),
     )
 
@@ -392,7 +544,7 @@ def define_components(mod):
         default=lambda m, g, t: m.gen_min_load_fraction[g],
         within=NonNegativeReals,
     )
-    mod.DispatchLowerLimit = Expression(
+    mod.DispatchLowerLimit = ExpressionView(
         mod.GEN_TPS,
         rule=lambda m, g, t: (m.CommitGen[g, t] * m.gen_min_load_fraction_TP[g, t]),
     )
@@ -403,7 +555,7 @@ def define_components(mod):
         else:
             return m.CommitGen[g, t]
 
-    mod.DispatchUpperLimit = Expression(mod.GEN_TPS, rule=DispatchUpperLimit_expr)
+    mod.DispatchUpperLimit = ExpressionView(mod.GEN_TPS, rule=DispatchUpperLimit_expr)
 
     mod.Enforce_Dispatch_Lower_Limit = Constraint(
         mod.GEN_TPS,
@@ -422,6 +574,73 @@ def define_components(mod):
         rule=lambda m, g, t: (m.DispatchGen[g, t] - m.DispatchLowerLimit[g, t]),
     )
 
+    # Clusters of discretely sized projects that can be committed together
+    def discrete_gen_cluster_signature(m, g):
+        # technical parameters that must match for projects to share a cluster
+        def fuel_param(p):
+            try:
+                return value(p[g]) if g in m.FUEL_BASED_GENS else None
+            except ValueError:  # undefined, e.g., with incremental heat rates
+                return None
+
+        tps = tuple(m.TPS_FOR_GEN[g])
+        return (
+            m.gen_load_zone[g],
+            m.gen_tech[g],
+            m.gen_energy_source[g],
+            (
+                tuple(sorted(m.FUELS_FOR_MULTIFUEL_GEN[g]))
+                if g in m.MULTIFUEL_GENS
+                else None
+            ),
+            m.gen_unit_size[g],
+            m.gen_availability[g],
+            fuel_param(m.gen_full_load_heat_rate),
+            fuel_param(m.gen_startup_fuel),
+            m.gen_variable_om[g],
+            m.gen_startup_om[g],
+            m.gen_min_load_fraction[g],
+            m.gen_min_uptime[g],
+            m.gen_min_downtime[g],
+            tps,
+            tuple(
+                (
+                    m.gen_max_commit_fraction[g, t],
+                    m.gen_min_commit_fraction[g, t],
+                    m.gen_min_load_fraction_TP[g, t],
+                )
+                for t in tps
+            ),
+        )
+
+    def DISCRETE_GEN_CLUSTERS_init(m):
+        clusters = {}
+        for g in m.DISCRETELY_SIZED_GENS:
+            if m.options.cluster_unit_commitment:
+                key = discrete_gen_cluster_signature(m, g)
+            else:
+                key = g
+            clusters.setdefault(key, []).append(g)
+        # name each cluster after its first project
+        m.GENS_IN_DISCRETE_CLUSTER_dict = {gens[0]: gens for gens in clusters.values()}
+        return list(m.GENS_IN_DISCRETE_CLUSTER_dict.keys())
+
+    mod.DISCRETE_GEN_CLUSTERS = Set(
+        dimen=1, ordered=True, initialize=DISCRETE_GEN_CLUSTERS_init
+    )
+    mod.GENS_IN_DISCRETE_CLUSTER = Set(
+        mod.DISCRETE_GEN_CLUSTERS,
+        dimen=1,
+        within=mod.DISCRETELY_SIZED_GENS,
+        initialize=lambda m, c: m.GENS_IN_DISCRETE_CLUSTER_dict.pop(c),
+    )
+    mod.DISCRETE_CLUSTER_TPS = Set(
+        dimen=2,
+        initialize=lambda m: [
+            (c, t) for c in m.DISCRETE_GEN_CLUSTERS for t in m.TPS_FOR_GEN[c]
+        ],
+    )
+
 
 def load_inputs(mod, switch_data, inputs_dir):
     """
@@ -13,9 +13,10 @@ from __future__ import division
 import logging
 import os, collections
 
-import pandas as pd
 from pyomo.environ import *
 
+from switch_model.compact_sets import CompactSet, CompactTuples
+from switch_model.expression_views import ExpressionView
 from switch_model.reporting import write_table
 from switch_model.utilities import unwrap
 
@@ -171,13 +172,39 @@ def define_components(mod):
         doc="The set of projects active in a given period.",
     )
 
+    # GEN_TPS and its subsets are stored as compact, array-backed sets,
+    # because they can have millions of members in large models. The
+    # subsets and TPS_FOR_GEN share the same underlying timepoint array.
+    mod.GEN_TPS = CompactSet(
+        dimen=2,
+        initialize=lambda m: CompactTuples.from_rows(
+            m.GENERATION_PROJECTS,
+            m.TIMEPOINTS,
+            (
+                (tp for p in m.PERIODS_FOR_GEN[g] for tp in m.TPS_IN_PERIOD[p])
+                for g in m.GENERATION_PROJECTS
+            ),
+        ),
+    )
+    mod.VARIABLE_GEN_TPS = CompactSet(
+        dimen=2, initialize=lambda m: m.GEN_TPS.tuples.subset(m.VARIABLE_GENS)
+    )
+    mod.FUEL_BASED_GEN_TPS = CompactSet(
+        dimen=2, initialize=lambda m: m.GEN_TPS.tuples.subset(m.FUEL_BASED_GENS)
+    )
+    mod.GEN_TP_FUELS = CompactSet(
+        dimen=3,
+        initialize=lambda m: m.GEN_TPS.tuples.subset(
+            m.FUEL_BASED_GENS,
+            extras=[m.FUELS_FOR_GEN[g] for g in m.FUEL_BASED_GENS],
+        ),
+    )
+
     mod.TPS_FOR_GEN = Set(
         mod.GENERATION_PROJECTS,
         dimen=1,
         within=mod.TIMEPOINTS,
-        initialize=lambda m, g: (
-            tp for p in m.PERIODS_FOR_GEN[g] for tp in m.TPS_IN_PERIOD[p]
-        ),
+        initialize=lambda m, g: m.GEN_TPS.tuples.row(g),
     )
 
     def init(m, gen, period):
@@ -186,7 +213,7 @@ def define_components(mod):
         except AttributeError:
             d = m._TPS_FOR_GEN_IN_PERIOD_dict = dict()
             for _gen in m.GENERATION_PROJECTS:
-                for t in m.TPS_FOR_GEN[_gen]:
+                for t in m.GEN_TPS.tuples.row(_gen):
                     d.setdefault((_gen, m.tp_period[t]), []).append(t)
         result = d.pop((gen, period), [])
         if not d:  # all gone, delete the attribute
@@ -201,32 +228,7 @@ def define_components(mod):
         initialize=init,
     )
 
-    mod.GEN_TPS = Set(
-        dimen=2,
-        initialize=lambda m: (
-            (g, tp) for g in m.GENERATION_PROJECTS for tp in m.TPS_FOR_GEN[g]
-        ),
-    )
-    mod.VARIABLE_GEN_TPS = Set(
-        dimen=2,
-        initialize=lambda m: (
-            (g, tp) for g in m.VARIABLE_GENS for tp in m.TPS_FOR_GEN[g]
-        ),
-    )
-    mod.FUEL_BASED_GEN_TPS = Set(
-        dimen=2,
-        initialize=lambda m: (
-            (g, tp) for g in m.FUEL_BASED_GENS for tp in m.TPS_FOR_GEN[g]
-        ),
-    )
-    mod.GEN_TP_FUELS = Set(
-        dimen=3,
-        initialize=lambda m: (
-            (g, t, f) for (g, t) in m.FUEL_BASED_GEN_TPS for f in m.FUELS_FOR_GEN[g]
-        ),
-    )
-
-    mod.GenCapacityInTP = Expression(
+    mod.GenCapacityInTP = ExpressionView(
         mod.GEN_TPS, rule=lambda m, g, t: m.GenCapacity[g, m.tp_period[t]]
     )
     mod.DispatchGen = Var(mod.GEN_TPS, within=NonNegativeReals)
@@ -279,19 +281,34 @@ def define_components(mod):
         initialize=init_gen_availability,
     )
 
-    mod.VARIABLE_GEN_TPS_RAW = Set(dimen=2, within=mod.VARIABLE_GENS * mod.TIMEPOINTS)
-    mod.gen_max_capacity_factor = Param(
-        mod.VARIABLE_GEN_TPS_RAW,
-        within=Reals,
-        validate=lambda m, val, g, t: -1 < val < 2,
-    )
+    # These can have millions of elements, so they are checked in bulk before
+    # construction instead of with `within` and `validate` arguments.
+    mod.VARIABLE_GEN_TPS_RAW = Set(dimen=2)
+    mod.gen_max_capacity_factor = Param(mod.VARIABLE_GEN_TPS_RAW, within=Reals)
+
+    def variable_gens(data):
+        return [g for g, v in data.get("gen_is_variable", {}).items() if v]
+
+    mod.check_index(mod.VARIABLE_GEN_TPS_RAW, variable_gens, mod.TIMEPOINTS)
+    mod.check_range(mod.gen_max_capacity_factor, gt=-1, lt=2)
+
     # Validate that a gen_max_capacity_factor has been defined for every
     # variable gen / timepoint that we need. Extra cap factors (like beyond an
     # existing plant's lifetime) shouldn't cause any problems.
     # This replaces: mod.min_data_check('gen_max_capacity_factor') from when
     # gen_max_capacity_factor was indexed by VARIABLE_GEN_TPS.
+    def have_minimal_gen_max_capacity_factors_rule(m):
+        missing = [gt for gt in m.VARIABLE_GEN_TPS if gt not in m.VARIABLE_GEN_TPS_RAW]
+        if missing:
+            raise ValueError(
+                f"gen_max_capacity_factor is not defined for {len(missing)} "
+                "variable generator(s) and timepoint(s) when they are operable, "
+                f"including: {missing[:10]}"
+            )
+        return True
+
     mod.have_minimal_gen_max_capacity_factors = BuildCheck(
-        mod.VARIABLE_GEN_TPS, rule=lambda m, g, t: (g, t) in m.VARIABLE_GEN_TPS_RAW
+        rule=have_minimal_gen_max_capacity_factors_rule
     )
 
     if mod.logger.isEnabledFor(logging.INFO):
@@ -322,8 +339,7 @@ def define_components(mod):
                 )
                 if m.logger.isEnabledFor(logging.DEBUG):
                     # more detailed message
-                    msg += unwrap(
-                        """
+                    msg += unwrap("""
                          You can avoid this message by only placing data in
                         variable_capacity_factors.csv for active periods for
                         each project. If you expect these project[s] to be
@@ -332,8 +348,7 @@ def define_components(mod):
                         come online earlier, have longer lifetimes, or have
                         options to build new capacity when the old capacity
                         reaches its maximum age.
-                    """
-                    )
+                    """)
                     msg += " Plants with extra timepoints:\n{}".format(pprint)
                 else:
                     msg += " Use --log-level debug for more details."
@@ -394,6 +409,12 @@ def load_inputs(mod, switch_data, inputs_dir):
     variable_capacity_factors.csv
         GENERATION_PROJECT, timepoint, gen_max_capacity_factor
 
+    variable_capacity_factors can also be provided as a timepoint x project
+    matrix in variable_capacity_factors.npy, with labels in
+    variable_capacity_factors_rows.csv and variable_capacity_factors_columns.csv
+    (see `switch convert-inputs --matrix`). Only the rows for timepoints in
+    timepoints.csv are read from the matrix.
+
     """
 
     switch_data.load_aug(
@@ -401,6 +422,7 @@ def load_inputs(mod, switch_data, inputs_dir):
         filename=os.path.join(inputs_dir, "variable_capacity_factors.csv"),
         index=mod.VARIABLE_GEN_TPS_RAW,
         param=(mod.gen_max_capacity_factor,),
+        matrix_sets=(mod.GENERATION_PROJECTS, mod.TIMEPOINTS),
     )
 
 
@@ -428,6 +450,8 @@ def post_solve(instance, outdir):
     dispatch_annual_summary.pdf - A figure of annual summary data. Only written
     if the ggplot python library is installed.
     """
+    import pandas as pd
+
     gen_proj = list(instance.GENERATION_PROJECTS)  # native order
     if instance.options.sorted_output:
         gen_proj.sort()
@@ -441,6 +465,15 @@ def post_solve(instance, outdir):
         + tuple(m.DispatchGen[p, t] if (p, t) in m.GEN_TPS else 0.0 for p in gen_proj),
     )
 
+    # evaluate expressions for all generators at once
+    dispatch_gen = instance.solution_values(instance.DispatchGen)
+    dispatch_emissions = instance.solution_values(instance.DispatchEmissions)
+    gen_capacity = instance.solution_values(instance.GenCapacity)
+    gen_capital_costs = instance.solution_values(instance.GenCapitalCosts)
+    gen_fixed_om_costs = instance.solution_values(instance.GenFixedOMCosts)
+    if hasattr(instance, "ChargeStorage"):
+        charge_storage = instance.solution_values(instance.ChargeStorage)
+
     dispatch_normalized_dat = []
     for g, t in instance.GEN_TPS:
         p = instance.tp_period[t]
@@ -453,46 +486,41 @@ def post_solve(instance, outdir):
             "timestamp": instance.tp_timestamp[t],
             "tp_weight_in_year_hrs": instance.tp_weight_in_year[t],
             "period": instance.tp_period[t],
-            "DispatchGen_MW": value(instance.DispatchGen[g, t]),
-            "Energy_GWh_typical_yr": value(
-                instance.DispatchGen[g, t] * instance.tp_weight_in_year[t] / 1000
+            "DispatchGen_MW": dispatch_gen[g, t],
+            "Energy_GWh_typical_yr": (
+                dispatch_gen[g, t] * instance.tp_weight_in_year[t] / 1000
             ),
-            "VariableCost_per_yr": value(
-                instance.DispatchGen[g, t]
+            "VariableCost_per_yr": (
+                dispatch_gen[g, t]
                 * instance.gen_variable_om[g]
                 * instance.tp_weight_in_year[t]
             ),
             "DispatchEmissions_tCO2_per_typical_yr": (
-                value(
-                    sum(
-                        instance.DispatchEmissions[g, t, f]
-                        * instance.tp_weight_in_year[t]
-                        for f in instance.FUELS_FOR_GEN[g]
-                    )
+                sum(
+                    dispatch_emissions[g, t, f] * instance.tp_weight_in_year[t]
+                    for f in instance.FUELS_FOR_GEN[g]
                 )
                 if instance.gen_uses_fuel[g]
                 else 0
             ),
-            "GenCapacity_MW": value(instance.GenCapacity[g, p]),
-            "GenCapitalCosts": value(instance.GenCapitalCosts[g, p]),
-            "GenFixedOMCosts": value(instance.GenFixedOMCosts[g, p]),
+            "GenCapacity_MW": gen_capacity[g, p],
+            "GenCapitalCosts": gen_capital_costs[g, p],
+            "GenFixedOMCosts": gen_fixed_om_costs[g, p],
         }
-        try:
-            try:
-                record["ChargeStorage_MW"] = -1.0 * value(instance.ChargeStorage[g, t])
-                record["Store_GWh_typical_yr"] = value(
-                    instance.ChargeStorage[g, t] * instance.tp_weight_in_year[t] / 1000
+        if hasattr(instance, "ChargeStorage"):
+            if (g, t) in charge_storage:
+                record["ChargeStorage_MW"] = -1.0 * charge_storage[g, t]
+                record["Store_GWh_typical_yr"] = (
+                    charge_storage[g, t] * instance.tp_weight_in_year[t] / 1000
                 )
                 record["Discharge_GWh_typical_yr"] = record["Energy_GWh_typical_yr"]
                 record["Energy_GWh_typical_yr"] -= record["Store_GWh_typical_yr"]
                 record["is_storage"] = True
-            except KeyError:
+            else:
                 record["ChargeStorage_MW"] = float("NaN")
                 record["Store_GWh_typical_yr"] = float("NaN")
                 record["Discharge_GWh_typical_yr"] = float("NaN")
                 record["is_storage"] = False
-        except AttributeError:
-            pass
         dispatch_normalized_dat.append(record)
     dispatch_full_df = pd.DataFrame(dispatch_normalized_dat)
     dispatch_full_df.set_index(["generation_project", "timestamp"], inplace=True)
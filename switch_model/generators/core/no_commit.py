@@ -8,6 +8,7 @@ module which constrains dispatch to unit commitment decisions.
 """
 
 from pyomo.environ import *
+from switch_model.expression_views import ExpressionView
 
 dependencies = (
     "switch_model.timescales",
@@ -109,7 +110,7 @@ def define_components(mod):
         else:
             return m.GenCapacityInTP[g, t] * m.gen_availability[g]
 
-    mod.DispatchUpperLimit = Expression(mod.GEN_TPS, rule=DispatchUpperLimit_expr)
+    mod.DispatchUpperLimit = ExpressionView(mod.GEN_TPS, rule=DispatchUpperLimit_expr)
 
     mod.Enforce_Dispatch_Baseload_Flat = Constraint(
         mod.BASELOAD_GEN_TPS,
@@ -145,6 +145,20 @@ def define_components(mod):
     meters. This variable is determined by the volume in the previous timepoint,
     the inflows and the outflows.
 
+    If chronology.csv is provided (see timescales), reservoirs can carry water
+    between the days represented by LINKED_TIMESERIES, the same way as
+    storage projects (see generators.extensions.storage). In these
+    timeseries, ReservoirVol is relative to the volume at the start of the
+    timeseries, which is tracked once per chronological day by
+    ReservoirVolStartOfDay[r, d]. ReservoirVolChangeInTS[r, ts] is the net
+    change in volume over each linked timeseries, and
+    ReservoirVolAboveMaxInTS[r, ts] and ReservoirVolAboveMinInTS[r, ts] are
+    the largest amount by which ReservoirVol exceeds res_max_vol_tp and the
+    smallest amount by which it exceeds res_min_vol_tp during the timeseries.
+    These are used to keep the actual volume within its limits on every
+    chronological day. res_initial_vol and res_final_vol cannot be used for
+    linked timeseries.
+
     WATER_CONNECTIONS is the set of flows that begin and end in different water
     bodies, such as reservoirs and nodes. The model decides how much water is
     "dispatched" through each connection at each timepoint. Water may only flow
@@ -320,10 +334,15 @@ def define_components(mod):
         or m.res_initial_vol != float("inf"),
     )
 
+    # volumes in linked timeseries are relative to the start of the timeseries
     mod.ReservoirVol = Var(
         mod.RESERVOIR_TPS,
-        within=NonNegativeReals,
-        bounds=lambda m, r, tp: (m.res_min_vol_tp[r, tp], m.res_max_vol_tp[r, tp]),
+        within=Reals,
+        bounds=lambda m, r, tp: (
+            (None, None)
+            if m.tp_ts[tp] in m.LINKED_TIMESERIES
+            else (m.res_min_vol_tp[r, tp], m.res_max_vol_tp[r, tp])
+        ),
     )
 
     # apply res_initial_vol if provided
@@ -339,6 +358,72 @@ def define_components(mod):
         ),
     )
 
+    # link reservoir volumes between the chronological days represented by
+    # LINKED_TIMESERIES, if any
+    mod.No_Fixed_Res_Vol_In_Linked_Timeseries = BuildCheck(
+        mod.RESERVOIRS,
+        mod.LINKED_TIMESERIES,
+        rule=lambda m, r, ts: m.res_initial_vol[r, ts] == float("inf")
+        and m.res_final_vol[r, ts] == float("inf"),
+    )
+    mod.RESERVOIR_LINKED_TS = Set(
+        dimen=2, initialize=lambda m: m.RESERVOIRS * m.LINKED_TIMESERIES
+    )
+    mod.RESERVOIR_CHRONO_DAYS = Set(
+        dimen=2, initialize=lambda m: m.RESERVOIRS * m.CHRONOLOGICAL_DAYS
+    )
+    mod.ReservoirVolStartOfDay = Var(mod.RESERVOIR_CHRONO_DAYS, within=NonNegativeReals)
+    mod.ReservoirVolChangeInTS = Var(mod.RESERVOIR_LINKED_TS, within=Reals)
+    mod.ReservoirVolAboveMaxInTS = Var(mod.RESERVOIR_LINKED_TS, within=Reals)
+    mod.ReservoirVolAboveMinInTS = Var(mod.RESERVOIR_LINKED_TS, within=Reals)
+
+    mod.Start_Linked_ReservoirVol_At_Zero = Constraint(
+        mod.RESERVOIR_LINKED_TS,
+        rule=lambda m, r, ts: m.ReservoirVol[r, m.TPS_IN_TS[ts].first()] == 0,
+    )
+    mod.Link_ReservoirVol_Between_Days = Constraint(
+        mod.RESERVOIR_CHRONO_DAYS,
+        rule=lambda m, r, d: (
+            m.ReservoirVolStartOfDay[r, m.chrono_day_next[d]]
+            == m.ReservoirVolStartOfDay[r, d]
+            + m.ReservoirVolChangeInTS[r, m.chrono_day_ts[d]]
+        ),
+    )
+    mod.ReservoirVol_Max_In_TS = Constraint(
+        mod.RESERVOIR_TPS,
+        rule=lambda m, r, t: (
+            m.ReservoirVolAboveMaxInTS[r, m.tp_ts[t]]
+            >= m.ReservoirVol[r, t] - m.res_max_vol_tp[r, t]
+            if m.tp_ts[t] in m.LINKED_TIMESERIES
+            else Constraint.Skip
+        ),
+    )
+    mod.ReservoirVol_Min_In_TS = Constraint(
+        mod.RESERVOIR_TPS,
+        rule=lambda m, r, t: (
+            m.ReservoirVolAboveMinInTS[r, m.tp_ts[t]]
+            <= m.ReservoirVol[r, t] - m.res_min_vol_tp[r, t]
+            if m.tp_ts[t] in m.LINKED_TIMESERIES
+            else Constraint.Skip
+        ),
+    )
+    mod.ReservoirVol_Day_Upper_Limit = Constraint(
+        mod.RESERVOIR_CHRONO_DAYS,
+        rule=lambda m, r, d: (
+            m.ReservoirVolStartOfDay[r, d]
+            + m.ReservoirVolAboveMaxInTS[r, m.chrono_day_ts[d]]
+            <= 0
+        ),
+    )
+    mod.ReservoirVol_Day_Lower_Limit = Constraint(
+        mod.RESERVOIR_CHRONO_DAYS,
+        rule=lambda m, r, d: (
+            m.ReservoirVolStartOfDay[r, d]
+            + m.ReservoirVolAboveMinInTS[r, m.chrono_day_ts[d]]
+            >= 0
+        ),
+    )
+
     ################
     # Edges of the water network
     mod.WATER_CONNECTIONS = Set(dimen=1)
@@ -462,7 +547,12 @@ def define_components(mod):
         # calculate reservoir_fill_rate rate during this timepoint in m3/s
         if wn in m.RESERVOIRS:
             ts = m.tp_ts[tp]
-            if tp == m.TPS_IN_TS[ts].last() and m.res_final_vol[wn, ts] != float("inf"):
+            if tp == m.TPS_IN_TS[ts].last() and ts in m.LINKED_TIMESERIES:
+                # carry the change in volume to the next chronological day
+                end_of_tp_volume = m.ReservoirVolChangeInTS[wn, ts]
+            elif tp == m.TPS_IN_TS[ts].last() and m.res_final_vol[wn, ts] != float(
+                "inf"
+            ):
                 # reach res_final_vol if specified
                 end_of_tp_volume = m.res_final_vol[wn, ts]
             else:
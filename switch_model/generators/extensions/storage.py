@@ -10,6 +10,7 @@ storage, when to charge, energy accounting, etc.
 from pyomo.environ import *
 import os, collections
 from switch_model.financials import capital_recovery_factor as crf
+from switch_model.utilities import unique_list
 
 dependencies = (
     "switch_model.timescales",
@@ -116,6 +117,26 @@ def define_components(mod):
     State_Of_Charge_Upper_Limit[(g, t) in STORAGE_GEN_TPS] constrains
     StateOfCharge based on installed energy capacity.
 
+    If chronology.csv is provided (see timescales), storage can carry energy
+    between the days represented by LINKED_TIMESERIES. In these timeseries,
+    StateOfCharge is measured relative to the level at the start of the
+    timeseries (so it can be negative) and does not wrap around from the last
+    timepoint to the first. The actual level is tracked once per
+    chronological day instead, following Kotzur et al. (2018), "Time series
+    aggregation for energy system design: Modeling seasonal storage",
+    https://doi.org/10.1016/j.apenergy.2018.01.023.
+
+    StateOfChargeStartOfDay[(g, d) in STORAGE_GEN_CHRONO_DAYS] is the state
+    of charge at the start of chronological day d. This changes from each day
+    to the next by the net charging over the day's representative timeseries
+    (Link_State_Of_Charge_Between_Days).
+
+    StateOfChargeMaxInTS[g, ts] and StateOfChargeMinInTS[g, ts] bound the
+    relative StateOfCharge during each linked timeseries, and
+    State_Of_Charge_Day_Upper_Limit and State_Of_Charge_Day_Lower_Limit keep
+    the actual level (start of day plus these amounts) between zero and the
+    installed energy capacity on every chronological day.
+
     """
 
     # includes generators that we manage depth of charge for and also ones that
@@ -281,12 +302,26 @@ def define_components(mod):
         <= m.DispatchUpperLimit[g, t] * m.gen_store_to_release_ratio[g],
     )
 
-    mod.StateOfCharge = Var(mod.STORAGE_GEN_TPS, within=NonNegativeReals)
+    # StateOfCharge is relative to the start of the timeseries (and may be
+    # negative) in linked timeseries
+    mod.StateOfCharge = Var(
+        mod.STORAGE_GEN_TPS,
+        within=Reals,
+        bounds=lambda m, g, t: (
+            (None, None) if m.tp_ts[t] in m.LINKED_TIMESERIES else (0, None)
+        ),
+    )
 
     def Track_State_Of_Charge_rule(m, g, t):
+        ts = m.tp_ts[t]
+        if ts in m.LINKED_TIMESERIES and t == m.TPS_IN_TS[ts].first():
+            # start from zero instead of wrapping around
+            previous = 0.0
+        else:
+            previous = m.StateOfCharge[g, m.tp_previous[t]]
         return (
             m.StateOfCharge[g, t]
-            == m.StateOfCharge[g, m.tp_previous[t]]
+            == previous
             + (
                 m.ChargeStorage[g, t] * m.gen_storage_efficiency[g]
                 - m.DispatchGen[g, t]
@@ -299,12 +334,81 @@ def define_components(mod):
     )
 
     def State_Of_Charge_Upper_Limit_rule(m, g, t):
+        if m.tp_ts[t] in m.LINKED_TIMESERIES:
+            # limited via State_Of_Charge_Day_Upper_Limit instead
+            return Constraint.Skip
         return m.StateOfCharge[g, t] <= m.StorageEnergyCapacity[g, m.tp_period[t]]
 
     mod.State_Of_Charge_Upper_Limit = Constraint(
         mod.STORAGE_GEN_TPS, rule=State_Of_Charge_Upper_Limit_rule
     )
 
+    # link storage levels between the chronological days represented by
+    # LINKED_TIMESERIES, if any
+    mod.STORAGE_GEN_LINKED_TS = Set(
+        dimen=2,
+        initialize=lambda m: unique_list(
+            (g, m.tp_ts[t])
+            for g, t in m.STORAGE_GEN_TPS
+            if m.tp_ts[t] in m.LINKED_TIMESERIES
+        ),
+    )
+    mod.STORAGE_GEN_CHRONO_DAYS = Set(
+        dimen=2,
+        initialize=lambda m: [
+            (g, d)
+            for d in m.CHRONOLOGICAL_DAYS
+            for g in m.STORAGE_GENS
+            if (g, m.chrono_day_ts[d]) in m.STORAGE_GEN_LINKED_TS
+        ],
+    )
+    mod.StateOfChargeStartOfDay = Var(
+        mod.STORAGE_GEN_CHRONO_DAYS, within=NonNegativeReals
+    )
+    mod.StateOfChargeMaxInTS = Var(mod.STORAGE_GEN_LINKED_TS, within=Reals)
+    mod.StateOfChargeMinInTS = Var(mod.STORAGE_GEN_LINKED_TS, within=Reals)
+
+    mod.Link_State_Of_Charge_Between_Days = Constraint(
+        mod.STORAGE_GEN_CHRONO_DAYS,
+        rule=lambda m, g, d: (
+            m.StateOfChargeStartOfDay[g, m.chrono_day_next[d]]
+            == m.StateOfChargeStartOfDay[g, d]
+            + m.StateOfCharge[g, m.TPS_IN_TS[m.chrono_day_ts[d]].last()]
+        ),
+    )
+    mod.State_Of_Charge_Max_In_TS = Constraint(
+        mod.STORAGE_GEN_TPS,
+        rule=lambda m, g, t: (
+            m.StateOfChargeMaxInTS[g, m.tp_ts[t]] >= m.StateOfCharge[g, t]
+            if m.tp_ts[t] in m.LINKED_TIMESERIES
+            else Constraint.Skip
+        ),
+    )
+    mod.State_Of_Charge_Min_In_TS = Constraint(
+        mod.STORAGE_GEN_TPS,
+        rule=lambda m, g, t: (
+            m.StateOfChargeMinInTS[g, m.tp_ts[t]] <= m.StateOfCharge[g, t]
+            if m.tp_ts[t] in m.LINKED_TIMESERIES
+            else Constraint.Skip
+        ),
+    )
+    mod.State_Of_Charge_Day_Upper_Limit = Constraint(
+        mod.STORAGE_GEN_CHRONO_DAYS,
+        rule=lambda m, g, d: (
+            m.StateOfChargeStartOfDay[g, d]
+            + m.StateOfChargeMaxInTS[g, m.chrono_day_ts[d]]
+            <= m.StorageEnergyCapacity[g, m.ts_period[m.chrono_day_ts[d]]]
+        ),
+    )
+    mod.State_Of_Charge_Day_Lower_Limit = Constraint(
+        mod.STORAGE_GEN_CHRONO_DAYS,
+        rule=lambda m, g, d: (
+            m.StateOfChargeStartOfDay[g, d]
+            + m.StateOfChargeMinInTS[g, m.chrono_day_ts[d]]
+            >= 0
+        ),
+    )
+
     # batteries can only complete the specified number of cycles per year, averaged over each period
     mod.Battery_Cycle_Limit = Constraint(
         mod.STORAGE_GEN_PERIODS,
@@ -425,7 +529,10 @@ def load_inputs(mod, switch_data, inputs_dir):
 
 def post_solve(instance, outdir):
     """
-    Export storage dispatch info to storage_dispatch.csv
+    Export storage dispatch info to storage_dispatch.csv. In linked
+    timeseries, StateOfCharge is relative to the start of the timeseries, and
+    the state of charge at the start of each chronological day is exported to
+    storage_chronological_state.csv.
 
     Note that construction information is reported by the generators.core.build
     module, so is not reported here.
@@ -453,3 +560,21 @@ def post_solve(instance, outdir):
             m.StateOfCharge[g, t] if g in m.STORAGE_GENS else ".",
         ),
     )
+    if len(instance.STORAGE_GEN_CHRONO_DAYS) > 0:
+        reporting.write_table(
+            instance,
+            instance.STORAGE_GEN_CHRONO_DAYS,
+            output_file=os.path.join(outdir, "storage_chronological_state.csv"),
+            headings=(
+                "generation_project",
+                "chronological_day",
+                "timeseries",
+                "StateOfChargeStartOfDay",
+            ),
+            values=lambda m, g, d: (
+                g,
+                d,
+                m.chrono_day_ts[d],
+                m.StateOfChargeStartOfDay[g, d],
+            ),
+        )
@@ -66,14 +66,12 @@ def summary_values(m):
     ]
     values = []
 
-    # Cache SystemCostPerPeriod and SystemCost to speed up saving large models
-    # The time needed to directly access the expressions seems to rise quadratically
-    # with the number of timepoints, so it gets very slow for big models and we don't
-    # want to repeat it if possible (e.g., without caching, this function takes up
-    # to an hour for an 8760 Oahu model)
-    SystemCostPerPeriod = dict()
-    for p in m.PERIODS:
-        SystemCostPerPeriod[p] = value(m.SystemCostPerPeriod[p])
+    # Use cached values for SystemCostPerPeriod and SystemCost to speed up
+    # saving large models. The time needed to directly access the expressions
+    # seems to rise quadratically with the number of timepoints, so it gets very
+    # slow for big models and we don't want to repeat it if possible (e.g.,
+    # without caching, this function takes up to an hour for an 8760 Oahu model)
+    SystemCostPerPeriod = m.solution_values(m.SystemCostPerPeriod)
     SystemCost = sum(SystemCostPerPeriod[p] for p in m.PERIODS)
 
     # scenario name and looping variables
@@ -91,12 +89,13 @@ def summary_values(m):
 
     # NPV of total cost / NPV of kWh generated (equivalent to spreading
     # all costs uniformly over all generation)
+    demand_values = [m.solution_values(c) for c in demand_components]
     values.append(
         SystemCost  # m.SystemCost
         / sum(
             m.bring_timepoint_costs_to_base_year[t]
             * 1000.0
-            * sum(getattr(m, c)[z, t] for c in demand_components for z in m.LOAD_ZONES)
+            * sum(vals[z, t] for vals in demand_values for z in m.LOAD_ZONES)
             for t in m.TIMEPOINTS
         )
     )
@@ -109,9 +108,7 @@ def summary_values(m):
             / sum(
                 m.bring_timepoint_costs_to_base_year[t]
                 * 1000.0
-                * sum(
-                    getattr(m, c)[z, t] for c in demand_components for z in m.LOAD_ZONES
-                )
+                * sum(vals[z, t] for vals in demand_values for z in m.LOAD_ZONES)
                 for t in m.TPS_IN_PERIOD[p]
             )
             for p in m.PERIODS
@@ -299,11 +296,17 @@ def write_results(m, outputs_dir):
             )
             for s in m.NON_FUEL_ENERGY_SOURCES
         )
-        + tuple(getattr(m, component)[z, t] for component in m.Zone_Power_Injections)
-        + tuple(getattr(m, component)[z, t] for component in m.Zone_Power_Withdrawals)
+        + tuple(
+            m.solution_values(component)[z, t]
+            for component in m.Zone_Power_Injections
+        )
+        + tuple(
+            m.solution_values(component)[z, t]
+            for component in m.Zone_Power_Withdrawals
+        )
         + (
             tuple(
-                getattr(m, component)[z, t]
+                m.solution_values(component)[z, t]
                 for component in m.Distributed_Power_Withdrawals
             )
             if hasattr(m, "Distributed_Power_Withdrawals")
@@ -458,11 +461,12 @@ def write_results(m, outputs_dir):
             active_periods_for_gen[g].add(m.tp_period[tp])
     # add the periods between the first and last active period if capacity was available then
     operate_gen_in_period = set()
+    gen_capacity = m.solution_values(m.GenCapacity)
     for g, active_periods in active_periods_for_gen.items():
         start = min(active_periods)
         end = max(active_periods)
         for p in m.PERIODS:
-            if start <= p <= end and value(m.GenCapacity[g, p]) > 0:
+            if start <= p <= end and gen_capacity[g, p] > 0:
                 operate_gen_in_period.add((g, p))
 
     storage_gens = getattr(m, "STORAGE_GENS", set())
@@ -535,7 +539,7 @@ def write_results(m, outputs_dir):
         )
         + tuple(
             sum(
-                (m.GenCapacity[g, pe] if ((g, pe) in operate_gen_in_period) else 0.0)
+                (gen_capacity[g, pe] if ((g, pe) in operate_gen_in_period) else 0.0)
                 for g in built_gens_for_tech_and_zone[t, z]
             )
             for t in built_tech
@@ -564,7 +568,7 @@ def write_results(m, outputs_dir):
         )
         + tuple(
             sum(
-                m.GenCapacity[g, pe]
+                gen_capacity[g, pe]
                 for g in built_gens
                 if gen_energy_source(g) == s and m.gen_load_zone[g] == z
             )
@@ -593,7 +597,7 @@ def write_results(m, outputs_dir):
         )
         + tuple(
             sum(
-                (m.GenCapacity[g, pe] if ((g, pe) in operate_gen_in_period) else 0.0)
+                (gen_capacity[g, pe] if ((g, pe) in operate_gen_in_period) else 0.0)
                 for g in built_gens
                 if gen_energy_source(g) == s and m.gen_load_zone[g] == z
             )
@@ -1,6 +1,8 @@
 from __future__ import print_function
 
-import time, sys, collections, os, itertools
+import time, collections, os, itertools
+import concurrent.futures, hashlib, json, math, sqlite3, threading
+from contextlib import contextmanager
 from textwrap import dedent
 from switch_model import __version__ as switch_version
 from switch_model.utilities import iteritems
@@ -98,6 +100,12 @@ def write_tables_implementation(args, alt_args={}, scenarios=[]):
     '--input-alias[es]' and the file substitutions corresponding to the
     specified data tags. A warning is issued if two tags cause conflicting file
     substitutions.
+
+    Queries are run concurrently over `query_workers` connections (default 4).
+    Tables are only re-created if their query has changed since they were
+    last written, unless `use_query_cache` is set to False (see
+    write_queries()). If `sqlite_database` is specified, data are read from that
+    SQLite file instead of the postgresql server (mainly for testing).
     """
     # Note: this works by comparing the final queries used to generate each
     # table, so it will reuse tables from the base model if they are identical
@@ -113,6 +121,8 @@ def write_tables_implementation(args, alt_args={}, scenarios=[]):
     # from write_base_tables and then passing it to write_alternative_tables,
     # but it works pretty well as is.
 
+    configure_database(args)
+
     # write version marker file
     with open(make_file_path("switch_inputs_version.txt", args), "w") as f:
         f.write(switch_version)
@@ -153,8 +163,9 @@ def write_tables_implementation(args, alt_args={}, scenarios=[]):
 
 def write_base_tables(args):
     queries = get_queries(args)
-    for table, query in queries:
-        write_table(make_file_path(table, args), query)
+    write_queries(
+        [(make_file_path(table, args), query) for table, query in queries], args
+    )
 
 
 def write_alternative_tables(base_args, alt_args):
@@ -169,6 +180,7 @@ def write_alternative_tables(base_args, alt_args):
     )
     # find differences and run alt queries
     aliases = []
+    tables = []
     for table, query in alt_queries.items():
         if table not in base_queries or query != base_queries[table]:
             # new or altered table
@@ -179,12 +191,13 @@ def write_alternative_tables(base_args, alt_args):
                 new_table = table_base + "." + full_alt_args["tag"] + table_ext
             else:
                 new_table = os.path.join(alt_relative_path, table)
-            write_table(make_file_path(new_table, base_args), query)
+            tables.append((make_file_path(new_table, base_args), query))
             # note: if regular files are in inputs and alternative files are in
             # inputs_alt, then this will set file.csv=../inputs_alt/file.csv,
             # and then --input-alias will just do a simple translation of
             # file.csv, resulting in inputs/../inputs_alt/file.csv
             aliases.append((table, new_table))
+    write_queries(tables, full_alt_args)
     # exclude tables that are omitted in the alternative case
     aliases.extend((t, "none") for t, q in base_queries.items() if t not in alt_queries)
     return aliases
@@ -1325,17 +1338,38 @@ def make_file_path(file, args):
     return path
 
 
+# Connections are drawn from a small pool, so several queries can run at the
+# same time (psycopg2 releases the GIL while waiting for the server). Each
+# connection is read-only, because that's enough for this script and it's
+# possible something weird could come through in the configuration info that
+# gets passed to postgresql.
+# If the SWITCH_SQLITE_DATABASE environment variable or the sqlite_database
+# argument is set, queries are run against that SQLite file instead. This is
+# meant as a local stand-in for testing, so only queries that are valid in both
+# dialects will work.
+sqlite_database = os.getenv("SWITCH_SQLITE_DATABASE", "")
+max_connections = 4
+pool = None
 con = None
+local = threading.local()
 
 
-def db_cursor():
-    global con
-    if con is None:
+def configure_database(args):
+    """Choose the database and number of connections based on `args`."""
+    global sqlite_database, max_connections
+    if args.get("sqlite_database"):
+        sqlite_database = args["sqlite_database"]
+    max_connections = args.get("query_workers", max_connections)
+
+
+def db_pool():
+    global pool
+    if pool is None:
         try:
             # note: we don't import until here to avoid interfering with unit tests on systems that don't have
             # (or need) psycopg2
             global psycopg2, sql
-            import psycopg2, psycopg2.sql as sql
+            import psycopg2, psycopg2.pool, psycopg2.sql as sql
         except ImportError:
             print(
                 dedent(
@@ -1349,11 +1383,11 @@ def db_cursor():
             )
             raise
         try:
-            # note: the connection gets created when the module loads and never gets closed (until presumably python exits)
-            con = psycopg2.connect(database=pgdatabase, host=pghost, user=pguser)
-            # use read-only session, because that's enough for this script and it's possible something
-            # weird could come through in the configuration info that gets passed to postgresql
-            con.set_session(readonly=True, autocommit=True)
+            # note: the connections get created when first needed and never get closed (until presumably python exits)
+            # (one extra connection is held by db_cursor() for preparing queries)
+            pool = psycopg2.pool.ThreadedConnectionPool(
+                1, max_connections + 1, database=pgdatabase, host=pghost, user=pguser
+            )
             print(
                 "Reading data from database {} on server {}".format(pgdatabase, pghost)
             )
@@ -1378,19 +1412,109 @@ def db_cursor():
                 )
             )
             raise
+    return pool
+
+
+@contextmanager
+def db_connection():
+    """Borrow a database connection for the current thread."""
+    if sqlite_database:
+        yield sqlite_connection()
+    else:
+        p = db_pool()
+        c = p.getconn()
+        if c.autocommit is False:
+            c.set_session(readonly=True, autocommit=True)
+        try:
+            yield c
+        finally:
+            p.putconn(c)
+
+
+def sqlite_connection():
+    """Return a read-only connection to sqlite_database for the current thread."""
+    # sqlite connections are cheap, so we just keep one per thread (and
+    # database, in case sqlite_database is changed by configure_database())
+    if getattr(local, "sqlite_path", None) != sqlite_database:
+        local.sqlite_con = sqlite3.connect(
+            "file:{}?mode=ro".format(sqlite_database), uri=True
+        )
+        # not all builds of sqlite include the math functions
+        local.sqlite_con.create_function("power", 2, math.pow)
+        local.sqlite_path = sqlite_database
+    return local.sqlite_con
+
+
+def db_cursor():
+    # cursor on a persistent connection, used for preparing queries
+    global con
+    if sqlite_database:
+        return sqlite_connection().cursor()
+    if con is None:
+        con = db_pool().getconn()
+        con.set_session(readonly=True, autocommit=True)
     return con.cursor()
 
 
+def db_identity():
+    """Return a string identifying the current database, for query fingerprints."""
+    if sqlite_database:
+        # include the modification time, so cached tables are refreshed if
+        # the test database changes
+        path = os.path.abspath(sqlite_database)
+        return "sqlite:{}:{}".format(path, os.path.getmtime(path))
+    else:
+        return "postgresql://{}@{}/{}".format(pguser, pghost, pgdatabase)
+
+
 def prepare_query(query, arguments):
+    if sqlite_database:
+        return sqlite_mogrify(query, arguments)
     return db_cursor().mogrify(query, arguments)
 
 
+def sqlite_literal(val):
+    # convert a Python value to an SQLite literal, following the same
+    # conventions as psycopg2 (e.g., tuples become lists for use with IN)
+    if val is None:
+        return "NULL"
+    elif isinstance(val, bool):
+        return "1" if val else "0"
+    elif isinstance(val, (int, float)):
+        return repr(val)
+    elif isinstance(val, (tuple, list)):
+        return "(" + ", ".join(sqlite_literal(v) for v in val) + ")"
+    else:
+        return "'" + str(val).replace("'", "''") + "'"
+
+
+def sqlite_mogrify(query, arguments):
+    return (query % {k: sqlite_literal(v) for k, v in arguments.items()}).encode()
+
+
 def add_query(queries, file, query, arguments):
     queries.append((file, prepare_query(query, arguments)))
 
 
 def add_literal_table(queries, table, headers, data, arguments={}):
     # Create an SQL query that returns the  values defined by the headers and data
+    if sqlite_database:
+        # sqlite doesn't accept column names for subqueries, so we use a
+        # common table expression instead
+        if data:
+            values = ", ".join(sqlite_literal(tuple(row)) for row in data)
+            where = ""
+        else:
+            values = sqlite_literal(tuple("" for h in headers))
+            where = " WHERE 0"
+        query = "WITH t ({}) AS (VALUES {}) SELECT * FROM t{}".format(
+            ", ".join('"{}"'.format(h) for h in headers), values, where
+        )
+        # escape % signs, since this will be passed through prepare_query
+        add_query(queries, table, query.replace("%", "%%"), arguments)
+        return
+
+    db_pool()  # make sure psycopg2.sql is imported
     if data:
         query = sql.SQL("SELECT * FROM (VALUES {}) AS t ({})").format(
             sql.SQL(", ").join(sql.Literal(tuple(row)) for row in data),
@@ -1411,27 +1535,119 @@ def add_one_row_literal(queries, table, arg_names, args):
     )
 
 
-def write_table(output_file, query):
-    print("Writing {file} ...".format(file=output_file), end=" ")
-    sys.stdout.flush()  # display the part line to the user
+def write_queries(tables, args):
+    """
+    Run the queries in `tables` (a list of (output file, query) tuples) and
+    save the results in the output files.
+
+    Queries are run concurrently, using up to `query_workers` connections
+    (default 4). If `use_query_cache` is True (the default), a query is skipped
+    if its output file already exists and was created by the same query on the
+    same database, as recorded in query_cache.json in the same directory. Note
+    that this does not detect changes in the data stored in the database, so
+    `use_query_cache` should be set to False if the source tables have been
+    updated.
+    """
+    use_cache = args.get("use_query_cache", True)
+    identity = db_identity()
+    fingerprints = {
+        output_file: hashlib.sha256(identity.encode() + b"\0" + query).hexdigest()
+        for output_file, query in tables
+    }
+
+    # load the cache index for each directory that will receive files
+    caches = {}
+    for output_file, query in tables:
+        cache_dir = os.path.dirname(os.path.abspath(output_file))
+        if cache_dir not in caches:
+            caches[cache_dir] = read_query_cache(cache_dir) if use_cache else {}
+
+    def cache_entry(output_file):
+        path = os.path.abspath(output_file)
+        return caches[os.path.dirname(path)], os.path.basename(path)
+
+    jobs = []
+    for output_file, query in tables:
+        cache, key = cache_entry(output_file)
+        if cache.get(key) == fingerprints[output_file] and os.path.exists(output_file):
+            print("Skipping {file} (unchanged)".format(file=output_file))
+        else:
+            jobs.append((output_file, query))
 
-    start = time.time()
-    cur = db_cursor()
+    with concurrent.futures.ThreadPoolExecutor(max_connections) as executor:
+        futures = {
+            executor.submit(write_table, output_file, query): output_file
+            for output_file, query in jobs
+        }
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                future.result()  # raise any errors
+                cache, key = cache_entry(futures[future])
+                cache[key] = fingerprints[futures[future]]
+        finally:
+            # record whatever was completed, even if some queries failed
+            for cache_dir, cache in caches.items():
+                write_query_cache(cache_dir, cache)
+
+
+def read_query_cache(cache_dir):
     try:
-        cur.execute(query)
-    except:
-        print("\nError running the following query:\n{}\n".format(query.decode()))
-        raise
-    with open(output_file, "w") as f:
-        writerow(f, [d[0] for d in cur.description])  # header
-        writerows(f, cur)  # data
-    print("time taken: {dur:.2f}s".format(dur=time.time() - start))
+        with open(os.path.join(cache_dir, "query_cache.json")) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+
+def write_query_cache(cache_dir, cache):
+    with open(os.path.join(cache_dir, "query_cache.json"), "w") as f:
+        json.dump(cache, f, indent=0, sort_keys=True)
+
+
+def write_table(output_file, query, batch_size=10000):
+    start = time.time()
+    with db_connection() as c:
+        if sqlite_database:
+            cur = c.cursor()
+        else:
+            # named (server-side) cursor, so rows are streamed from the server
+            # in batches instead of being loaded into memory all at once;
+            # withhold is needed to use these with autocommit connections
+            cur = c.cursor(
+                name="switch_{}".format(threading.get_ident()), withhold=True
+            )
+        try:
+            try:
+                cur.execute(query.decode() if sqlite_database else query)
+                rows = cur.fetchmany(batch_size)
+            except:
+                print(
+                    "\nError running the following query:\n{}\n".format(
+                        query.decode()
+                    )
+                )
+                raise
+            with open(output_file, "w") as f:
+                writerow(f, [d[0] for d in cur.description])  # header
+                while rows:
+                    writerows(f, rows)  # data
+                    rows = cur.fetchmany(batch_size)
+        finally:
+            cur.close()
+    print(
+        "Wrote {file}, time taken: {dur:.2f}s".format(
+            file=output_file, dur=time.time() - start
+        )
+    )
 
 
 def stringify(val):
-    if val is None:
+    # numbers are by far the most common values, so we check for them first
+    t = type(val)
+    if t is float or t is int:
+        out = str(val)
+    elif val is None:
         out = "."
-    elif type(val) is str:
+    elif t is str:
         out = val.replace('"', '""')
         if any(char in out for char in [" ", "\t", '"', "'", ","]):
             out = '"' + out + '"'
@@ -1441,9 +1657,9 @@ def stringify(val):
 
 
 def writerow(f, row):
-    f.write(",".join(stringify(c) for c in row) + "\n")
+    f.write(",".join(map(stringify, row)) + "\n")
 
 
 def writerows(f, rows):
-    for r in rows:
-        writerow(f, r)
+    # write a whole batch at once
+    f.write("".join(",".join(map(stringify, r)) + "\n" for r in rows))
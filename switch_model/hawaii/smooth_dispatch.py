@@ -6,31 +6,78 @@ Simple use: add this to modules.txt, below most modules but before reporting.
 
 Advanced use: add this to modules.txt and also to iterate.txt (should
 automatically improve all reporting)
+
+Smoothing is done after the main solve, by fixing all the variables that
+appear in the cost objective, along with all investment decisions (variables
+that are not indexed by timepoint) and integer variables (e.g., commitment
+decisions). The remaining smoothing problem only couples timepoints within each
+timeseries, so it is split into one small problem per timeseries, and these are
+solved in parallel in --smooth-dispatch-workers processes and written back to
+the model. Constraints that link several timeseries (e.g., annual limits) are
+kept feasible by not letting any timeseries' share of the constraint move in
+the binding direction. The duals from the main solve are not affected. If the
+model can't be decomposed this way (e.g., it has nonlinear constraints), the
+whole model is re-solved with the smoothing objective instead.
 """
 
 from __future__ import print_function
 from __future__ import division
 
+import concurrent.futures
+import os
+
 from pyomo.environ import *
 from pyomo.core.base.numvalue import native_numeric_types
+from pyomo.core.expr.visitor import identify_variables
+from pyomo.opt import TerminationCondition
+from pyomo.repn import generate_standard_repn
 import switch_model.solve
-from switch_model.utilities import iteritems
+from switch_model.utilities import StepTimer, iteritems
+
+
+def define_arguments(argparser):
+    argparser.add_argument(
+        "--smooth-dispatch",
+        action="store_true",
+        default=None,
+        help="""
+            Smooth dispatch after the main solve with any solver. The
+            smoothing problem in hawaii.smooth_dispatch is linear, so any LP
+            solver can be used; by default, dispatch is only smoothed when
+            using cplex or gurobi. (hawaii.smooth_dispatch_quadratic always
+            requires cplex or gurobi.)
+        """,
+    )
+    argparser.add_argument(
+        "--smooth-dispatch-workers",
+        type=int,
+        default=None,
+        help="""
+            Number of processes to use to solve the smoothing problems for
+            individual timeseries (default is one per timeseries, up to the
+            number of CPUs; 1 solves them in the main process).
+        """,
+    )
+
 
 # This uses define_dynamic_components instead of define_components, to ensure
 # that whatever components it needs to access will already be constructed. This
 # should be placed high in the module list so that the post-solve smoothing code
 # will run before the post-solve reporting code in other modules.
 def define_dynamic_components(m):
-    if m.options.solver in ("cplex", "cplexamp", "gurobi", "gurobi_ampl"):
-        m.options.smooth_dispatch = True
-    else:
-        # glpk and cbc can't handle quadratic problem used for smoothing
-        m.options.smooth_dispatch = False
-        if m.options.verbose:
+    if m.options.smooth_dispatch is None:
+        # not specified on the command line; smooth with the solvers that
+        # have traditionally been used with this module
+        m.options.smooth_dispatch = m.options.solver in (
+            "cplex",
+            "cplexamp",
+            "gurobi",
+            "gurobi_ampl",
+        )
+        if not m.options.smooth_dispatch and m.options.verbose:
             print(
-                "Not smoothing dispatch because {} cannot solve a quadratic model.".format(
-                    m.options.solver
-                )
+                "Not smoothing dispatch with {}; use --smooth-dispatch to "
+                "smooth anyway.".format(m.options.solver)
             )
             print(
                 "Remove hawaii.smooth_dispatch from modules.txt and iterate.txt to avoid this message."
@@ -64,7 +111,9 @@ def define_dynamic_components(m):
             """
             tp = key[-1]
             prev_tp = m.TPS_IN_TS[m.tp_ts[tp]].prevw(tp)
-            entry_key = str((component.name,) + key)
+            # keep the timepoint separate, so the entry can be assigned to its
+            # timeseries when smoothing by timeseries
+            entry_key = (str((component.name,) + key[:-1]), tp)
             entry_val = component[key] - component[key[:-1] + (prev_tp,)]
             d[entry_key] = weight * entry_val
 
@@ -95,13 +144,13 @@ def define_dynamic_components(m):
 
         # Force IncreaseSmoothedValue to equal any step-up in a smoothed value
         m.ISV_INDEX = Set(
-            dimen=1, initialize=lambda m: list(m.component_smoothing_dict.keys())
+            dimen=2, initialize=lambda m: list(m.component_smoothing_dict.keys())
         )
         m.IncreaseSmoothedValue = Var(m.ISV_INDEX, within=NonNegativeReals)
         m.Calculate_IncreaseSmoothedValue = Constraint(
             m.ISV_INDEX,
-            rule=lambda m, k: m.IncreaseSmoothedValue[k]
-            >= m.component_smoothing_dict[k],
+            rule=lambda m, k, tp: m.IncreaseSmoothedValue[k, tp]
+            >= m.component_smoothing_dict[k, tp],
         )
 
         def Smooth_Free_Variables_obj_rule(m):
@@ -158,18 +207,9 @@ def define_dynamic_components(m):
 
 
 def pre_iterate(m):
-    if m.options.smooth_dispatch:
-        if m.iteration_number == 0:
-            # indicate that this was run in iterated mode, so no need for post-solve
-            m.iterated_smooth_dispatch = True
-        elif m.iteration_number == 1:
-            pre_smooth_solve(m)
-        else:
-            raise RuntimeError(
-                "Reached unexpected iteration number {} in module {}.".format(
-                    m.iteration_number, __name__
-                )
-            )
+    if m.options.smooth_dispatch and m.iteration_number == 0:
+        # indicate that this was run in iterated mode, so no need for post-solve
+        m.iterated_smooth_dispatch = True
 
     return None  # no comment on convergence
 
@@ -196,30 +236,34 @@ def post_iterate(m):
                 )
 
     if m.options.smooth_dispatch:
-        # setup model for next iteration
-        if m.iteration_number == 0:
-            done = False  # we'll have to run again to do the smoothing
-        elif m.iteration_number == 1:
-            # finished smoothing the model
-            post_smooth_solve(m)
-            # now we're done
-            done = True
-        else:
-            raise RuntimeError(
-                "Reached unexpected iteration number {} in module {}.".format(
-                    m.iteration_number, __name__
-                )
-            )
-    else:
-        # not smoothing the dispatch
-        done = True
+        # smooth the current solution; if other modules need another
+        # iteration, this will be repeated after the next solve
+        smooth_dispatch(m)
+
+    return True  # no need for further iteration
+
+
+def save_iteration_state(m):
+    return getattr(m, "iterated_smooth_dispatch", False)
+
 
-    return done
+def load_iteration_state(m, iterated_smooth_dispatch):
+    m.iterated_smooth_dispatch = iterated_smooth_dispatch
 
 
 def post_solve(m, outputs_dir):
     """Smooth dispatch if it wasn't already done during an iterative solution."""
     if m.options.smooth_dispatch and not getattr(m, "iterated_smooth_dispatch", False):
+        smooth_dispatch(m)
+
+
+def smooth_dispatch(m):
+    """
+    Smooth the dispatch in the current solution, by timeseries if possible,
+    otherwise by re-solving the whole model.
+    """
+    if not smooth_by_timeseries(m, m.Smooth_Free_Variables):
+        m.logger.info("Re-solving the whole model to smooth dispatch.")
         pre_smooth_solve(m)
         # re-solve and load results
         m.preprocess()
@@ -227,6 +271,229 @@ def post_solve(m, outputs_dir):
         post_smooth_solve(m)
 
 
+def smooth_by_timeseries(m, smoothing_objective):
+    """
+    Fix all variables in the cost objective, all variables that are not
+    indexed by timepoint and all integer variables at their current values,
+    then minimize smoothing_objective separately for each timeseries and load
+    the results into the model. Returns False without changing the model if
+    the problem cannot be split this way.
+    """
+    timer = StepTimer()
+    ts_of_var = dict()  # id(var) -> timeseries, for free variables
+    free_vars = {ts: [] for ts in m.TIMESERIES}
+    fixed_vars = []
+    cost_vars = set(
+        id(v)
+        for v in identify_variables(m.Minimize_System_Cost.expr, include_fixed=False)
+    )
+    for var in m.component_objects(Var, active=True, descend_into=True):
+        tp_pos = timepoint_position(m, var)
+        if tp_pos is None:
+            m.logger.debug(
+                f"Fixing {var.name} for smoothing, because it is not indexed "
+                "by timepoint."
+            )
+        for idx, v in var.items():
+            if v.fixed:
+                continue
+            if id(v) in cost_vars or not v.is_continuous() or tp_pos is None:
+                if v.value is not None:
+                    v.fix()
+                    fixed_vars.append(v)
+            else:
+                tp = idx[tp_pos] if isinstance(idx, tuple) else idx
+                ts = m.tp_ts[tp]
+                ts_of_var[id(v)] = ts
+                free_vars[ts].append(v)
+
+    try:
+        subproblems = build_smoothing_subproblems(
+            m, smoothing_objective, ts_of_var, free_vars
+        )
+    finally:
+        for v in fixed_vars:
+            v.unfix()
+    if subproblems is None:
+        return False
+
+    n_workers = m.options.smooth_dispatch_workers
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, len(subproblems)))
+    solver_args = (
+        m.options.solver,
+        m.options.solver_io,
+        switch_model.solve.options_string_to_dict(m.options.solver_options_string),
+    )
+    tasks = [(p, solver_args) for ts, p in subproblems]
+    m.logger.info(
+        f"Smoothing dispatch for {len(tasks)} timeseries in {n_workers} "
+        "process(es)..."
+    )
+    if n_workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+            results = list(executor.map(solve_smoothing_subproblem, tasks))
+    else:
+        results = [solve_smoothing_subproblem(t) for t in tasks]
+
+    for (ts, p), values in zip(subproblems, results):
+        if values is None:
+            # show a warning, but don't abort the overall post_solve process
+            m.logger.warning(
+                f"Smoothing problem for timeseries {ts} could not be "
+                "solved; keeping original dispatch for this timeseries."
+            )
+            continue
+        for v, val in zip(free_vars[ts], values):
+            v.set_value(val, skip_validation=True)
+    m.logger.info(f"Smoothed dispatch in {timer.step_time():.2f} s.")
+    return True
+
+
+def timepoint_position(m, var):
+    """
+    Return the position of the timepoint in the indexes of Var component
+    `var`, or None if it is not indexed by timepoint. If the index set is a
+    product of sets (e.g., LOAD_ZONES * TIMEPOINTS), this is the position of
+    TIMEPOINTS; otherwise (e.g., GEN_TPS or GEN_TP_FUELS), it is the only
+    position that holds a timepoint in every index. Components where this is
+    ambiguous are treated as not indexed by timepoint.
+    """
+    if not var.is_indexed():
+        return None
+    index_set = var.index_set()
+    if index_set is m.TIMEPOINTS:
+        return 0
+    factors = list(index_set.subsets())
+    if len(factors) > 1:
+        pos = 0
+        for s in factors:
+            if s is m.TIMEPOINTS:
+                return pos
+            if not isinstance(s.dimen, int):
+                return None
+            pos += s.dimen
+        return None
+    keys = [k if isinstance(k, tuple) else (k,) for k in index_set]
+    if not keys:
+        return None
+    dimen = len(keys[0])
+    positions = [
+        i
+        for i in range(dimen)
+        if all(len(k) == dimen and k[i] in m.TIMEPOINTS for k in keys)
+    ]
+    return positions[0] if len(positions) == 1 else None
+
+
+def build_smoothing_subproblems(m, smoothing_objective, ts_of_var, free_vars):
+    """
+    Split the constraints and smoothing objective among timeseries, based on
+    the free variables in each one. Returns a list of (timeseries,
+    subproblem) tuples, where each subproblem is a picklable tuple for
+    solve_smoothing_subproblem(), or None if the model can't be split.
+    """
+    pos = {id(v): i for ts, vars in free_vars.items() for i, v in enumerate(vars)}
+    constraints = {ts: [] for ts in m.TIMESERIES}
+
+    for c in m.component_data_objects(Constraint, active=True, descend_into=True):
+        repn = generate_standard_repn(c.body, compute_values=True, quadratic=False)
+        if not repn.is_linear():
+            return None
+        terms = dict()  # timeseries -> ([positions], [coefficients])
+        for v, coef in zip(repn.linear_vars, repn.linear_coefs):
+            try:
+                ts = ts_of_var[id(v)]
+            except KeyError:  # variable that could not be fixed
+                return None
+            idx, coefs = terms.setdefault(ts, ([], []))
+            idx.append(pos[id(v)])
+            coefs.append(coef)
+        if not terms:
+            continue  # all variables fixed
+        lb = None if c.lb is None else c.lb - repn.constant
+        ub = None if c.ub is None else c.ub - repn.constant
+        if len(terms) == 1:
+            ((ts, (idx, coefs)),) = terms.items()
+            constraints[ts].append((lb, idx, coefs, ub))
+        else:
+            # don't let any timeseries move in the binding direction(s)
+            for ts, (idx, coefs) in terms.items():
+                vars = free_vars[ts]
+                current = sum(coef * vars[i].value for i, coef in zip(idx, coefs))
+                constraints[ts].append(
+                    (
+                        None if lb is None else current,
+                        idx,
+                        coefs,
+                        None if ub is None else current,
+                    )
+                )
+
+    linear = {ts: ([], []) for ts in m.TIMESERIES}
+    quadratic = {ts: [] for ts in m.TIMESERIES}
+    repn = generate_standard_repn(
+        smoothing_objective.expr, compute_values=True, quadratic=True
+    )
+    if repn.nonlinear_expr is not None:
+        return None
+    for v, coef in zip(repn.linear_vars, repn.linear_coefs):
+        ts = ts_of_var.get(id(v))
+        if ts is None:
+            return None
+        linear[ts][0].append(pos[id(v)])
+        linear[ts][1].append(coef)
+    for (v1, v2), coef in zip(repn.quadratic_vars, repn.quadratic_coefs):
+        ts = ts_of_var.get(id(v1))
+        if ts is None or ts_of_var.get(id(v2)) != ts:
+            return None
+        quadratic[ts].append((pos[id(v1)], pos[id(v2)], coef))
+
+    return [
+        (
+            ts,
+            (
+                [v.bounds for v in free_vars[ts]],
+                constraints[ts],
+                linear[ts],
+                quadratic[ts],
+            ),
+        )
+        for ts in m.TIMESERIES
+        if free_vars[ts]
+    ]
+
+
+def solve_smoothing_subproblem(task):
+    """
+    Solve one smoothing subproblem created by build_smoothing_subproblems()
+    (possibly in a worker process). Returns a list of values for the free
+    variables, or None if no optimal solution was found.
+    """
+    (bounds, constraints, linear, quadratic), (solver, solver_io, options) = task
+    sub = ConcreteModel()
+    sub.VARS = RangeSet(0, len(bounds) - 1)
+    sub.x = Var(sub.VARS, bounds=lambda s, i: bounds[i])
+    sub.Constraints = ConstraintList()
+    for lb, idx, coefs, ub in constraints:
+        body = sum(coef * sub.x[i] for i, coef in zip(idx, coefs))
+        sub.Constraints.add((lb, body, ub))
+    obj = sum(coef * sub.x[i] for i, coef in zip(*linear))
+    obj += sum(coef * sub.x[i] * sub.x[j] for i, j, coef in quadratic)
+    sub.Objective = Objective(expr=obj, sense=minimize)
+
+    solver_args = {} if solver_io is None else {"solver_io": solver_io}
+    try:
+        results = SolverFactory(solver, **solver_args).solve(sub, options=options)
+    except (RuntimeError, ValueError):
+        # appsi solvers raise errors if the model is infeasible
+        return None
+    if results.solver.termination_condition != TerminationCondition.optimal:
+        return None
+    return [sub.x[i].value for i in sub.VARS]
+
+
 def pre_smooth_solve(m):
     """store model state and prepare for smoothing"""
     save_duals(m)
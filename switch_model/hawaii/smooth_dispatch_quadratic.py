@@ -1,9 +1,15 @@
 """Minimize excess renewable production (dissipated in transmission losses) and
-smooth out demand response and EV charging as much as possible."""
+smooth out demand response and EV charging as much as possible.
+
+As in hawaii.smooth_dispatch, the quadratic smoothing problem is solved
+separately for each timeseries, in parallel, after fixing the cost and
+investment decisions.
+"""
 from __future__ import print_function
 
 from pyomo.environ import *
 import switch_model.solve
+from switch_model.hawaii.smooth_dispatch import define_arguments, smooth_by_timeseries
 
 
 def define_components(m):
@@ -109,18 +115,9 @@ def define_components(m):
 
 
 def pre_iterate(m):
-    if m.options.smooth_dispatch:
-        if m.iteration_number == 0:
-            # indicate that this was run in iterated mode, so no need for post-solve
-            m.iterated_smooth_dispatch = True
-        elif m.iteration_number == 1:
-            pre_smooth_solve(m)
-        else:
-            raise RuntimeError(
-                "Reached unexpected iteration number {} in module {}.".format(
-                    m.iteration_number, __name__
-                )
-            )
+    if m.options.smooth_dispatch and m.iteration_number == 0:
+        # indicate that this was run in iterated mode, so no need for post-solve
+        m.iterated_smooth_dispatch = True
 
     return None  # no comment on convergence
 
@@ -147,30 +144,34 @@ def post_iterate(m):
                 )
 
     if m.options.smooth_dispatch:
-        # setup model for next iteration
-        if m.iteration_number == 0:
-            done = False  # we'll have to run again to do the smoothing
-        elif m.iteration_number == 1:
-            # finished smoothing the model
-            post_smooth_solve(m)
-            # now we're done
-            done = True
-        else:
-            raise RuntimeError(
-                "Reached unexpected iteration number {} in module {}.".format(
-                    m.iteration_number, __name__
-                )
-            )
-    else:
-        # not smoothing the dispatch
-        done = True
+        # smooth the current solution; if other modules need another
+        # iteration, this will be repeated after the next solve
+        smooth_dispatch(m)
 
-    return done
+    return True  # no need for further iteration
+
+
+def save_iteration_state(m):
+    return getattr(m, "iterated_smooth_dispatch", False)
+
+
+def load_iteration_state(m, iterated_smooth_dispatch):
+    m.iterated_smooth_dispatch = iterated_smooth_dispatch
 
 
 def post_solve(m, outputs_dir):
     """Smooth dispatch if it wasn't already done during an iterative solution."""
     if m.options.smooth_dispatch and not getattr(m, "iterated_smooth_dispatch", False):
+        smooth_dispatch(m)
+
+
+def smooth_dispatch(m):
+    """
+    Smooth the dispatch in the current solution, by timeseries if possible,
+    otherwise by re-solving the whole model.
+    """
+    if not smooth_by_timeseries(m, m.Smooth_Free_Variables):
+        print("Re-solving the whole model to smooth dispatch.")
         pre_smooth_solve(m)
         # re-solve and load results
         m.preprocess()
@@ -0,0 +1,455 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+"""
+Vectorized checks of input data, run before the model instance is constructed.
+
+Pyomo validates input data one element at a time while it constructs each
+component: every Param value is tested against the Param's domain and
+validate rule, and every member of a Set against its `within` set. With large
+inputs (e.g., millions of capacity factors) this takes a lot of time, and
+construction stops at the first bad value, so users find problems one run at
+a time.
+
+SwitchAbstractModel.load_inputs() calls check_data() after all the modules
+have read their inputs and before the instance is constructed. This tests the
+raw data in the DataPortal, a whole column at a time, for:
+
+- the domains of Params read from input files, if they are standard numeric
+  sets like NonNegativeReals, NonNegativeIntegers or PercentFraction,
+- ranges declared by modules with mod.check_range(), e.g.,
+  `mod.check_range(mod.gen_max_capacity_factor, gt=-1, lt=2)` instead of
+  `validate=lambda m, val, g, t: -1 < val < 2`,
+- index elements declared with mod.check_index(), e.g.,
+  `mod.check_index(mod.VARIABLE_GEN_TPS_RAW, mod.VARIABLE_GENS, mod.TIMEPOINTS)`
+  instead of `within=mod.VARIABLE_GENS * mod.TIMEPOINTS`,
+- components listed in mod.min_data_check() that should have data in the
+  input files.
+
+All the problems found are reported together in one InputError, with the
+file, column and line for each bad value. Params that passed their domain
+check are constructed without repeating it, and any of their values that are
+calculated by rules are checked afterwards. Declared checks of components
+that are calculated by rules instead of read from files are run on the
+constructed instance by check_instance(); min_data_check() also still adds
+a BuildCheck for cases that can only be checked after construction.
+"""
+
+import csv
+import types
+
+import numpy as np
+from pyomo.environ import (
+    Any,
+    Binary,
+    Boolean,
+    Integers,
+    NegativeIntegers,
+    NegativeReals,
+    NonNegativeIntegers,
+    NonNegativeReals,
+    NonPositiveIntegers,
+    NonPositiveReals,
+    Param,
+    PercentFraction,
+    PositiveIntegers,
+    PositiveReals,
+    Reals,
+    Set,
+    UnitInterval,
+)
+
+from switch_model.basic_utilities import InputError
+
+# standard domains that can be checked as ranges:
+# (domain, range arguments, integer values only)
+numeric_domains = [
+    (Reals, {}, False),
+    (PositiveReals, {"gt": 0}, False),
+    (NonNegativeReals, {"ge": 0}, False),
+    (NegativeReals, {"lt": 0}, False),
+    (NonPositiveReals, {"le": 0}, False),
+    (PercentFraction, {"ge": 0, "le": 1}, False),
+    (UnitInterval, {"ge": 0, "le": 1}, False),
+    (Integers, {}, True),
+    (PositiveIntegers, {"gt": 0}, True),
+    (NonNegativeIntegers, {"ge": 0}, True),
+    (NegativeIntegers, {"lt": 0}, True),
+    (NonPositiveIntegers, {"le": 0}, True),
+    (Boolean, {"ge": 0, "le": 1}, True),
+    (Binary, {"ge": 0, "le": 1}, True),
+]
+
+numeric_types = {int, float, bool, np.float64, np.int64}
+
+# number of examples to show for each problem
+max_examples = 10
+
+
+class RangeCheck(object):
+    """
+    Check that all values of `param` are numbers within the specified bounds
+    (gt: greater than, ge: greater than or equal to, lt: less than, le: less
+    than or equal to), and optionally integers. NaN is never accepted.
+    """
+
+    def __init__(self, param, gt=None, ge=None, lt=None, le=None, integer=False):
+        self.component = param
+        self.bounds = [
+            (op, b)
+            for op, b in [(">", gt), (">=", ge), ("<", lt), ("<=", le)]
+            if b is not None
+        ]
+        self.integer = integer
+
+    def describe(self):
+        """Describe the valid values, e.g., "an integer > 0"."""
+        noun = "an integer" if self.integer else "a number"
+        limits = " and ".join(f"{op} {b}" for op, b in self.bounds)
+        return f"{noun} {limits}" if limits else noun
+
+    def find_problems(self, values):
+        """
+        Return the positions of invalid items in `values` (a dict of index:
+        value pairs).
+        """
+        vals = list(values.values())
+        if not set(map(type, vals)) <= numeric_types:
+            # find non-numeric values one by one, then check the rest
+            ok = [type(v) in numeric_types or isinstance(v, (int, float)) for v in vals]
+            bad = np.logical_not(ok)
+            x = np.array([v if o else np.nan for v, o in zip(vals, ok)], dtype=float)
+        else:
+            bad = np.zeros(len(vals), dtype=bool)
+            x = np.array(vals, dtype=float)
+        with np.errstate(invalid="ignore"):
+            bad |= np.isnan(x)
+            for op, b in self.bounds:
+                if op == ">":
+                    bad |= ~(x > b)
+                elif op == ">=":
+                    bad |= ~(x >= b)
+                elif op == "<":
+                    bad |= ~(x < b)
+                else:
+                    bad |= ~(x <= b)
+            if self.integer:
+                bad |= ~np.isfinite(x) | (x != np.round(x))
+        return np.flatnonzero(bad)
+
+    def check(self, model, values, problems):
+        positions = self.find_problems(values)
+        if len(positions):
+            keys = list(values)
+            bad = [(keys[i], values[keys[i]]) for i in positions[:max_examples]]
+            problems.append(
+                Problem(
+                    model,
+                    self.component.name,
+                    f"{len(positions)} value(s) of {self.component.name} are "
+                    f"not {self.describe()}",
+                    bad,
+                )
+            )
+
+
+class CalculatedValuesCheck(object):
+    """
+    Check the values of a Param whose input data already passed RangeCheck
+    `check`, but which may also have values calculated during construction
+    (e.g., by an initialize rule). Only the calculated values are checked.
+    """
+
+    def __init__(self, check):
+        self.component = check.component
+        self.range_check = check
+
+    def check(self, model, param, problems, raw):
+        given = raw.get(self.component.name, {})
+        keys = param.sparse_keys()
+        if len(keys) > len(given):
+            extra = {k: param[k] for k in keys if k not in given}
+            self.range_check.check(model, extra, problems)
+
+
+class IndexCheck(object):
+    """
+    Check that each element of the index of `component` (a Set or an indexed
+    Param) is in the corresponding set in `sets`. Each set can be a Set
+    component or a function that accepts a dict of raw input data (component
+    name: data) and returns a collection of valid elements; these are used to
+    specify sets that are calculated from the inputs, such as VARIABLE_GENS.
+    """
+
+    def __init__(self, component, sets):
+        self.component = component
+        self.sets = sets
+
+    def allowed(self, model, raw, i):
+        s = self.sets[i]
+        if isinstance(s, types.FunctionType):
+            return set(s(raw))
+        elif model.is_constructed():
+            return set(getattr(model, s.name))
+        elif s.name in raw:
+            return set(raw[s.name][None])
+        else:
+            # this set is calculated by a rule, so it can't be checked yet
+            return None
+
+    def check(self, model, values, problems, raw):
+        """
+        Add any problems found to `problems`. Returns False if some of the
+        sets could not be checked yet.
+        """
+        members = list(values)
+        bad = set()
+        complete = True
+        for i, s in enumerate(self.sets):
+            allowed = self.allowed(model, raw, i)
+            if allowed is None:
+                complete = False
+                continue
+            if len(self.sets) == 1:
+                extra = set(members) - allowed
+                bad.update(extra)
+            else:
+                extra = {x[i] for x in members} - allowed
+                if extra:
+                    bad.update(x for x in members if x[i] in extra)
+        if bad:
+            set_names = " * ".join(
+                s.__name__ if isinstance(s, types.FunctionType) else s.name
+                for s in self.sets
+            )
+            examples = [x for x in members if x in bad][:max_examples]
+            problems.append(
+                Problem(
+                    model,
+                    self.component.name,
+                    f"{len(bad)} index value(s) of {self.component.name} are not "
+                    f"in {set_names}",
+                    [(x, None) for x in examples],
+                )
+            )
+        return complete
+
+
+class Problem(object):
+    """A group of bad values for one component, with examples."""
+
+    def __init__(self, model, name, message, examples):
+        self.name = name
+        self.message = message
+        self.examples = examples
+        if name in getattr(model, "param_column_map", {}):
+            self.file, self.column = model.param_column_map[name]
+        else:
+            self.file = getattr(model, "input_set_files", {}).get(name)
+            self.column = None
+
+    def describe(self, model):
+        lines = [self.message]
+        if self.column:
+            lines[0] += f" (read from '{self.column}' column of {self.file})"
+        elif self.file:
+            lines[0] += f" (read from {self.file})"
+        if self.file:
+            line_numbers = find_lines(model, self.file, [k for k, v in self.examples])
+        else:
+            line_numbers = {}
+        for k, v in self.examples:
+            text = f"    {k!r}" if v is None else f"    {k!r}: {v!r}"
+            if k in line_numbers:
+                text += f" (line {line_numbers[k]})"
+            lines.append(text)
+        return "\n".join(lines)
+
+
+def parse_cell(s):
+    # Pyomo converts numeric text in input files to numbers
+    try:
+        return int(s)
+    except ValueError:
+        pass
+    try:
+        return float(s)
+    except ValueError:
+        return s
+
+
+def find_lines(model, file, keys):
+    """
+    Find the line numbers for the specified index keys in an input file. This
+    is only used to report problems, so speed is not important.
+    """
+    index_cols = getattr(model, "input_file_index_columns", {}).get(file)
+    if not index_cols or not file.endswith((".csv", ".tab", ".tsv")):
+        return {}
+    wanted = set(keys)
+    found = dict()
+    delimiter = "," if file.endswith(".csv") else "\t"
+    try:
+        with open(file, newline="") as f:
+            reader = csv.reader(f, delimiter=delimiter)
+            headers = next(reader)
+            cols = [headers.index(c) for c in index_cols]
+            for line, row in enumerate(reader, start=2):
+                key = tuple(parse_cell(row[c]) for c in cols if c < len(row))
+                if len(key) == 1:
+                    key = key[0]
+                if key in wanted and key not in found:
+                    found[key] = line
+    except (OSError, ValueError, StopIteration):
+        pass
+    return found
+
+
+def domain_check(param):
+    """Return a RangeCheck for the domain of `param`, or None if unavailable."""
+    for domain, bounds, integer in numeric_domains:
+        if param.domain is domain:
+            return RangeCheck(param, integer=integer, **bounds)
+    return None
+
+
+def mandatory_problems(model, raw):
+    """
+    Find components listed in mandatory data checks that are read from input
+    files but have no data there. Components that are not read from input
+    files (e.g., ones calculated by rules) are left to the BuildChecks added
+    by min_data_check().
+    """
+    problems = []
+    set_files = getattr(model, "input_set_files", {})
+    param_columns = getattr(model, "param_column_map", {})
+    for name in getattr(model, "mandatory_components", []):
+        c = getattr(model, name)
+        if c.ctype is Set and not c.is_indexed():
+            if name in raw:
+                members = raw[name][None]
+            elif name in set_files:
+                # the file was read, but had no rows
+                members = []
+            else:
+                continue
+            if len(members) == 0:
+                problems.append(f"No data is defined for the mandatory set '{name}'.")
+        elif c.ctype is Param and c.is_indexed():
+            index = c.index_set()
+            if (
+                name not in param_columns
+                or c.default() is not Param.NoValue
+                or index.name not in raw
+            ):
+                continue
+            given = raw.get(name, {})
+            missing = [k for k in raw[index.name][None] if k not in given]
+            if missing:
+                problems.append(
+                    Problem(
+                        model,
+                        name,
+                        f"Values are not provided for {len(missing)} element(s) "
+                        f"of the mandatory parameter '{name}'",
+                        [(k, None) for k in missing[:max_examples]],
+                    )
+                )
+        elif c.ctype is Param:
+            if (
+                name not in raw
+                and name in param_columns
+                and c.default() is Param.NoValue
+            ):
+                problems.append(f"Value not provided for mandatory parameter '{name}'.")
+    return problems
+
+
+def check_data(model, data):
+    """
+    Run all the vectorized checks on the data loaded into DataPortal `data`
+    for abstract model `model`, and raise an InputError describing all the
+    problems found, if any.
+
+    Otherwise, this turns off per-element domain checks for Params that have
+    been checked here and returns a tuple of (disabled, deferred).
+    `disabled` is a list of (Param, domain) tuples that should be passed to
+    restore_checks() after the instance is constructed, and `deferred` is a
+    list of declared checks that need values calculated during construction,
+    which should be passed to check_instance().
+    """
+    raw = data.data()
+    problems = mandatory_problems(model, raw)
+    deferred = []
+    for check in getattr(model, "input_checks", []):
+        name = check.component.name
+        if name not in raw:
+            deferred.append(check)
+        elif isinstance(check, IndexCheck):
+            values = raw[name][None] if check.component.ctype is Set else raw[name]
+            if not check.check(model, values, problems, raw):
+                deferred.append(check)
+        else:
+            check.check(model, raw[name], problems)
+
+    disabled = []
+    for p in model.component_objects(Param):
+        if p.name not in raw or not p.is_indexed():
+            continue
+        check = domain_check(p)
+        if check is None:
+            continue
+        n = len(problems)
+        check.check(model, raw[p.name], problems)
+        if len(problems) == n and type(p.default()) is not types.FunctionType:
+            # the input values have been checked; any values calculated by an
+            # initialize rule are checked after construction
+            disabled.append((p, p.domain))
+            deferred.append(CalculatedValuesCheck(check))
+
+    if problems:
+        raise InputError(
+            "The following problems were found in the input data:\n\n"
+            + "\n\n".join(
+                p if isinstance(p, str) else p.describe(model) for p in problems
+            )
+        )
+    for p, domain in disabled:
+        p.domain = Any
+    return disabled, deferred
+
+
+def restore_checks(model, instance, disabled):
+    """
+    Restore the domains of Params in abstract model `model` and the
+    corresponding Params in `instance` (if given), after they have been
+    constructed without per-element domain checks.
+    """
+    for p, domain in disabled:
+        p.domain = domain
+        if instance is not None:
+            getattr(instance, p.name).domain = domain
+
+
+def check_instance(instance, checks, data):
+    """
+    Run declared checks that could not be completed before construction,
+    using the values in the constructed instance.
+    """
+    raw = data.data()
+    problems = []
+    for check in checks:
+        c = getattr(instance, check.component.name)
+        if isinstance(check, IndexCheck):
+            values = list(c) if c.ctype is Set else list(c.sparse_keys())
+            check.check(instance, values, problems, raw)
+        elif isinstance(check, CalculatedValuesCheck):
+            check.check(instance, c, problems, raw)
+        else:
+            values = {k: c[k] for k in c.sparse_keys()}
+            check.check(instance, values, problems)
+    if problems:
+        raise InputError(
+            "The following problems were found in the model data:\n\n"
+            + "\n\n".join(p.describe(instance) for p in problems)
+        )
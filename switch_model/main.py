@@ -4,14 +4,108 @@
 """Script to handle switch <cmd> calls from the command line."""
 from __future__ import print_function
 
-import sys, os
+import sys, os, time
 import switch_model
 
 # print "running {} as {}.".format(__file__, __name__)
 
 
+class ImportTimer(object):
+    """
+    Meta path finder that records how long each module takes to import
+    (including and excluding the modules it imports in turn), for
+    `switch <cmd> --startup-profile`.
+    """
+
+    def __init__(self):
+        self.times = dict()  # module name: (cumulative, self) time
+        self.stack = []  # time spent importing children of modules in progress
+        self.start = time.perf_counter()
+        self.command_start = None
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def find_spec(self, name, path, target=None):
+        # find the module with the standard finders, then time its loader
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        loader = spec.loader
+        # builtin and frozen modules use class-level loaders, which we leave alone
+        if not isinstance(loader, type) and hasattr(loader, "exec_module"):
+            loader.exec_module = self.timed(name, loader.exec_module)
+        return spec
+
+    def timed(self, name, exec_module):
+        def exec_module_timed(module):
+            start = time.perf_counter()
+            self.stack.append(0.0)
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = self.stack.pop()
+                if self.stack:
+                    self.stack[-1] += elapsed
+                self.times[name] = (elapsed, elapsed - children)
+
+        return exec_module_timed
+
+    def report(self, limit=30, file=None):
+        file = sys.stderr if file is None else file
+        print("\nStartup profile (import times in ms):", file=file)
+        print("{:>10} {:>10}  {}".format("cumulative", "self", "module"), file=file)
+        ranked = sorted(self.times.items(), key=lambda x: x[1][0], reverse=True)
+        for name, (cum, own) in ranked[:limit]:
+            print(
+                "{:10.1f} {:10.1f}  {}".format(cum * 1000, own * 1000, name), file=file
+            )
+        print(
+            "{} modules imported; {:.1f} ms in imports.".format(
+                len(self.times), sum(own for cum, own in self.times.values()) * 1000
+            ),
+            file=file,
+        )
+        if self.command_start is not None:
+            print(
+                "Command started {:.1f} ms after switch_model.main.".format(
+                    (self.command_start - self.start) * 1000
+                ),
+                file=file,
+            )
+
+
 def main():
-    cmds = ["solve", "solve-scenarios", "test", "upgrade", "info", "--version"]
+    if "--startup-profile" in sys.argv:
+        sys.argv.remove("--startup-profile")
+        import atexit
+
+        profiler = ImportTimer()
+        profiler.install()
+        atexit.register(profiler.report)
+    else:
+        profiler = None
+
+    cmds = [
+        "solve",
+        "solve-scenarios",
+        "stochastic",
+        "sweep",
+        "consolidate",
+        "convert-inputs",
+        "benchmark",
+        "test",
+        "upgrade",
+        "info",
+        "serve",
+        "--version",
+    ]
     if len(sys.argv) >= 2 and sys.argv[1] in cmds:
         # If users run a script from the command line, the location of the script
         # gets added to the start of sys.path; if they call a module from the
@@ -33,12 +127,26 @@ def main():
             from .solve import main
         elif cmd == "solve-scenarios":
             from .solve_scenarios import main
+        elif cmd == "stochastic":
+            from .stochastic import main
+        elif cmd == "sweep":
+            from .sweep import main
+        elif cmd == "consolidate":
+            from .reporting.database import main
+        elif cmd == "convert-inputs":
+            from .convert_inputs import main
+        elif cmd == "benchmark":
+            from .benchmark import main
         elif cmd == "info":
             from .api import info as main
+        elif cmd == "serve":
+            from .api import serve as main
         elif cmd == "test":
             from .test import main
         elif cmd == "upgrade":
             from switch_model.upgrade import main
+        if profiler is not None:
+            profiler.command_start = time.perf_counter()
         main()
     else:
         print(
@@ -47,6 +155,10 @@ def main():
             )
         )
         print("Use one of these commands with --help for more information.")
+        print(
+            "Add --startup-profile to any command to report the time spent "
+            "importing each module."
+        )
 
 
 if __name__ == "__main__":
@@ -19,7 +19,15 @@ is unspecified.
 """
 from __future__ import division
 import os
-from pyomo.environ import Set, Param, Expression, Constraint, Suffix, NonNegativeReals
+from pyomo.environ import (
+    Set,
+    Param,
+    Expression,
+    Constraint,
+    Suffix,
+    NonNegativeReals,
+    value,
+)
 import switch_model.reporting as reporting
 
 
@@ -36,7 +44,7 @@ def define_components(model):
     model.Enforce_Carbon_Cap = Constraint(
         model.PERIODS,
         rule=lambda m, p: Constraint.Skip
-        if m.carbon_cap_tco2_per_yr[p] == float("inf")
+        if value(m.carbon_cap_tco2_per_yr[p]) == float("inf")
         else m.AnnualEmissions[p] <= m.carbon_cap_tco2_per_yr[p],
         doc=("Enforces the carbon cap for generation-related emissions."),
     )
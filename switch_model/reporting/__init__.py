@@ -27,6 +27,7 @@ dependencies = "switch_model.financials"
 import os
 import csv
 import itertools
+import time
 
 try:
     # Python 2
@@ -65,6 +66,14 @@ def define_arguments(argparser):
         action="extend",
         help="List of expressions to save in addition to variables; can also be 'all' or 'none'.",
     )
+    argparser.add_argument(
+        "--results-db",
+        default=False,
+        action="store_true",
+        help="Also save all exported tables and information about this run in "
+        "results.sqlite in the outputs directory. Use `switch consolidate` "
+        "to merge these into one database for a group of scenarios.",
+    )
 
 
 def write_table(instance, *indexes, **kwargs):
@@ -96,18 +105,19 @@ def write_table(instance, *indexes, **kwargs):
         if instance.options.sorted_output:
             idx.sort()
 
+        def get_row(x):
+            return values(instance, *unpack_elements(x))
+
         try:
-            w.writerows(
-                format_row(row=values(instance, *unpack_elements(x))) for x in idx
-            )
+            if idx:
+                get_row(idx[0])
         except TypeError:  # lambda got wrong number of arguments
             # use old code, which doesn't unpack the indices
-            w.writerows(
-                # TODO: flatten x (unpack tuples) like Pyomo before calling values()
-                # That may cause problems elsewhere though...
-                format_row(row=values(instance, *x))
-                for x in idx
-            )
+            # TODO: flatten x (unpack tuples) like Pyomo before calling values()
+            # That may cause problems elsewhere though...
+            def get_row(x):
+                return values(instance, *x)
+
             print(
                 "DEPRECATION WARNING: switch_model.reporting.write_table() was called with a function"
             )
@@ -119,6 +129,20 @@ def write_table(instance, *indexes, **kwargs):
             )
             print("Problem occured with {}.".format(values.__code__))
 
+        results_db = getattr(instance, "results_db", None)
+        if results_db is None:
+            w.writerows(format_row(row=get_row(x)) for x in idx)
+        else:
+            # evaluate once, then save unformatted values in the database
+            rows = [[value(v) for v in get_row(x)] for x in idx]
+            w.writerows(format_row(row=row) for row in rows)
+            results_db.add_table(
+                output_file,
+                headings,
+                rows,
+                index_columns=len(unpack_elements(idx[0])) if idx else 0,
+            )
+
 
 def unpack_elements(items):
     """Unpack any multi-element objects within items, to make a single flat list.
@@ -136,6 +160,12 @@ def unpack_elements(items):
     return l
 
 
+def pre_solve(instance):
+    # note when this run started, so the results database can pick up any
+    # other files written during the run
+    instance.run_start_time = time.time()
+
+
 def post_solve(instance, outdir):
     """
     Minimum output generation for all model runs.
@@ -163,6 +193,7 @@ def save_generic_results(instance, outdir, sorted_output):
     else:
         components += [getattr(instance, c) for c in instance.options.save_expressions]
 
+    results_db = getattr(instance, "results_db", None)
     missing_val_list = []
     for var in components:
         output_file = os.path.join(outdir, "%s.csv" % var.name)
@@ -187,13 +218,26 @@ def save_generic_results(instance, outdir, sorted_output):
                 )
                 # Results are saved in the order of the index set by default.
                 # Lexicographic sorting is available if wanted.
-                items = sorted(var.items()) if sorted_output else list(var.items())
-                for key, obj in items:
-                    writer.writerow(tuple(make_iterable(key)) + (get_value(obj),))
+                items = list(get_values(instance, var).items())
+                if sorted_output:
+                    items.sort()
+                for key, val in items:
+                    writer.writerow(tuple(make_iterable(key)) + (val,))
+                if results_db is not None:
+                    results_db.add_table(
+                        output_file,
+                        [f"{index_name}_{i+1}" for i in range(index_dimen)]
+                        + [var.name],
+                        (tuple(make_iterable(key)) + (val,) for key, val in items),
+                        index_columns=index_dimen,
+                    )
             else:
                 # single-valued variable
+                val = get_values(instance, var)[None]
                 writer.writerow([var.name])
-                writer.writerow([get_value(obj)])
+                writer.writerow([val])
+                if results_db is not None:
+                    results_db.add_table(output_file, [var.name], [(val,)])
     if missing_val_list:
         msg = (
             "WARNING: {} {}. This "
@@ -217,6 +261,18 @@ def save_generic_results(instance, outdir, sorted_output):
             print(msg)
 
 
+def get_values(instance, component):
+    """
+    Retrieve a dict of values for all elements of a Variable or Expression,
+    keyed by index. Expressions are evaluated in bulk via
+    instance.solution_values() when available.
+    """
+    if component.ctype is Var or not hasattr(instance, "solution_values"):
+        return {k: get_value(obj) for k, obj in component.items()}
+    else:
+        return instance.solution_values(component)
+
+
 def get_value(obj, missing_val_list=[]):
     """
     Retrieve value of one element of a Variable or Expression, converting
@@ -254,21 +310,17 @@ def save_cost_components(m, outdir):
     # TODO: should this use bring_future_costs_to_base_year instead of bring_annual_costs_to_base_year
     cost_dict = dict()
     for annual_cost in m.Cost_Components_Per_Period:
-        cost = getattr(m, annual_cost)
-        # note: storing value() instead of the expression may save
-        # some memory while this function runs
-        cost_dict[annual_cost] = value(
-            sum(cost[p] * m.bring_annual_costs_to_base_year[p] for p in m.PERIODS)
+        cost = m.solution_values(annual_cost)
+        cost_dict[annual_cost] = sum(
+            cost[p] * value(m.bring_annual_costs_to_base_year[p]) for p in m.PERIODS
         )
     for tp_cost in m.Cost_Components_Per_TP:
-        cost = getattr(m, tp_cost)
-        cost_dict[tp_cost] = value(
-            sum(
-                cost[t]
-                * m.tp_weight_in_year[t]
-                * m.bring_annual_costs_to_base_year[m.tp_period[t]]
-                for t in m.TIMEPOINTS
-            )
+        cost = m.solution_values(tp_cost)
+        cost_dict[tp_cost] = sum(
+            cost[t]
+            * value(m.tp_weight_in_year[t])
+            * value(m.bring_annual_costs_to_base_year[m.tp_period[t]])
+            for t in m.TIMEPOINTS
         )
     write_table(
         m,
@@ -8,7 +8,6 @@ This module enables exporting basic plots and tables with processed information.
 from __future__ import print_function
 from __future__ import division
 import switch_model.reporting as export
-import pandas as pd
 import os, time, sys
 from csv import reader
 from itertools import cycle
@@ -81,6 +80,7 @@ def post_solve(mod, outdir):
     import matplotlib.pyplot as plt
     from cycler import cycler
     from matplotlib.backends.backend_pdf import PdfPages
+    import pandas as pd
 
     nan = float("nan")
 
@@ -0,0 +1,407 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+"""
+Save the results of each run in a SQLite database, and merge the databases
+for many scenarios into one store that can be queried across scenarios.
+
+With the --results-db option, every table exported by
+switch_model.reporting.write_table() and the generic Var and Expression
+exports are also written to results.sqlite in the outputs directory, with
+numeric values stored as numbers. After all the post-solve functions have run,
+any other csv files written to the outputs directory during the run (e.g.,
+tables from the hawaii modules, which are built up with util.append_table)
+are added too, along with the contents of model_config.json and the total
+cost. The database is written to a temporary file and renamed when it is
+complete, so results.sqlite only exists for runs that finished.
+
+Each per-run database has one table for each exported file (named after the
+file, without the extension), an `exported_tables` catalog that lists the
+source file, number of index columns and number of rows for each table, and a
+`run_info` table of (key, value) pairs. The index columns of each table are
+indexed.
+
+`switch consolidate [path ...] [--output file]` searches the specified
+directories (default is the current directory) for results.sqlite files and
+merges them into one database (all_results.sqlite by default), adding a
+`scenario` column to every table. Scenarios are named by their scenario_name
+option, or by the path of their outputs directory if that is not set. The
+`scenarios` table records the size and modification time of each source, so
+later runs only merge scenarios that were added or re-run since the last one.
+This can be run while a scenario queue is still being solved.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import time
+
+results_db_file = "results.sqlite"
+
+
+def quote(name):
+    """Quote an SQL identifier."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def register_numpy_types():
+    # Evaluated expressions may be numpy numbers; floats are handled already
+    # because numpy.float64 is a subclass of float.
+    try:
+        import numpy as np
+    except ImportError:
+        return
+    for t in (np.int8, np.int16, np.int32, np.int64):
+        sqlite3.register_adapter(t, int)
+    for t in (np.float16, np.float32):
+        sqlite3.register_adapter(t, float)
+    sqlite3.register_adapter(np.bool_, bool)
+
+
+def unique_columns(headings):
+    """Return distinct, non-empty column names for the specified headings."""
+    columns = []
+    for i, h in enumerate(headings):
+        name = str(h) if str(h) != "" else f"column_{i + 1}"
+        base, n = name, 2
+        while name.lower() in (c.lower() for c in columns):
+            name = f"{base}_{n}"
+            n += 1
+        columns.append(name)
+    return columns
+
+
+def parse_number(s):
+    """Convert numeric text from a csv file to a number; blanks become NULL."""
+    if s == "":
+        return None
+    try:
+        return int(s)
+    except ValueError:
+        pass
+    try:
+        return float(s)
+    except ValueError:
+        return s
+
+
+class ResultsDB(object):
+    """
+    Per-run results database. This is created by
+    SwitchConcreteModel.post_solve() when --results-db is specified and stored
+    as instance.results_db while the post-solve functions run.
+    """
+
+    def __init__(self, instance, outputs_dir):
+        self.instance = instance
+        self.outputs_dir = outputs_dir
+        self.path = os.path.join(outputs_dir, results_db_file)
+        self.tmp_path = self.path + ".tmp"
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+        register_numpy_types()
+        self.conn = sqlite3.connect(self.tmp_path)
+        # nothing needs to survive a crash, since the file is only renamed
+        # into place when it is complete
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute(
+            "CREATE TABLE exported_tables "
+            "(name TEXT PRIMARY KEY, file TEXT, index_columns INTEGER, rows INTEGER)"
+        )
+        self.conn.execute("CREATE TABLE run_info (key TEXT PRIMARY KEY, value)")
+        # files that have already been stored, so they aren't read back in
+        self.files = set()
+
+    def add_table(self, output_file, headings, rows, index_columns=0):
+        """
+        Store the rows of one exported table. output_file is the csv file
+        that holds the same data; the table is named after it. rows can be
+        any iterable of sequences with one value per heading.
+        """
+        name = os.path.splitext(os.path.basename(output_file))[0]
+        columns = unique_columns(headings)
+        index_columns = min(index_columns, len(columns))
+        c = self.conn
+        c.execute(f"DROP TABLE IF EXISTS {quote(name)}")
+        c.execute(
+            f"CREATE TABLE {quote(name)} ({', '.join(quote(h) for h in columns)})"
+        )
+        cur = c.executemany(
+            f"INSERT INTO {quote(name)} VALUES ({', '.join('?' * len(columns))})",
+            (tuple(r) for r in rows),
+        )
+        if index_columns:
+            c.execute(
+                f"CREATE INDEX {quote(name + '_index')} ON {quote(name)} "
+                f"({', '.join(quote(h) for h in columns[:index_columns])})"
+            )
+        c.execute(
+            "INSERT OR REPLACE INTO exported_tables VALUES (?, ?, ?, ?)",
+            (name, os.path.basename(output_file), index_columns, cur.rowcount),
+        )
+        self.files.add(os.path.abspath(output_file))
+
+    def add_csv_file(self, path):
+        """Store a csv file, treating the first column as the index."""
+        with open(path, newline="") as f:
+            reader = csv.reader(f, doublequote=False, escapechar="\\")
+            try:
+                headings = next(reader)
+            except StopIteration:
+                return
+            n = len(headings)
+            # pad or trim rows to match the headings
+            rows = (
+                ([parse_number(v) for v in row] + [None] * n)[:n]
+                for row in reader
+                if row
+            )
+            self.add_table(path, headings, rows, index_columns=1 if n > 1 else 0)
+
+    def add_run_info(self, key, val):
+        if not isinstance(val, (int, float, str, type(None))):
+            val = json.dumps(val, default=str)
+        self.conn.execute("INSERT OR REPLACE INTO run_info VALUES (?, ?)", (key, val))
+
+    def finish(self, start_time=None):
+        """
+        Add any csv files written to the outputs directory since start_time
+        (a time.time() value) that were not stored directly, plus general
+        information about the run, then move the database into place.
+        """
+        m = self.instance
+        for f in sorted(os.listdir(self.outputs_dir)):
+            path = os.path.join(self.outputs_dir, f)
+            if (
+                f.endswith(".csv")
+                and os.path.abspath(path) not in self.files
+                and (start_time is None or os.path.getmtime(path) >= start_time)
+            ):
+                try:
+                    self.add_csv_file(path)
+                except (csv.Error, UnicodeDecodeError, sqlite3.Error) as e:
+                    m.logger.warning(f"Unable to add {f} to the results database: {e}")
+
+        self.add_run_info("scenario_name", getattr(m.options, "scenario_name", None))
+        self.add_run_info("outputs_dir", os.path.abspath(self.outputs_dir))
+        self.add_run_info("completed", time.strftime("%Y-%m-%d %H:%M:%S"))
+        if hasattr(m, "SystemCost"):
+            try:
+                self.add_run_info("total_cost", m.solution_values(m.SystemCost)[None])
+            except (ValueError, ZeroDivisionError):
+                pass
+        config_file = os.path.join(self.outputs_dir, "model_config.json")
+        if os.path.exists(config_file):
+            with open(config_file) as f:
+                for key, val in json.load(f).items():
+                    self.add_run_info(key, val)
+        else:
+            self.add_run_info("options", vars(m.options))
+
+        self.conn.commit()
+        self.conn.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """
+        Discard the partial database after an error. Problems doing that are
+        logged rather than raised, so they don't hide the original error.
+        """
+        try:
+            self.conn.close()
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+        except (OSError, sqlite3.Error) as e:
+            self.instance.logger.warning(
+                f"Unable to remove partial results database {self.tmp_path}: {e}"
+            )
+
+
+def find_results_dbs(paths, exclude=()):
+    exclude = {os.path.abspath(p) for p in exclude}
+    for path in paths:
+        if os.path.isfile(path):
+            found = [path]
+        else:
+            found = []
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                if results_db_file in filenames:
+                    found.append(os.path.join(dirpath, results_db_file))
+        for f in found:
+            if os.path.abspath(f) not in exclude:
+                yield f
+
+
+def table_columns(conn, schema, table):
+    return [
+        row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({quote(table)})")
+    ]
+
+
+def merge_results(output, sources, logger=None):
+    """
+    Merge per-run results databases (`sources`) into `output`, skipping
+    any that have not changed since they were last merged. Returns the number
+    of scenarios merged.
+    """
+    log = logger.info if logger else print
+    conn = sqlite3.connect(output)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS scenarios "
+        "(scenario TEXT PRIMARY KEY, source TEXT, mtime_ns INTEGER, "
+        "size INTEGER, merged TEXT)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS exported_tables "
+        "(name TEXT PRIMARY KEY, file TEXT, index_columns INTEGER)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS run_info "
+        "(scenario TEXT, key TEXT, value, PRIMARY KEY (scenario, key))"
+    )
+    conn.commit()
+
+    merged = 0
+    for source in sources:
+        source = os.path.abspath(source)
+        stat = os.stat(source)
+        # look up the scenario name before attaching the whole database
+        src = sqlite3.connect(source)
+        try:
+            row = src.execute(
+                "SELECT value FROM run_info WHERE key='scenario_name'"
+            ).fetchone()
+        finally:
+            src.close()
+        scenario = (
+            row[0]
+            if row and row[0]
+            else os.path.relpath(
+                os.path.dirname(source), os.path.dirname(os.path.abspath(output))
+            )
+        )
+
+        prev = conn.execute(
+            "SELECT source, mtime_ns, size FROM scenarios WHERE scenario=?",
+            (scenario,),
+        ).fetchone()
+        if prev == (source, stat.st_mtime_ns, stat.st_size):
+            continue
+        if prev and prev[0] != source:
+            log(f"Scenario {scenario} from {source} replaces results from {prev[0]}.")
+
+        conn.execute("ATTACH DATABASE ? AS src", (source,))
+        try:
+            # remove results from a previous run of this scenario
+            old = conn.execute("SELECT name FROM main.exported_tables").fetchall()
+            for (name,) in old:
+                conn.execute(
+                    f"DELETE FROM main.{quote(name)} WHERE scenario=?", (scenario,)
+                )
+            conn.execute("DELETE FROM main.run_info WHERE scenario=?", (scenario,))
+
+            tables = conn.execute(
+                "SELECT name, file, index_columns FROM src.exported_tables"
+            ).fetchall()
+            for name, file, index_columns in tables:
+                columns = table_columns(conn, "src", name)
+                existing = table_columns(conn, "main", name)
+                if not existing:
+                    conn.execute(
+                        f"CREATE TABLE main.{quote(name)} "
+                        f"({', '.join(quote(c) for c in ['scenario'] + columns)})"
+                    )
+                    index = [quote(c) for c in columns[:index_columns]]
+                    conn.execute(
+                        f"CREATE INDEX main.{quote(name + '_scenario_index')} "
+                        f"ON {quote(name)} ({', '.join(['scenario'] + index)})"
+                    )
+                    if index:
+                        # for comparing the same elements across scenarios
+                        conn.execute(
+                            f"CREATE INDEX main.{quote(name + '_index')} "
+                            f"ON {quote(name)} ({', '.join(index)})"
+                        )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO main.exported_tables VALUES (?, ?, ?)",
+                        (name, file, index_columns),
+                    )
+                else:
+                    lower = {c.lower() for c in existing}
+                    for c in columns:
+                        if c.lower() not in lower:
+                            conn.execute(
+                                f"ALTER TABLE main.{quote(name)} ADD COLUMN {quote(c)}"
+                            )
+                cols = ", ".join(quote(c) for c in columns)
+                conn.execute(
+                    f"INSERT INTO main.{quote(name)} (scenario, {cols}) "
+                    f"SELECT ?, {cols} FROM src.{quote(name)}",
+                    (scenario,),
+                )
+            conn.execute(
+                "INSERT INTO main.run_info SELECT ?, key, value FROM src.run_info",
+                (scenario,),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO main.scenarios VALUES (?, ?, ?, ?, ?)",
+                (
+                    scenario,
+                    source,
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    time.strftime("%Y-%m-%d %H:%M:%S"),
+                ),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("DETACH DATABASE src")
+        merged += 1
+        log(f"Merged results for scenario {scenario} from {source}.")
+
+    conn.close()
+    return merged
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="""
+            Merge the results.sqlite files created by runs with --results-db
+            into one database, with a scenario column added to every table.
+            Scenarios that have not changed since the last merge are skipped.
+        """,
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=["."],
+        help="Directories to search for results.sqlite files, or individual "
+        "files (default is the current directory).",
+    )
+    parser.add_argument(
+        "--output",
+        default="all_results.sqlite",
+        help="Database to create or update (default is all_results.sqlite).",
+    )
+    options = parser.parse_args(args=args)
+
+    sources = list(find_results_dbs(options.paths, exclude=[options.output]))
+    if not sources:
+        print(f"No {results_db_file} files were found.")
+        return
+    merged = merge_results(options.output, sources)
+    print(
+        f"Merged {merged} of {len(sources)} scenario(s) into {options.output} "
+        f"({len(sources) - merged} unchanged)."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+"""
+Evaluate model components against the current solution.
+
+Post-solve code in many modules needs the values of the same Expressions,
+e.g., GenCapacity, GenCapitalCosts, the components registered in
+Zone_Power_Injections and SystemCostPerPeriod. Calling value() on each
+element walks the whole expression tree every time, which gets very slow for
+large models or with `--save-expressions all`.
+
+The SolutionEvaluator defined here compiles each indexed component once into a
+sparse linear map (via Pyomo's standard representation), i.e., a list of
+(row, variable, coefficient) triples plus a constant for each row. The values
+for all the indexes of the component can then be calculated at once as a
+matrix-vector product with the vector of variable values from the current
+solution. Results are cached, so all the exporters can share them.
+
+Modules should normally use this via the solution_values() method of the model
+instance, e.g., `cap = m.solution_values(m.GenCapacity)` followed by
+`cap[g, p]`. The cache is discarded by switch_model.solve.solve() each time the
+model is solved.
+"""
+
+import numpy as np
+from pyomo.environ import Var, Param, Expression, Objective, value
+from pyomo.repn import generate_standard_repn
+
+
+class SolutionEvaluator(object):
+    """
+    Calculate and cache values for Vars, Expressions, Objectives and Params
+    of a solved model. Each Expression or Objective is compiled to a sparse
+    linear map the first time it is requested.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.clear()
+
+    def clear(self):
+        """
+        Forget all compiled maps and cached values. This should be called
+        whenever the model is re-solved or its parameters or expressions are
+        changed.
+        """
+        # all variables referenced by compiled maps, with their position in
+        # the solution vector, keyed by id() of the VarData object (the
+        # objects themselves are kept in self.vars, so the ids stay valid)
+        self.vars = []
+        self.var_pos = dict()
+        # vector of variable values, extended as new maps are compiled
+        self.x = np.zeros(0)
+        # compiled maps and calculated values, keyed by component name
+        self.maps = dict()
+        self.values = dict()
+
+    def solution_values(self, component):
+        """
+        Return a dict with the value of each element of `component` (a
+        component object or name) in the current solution, keyed by index.
+        Scalar components use `None` as the key, like Pyomo's extract_values().
+        Unassigned variables are reported as None; expressions that depend on
+        unassigned variables or divide by zero are reported as nan.
+        """
+        if not hasattr(component, "ctype"):
+            component = getattr(self.model, component)
+        name = component.name
+        try:
+            return self.values[name]
+        except KeyError:
+            pass
+
+        if component.ctype is Var:
+            vals = {k: v.value for k, v in component.items()}
+        elif component.ctype is Param:
+            vals = {k: value(component[k]) for k in component.index_set()}
+        elif component.ctype in (Expression, Objective):
+            vals = self.evaluate(component)
+        else:
+            raise TypeError(
+                f"Unable to calculate solution values for {name}; only "
+                "Vars, Params, Expressions and Objectives are supported."
+            )
+        self.values[name] = vals
+        return vals
+
+    def evaluate(self, component):
+        try:
+            keys, rows, cols, coefs, constant, nonlinear = self.maps[component.name]
+        except KeyError:
+            keys, rows, cols, coefs, constant, nonlinear = self.maps[component.name] = (
+                self.compile(component)
+            )
+
+        x = self.solution_vector()
+        y = constant + np.bincount(rows, weights=coefs * x[cols], minlength=len(keys))
+        vals = dict(zip(keys, y.tolist()))
+        # evaluate any nonlinear or constant elements individually
+        for k, obj in nonlinear:
+            try:
+                vals[k] = value(obj)
+            except ZeroDivisionError:
+                vals[k] = float("nan")
+            except ValueError:
+                # unassigned variable
+                vals[k] = float("nan")
+        return vals
+
+    def compile(self, component):
+        """
+        Convert all elements of an Expression or Objective into a sparse
+        linear map. Returns a tuple of (keys, rows, cols, coefs, constant,
+        nonlinear), where nonlinear is a list of (key, element) pairs that
+        could not be converted or have no variables, and must be evaluated
+        directly.
+        """
+        keys = []
+        rows = []
+        cols = []
+        coefs = []
+        constant = []
+        nonlinear = []
+        for row, (k, obj) in enumerate(component.items()):
+            keys.append(k)
+            # ExpressionView elements may be variables or unnamed expressions
+            expr = getattr(obj, "expr", obj)
+            if expr is None:
+                # undefined expression; value() will report None
+                repn = None
+            else:
+                try:
+                    repn = generate_standard_repn(
+                        expr, compute_values=True, quadratic=False
+                    )
+                except (ZeroDivisionError, ValueError):
+                    # e.g., 0 denominator in a diagnostic expression
+                    repn = None
+            if repn is None or repn.nonlinear_expr is not None or not repn.linear_vars:
+                # nonlinear or constant; these are evaluated individually
+                # (this also preserves integer zeros from empty sums)
+                nonlinear.append((k, obj))
+                constant.append(0.0)
+                continue
+            constant.append(value(repn.constant))
+            for v, c in zip(repn.linear_vars, repn.linear_coefs):
+                rows.append(row)
+                cols.append(self.var_position(v))
+                coefs.append(value(c))
+        return (
+            keys,
+            np.array(rows, dtype=np.int64),
+            np.array(cols, dtype=np.int64),
+            np.array(coefs, dtype=float),
+            np.array(constant, dtype=float),
+            nonlinear,
+        )
+
+    def var_position(self, v):
+        try:
+            return self.var_pos[id(v)]
+        except KeyError:
+            pos = self.var_pos[id(v)] = len(self.vars)
+            self.vars.append(v)
+            return pos
+
+    def solution_vector(self):
+        """
+        Return a vector of current values for all variables used in compiled
+        maps, with nan for unassigned variables.
+        """
+        n = len(self.x)
+        if n < len(self.vars):
+            new_vals = np.array(
+                [np.nan if v.value is None else v.value for v in self.vars[n:]],
+                dtype=float,
+            )
+            self.x = np.concatenate([self.x, new_vals])
+        return self.x
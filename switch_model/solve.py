@@ -18,13 +18,11 @@ import json
 import traceback
 import argparse
 import pickle
+import importlib.util
 
-try:
-    import IPython
-
-    has_ipython = True
-except ImportError:
-    has_ipython = False
+# IPython is slow to import, so we only check whether it is available here and
+# import it if the user asks for an interactive shell
+has_ipython = importlib.util.find_spec("IPython") is not None
 
 from pyomo.environ import *
 from pyomo.opt import SolverFactory, SolverStatus, TerminationCondition
@@ -41,8 +39,8 @@ from switch_model.utilities import (
     wrap,
     unwrap,
     rewrap,
+    unique_list,
 )
-from switch_model.upgrade import do_inputs_need_upgrade, upgrade_inputs
 
 
 def main(args=None, return_model=False, return_instance=False):
@@ -123,6 +121,8 @@ def main(args=None, return_model=False, return_instance=False):
         add_module_args(parser)
         module_options = parser.parse_known_args(args=args)[0]
 
+        from switch_model.upgrade import do_inputs_need_upgrade, upgrade_inputs
+
         if os.path.exists(module_options.inputs_dir) and do_inputs_need_upgrade(
             module_options.inputs_dir
         ):
@@ -212,6 +212,11 @@ def main(args=None, return_model=False, return_instance=False):
             else:
                 return instance
 
+        if instance.options.warm_start_from is not None:
+            logger.info("Loading warm start values...")
+            load_warm_start(instance, instance.options.warm_start_from)
+            timer.step_time()
+
         # make sure the outputs_dir exists (used by some modules during iterate)
         # use a race-safe approach in case this code is run in parallel
         try:
@@ -230,6 +235,8 @@ def main(args=None, return_model=False, return_instance=False):
         else:
             # solve the model (reports time for each step as it goes)
             if instance.iterate_modules:
+                if instance.options.resume:
+                    load_iteration_checkpoint(instance)
                 logger.info("Iterating model...")
                 iterate(instance)
             else:
@@ -310,6 +317,8 @@ def main(args=None, return_model=False, return_instance=False):
         # IPython support is disabled until they fix
         # https://github.com/ipython/ipython/issues/12199
         if has_ipython and False:
+            import IPython
+
             banner += "\nUse tab to auto-complete"
             IPython.embed(
                 banner1=banner,
@@ -387,51 +396,122 @@ def reload_prior_solution_from_pickle(instance, pickle_file):
     with open(pickle_file, "rb") as fh:
         results = pickle.load(fh)
     instance.solutions.load_from(results)
+    if hasattr(instance, "clear_solution_values"):
+        instance.clear_solution_values()
     return instance
 
 
-def reload_prior_solution_from_csvs(instance):
+def reload_prior_solution_from_csvs(instance, outputs_dir=None):
     """
-    Assign values to all model variables from <variable>.csv files saved after
-    previous solution. (Not currently used.)
+    Assign values to model variables from the <variable>.csv files saved by
+    switch_model.reporting in outputs_dir (instance.options.outputs_dir by
+    default). Rows are matched to variables by the text of their indexes, so
+    this also works with the outputs of a related model, e.g., a sibling
+    scenario. Variables and rows that don't match are skipped, and fixed
+    variables are left as is. Returns the number of variables assigned.
     """
     import csv
 
-    var_objects = instance.component_objects(Var)
-    for var in var_objects:
-        var_file = os.path.join(instance.options.outputs_dir, "{}.csv".format(var.name))
+    if outputs_dir is None:
+        outputs_dir = instance.options.outputs_dir
+    assigned = 0
+    for var in instance.component_objects(Var):
+        var_file = os.path.join(outputs_dir, "{}.csv".format(var.name))
         if not os.path.isfile(var_file):
-            raise RuntimeError(
-                "Tab output file for variable {} cannot be found in outputs "
-                "directory. Exiting.".format(var.name)
-            )
-        try:
-            # check types of the first tuple of keys for this variable
-            key_types = [type(i) for i in make_iterable(next(var.iterkeys()))]
-        except StopIteration:
-            key_types = []  # no keys
-        with open(var_file, "r") as f:
-            reader = csv.reader(f, delimiter=",")
+            continue
+        # look up elements by their indexes as written in the csv file
+        elements = {
+            () if k is None else tuple(str(i) for i in make_iterable(k)): v
+            for k, v in var.items()
+        }
+        with open(var_file, "r", newline="") as f:
+            # same settings as the "switch-csv" dialect in switch_model.reporting
+            reader = csv.reader(f, delimiter=",", escapechar="\\", doublequote=False)
             next(reader)  # skip headers
             for row in reader:
-                index = tuple(t(k) for t, k in zip(key_types, row[:-1]))
-                try:
-                    v = var[index]
-                except KeyError:
-                    raise KeyError(
-                        "Unable to set value for {}[{}]; index is invalid.".format(
-                            var.name, keys
-                        )
-                    )
-                if row[-1] == "":
-                    # Variables that are not used in the model end up with no
-                    # value after the solve and get saved as blanks; we skip those.
-                    continue
-                val = float(row[-1])
-                if v.is_integer() or v.is_binary():
-                    val = int(val)
-                v.value = val
-        instance.logger.info(f"Loaded variable {var.name} values into instance.")
+                v = elements.get(tuple(row[:-1]))
+                # Variables that are not used in the model end up with no
+                # value after the solve and get saved as blanks; we skip those.
+                if v is not None and row[-1] != "" and not v.fixed:
+                    set_prior_value(v, float(row[-1]))
+                    assigned += 1
+    return assigned
+
+
+def reload_prior_solution_from_values(instance, values_file):
+    """
+    Assign values to model variables from a variable_values.pickle file (see
+    save_solution_file()). This is faster than reading the csv files and
+    matches indexes exactly. Returns the number of variables assigned.
+    """
+    with open(values_file, "rb") as fh:
+        prior_values = pickle.load(fh)
+    return assign_variable_values(instance, prior_values)
+
+
+def get_variable_values(instance):
+    """Return a dict of variable values, keyed by variable name and index."""
+    return {
+        var.name: {k: v.value for k, v in var.items()}
+        for var in instance.component_objects(Var)
+    }
+
+
+def assign_variable_values(instance, prior_values):
+    """
+    Assign values from a dict created by get_variable_values() to the
+    matching variables of instance, skipping fixed variables. Returns the
+    number of variables assigned.
+    """
+    assigned = 0
+    for var in instance.component_objects(Var):
+        for k, val in prior_values.get(var.name, {}).items():
+            if val is not None and k in var:
+                v = var[k]
+                if not v.fixed:
+                    set_prior_value(v, val)
+                    assigned += 1
+    return assigned
+
+
+def set_prior_value(v, val):
+    if v.is_integer() or v.is_binary():
+        val = int(round(val))
+    # skip domain checks, because solvers may report values slightly outside
+    # the bounds
+    v.set_value(val, skip_validation=True)
+
+
+def load_warm_start(instance, source_dir):
+    """
+    Assign initial values to the model variables from a prior solution saved
+    in source_dir (e.g., the outputs directory of an earlier run or a sibling
+    scenario), to be passed to the solver as a MIP start. Uses
+    variable_values.pickle if available, otherwise the generic
+    <variable>.csv files.
+    """
+    if not os.path.isdir(source_dir):
+        raise IOError(f"Warm-start directory {source_dir} does not exist.")
+    values_file = os.path.join(source_dir, "variable_values.pickle")
+    if os.path.exists(values_file):
+        assigned = reload_prior_solution_from_values(instance, values_file)
+        source = values_file
+    else:
+        assigned = reload_prior_solution_from_csvs(instance, source_dir)
+        source = os.path.join(source_dir, "<variable>.csv")
+    total = sum(
+        1 for v in instance.component_data_objects(Var, active=True) if not v.fixed
+    )
+    instance.logger.info(
+        f"Warm start: assigned values to {assigned} of {total} variables from "
+        f"{source}."
+    )
+    if assigned == 0:
+        instance.logger.warning(
+            f"No variables in {source_dir} matched the current model; "
+            "the solver will start cold."
+        )
+    return assigned
 
 
 def iterate(m, depth=0):
@@ -454,6 +534,8 @@ def iterate(m, depth=0):
     # create or truncate the iteration tree
     if depth == 0:
         m.iteration_node = tuple()
+        # convergence status at each level, for checkpoints
+        m.iteration_converged = []
 
     if depth == len(m.iterate_modules):
         # asked to converge at the deepest level
@@ -477,18 +559,42 @@ def iterate(m, depth=0):
 
         j = 0
         converged = False
-        while not converged:
+        # if resuming from a checkpoint, pick up where it left off (see
+        # load_iteration_checkpoint())
+        resuming = False
+        resume = getattr(m, "iteration_resume", None)
+        if resume is not None:
+            node, resume_converged = resume
+            m.iteration_node = node[: depth + 1]
+            m.iteration_converged = resume_converged[: depth + 1]
+            if depth < len(node) - 1:
+                # the checkpoint was saved partway through this step, after
+                # pre_iterate() and before post_iterate() at this level
+                j = node[depth]
+                resuming = True
+            else:
+                # the checkpoint was saved after this step was finished
+                j = node[depth] + 1
+                converged = resume_converged[depth]
+                m.iteration_resume = None
+
+        while resuming or not converged:
             # take one step at the current level
             if m.options.max_iter is not None and j >= m.options.max_iter:
                 break
 
-            converged = True
-
-            # pre-iterate modules at this level
             m.iteration_number = j
             m.iteration_node = m.iteration_node[:depth] + (j,)
-            for module in current_modules:
-                converged = iterate_module_func(m, module, "pre_iterate", converged)
+            if resuming:
+                # pre_iterate() was already run for this step
+                converged = m.iteration_converged[depth]
+                resuming = False
+            else:
+                converged = True
+                # pre-iterate modules at this level
+                for module in current_modules:
+                    converged = iterate_module_func(m, module, "pre_iterate", converged)
+            m.iteration_converged = m.iteration_converged[:depth] + [converged]
 
             # converge the deeper-level modules, if any (inner loop)
             iterate(m, depth=depth + 1)
@@ -496,8 +602,18 @@ def iterate(m, depth=0):
             # post-iterate modules at this level
             m.iteration_number = j  # may have been changed during iterate()
             m.iteration_node = m.iteration_node[:depth] + (j,)
+            m.iteration_converged = m.iteration_converged[: depth + 1]
             for module in current_modules:
                 converged = iterate_module_func(m, module, "post_iterate", converged)
+            m.iteration_converged[depth] = converged
+
+            if m.options.iteration_checkpoint:
+                m.iterations_since_checkpoint = (
+                    getattr(m, "iterations_since_checkpoint", 0) + 1
+                )
+                if m.iterations_since_checkpoint >= m.options.iteration_checkpoint:
+                    save_iteration_checkpoint(m)
+                    m.iterations_since_checkpoint = 0
 
             j += 1
         if converged:
@@ -530,6 +646,92 @@ def iterate_module_func(m, module, func, converged):
         return converged and module_converged
 
 
+def iteration_checkpoint_file(m):
+    return os.path.join(m.options.outputs_dir, "iteration_checkpoint.pickle")
+
+
+def save_iteration_checkpoint(m):
+    """
+    Save the state of an iterated model after post_iterate(), so it can be
+    resumed with --resume if the run is interrupted. This includes the current
+    position in the iteration tree, the latest solution (variable values and
+    imported suffixes such as duals) and any state saved by modules that
+    define a save_iteration_state(m) function. Those modules should also
+    define load_iteration_state(m, state) to restore it.
+    """
+    module_state = {}
+    for module in m.get_modules():
+        if hasattr(module, "save_iteration_state"):
+            module_state[module.__name__] = module.save_iteration_state(m)
+    checkpoint = {
+        "iteration_node": m.iteration_node,
+        "iteration_converged": list(m.iteration_converged),
+        "module_state": module_state,
+        "variable_values": get_variable_values(m),
+        "suffix_values": {
+            suffix.name: {
+                (c.parent_component().name, c.index()): val for c, val in suffix.items()
+            }
+            for suffix in m.component_objects(Suffix)
+            if suffix.import_enabled()
+        },
+    }
+    # write to a temporary file first, so an interruption while saving
+    # doesn't destroy the previous checkpoint
+    checkpoint_file = iteration_checkpoint_file(m)
+    with open(checkpoint_file + ".tmp", "wb") as fh:
+        pickle.dump(checkpoint, fh, protocol=-1)
+    os.replace(checkpoint_file + ".tmp", checkpoint_file)
+
+
+def load_iteration_checkpoint(m):
+    """
+    Restore the state saved by save_iteration_checkpoint() into a newly
+    constructed instance and arrange for iterate() to continue after the last
+    completed iteration.
+    """
+    checkpoint_file = iteration_checkpoint_file(m)
+    if not os.path.exists(checkpoint_file):
+        m.logger.warning(
+            f"No iteration checkpoint found at {checkpoint_file}; "
+            "starting from the first iteration."
+        )
+        return
+    with open(checkpoint_file, "rb") as fh:
+        checkpoint = pickle.load(fh)
+
+    # restore module state first, since it may add components or indexes
+    # that the saved solution refers to
+    for module in m.get_modules():
+        if module.__name__ in checkpoint["module_state"]:
+            if not hasattr(module, "load_iteration_state"):
+                raise RuntimeError(
+                    f"Module {module.__name__} saved its state in the iteration "
+                    "checkpoint but does not define load_iteration_state()."
+                )
+            module.load_iteration_state(m, checkpoint["module_state"][module.__name__])
+    assign_variable_values(m, checkpoint["variable_values"])
+    for suffix_name, values in checkpoint["suffix_values"].items():
+        suffix = m.find_component(suffix_name)
+        if suffix is None:
+            continue
+        for (name, idx), val in values.items():
+            component = m.find_component(name)
+            if component is not None and idx in component:
+                suffix[component[idx]] = val
+    if hasattr(m, "clear_solution_values"):
+        m.clear_solution_values()
+
+    m.iteration_resume = (
+        checkpoint["iteration_node"],
+        checkpoint["iteration_converged"],
+    )
+    m.logger.info(
+        f"Resuming iteration after step {checkpoint['iteration_node']} "
+        f"from {checkpoint_file}."
+    )
+
+
 def define_arguments(argparser):
     # callback function to define model configuration arguments while the model is built
 
@@ -561,6 +763,31 @@ def define_arguments(argparser):
             models
         """,
     )
+    argparser.add_argument(
+        "--resume",
+        default=False,
+        action="store_true",
+        help="""
+            Resume an iterated model from the checkpoint saved in the outputs
+            directory by `--iteration-checkpoint` (e.g., after the job was
+            interrupted).
+        """,
+    )
+    argparser.add_argument(
+        "--iteration-checkpoint",
+        nargs="?",
+        type=int,
+        const=1,
+        default=None,
+        metavar="N",
+        help="""
+            Save a checkpoint (iteration_checkpoint.pickle in the outputs
+            directory) after every N iterations of an iterated model (default
+            is 1 if this flag is given without a value), so the run can be
+            continued with `--resume`. This saves all the variable values
+            each time, so it is off by default.
+        """,
+    )
 
     # scenario information
     argparser.add_argument(
@@ -680,6 +907,27 @@ def define_arguments(argparser):
             --symbolic-solver-labels.
         """,
     )
+    argparser.add_argument(
+        "--diagnose-infeasibility",
+        default=False,
+        action="store_true",
+        help="""
+            If the model is infeasible, search the constructed model for a
+            minimal set of conflicting constraints and report them (also saved
+            in conflicting_constraints.csv in the outputs directory). This
+            requires several more solves, but does not enlarge the model like
+            the switch_model.balancing.diagnose_infeasibility module.
+        """,
+    )
+    argparser.add_argument(
+        "--diagnosis-workers",
+        type=int,
+        default=1,
+        help="""
+            Number of parallel processes to use when testing constraint
+            families with --diagnose-infeasibility (default is 1).
+        """,
+    )
     argparser.add_argument(
         "--retrieve-cplex-mip-duals",
         dest="retrieve_cplex_mip_duals",
@@ -757,7 +1005,20 @@ def define_arguments(argparser):
         action="store_true",
         help="""
             Save solution file (results.pickle) after model is solved, to enable
-            reloading via `--reload-prior-solution`.
+            reloading via `--reload-prior-solution`. Also saves the variable
+            values in variable_values.pickle, for faster use with
+            `--warm-start-from`.
+        """,
+    )
+    argparser.add_argument(
+        "--warm-start-from",
+        default=None,
+        help="""
+            Outputs directory from a previous run (e.g., a similar scenario)
+            to use as a starting point for the solver. Variable values are read
+            from variable_values.pickle if available (see
+            `--save-solution-file`) or from the generic <variable>.csv files,
+            then passed to the solver as a MIP start if it accepts one.
         """,
     )
     argparser.add_argument(
@@ -1056,13 +1317,26 @@ def solve(model):
     if model.options.no_load_solution:
         solver_args["load_solutions"] = False
 
+    if model.options.warm_start_from is not None:
+        # use current variable values (set by load_warm_start()) as a MIP start
+        if model.solver.warm_start_capable():
+            solver_args["warmstart"] = True
+        elif not getattr(model, "warned_warm_start", False):
+            model.logger.warning(
+                f"Solver {model.options.solver} does not accept a "
+                "warm start; ignoring --warm-start-from."
+            )
+            model.warned_warm_start = True
+
     # Automatically send any defined suffixes to the solver
     # This is mostly obsolete: appsi_* solvers won't accept any suffixes but
     # automatically adapt to duals, slack and rc; cplex and gurobi accept
     # suffixes but will also produce duals automatically if the model has
     # a duals component. But we send these anyway in case that treatment doesn't
     # extend to more specialized suffixes like iis.
-    suffixes = [c.name for c in model.component_objects(ctype=Suffix)]
+    # (local names, in case the model contains sub-models, e.g., scenarios in
+    # a stochastic model)
+    suffixes = unique_list(c.local_name for c in model.component_objects(ctype=Suffix))
     if suffixes and not model.options.solver.startswith("appsi_"):
         # don't assign at all if no suffixes are defined, since appsi_highs
         # (and maybe others, but also maybe only old versions) want None
@@ -1117,6 +1391,7 @@ def solve(model):
                 )
             else:
                 new_err += "The solver may also report additional details if you specify `--stream-solver`."
+            run_infeasibility_diagnosis(model)
             raise RuntimeError(new_err)
 
         try:
@@ -1163,7 +1438,8 @@ def solve(model):
     # (note: in this case, results.solver.status may be SolverStatus.warning instead of
     # SolverStatus.error)
     infeasibility_message = (
-        "You can identify infeasible constraints by adding "
+        "You can identify a set of conflicting constraints by solving again "
+        "with the --diagnose-infeasibility flag, or by adding "
         "switch_model.balancing.diagnose_infeasibility to the module list and "
         "solving again."
         "\n\nAlternatively, if the solver can generate an irreducibly "
@@ -1184,6 +1460,7 @@ def solve(model):
             model.logger.error("\n".join(sorted(c.name for c in model.iis)))
         else:
             model.logger.error(rewrap("Model was infeasible. " + infeasibility_message))
+        run_infeasibility_diagnosis(model)
 
         # This infeasibility logging module could be nice, but it doesn't work
         # for my solvers and produces extraneous messages.
@@ -1259,6 +1536,7 @@ def solve(model):
 
             model.logger.error(infeasibility_message)
         model.logger.error("")  # add extra line to set info apart
+        run_infeasibility_diagnosis(model)
         raise RuntimeError("Solver failed to produce a solution.")
 
     # Report any warnings; these are written to stderr so users can find them in
@@ -1282,9 +1560,27 @@ def solve(model):
     # Cache a copy of the results object, to allow saving and restoring model
     # solutions later.
     model.last_results = results
+
+    # Discard any values calculated from the previous solution
+    if hasattr(model, "clear_solution_values"):
+        model.clear_solution_values()
+
     return results
 
 
+def run_infeasibility_diagnosis(model):
+    """
+    Search for conflicting constraints if the user requested that via
+    --diagnose-infeasibility.
+    """
+    if model.options.diagnose_infeasibility:
+        from switch_model.balancing.diagnose_infeasibility import (
+            diagnose_infeasibility,
+        )
+
+        diagnose_infeasibility(model)
+
+
 instance_number = 0
 instance_number_lock = threading.Lock()
 
@@ -1372,6 +1668,10 @@ def save_solution_file(instance, outdir):
         pickle.dump(instance.last_results, fh, protocol=-1)
     # remove the solution from the results object, to minimize long-term memory use
     instance.last_results.solution.clear()
+    # also save the variable values by name and index, which can be used to
+    # warm-start related models (see load_warm_start())
+    with open(os.path.join(outdir, "variable_values.pickle"), "wb") as fh:
+        pickle.dump(get_variable_values(instance), fh, protocol=-1)
 
 
 def query_yes_no(question, default="yes"):
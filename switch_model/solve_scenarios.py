@@ -23,14 +23,7 @@ import sys, os, time
 import argparse, shlex, socket, io, glob, multiprocessing
 from collections import OrderedDict
 
-from .utilities import _ArgumentParser
-
-# load the solve module from the same package as this module
-from . import solve
-
-# retrieve base options and command-line arguments
-option_file_args = solve.get_option_file_args()
-cmd_line_args = sys.argv[1:]
+from .basic_utilities import _ArgumentParser
 
 # Parse scenario-manager-related command-line arguments.
 # Other command-line arguments will be passed through to solve.py via
@@ -50,44 +43,19 @@ parser.add_argument("--scenario-list", default="scenarios.txt")
 parser.add_argument("--scenario-queue", default="scenario_queue")
 parser.add_argument("--job-id", default=None)
 
-# import pdb; pdb.set_trace()
-# get a namespace object with successfully parsed scenario manager arguments
-scenario_manager_args = parser.parse_known_args(args=option_file_args + cmd_line_args)[
-    0
-]
-# get lists of other arguments to pass through to standard solve routine
-scenario_option_file_args = parser.parse_known_args(args=option_file_args)[1]
-scenario_cmd_line_args = parser.parse_known_args(args=cmd_line_args)[1]
-
-# create a logger for this module's output based on default arguments
-logger = solve.make_logger(
-    solve.parse_pre_module_options(scenario_option_file_args + scenario_cmd_line_args)
-)
-
-requested_scenarios = scenario_manager_args.scenarios
-scenario_list_file = scenario_manager_args.scenario_list
-scenario_queue_dir = scenario_manager_args.scenario_queue
-
-# Get a unique task id.
-# This is used to requeue any scenario that this task was working on that got
-# interrupted. This is useful for running jobs on a pre-emptable cluster.
-# Note: in the past we have tried to get a persistent ID for each parallel task
-# by inspecting the cluster computing batch environment or looking at the parent's
-# pid (useful when launching several instances of `switch solve-scenarios` in
-# different terminals on a desktop). However, that only works if tasks are
-# restarted under similar conditions. It also fails if users run one job on a
-# cluster that launches several instances of solve-scenarios via a direct call to
-# "srun" or "mpirun". That launches many tasks that all end up thinking they're
-# the same task and race to reset the queue. So now it is up to the user to
-# specify a unique task id in an environment variable or command-line argument.
-# If a job id is not specified, interrupted jobs will not be restarted.
-job_id = scenario_manager_args.job_id
-if job_id is None:
-    job_id = os.environ.get("SWITCH_JOB_ID")
-if job_id is None:
-    # this cannot be running in parallel with another task with the same pid on
-    # the same host, so it's safe to requeue any jobs with this id
-    job_id = socket.gethostname() + "_" + str(os.getpid())
+# Options for this job. These are set by configure() when main() runs, rather
+# than when this module is imported, so other code (e.g., switch info and
+# worker processes) can import it without reading the options files.
+option_file_args = []
+cmd_line_args = []
+scenario_option_file_args = []
+scenario_cmd_line_args = []
+logger = None
+requested_scenarios = []
+scenario_list_file = "scenarios.txt"
+scenario_queue_dir = "scenario_queue"
+job_id = None
+running_scenarios_file = None
 
 # TODO: other options for requeueing jobs:
 # - use file locks on lockfiles: lock a
@@ -138,15 +106,73 @@ if job_id is None:
 # the DB), so users can restart scenarios by deleting the 'done' file.
 # But this requires synchronized clocks across workers...
 
-running_scenarios_file = os.path.join(scenario_queue_dir, job_id + "_running.txt")
-
 # list of scenarios currently being run by this job (always just one with the current code)
 running_scenarios = []
 
-# import pdb; pdb.set_trace()
+
+def configure(args=None):
+    """
+    Read scenario-manager options from options.txt and the command line (or
+    args, if provided) and store them in this module's globals.
+    """
+    global option_file_args, cmd_line_args
+    global scenario_option_file_args, scenario_cmd_line_args, logger
+    global requested_scenarios, scenario_list_file, scenario_queue_dir
+    global job_id, running_scenarios_file
+
+    # load the solve module from the same package as this module
+    from . import solve
+
+    # retrieve base options and command-line arguments
+    option_file_args = solve.get_option_file_args()
+    cmd_line_args = sys.argv[1:] if args is None else args
+
+    # get a namespace object with successfully parsed scenario manager arguments
+    scenario_manager_args = parser.parse_known_args(
+        args=option_file_args + cmd_line_args
+    )[0]
+    # get lists of other arguments to pass through to standard solve routine
+    scenario_option_file_args = parser.parse_known_args(args=option_file_args)[1]
+    scenario_cmd_line_args = parser.parse_known_args(args=cmd_line_args)[1]
+
+    # create a logger for this module's output based on default arguments
+    logger = solve.make_logger(
+        solve.parse_pre_module_options(
+            scenario_option_file_args + scenario_cmd_line_args
+        )
+    )
+
+    requested_scenarios = scenario_manager_args.scenarios
+    scenario_list_file = scenario_manager_args.scenario_list
+    scenario_queue_dir = scenario_manager_args.scenario_queue
+
+    # Get a unique task id.
+    # This is used to requeue any scenario that this task was working on that got
+    # interrupted. This is useful for running jobs on a pre-emptable cluster.
+    # Note: in the past we have tried to get a persistent ID for each parallel task
+    # by inspecting the cluster computing batch environment or looking at the parent's
+    # pid (useful when launching several instances of `switch solve-scenarios` in
+    # different terminals on a desktop). However, that only works if tasks are
+    # restarted under similar conditions. It also fails if users run one job on a
+    # cluster that launches several instances of solve-scenarios via a direct call to
+    # "srun" or "mpirun". That launches many tasks that all end up thinking they're
+    # the same task and race to reset the queue. So now it is up to the user to
+    # specify a unique task id in an environment variable or command-line argument.
+    # If a job id is not specified, interrupted jobs will not be restarted.
+    job_id = scenario_manager_args.job_id
+    if job_id is None:
+        job_id = os.environ.get("SWITCH_JOB_ID")
+    if job_id is None:
+        # this cannot be running in parallel with another task with the same pid on
+        # the same host, so it's safe to requeue any jobs with this id
+        job_id = socket.gethostname() + "_" + str(os.getpid())
+
+    running_scenarios_file = os.path.join(scenario_queue_dir, job_id + "_running.txt")
 
 
 def main(args=None):
+    configure(args)
+
     # make sure the scenario_queue_dir exists (marginally better to do this once
     # rather than every time we need to write a file there)
     try:
@@ -189,6 +215,8 @@ def run_scenario(args):
     # from https://stackoverflow.com/questions/30134297/python-multiprocessing-stdin-input
     # also see refs to stdin in https://docs.python.org/3/library/multiprocessing.html
     sys.stdin = os.fdopen(0)
+    from . import solve
+
     try:
         solve.main(args)
     except:
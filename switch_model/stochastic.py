@@ -0,0 +1,618 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+"""
+Solve two-stage stochastic versions of a Switch model.
+
+This is run via `switch stochastic`. It reads a scenario tree definition from a
+csv file (scenario_tree.csv by default), with one row per scenario and columns
+named scenario, probability and arguments. The arguments column gives the
+command-line arguments that distinguish each scenario from the base model,
+usually input aliases, e.g.,
+
+    scenario,probability,arguments
+    low_fuel,0.3,--input-alias fuel_cost.csv=fuel_cost_low.csv
+    mid_fuel,0.4,
+    high_fuel,0.3,--input-alias fuel_cost.csv=fuel_cost_high.csv
+
+Each scenario is built as a normal Switch instance, using the arguments from
+options.txt and the command line followed by the arguments for the scenario.
+The first-stage variables (--first-stage-vars, BuildGen, BuildStorageEnergy,
+BuildLocalTD and BuildTx by default) must take the same value in all scenarios;
+all other variables are chosen separately for each scenario.
+
+With `--stochastic-method ef` (the default), the scenario instances are added as
+blocks of a single extensive-form model, with constraints that make the
+first-stage variables equal across scenarios, and solved in one step.
+
+With `--stochastic-method ph`, the model is solved with progressive hedging
+(Rockafellar and Wets, 1991; Watson and Woodruff, 2011). Each scenario is solved
+separately with additional objective terms that penalize deviation from the
+probability-weighted average of the first-stage decisions, and the penalty
+weights are updated until all the scenarios agree on the first-stage decisions.
+The scenario subproblems are divided among --ph-workers processes. Each process
+constructs its scenarios once and keeps them (and their solver objects) for
+all iterations, so persistent solvers (e.g., appsi_highs or gurobi_persistent)
+only need to update the objective each time. By default, the proximal term is
+a piecewise-linear approximation of the usual quadratic term, which works with
+any solver; its tangent points are moved closer to the average as the
+scenarios converge. Use `--ph-proximal-term quadratic` for the exact quadratic
+term with solvers that accept quadratic objectives.
+
+Progressive hedging stops when the first-stage decisions agree to within
+--ph-tolerance (relative to their size), then fixes the first-stage decisions
+at their average (rounded for integer variables) and re-solves each
+scenario. The resulting expected cost is usually close to, but not exactly
+the same as, the extensive-form optimum; the gap shrinks with tighter
+tolerances, at the cost of more iterations. For example, the
+3zone_toy_stochastic_PySP example converges in about 50 iterations with the
+default settings, giving an expected cost within 1e-7 of the extensive form.
+
+Results for each scenario are written to a subdirectory of the outputs
+directory named after the scenario, and the probability-weighted total cost is
+written to total_cost.txt in the outputs directory.
+"""
+
+import csv
+import multiprocessing
+import os
+import shlex
+import sys
+import traceback
+
+import numpy as np
+from pyomo.environ import (
+    ConcreteModel,
+    Constraint,
+    ConstraintList,
+    NonNegativeReals,
+    Objective,
+    Param,
+    Set,
+    Var,
+    minimize,
+    value,
+)
+from pyomo.repn import generate_standard_repn
+
+from switch_model import solve
+from switch_model.utilities import StepTimer, _ArgumentParser, create_model
+
+
+def define_arguments(parser):
+    parser.add_argument(
+        "--scenario-tree",
+        default="scenario_tree.csv",
+        help="""
+            csv file with one row per scenario, with columns named scenario,
+            probability and arguments (default is scenario_tree.csv).
+        """,
+    )
+    parser.add_argument(
+        "--first-stage-vars",
+        nargs="+",
+        default=["BuildGen", "BuildStorageEnergy", "BuildLocalTD", "BuildTx"],
+        help="""
+            Variables that must be the same in all scenarios. Names that are
+            not defined in the model are ignored. Default is BuildGen,
+            BuildStorageEnergy, BuildLocalTD and BuildTx.
+        """,
+    )
+    parser.add_argument(
+        "--stochastic-method",
+        choices=["ef", "ph"],
+        default="ef",
+        help="""
+            Solve the extensive form in one step (ef, default) or use
+            progressive hedging (ph).
+        """,
+    )
+    parser.add_argument(
+        "--ph-workers",
+        type=int,
+        default=None,
+        help="""
+            Number of processes to use for progressive hedging subproblems
+            (default is one per scenario, up to the number of CPUs).
+        """,
+    )
+    parser.add_argument(
+        "--ph-max-iter",
+        type=int,
+        default=200,
+        help="Maximum number of progressive hedging iterations (default is 200).",
+    )
+    parser.add_argument(
+        "--ph-tolerance",
+        type=float,
+        default=1e-5,
+        help="""
+            Progressive hedging stops when the probability-weighted deviation
+            of first-stage decisions from their average, relative to the size
+            of the average, falls below this level (default is 1e-5).
+        """,
+    )
+    parser.add_argument(
+        "--ph-rho-factor",
+        type=float,
+        default=0.5,
+        help="""
+            Progressive hedging penalty weight (rho) for each first-stage
+            variable, as a multiple of that variable's cost coefficient in the
+            objective function (default is 0.5).
+        """,
+    )
+    parser.add_argument(
+        "--ph-proximal-term",
+        choices=["quadratic", "piecewise"],
+        default="piecewise",
+        help="""
+            Form of the progressive hedging proximal term: piecewise
+            (piecewise-linear approximation of the quadratic term, default),
+            which works with any solver, or quadratic, which requires a solver
+            that accepts quadratic objectives.
+        """,
+    )
+
+
+def main(args=None):
+    timer = StepTimer()
+    if args is None:
+        args = solve.get_option_file_args(extra_args=sys.argv[1:])
+
+    parser = _ArgumentParser(
+        allow_abbrev=False,
+        description="Solve a two-stage stochastic Switch model.",
+    )
+    define_arguments(parser)
+    options, base_args = parser.parse_known_args(args=args)
+    logger = solve.make_logger(solve.parse_pre_module_options(base_args))
+
+    # find the outputs directory for the whole run
+    out_parser = _ArgumentParser(allow_abbrev=False, add_help=False)
+    out_parser.add_argument("--outputs-dir", default="outputs")
+    outputs_dir = out_parser.parse_known_args(args=base_args)[0].outputs_dir
+
+    scenarios = read_scenario_tree(options.scenario_tree, base_args, outputs_dir)
+    logger.info(
+        f"Solving stochastic model with {len(scenarios)} scenarios using "
+        f"{'extensive form' if options.stochastic_method == 'ef' else 'progressive hedging'}."
+    )
+
+    if options.stochastic_method == "ef":
+        costs = solve_extensive_form(scenarios, options, logger)
+    else:
+        costs = solve_progressive_hedging(scenarios, options, logger)
+
+    expected_cost = sum(p * costs[s] for s, p, a in scenarios)
+    if not os.path.exists(outputs_dir):
+        os.makedirs(outputs_dir)
+    with open(os.path.join(outputs_dir, "total_cost.txt"), "w") as f:
+        f.write("{:.16g}\n".format(expected_cost))
+    with open(os.path.join(outputs_dir, "scenario_costs.csv"), "w", newline="") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(["scenario", "probability", "total_cost"])
+        w.writerows([s, p, costs[s]] for s, p, a in scenarios)
+
+    logger.info(f"Expected total cost: {expected_cost:,.2f}")
+    logger.info(f"Stochastic solution completed in {timer.total_time():.2f} s.")
+
+
+def read_scenario_tree(path, base_args, outputs_dir):
+    """
+    Return a list of (name, probability, args) tuples for the scenarios in the
+    scenario tree file, where args is the full argument list for that scenario.
+    """
+    scenarios = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            name = row["scenario"].strip()
+            args = (
+                base_args
+                + shlex.split(row.get("arguments") or "")
+                + ["--outputs-dir", os.path.join(outputs_dir, name)]
+            )
+            scenarios.append((name, float(row["probability"]), args))
+    if not scenarios:
+        raise ValueError(f"No scenarios were defined in {path}.")
+    total = sum(p for s, p, a in scenarios)
+    if abs(total - 1.0) > 1e-6:
+        raise ValueError(
+            f"Scenario probabilities in {path} add up to {total} instead of 1."
+        )
+    return scenarios
+
+
+def build_scenario(args, logger):
+    """Construct a Switch instance for one scenario."""
+    model = create_model(solve.get_module_list(args), args=args, logger=logger)
+    solve.add_extra_suffixes(model)
+    instance = model.load_inputs()
+    instance.pre_solve()
+    return instance
+
+
+def first_stage_vars(m, names):
+    """
+    Return a list of (key, var) for all the first-stage variables in m, where
+    key is a string that identifies the variable across scenarios.
+    """
+    result = []
+    for name in names:
+        component = getattr(m, name, None)
+        if component is None:
+            continue
+        for idx, v in component.items():
+            result.append((f"{name}[{idx}]", v))
+    return result
+
+
+def active_objective(m):
+    return next(m.component_data_objects(Objective, active=True))
+
+
+def report_scenario(m):
+    if not m.options.no_post_solve:
+        m.post_solve()
+
+
+def solve_extensive_form(scenarios, options, logger):
+    ef = ConcreteModel()
+    instances = []
+    for name, prob, args in scenarios:
+        logger.info(f"\nConstructing scenario {name}...")
+        m = build_scenario(args, logger)
+        instances.append((name, prob, m))
+        ef.add_component(name, m)
+
+    base_objectives = dict()
+    for name, prob, m in instances:
+        obj = base_objectives[name] = active_objective(m)
+        obj.deactivate()
+    ef.Expected_System_Cost = Objective(
+        expr=sum(prob * base_objectives[name].expr for name, prob, m in instances),
+        sense=minimize,
+    )
+
+    # non-anticipativity: first-stage decisions must match the first scenario
+    ef.Nonanticipativity = ConstraintList()
+    ref_name, ref_prob, ref_m = instances[0]
+    ref_vars = first_stage_vars(ref_m, options.first_stage_vars)
+    for name, prob, m in instances[1:]:
+        vars = first_stage_vars(m, options.first_stage_vars)
+        check_first_stage_keys(ref_name, ref_vars, name, vars)
+        for (k, ref_v), (_, v) in zip(ref_vars, vars):
+            ef.Nonanticipativity.add(v == ref_v)
+
+    # use the options and logger of the first scenario for the solve
+    ef.options = ref_m.options
+    ef.logger = logger
+    solve.solve(ef)
+
+    costs = {}
+    for name, prob, m in instances:
+        # detach the scenario so its components are reported under their
+        # normal names
+        ef.del_component(m)
+        m.clear_solution_values()
+        costs[name] = value(base_objectives[name].expr)
+        report_scenario(m)
+    return costs
+
+
+def check_first_stage_keys(ref_name, ref_vars, name, vars):
+    if [k for k, v in ref_vars] != [k for k, v in vars]:
+        raise ValueError(
+            f"Scenarios {ref_name} and {name} have different first-stage "
+            "variables. All scenarios must use the same first-stage indexes."
+        )
+
+
+class ScenarioGroup(object):
+    """
+    A set of scenario subproblems for progressive hedging, which are
+    constructed once and then re-solved with new penalty weights in each
+    iteration. This is used directly for serial solution or held by a worker
+    process (see run_worker()).
+    """
+
+    def __init__(self, scenarios, options):
+        self.logger = solve.make_logger(solve.parse_pre_module_options(scenarios[0][2]))
+        self.instances = dict()
+        self.vars = dict()
+        self.base_objectives = dict()
+        self.last_x = dict()
+        for name, prob, args in scenarios:
+            m = build_scenario(args, self.logger)
+            vars = first_stage_vars(m, options.first_stage_vars)
+            self.base_objectives[name] = add_ph_components(
+                m, [v for k, v in vars], options.ph_proximal_term
+            )
+            self.instances[name] = m
+            self.vars[name] = vars
+
+    def first_stage_keys(self):
+        return {s: [k for k, v in vars] for s, vars in self.vars.items()}
+
+    def cost_coefficients(self):
+        """
+        Return the objective-function coefficient of each first-stage
+        variable in each scenario.
+        """
+        result = dict()
+        for s, m in self.instances.items():
+            repn = generate_standard_repn(
+                self.base_objectives[s].expr, compute_values=True, quadratic=False
+            )
+            coefs = {
+                id(v): value(c) for v, c in zip(repn.linear_vars, repn.linear_coefs)
+            }
+            result[s] = np.array([coefs.get(id(v), 0.0) for k, v in self.vars[s]])
+        return result
+
+    def solve(self, weights, xbar, rho):
+        """
+        Solve each scenario with the specified penalty weights (dict of
+        arrays, by scenario), average first-stage decisions and rho, and
+        return a dict of (first-stage values, objective value), by scenario.
+        """
+        result = dict()
+        for s, m in self.instances.items():
+            for i in m.PH_FIRST_STAGE:
+                m.ph_weight[i] = weights[s][i]
+                m.ph_xbar[i] = xbar[i]
+                m.ph_rho[i] = rho[i]
+            if hasattr(m, "ph_tangent"):
+                # place the tangent points at multiples of the distance between
+                # this scenario's last decisions and the average, so the
+                # approximation gets finer as the scenarios converge
+                if s in self.last_x:
+                    dev = np.abs(self.last_x[s] - xbar)
+                else:
+                    dev = np.zeros(len(xbar))
+                scale = np.maximum(dev, ph_min_tangent * np.maximum(1.0, np.abs(xbar)))
+                for i in m.PH_FIRST_STAGE:
+                    for j, t in enumerate(ph_tangents):
+                        m.ph_tangent[i, j] = scale[i] * t
+            solve.solve(m)
+            x = np.array(
+                [0.0 if v.value is None else v.value for k, v in self.vars[s]],
+                dtype=float,
+            )
+            self.last_x[s] = x
+            result[s] = (x, value(self.base_objectives[s].expr))
+        return result
+
+    def finish(self, xbar):
+        """
+        Fix first-stage decisions at xbar, re-solve each scenario with its
+        original objective, report results and return the costs. Integer
+        and binary decisions are rounded to the nearest integer first.
+        """
+        costs = dict()
+        for s, m in self.instances.items():
+            for (k, v), x in zip(self.vars[s], xbar.tolist()):
+                v.fix(first_stage_value(v, x))
+            m.PH_Objective.deactivate()
+            self.base_objectives[s].activate()
+            solve.solve(m)
+            costs[s] = value(self.base_objectives[s].expr)
+            report_scenario(m)
+        return costs
+
+
+def first_stage_value(v, x):
+    """
+    Return the value at which to fix first-stage variable v, based on the
+    average decision x: rounded if v is integer or binary, and moved inside the
+    bounds of v, since averages may stray slightly outside them.
+    """
+    if v.is_integer():
+        x = round(x)
+    if v.lb is not None:
+        x = max(x, v.lb)
+    if v.ub is not None:
+        x = min(x, v.ub)
+    return x
+
+
+# deviations from the average where the piecewise-linear proximal term is
+# tangent to the quadratic, relative to the distance between each scenario's
+# previous decision and the average (but at least ph_min_tangent times the
+# size of the average, or 1)
+ph_tangents = [sign * 2.0**k for k in range(-6, 7) for sign in (1, -1)]
+ph_min_tangent = 1e-8
+
+
+def add_ph_components(m, vars, proximal_term):
+    """
+    Add progressive hedging weights and penalty terms for the first-stage
+    variables in `vars` to instance m, and switch to the augmented objective.
+    The weights, averages and rho are mutable Params, so the objective does
+    not change form between iterations. Returns the original objective.
+    """
+    m.PH_FIRST_STAGE = Set(initialize=range(len(vars)), ordered=True)
+    m.ph_weight = Param(m.PH_FIRST_STAGE, mutable=True, initialize=0.0)
+    m.ph_xbar = Param(m.PH_FIRST_STAGE, mutable=True, initialize=0.0)
+    m.ph_rho = Param(m.PH_FIRST_STAGE, mutable=True, initialize=0.0)
+    base = active_objective(m)
+    base.deactivate()
+    if proximal_term == "quadratic":
+        proximal = sum(
+            0.5 * m.ph_rho[i] * (vars[i] - m.ph_xbar[i]) ** 2 for i in m.PH_FIRST_STAGE
+        )
+    else:
+        # outer approximation of the quadratic term, using tangent lines at
+        # the deviations in ph_tangent (set before each solve)
+        m.PH_TANGENTS = Set(initialize=range(len(ph_tangents)), ordered=True)
+        m.ph_tangent = Param(
+            m.PH_FIRST_STAGE, m.PH_TANGENTS, mutable=True, initialize=0.0
+        )
+        m.PHProximalCost = Var(m.PH_FIRST_STAGE, within=NonNegativeReals)
+        m.PH_Proximal_Tangents = Constraint(
+            m.PH_FIRST_STAGE,
+            m.PH_TANGENTS,
+            rule=lambda m, i, j: m.PHProximalCost[i]
+            >= 0.5
+            * m.ph_rho[i]
+            * m.ph_tangent[i, j]
+            * (2 * (vars[i] - m.ph_xbar[i]) - m.ph_tangent[i, j]),
+        )
+        proximal = sum(m.PHProximalCost[i] for i in m.PH_FIRST_STAGE)
+    m.PH_Objective = Objective(
+        expr=base.expr
+        + sum(m.ph_weight[i] * vars[i] for i in m.PH_FIRST_STAGE)
+        + proximal,
+        sense=minimize,
+    )
+    return base
+
+
+def run_worker(conn, scenarios, options):
+    """
+    Construct a ScenarioGroup in a worker process, then run the methods
+    requested through `conn` until told to stop (by receiving None).
+    """
+    try:
+        group = ScenarioGroup(scenarios, options)
+        conn.send(("ok", None))
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            method, args = request
+            conn.send(("ok", getattr(group, method)(*args)))
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+class LocalWorker(object):
+    """Run a ScenarioGroup in the current process."""
+
+    def __init__(self, scenarios, options):
+        self.group = ScenarioGroup(scenarios, options)
+
+    def send(self, method, *args):
+        self.response = getattr(self.group, method)(*args)
+
+    def receive(self):
+        return self.response
+
+    def close(self):
+        pass
+
+
+class ProcessWorker(object):
+    """Run a ScenarioGroup in a separate process."""
+
+    def __init__(self, scenarios, options):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=run_worker, args=(child_conn, scenarios, options)
+        )
+        self.process.start()
+        child_conn.close()
+        self.pending = True  # waiting for construction
+
+    def send(self, method, *args):
+        if self.pending:
+            self.receive()
+        self.conn.send((method, args))
+        self.pending = True
+
+    def receive(self):
+        status, response = self.conn.recv()
+        self.pending = False
+        if status == "error":
+            raise RuntimeError(
+                "Error in progressive hedging worker process:\n" + response
+            )
+        return response
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join()
+
+
+def call_workers(workers, method, *args):
+    """Call method on all workers in parallel and merge the resulting dicts."""
+    for w in workers:
+        w.send(method, *args)
+    result = dict()
+    for w in workers:
+        result.update(w.receive())
+    return result
+
+
+def solve_progressive_hedging(scenarios, options, logger):
+    n_workers = options.ph_workers
+    if n_workers is None:
+        n_workers = min(len(scenarios), multiprocessing.cpu_count())
+    n_workers = max(1, min(n_workers, len(scenarios)))
+    prob = {s: p for s, p, a in scenarios}
+    names = [s for s, p, a in scenarios]
+
+    # assign scenarios to workers round-robin
+    groups = [scenarios[i::n_workers] for i in range(n_workers)]
+    logger.info(f"Constructing scenarios in {n_workers} process(es)...")
+    if n_workers == 1:
+        workers = [LocalWorker(groups[0], options)]
+    else:
+        workers = [ProcessWorker(g, options) for g in groups]
+
+    try:
+        keys = call_workers(workers, "first_stage_keys")
+        for s in names[1:]:
+            if keys[s] != keys[names[0]]:
+                raise ValueError(
+                    f"Scenarios {names[0]} and {s} have different first-stage "
+                    "variables. All scenarios must use the same first-stage indexes."
+                )
+        n = len(keys[names[0]])
+
+        # cost-proportional rho (Watson and Woodruff, 2011)
+        coefs = call_workers(workers, "cost_coefficients")
+        cost = sum(prob[s] * np.abs(coefs[s]) for s in names)
+        rho = options.ph_rho_factor * np.where(cost > 0, cost, 1.0)
+
+        # iteration 0: solve each scenario independently
+        weights = {s: np.zeros(n) for s in names}
+        xbar = np.zeros(n)
+        no_rho = np.zeros(n)
+        results = call_workers(workers, "solve", weights, xbar, no_rho)
+        for k in range(1, options.ph_max_iter + 1):
+            xbar = sum(prob[s] * results[s][0] for s in names)
+            deviation = sum(prob[s] * np.abs(results[s][0] - xbar) for s in names)
+            convergence = deviation.sum() / max(1.0, np.abs(xbar).sum())
+            expected = sum(prob[s] * results[s][1] for s in names)
+            logger.info(
+                f"Progressive hedging iteration {k - 1}: convergence "
+                f"{convergence:.3g}, expected cost {expected:,.2f}"
+            )
+            if convergence <= options.ph_tolerance:
+                break
+            for s in names:
+                weights[s] = weights[s] + rho * (results[s][0] - xbar)
+            results = call_workers(workers, "solve", weights, xbar, rho)
+        else:
+            xbar = sum(prob[s] * results[s][0] for s in names)
+            logger.warning(
+                f"Progressive hedging did not converge in {options.ph_max_iter} "
+                "iterations; fixing first-stage decisions at their average values."
+            )
+
+        # final solution with first-stage decisions fixed at xbar
+        costs = call_workers(workers, "finish", xbar)
+    finally:
+        for w in workers:
+            w.close()
+    return costs
+
+
+if __name__ == "__main__":
+    main()
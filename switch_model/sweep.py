@@ -0,0 +1,336 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+"""
+Solve a Switch model repeatedly with different parameter values.
+
+This is run via `switch sweep`. It constructs the model instance once, with
+the swept parameters declared mutable, then for each point in the sweep it
+assigns the new parameter values in place, re-solves the same instance and
+writes the results for that point to a subdirectory of the outputs directory
+named after the point. Persistent solvers (e.g., appsi_highs or
+gurobi_persistent) keep their internal model between points, so only the
+changed coefficients are sent to the solver and the previous solution can be
+used as a starting point.
+
+The sweep is defined by a csv file (sweep.csv by default) with columns named
+point, parameter, index, value and (optionally) multiplier, e.g.,
+
+    point,parameter,index,value,multiplier
+    cap_low,carbon_cap_tco2_per_yr,2030,10000,
+    cap_high,carbon_cap_tco2_per_yr,2030,30000,
+    fuel_plus_20,fuel_cost,,,1.2
+
+Each point can set any number of parameters. The index column gives the index
+of the parameter to change, with multiple dimensions separated by spaces (e.g.,
+`NorthCentral Gas 2020`), or blank to change all indexes of the parameter (or a
+scalar parameter). Either value or multiplier should be given; multiplier
+scales the value from the original inputs. Parameters that are not mentioned
+for a point keep the values from the original inputs.
+
+Each swept parameter is replaced by a mutable parameter with the same name,
+index and domain, which gets its values from the input data or from the
+original declaration (kept as sweep_original_<name>). Parameters calculated
+from the swept parameters by an initialize or default rule (e.g.,
+gen_capital_cost_annual, which depends on interest_rate, or the discount
+factors, which depend on discount_rate) keep the values calculated from the
+original inputs, so the sweep should change parameters that are used directly
+in the model's expressions and constraints (e.g., fuel costs, loads or policy
+limits). A warning is shown for swept parameters that are not used that way.
+Rules that use a swept parameter to decide whether to create a
+component (e.g., an infinite carbon cap means no cap constraint) also only see
+the original values, so give those parameters finite values in the inputs.
+
+With --sweep-workers N, the points are divided among N processes forked from
+the constructed instance, so the model is still only constructed once. This
+requires the "fork" start method for multiprocessing, which is not available
+on Windows.
+"""
+
+import csv
+import multiprocessing
+import os
+import sys
+
+from pyomo.core.expr import identify_mutable_parameters
+from pyomo.environ import Constraint, Objective, Param, value
+
+from switch_model import solve
+from switch_model.utilities import StepTimer, _ArgumentParser, create_model
+
+
+def define_arguments(parser):
+    parser.add_argument(
+        "--sweep-file",
+        default="sweep.csv",
+        help="""
+            csv file defining the parameter values to use for each point in
+            the sweep, with columns named point, parameter, index, value and
+            multiplier (default is sweep.csv).
+        """,
+    )
+    parser.add_argument(
+        "--sweep-workers",
+        type=int,
+        default=1,
+        help="""
+            Number of processes to use for solving sweep points in parallel
+            (default is 1).
+        """,
+    )
+
+
+def main(args=None):
+    timer = StepTimer()
+    if args is None:
+        args = solve.get_option_file_args(extra_args=sys.argv[1:])
+
+    parser = _ArgumentParser(
+        allow_abbrev=False,
+        description="Solve a Switch model for a series of parameter values.",
+    )
+    define_arguments(parser)
+    options, model_args = parser.parse_known_args(args=args)
+    logger = solve.make_logger(solve.parse_pre_module_options(model_args))
+
+    points = read_sweep_file(options.sweep_file)
+    param_names = []
+    for name, settings in points:
+        for p, idx, val, mult in settings:
+            if p not in param_names:
+                param_names.append(p)
+    logger.info(
+        f"Sweeping {len(points)} points over {', '.join(param_names)} "
+        f"(from {options.sweep_file})."
+    )
+
+    model = create_model(
+        solve.get_module_list(model_args), args=model_args, logger=logger
+    )
+    solve.add_extra_suffixes(model)
+    make_params_mutable(model, param_names)
+    logger.info(f"Model defined in {timer.step_time():.2f} s.")
+
+    logger.info("\nLoading inputs...")
+    instance = model.load_inputs()
+    instance.pre_solve()
+    prepare_sweep(instance, param_names)
+    logger.info(f"Constructed model instance in {timer.step_time():.2f} s.")
+
+    outputs_dir = instance.options.outputs_dir
+    n_workers = max(1, min(options.sweep_workers, len(points)))
+    if n_workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        logger.warning(
+            "Parallel sweeps require the 'fork' start method for "
+            "multiprocessing, which is not available on this platform. "
+            "Solving sweep points serially."
+        )
+        n_workers = 1
+
+    if n_workers == 1:
+        results = [solve_point(instance, point, outputs_dir) for point in points]
+    else:
+        # worker processes inherit the constructed instance when they fork
+        global _instance, _outputs_dir
+        _instance, _outputs_dir = instance, outputs_dir
+        ctx = multiprocessing.get_context("fork")
+        with ctx.Pool(n_workers) as pool:
+            results = pool.map(_solve_point_in_worker, points, chunksize=1)
+
+    if not os.path.exists(outputs_dir):
+        os.makedirs(outputs_dir)
+    with open(os.path.join(outputs_dir, "sweep_summary.csv"), "w", newline="") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(["point", "termination_condition", "total_cost"])
+        w.writerows(results)
+
+    logger.info(f"\nSweep completed in {timer.total_time():.2f} s.")
+
+
+def read_sweep_file(path):
+    """
+    Return a list of (point, settings) tuples from the sweep file, where
+    settings is a list of (parameter, index, value, multiplier) tuples. index
+    is None to set all indexes, and one of value or multiplier is None.
+    """
+    points = dict()
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            point = row["point"].strip()
+            param = row["parameter"].strip()
+            index = (row.get("index") or "").strip() or None
+            val = (row.get("value") or "").strip()
+            mult = (row.get("multiplier") or "").strip()
+            if bool(val) == bool(mult):
+                raise ValueError(
+                    f"Row for {param} in point {point} of {path} must have "
+                    "either a value or a multiplier."
+                )
+            points.setdefault(point, []).append(
+                (
+                    param,
+                    index,
+                    float(val) if val else None,
+                    float(mult) if mult else None,
+                )
+            )
+    if not points:
+        raise ValueError(f"No sweep points were defined in {path}.")
+    return list(points.items())
+
+
+def make_params_mutable(model, param_names):
+    """
+    Replace the named Params of abstract model `model` with mutable Params
+    that have the same name, index and domain. Each original Param is kept as
+    sweep_original_<name>, just before its replacement, so its initialize and
+    default rules still run; the replacement takes its values from there,
+    unless they are given in the input data.
+    """
+    components = list(model.component_objects(descend_into=False))
+    position = {id(c): i for i, c in enumerate(components)}
+    swept = []
+    for name in param_names:
+        p = getattr(model, name, None)
+        if p is None or p.ctype is not Param:
+            raise ValueError(f"{name} is not a parameter of this model.")
+        swept.append(p)
+    if all(p.mutable for p in swept):
+        return
+
+    # Components are constructed in the order they were added, so remove
+    # everything from the first swept Param onward and add it back with the
+    # replacements in place.
+    first = min(position[id(p)] for p in swept)
+    for c in components[first:]:
+        model.del_component(c)
+    for c in components[first:]:
+        name = c.local_name
+        if name in param_names and not c.mutable:
+            model.add_component(f"sweep_original_{name}", c)
+            model.add_component(name, mutable_copy(c, f"sweep_original_{name}"))
+        else:
+            model.add_component(name, c)
+
+
+def mutable_copy(p, original_name):
+    """
+    Return a mutable Param with the same index and domain as Param `p`, whose
+    values are copied from the component called `original_name` (i.e., `p`)
+    in the instance.
+    """
+    if p.is_indexed():
+        return Param(
+            p.index_set(),
+            within=p.domain,
+            mutable=True,
+            initialize=lambda m: {
+                k: value(v) for k, v in getattr(m, original_name).items()
+            },
+            doc=p.doc,
+        )
+    else:
+        # a scalar can't be initialized without a value, so the original is
+        # only consulted if no value is given in the input data
+        return Param(
+            within=p.domain,
+            mutable=True,
+            default=lambda m: value(getattr(m, original_name)),
+            doc=p.doc,
+        )
+
+
+def prepare_sweep(m, param_names):
+    """
+    Record the original values of the swept parameters and build lookup
+    tables for the indexes named in the sweep file.
+    """
+    m.sweep_base_values = dict()
+    m.sweep_index_names = dict()
+    for name in param_names:
+        p = getattr(m, name)
+        m.sweep_base_values[name] = {k: value(p[k]) for k in p}
+        m.sweep_index_names[name] = {index_name(k): k for k in p}
+
+    # warn about parameters that are only used to calculate other ones
+    used = set()
+    for c in m.component_data_objects((Constraint, Objective), active=True):
+        used.update(
+            p.parent_component().local_name for p in identify_mutable_parameters(c.expr)
+        )
+    for name in param_names:
+        if name not in used:
+            m.logger.warning(
+                f"{name} is not used directly in any constraint or "
+                "objective, so changing it in the sweep will not affect the "
+                "results. Sweep the parameters calculated from it instead."
+            )
+
+
+def index_name(k):
+    if k is None:
+        return None
+    elif type(k) is tuple:
+        return " ".join(str(i) for i in k)
+    else:
+        return str(k)
+
+
+def apply_point(m, settings):
+    """
+    Assign parameter values for one sweep point, starting from the original
+    values.
+    """
+    for name, base in m.sweep_base_values.items():
+        getattr(m, name).store_values(base)
+    for name, index, val, mult in settings:
+        p = getattr(m, name)
+        base = m.sweep_base_values[name]
+        if index is None:
+            keys = list(base)
+        else:
+            try:
+                keys = [m.sweep_index_names[name][index]]
+            except KeyError:
+                raise ValueError(f"{index} is not a valid index for {name}.")
+        for k in keys:
+            p[k] = val if mult is None else base[k] * mult
+
+
+def solve_point(m, point, outputs_dir):
+    """Solve the model for one sweep point and save the results."""
+    name, settings = point
+    timer = StepTimer()
+    m.logger.info(f"\nSolving sweep point {name}...")
+    apply_point(m, settings)
+    m.options.outputs_dir = os.path.join(outputs_dir, name)
+    if not os.path.exists(m.options.outputs_dir):
+        os.makedirs(m.options.outputs_dir)
+
+    if m.iterate_modules:
+        solve.iterate(m)
+        condition = "iterated"
+    else:
+        results = solve.solve(m)
+        condition = str(results.solver.termination_condition)
+    if not m.options.no_post_solve:
+        m.post_solve()
+    total_cost = value(next(m.component_data_objects(Objective, active=True)))
+    m.logger.info(
+        f"Sweep point {name} completed in {timer.step_time():.2f} s; "
+        f"total cost {total_cost:,.2f}."
+    )
+    return [name, condition, total_cost]
+
+
+# constructed instance and outputs directory, inherited by forked workers
+_instance = None
+_outputs_dir = None
+
+
+def _solve_point_in_worker(point):
+    return solve_point(_instance, point, _outputs_dir)
+
+
+if __name__ == "__main__":
+    main()
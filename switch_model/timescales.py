@@ -140,6 +140,35 @@ def define_components(mod):
     d, derived from tp_date. Will be equivalent to TPS_IN_TS[ts in
     TIMESERIES] if tp_date is not provided.
 
+    Chronology fields, used to link storage levels between representative
+    timeseries (e.g., clustered days). These are only populated if
+    chronology.csv is provided.
+
+    CHRONOLOGICAL_DAYS: ordered set of all the actual days (or other blocks
+    of time) in a year, in chronological order, each of which is represented
+    by one of the timeseries. Modules that track storage (storage, hydro
+    system) use one state variable per chronological day to carry energy
+    from day to day, so that long-duration storage can shift energy between
+    representative days.
+
+    chrono_day_ts[d]: the timeseries that represents chronological day d.
+    Each chronological day should have the same duration as its timeseries.
+    Every timeseries named here must be defined in timeseries.csv, and the
+    number of days assigned to each timeseries in a period must be
+    proportional to its ts_scale_to_period (equal to it if the chronology
+    covers the whole period).
+
+    LINKED_TIMESERIES: the set of timeseries used to represent chronological
+    days. Storage levels in these timeseries are tracked relative to their
+    starting level instead of wrapping around from the end to the start.
+
+    CHRONOLOGICAL_DAYS_IN_PERIOD[p]: the ordered set of chronological days
+    represented by timeseries in period p.
+
+    chrono_day_next[d]: the chronological day after d in the same period. The
+    days of each period are treated circularly, so the day after the last day
+    is the first day.
+
     EXAMPLES
 
     These hypothetical examples illustrate differential weighting of
@@ -388,27 +417,29 @@ def define_components(mod):
         initialize=lambda m, t: m.TPS_IN_TS[m.tp_ts[t]].prevw(t),
     )
 
-    def validate_time_weights_rule(m, p):
-        hours_in_period = sum(m.tp_weight[t] for t in m.TPS_IN_PERIOD[p])
+    def validate_time_weights_rule(m):
+        # check all periods in one pass, so all the errors are reported at once
+        hours_in_period = {p: 0.0 for p in m.PERIODS}
+        for t in m.TIMEPOINTS:
+            hours_in_period[m.tp_period[t]] += m.tp_weight[t]
         tol = 0.01
-        if (
-            hours_in_period > (1 + tol) * m.period_length_hours[p]
-            or hours_in_period < (1 - tol) * m.period_length_hours[p]
-        ):
-            print(
-                (
-                    "validate_time_weights_rule failed for period "
-                    + "'{period:.0f}'. Expected {period_h:0.2f}, based on "
-                    + "length in years, but the sum of timepoint weights "
-                    + "is {ds_h:0.2f}.\n"
-                ).format(
-                    period=p, period_h=m.period_length_hours[p], ds_h=hours_in_period
-                )
-            )
+        errors = [
+            (
+                "validate_time_weights_rule failed for period "
+                + "'{period:.0f}'. Expected {period_h:0.2f}, based on "
+                + "length in years, but the sum of timepoint weights "
+                + "is {ds_h:0.2f}."
+            ).format(period=p, period_h=m.period_length_hours[p], ds_h=hours)
+            for p, hours in hours_in_period.items()
+            if hours > (1 + tol) * m.period_length_hours[p]
+            or hours < (1 - tol) * m.period_length_hours[p]
+        ]
+        if errors:
+            print("\n".join(errors) + "\n")
             return 0
         return 1
 
-    mod.validate_time_weights = BuildCheck(mod.PERIODS, rule=validate_time_weights_rule)
+    mod.validate_time_weights = BuildCheck(rule=validate_time_weights_rule)
 
     #############
     # date-related code
@@ -469,6 +500,101 @@ def define_components(mod):
     # End date code
     ##########
 
+    #############
+    # chronology of representative timeseries (used to link storage levels)
+    mod.CHRONOLOGICAL_DAYS = Set(dimen=1, ordered=True)
+    mod.chrono_day_ts = Param(mod.CHRONOLOGICAL_DAYS, within=Any)
+
+    def validate_chronology_timeseries_rule(m):
+        unknown = unique_list(
+            ts for ts in m.chrono_day_ts.values() if ts not in m.TIMESERIES
+        )
+        if unknown:
+            print(
+                "validate_chronology_timeseries_rule failed: chronology.csv "
+                "refers to timeseries that are not in timeseries.csv: "
+                "{}.".format(", ".join(str(ts) for ts in unknown))
+            )
+            return False
+        return True
+
+    mod.validate_chronology_timeseries = BuildCheck(
+        rule=validate_chronology_timeseries_rule
+    )
+
+    mod.LINKED_TIMESERIES = Set(
+        dimen=1,
+        within=mod.TIMESERIES,
+        initialize=lambda m: unique_list(
+            m.chrono_day_ts[d] for d in m.CHRONOLOGICAL_DAYS
+        ),
+    )
+
+    def CHRONOLOGICAL_DAYS_IN_PERIOD_init(m, p):
+        try:
+            dd = m.CHRONOLOGICAL_DAYS_IN_PERIOD_dict
+        except AttributeError:
+            dd = m.CHRONOLOGICAL_DAYS_IN_PERIOD_dict = {_p: [] for _p in m.PERIODS}
+            for d in m.CHRONOLOGICAL_DAYS:
+                dd[m.ts_period[m.chrono_day_ts[d]]].append(d)
+        return dd.pop(p)  # use pop to free memory as we go
+
+    mod.CHRONOLOGICAL_DAYS_IN_PERIOD = Set(
+        mod.PERIODS,
+        dimen=1,
+        ordered=True,
+        initialize=CHRONOLOGICAL_DAYS_IN_PERIOD_init,
+    )
+    mod.chrono_day_next = Param(
+        mod.CHRONOLOGICAL_DAYS,
+        within=mod.CHRONOLOGICAL_DAYS,
+        initialize=lambda m, d: m.CHRONOLOGICAL_DAYS_IN_PERIOD[
+            m.ts_period[m.chrono_day_ts[d]]
+        ].nextw(d),
+    )
+
+    def validate_chronology_weights_rule(m, p):
+        # Each chronological day stands for one occurrence of its timeseries,
+        # so the days assigned to each timeseries in a period must be in
+        # proportion to ts_scale_to_period. The chronology may cover the
+        # whole period or a single representative year, so only the ratios
+        # need to agree.
+        tol = 0.01
+        days = m.CHRONOLOGICAL_DAYS_IN_PERIOD[p]
+        if len(days) == 0:
+            return True
+        count = {ts: 0 for ts in m.TS_IN_PERIOD[p]}
+        for d in days:
+            count[m.chrono_day_ts[d]] += 1
+        ratio = {ts: count[ts] / m.ts_scale_to_period[ts] for ts in count}
+        expected = len(days) / sum(m.ts_scale_to_period[ts] for ts in count)
+        bad = [ts for ts in count if abs(ratio[ts] - expected) > tol * expected]
+        if bad:
+            print(
+                (
+                    "validate_chronology_weights_rule failed for period "
+                    "'{p:.0f}'. The number of chronological days for each "
+                    "timeseries should be proportional to ts_scale_to_period, "
+                    "but chronology.csv has {detail}."
+                ).format(
+                    p=p,
+                    detail=", ".join(
+                        "{} days for {} (ts_scale_to_period={})".format(
+                            count[ts], ts, m.ts_scale_to_period[ts]
+                        )
+                        for ts in bad
+                    ),
+                )
+            )
+            return False
+        return True
+
+    mod.validate_chronology_weights = BuildCheck(
+        mod.PERIODS, rule=validate_chronology_weights_rule
+    )
+    # End chronology code
+    ##########
+
     def validate_period_lengths_rule(m, p):
         tol = 0.01
         if p != m.PERIODS.last():
@@ -512,6 +638,15 @@ def load_inputs(mod, switch_data, inputs_dir):
     timepoints.csv
         timepoint_id, timestamp, timeseries, tp_date*
 
+    The optional chronology.csv file lists every actual day (or other block
+    of time) in the study years, in chronological order, with the timeseries
+    that represents it, e.g., from clustering. If provided, storage levels
+    are carried from day to day through the chronology instead of returning
+    to their starting level at the end of each of these timeseries.
+
+    chronology.csv*
+        CHRONOLOGICAL_DAY, timeseries
+
     """
     # Include select in each load() function so that it will check out column
     # names, be indifferent to column order, and throw an error message if
@@ -537,3 +672,10 @@ def load_inputs(mod, switch_data, inputs_dir):
         index=mod.TIMEPOINTS,
         param=(mod.tp_timestamp, mod.tp_ts, mod.tp_date),
     )
+    switch_data.load_aug(
+        filename=os.path.join(inputs_dir, "chronology.csv"),
+        optional=True,
+        select=("CHRONOLOGICAL_DAY", "timeseries"),
+        index=mod.CHRONOLOGICAL_DAYS,
+        param=(mod.chrono_day_ts,),
+    )
@@ -13,7 +13,6 @@ from __future__ import division
 
 import os
 
-import pandas as pd
 from pyomo.environ import *
 
 dependencies = (
@@ -260,6 +259,8 @@ def post_solve(instance, outdir):
     number of columns.
 
     """
+    import pandas as pd
+
     wide_dat = []
     for z, t in instance.ZONE_TIMEPOINTS:
         record = {"load_zone": z, "timestamp": t}
@@ -8,7 +8,6 @@ Defines transmission build-outs.
 import logging
 import os
 
-import pandas as pd
 from pyomo.environ import *
 
 from switch_model.financials import capital_recovery_factor as crf
@@ -339,6 +338,8 @@ def load_inputs(mod, switch_data, inputs_dir):
 
 
 def post_solve(instance, outdir):
+    import pandas as pd
+
     mod = instance
     normalized_dat = [
         {
@@ -0,0 +1,371 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+"""
+Adds DC power flow limits to the transport model of transmission.
+
+The transport model (switch_model.transmission.transport.dispatch) lets power
+be routed along any path, subject only to the capacity of each line. In a
+meshed network, power actually divides between parallel paths according to
+the reactance of each line. This module uses a linear (DC) power flow
+approximation to calculate the physical flow on each line from the net
+injection in each load zone, and limits those flows to the available capacity
+of each line.
+
+The physical flow on line tx (from trans_lz1 to trans_lz2) in timepoint t is
+sum(ptdf[tx, z] * injection[z, t] for z in LOAD_ZONES), where the injection in
+each zone is the net power it sends to the transmission network
+(-TXPowerNet[z, t]) and ptdf is the matrix of power transfer distribution
+factors. The first zone in each connected part of the network is used as the
+reference (slack) zone, which also absorbs transmission losses. Line
+reactances are treated as fixed, even when line capacity can be expanded.
+
+A constraint for every line and timepoint would be very large, and only a few
+of these usually bind. So limits are constructed at first only for the lines
+listed in dc_flow_binding_lines.csv, if provided (e.g., lines that were
+binding in previous studies). This module is added to the iteration list (if
+not already there), and after each solve, post_iterate() calculates the flows
+on all lines in all timepoints and adds limits for any line and timepoint
+where the flow exceeds the capacity of the line, until there are none. The
+flows are calculated with a sparse factorization of the network susceptance
+matrix, which is computed once, and rows of the ptdf matrix are only
+calculated for lines that need limits. This requires the scipy package.
+
+Lines whose flow limits bound in the final solution are saved in
+dc_flow_binding_lines.csv in the outputs directory, which can be copied to
+the inputs directory to speed up later studies of similar scenarios.
+"""
+
+import os
+
+import numpy as np
+from pyomo.environ import *
+
+from switch_model.reporting import write_table
+
+dependencies = (
+    "switch_model.timescales",
+    "switch_model.balancing.load_zones",
+    "switch_model.financials",
+    "switch_model.transmission.transport.build",
+    "switch_model.transmission.transport.dispatch",
+)
+
+
+def define_arguments(argparser):
+    group = argparser.add_argument_group(__name__)
+    group.add_argument(
+        "--dc-flow-enforce-all",
+        default=False,
+        dest="dc_flow_enforce_all",
+        action="store_true",
+        help=(
+            "Construct DC power flow limits for all lines in all timepoints "
+            "from the start, instead of adding them as needed."
+        ),
+    )
+    group.add_argument(
+        "--dc-flow-tolerance",
+        default=1e-4,
+        type=float,
+        dest="dc_flow_tolerance",
+        help=(
+            "Amount (in MW) by which a line's DC power flow can exceed its "
+            "capacity before a limit is added for it (default is 1e-4)."
+        ),
+    )
+
+
+def define_components(mod):
+    """
+    trans_reactance[tx in TRANSMISSION_LINES] is the series reactance of each
+    transmission line, in any consistent units (only the ratios between lines
+    matter). This is optional and defaults to trans_length_km, i.e., equal
+    reactance per km on all lines.
+
+    DC_FLOW_BINDING_LINES is an optional set of transmission lines whose DC
+    power flow limits should be enforced in every timepoint from the start.
+
+    DC_FLOW_ENFORCED_LINE_TPS is the set of (tx, t) where DC power flow limits
+    are currently constructed. It starts with DC_FLOW_BINDING_LINES crossed
+    with TIMEPOINTS (or all lines, with --dc-flow-enforce-all) and grows as
+    violated limits are found.
+
+    DCFlow[(tx, t) in DC_FLOW_ENFORCED_LINE_TPS] is an expression for the
+    physical flow on line tx from trans_lz1 to trans_lz2 in timepoint t. It is
+    only defined for lines and timepoints with enforced limits.
+
+    Maximum_DCFlow_Forward and Maximum_DCFlow_Reverse limit DCFlow in either
+    direction to TxCapacityNameplateAvailable.
+    """
+    mod.trans_reactance = Param(
+        mod.TRANSMISSION_LINES,
+        within=PositiveReals,
+        default=lambda m, tx: m.trans_length_km[tx],
+    )
+    mod.DC_FLOW_BINDING_LINES = Set(dimen=1, within=mod.TRANSMISSION_LINES)
+
+    def DC_FLOW_ENFORCED_LINE_TPS_init(m):
+        if m.options.dc_flow_enforce_all:
+            lines = m.TRANSMISSION_LINES
+        else:
+            lines = m.DC_FLOW_BINDING_LINES
+        return [(tx, t) for tx in lines for t in m.TIMEPOINTS]
+
+    mod.DC_FLOW_ENFORCED_LINE_TPS = Set(
+        dimen=2,
+        within=mod.TRANSMISSION_LINES * mod.TIMEPOINTS,
+        initialize=DC_FLOW_ENFORCED_LINE_TPS_init,
+    )
+    mod.DCFlow = Expression(mod.DC_FLOW_ENFORCED_LINE_TPS, rule=DCFlow_rule)
+    mod.Maximum_DCFlow_Forward = Constraint(
+        mod.DC_FLOW_ENFORCED_LINE_TPS, rule=Maximum_DCFlow_Forward_rule
+    )
+    mod.Maximum_DCFlow_Reverse = Constraint(
+        mod.DC_FLOW_ENFORCED_LINE_TPS, rule=Maximum_DCFlow_Reverse_rule
+    )
+
+    if not mod.options.dc_flow_enforce_all and not any(
+        __name__ in level for level in mod.iterate_modules
+    ):
+        # use iteration to add violated limits (innermost level)
+        mod.iterate_modules.append([__name__])
+
+
+def DCFlow_rule(m, tx, t):
+    return sum(
+        -coef * m.TXPowerNet[z, t] for z, coef in dc_network(m).ptdf_row(tx).items()
+    )
+
+
+def Maximum_DCFlow_Forward_rule(m, tx, t):
+    return m.DCFlow[tx, t] <= m.TxCapacityNameplateAvailable[tx, m.tp_period[t]]
+
+
+def Maximum_DCFlow_Reverse_rule(m, tx, t):
+    return -m.DCFlow[tx, t] <= m.TxCapacityNameplateAvailable[tx, m.tp_period[t]]
+
+
+class DCNetwork(object):
+    """
+    Factorized DC power flow model of the transmission network, used to
+    calculate rows of the power transfer distribution factor (ptdf) matrix
+    and the flows on all lines for a set of injections.
+    """
+
+    def __init__(self, m):
+        try:
+            import scipy.sparse
+            from scipy.sparse.csgraph import connected_components
+            from scipy.sparse.linalg import splu
+        except ImportError:
+            raise ImportError(
+                f"The scipy package is needed to use {__name__}. Please "
+                "install it, e.g., with `pip install scipy`."
+            )
+        self.zones = list(m.LOAD_ZONES)
+        self.lines = list(m.TRANSMISSION_LINES)
+        zone_pos = {z: i for i, z in enumerate(self.zones)}
+        n, l = len(self.zones), len(self.lines)
+        self.line_pos = {tx: i for i, tx in enumerate(self.lines)}
+        self.from_pos = np.array(
+            [zone_pos[m.trans_lz1[tx]] for tx in self.lines], dtype=int
+        )
+        self.to_pos = np.array(
+            [zone_pos[m.trans_lz2[tx]] for tx in self.lines], dtype=int
+        )
+        self.susceptance = np.array(
+            [1.0 / m.trans_reactance[tx] for tx in self.lines], dtype=float
+        )
+
+        # branch-zone incidence matrix and susceptance matrix
+        incidence = scipy.sparse.csr_matrix(
+            (
+                np.concatenate([np.ones(l), -np.ones(l)]),
+                (
+                    np.tile(np.arange(l), 2),
+                    np.concatenate([self.from_pos, self.to_pos]),
+                ),
+            ),
+            shape=(l, n),
+        )
+        self.branch_matrix = scipy.sparse.diags(self.susceptance) @ incidence
+        bus_matrix = (incidence.T @ self.branch_matrix).tocsc()
+
+        # use the first zone in each island as its reference zone
+        n_islands, island = connected_components(incidence.T @ incidence)
+        slack = set(np.unique(island, return_index=True)[1].tolist())
+        self.keep = np.array([i for i in range(n) if i not in slack], dtype=int)
+        reduced = bus_matrix[self.keep, :][:, self.keep]
+        self.factor = splu(reduced.tocsc()) if len(self.keep) else None
+        self.ptdf_rows = dict()
+
+    def ptdf_row(self, tx):
+        """Return a dict of nonzero power transfer distribution factors for tx."""
+        try:
+            return self.ptdf_rows[tx]
+        except KeyError:
+            pass
+        i = self.line_pos[tx]
+        row = dict()
+        if self.factor is not None:
+            # the reduced susceptance matrix is symmetric, so row i of
+            # branch_matrix @ inv(reduced) is inv(reduced) @ branch_matrix[i]
+            b = self.branch_matrix[i, :].toarray().ravel()[self.keep]
+            coefs = self.factor.solve(b)
+            for j, c in zip(self.keep.tolist(), coefs.tolist()):
+                if abs(c) > 1e-10:
+                    row[self.zones[j]] = c
+        self.ptdf_rows[tx] = row
+        return row
+
+    def flows(self, injections):
+        """
+        Return an array of flows on all lines (rows) given an array of net
+        injections in all zones (rows) for one or more timepoints (columns).
+        """
+        angles = np.zeros_like(injections, dtype=float)
+        if self.factor is not None:
+            angles[self.keep, :] = self.factor.solve(
+                np.ascontiguousarray(injections[self.keep, :], dtype=float)
+            )
+        return self.branch_matrix @ angles
+
+
+def dc_network(m):
+    """Return the DCNetwork for model m, creating it if needed."""
+    try:
+        return m._dc_network
+    except AttributeError:
+        m._dc_network = DCNetwork(m)
+        return m._dc_network
+
+
+def solution_flows(m):
+    """
+    Return arrays of DC power flows and capacities for all lines (rows) and
+    timepoints (columns) in the current solution.
+    """
+    network = dc_network(m)
+    timepoints = list(m.TIMEPOINTS)
+    net = m.solution_values(m.TXPowerNet)
+    injections = np.array(
+        [[-net[z, t] for t in timepoints] for z in network.zones], dtype=float
+    ).reshape(len(network.zones), len(timepoints))
+    flows = network.flows(injections)
+    cap = m.solution_values(m.TxCapacityNameplateAvailable)
+    capacity = np.array(
+        [[cap[tx, m.tp_period[t]] for t in timepoints] for tx in network.lines],
+        dtype=float,
+    ).reshape(len(network.lines), len(timepoints))
+    return timepoints, flows, capacity
+
+
+def add_limits(m, line_tps):
+    for tx, t in line_tps:
+        m.DC_FLOW_ENFORCED_LINE_TPS.add((tx, t))
+        m.DCFlow.add((tx, t), DCFlow_rule(m, tx, t))
+        m.Maximum_DCFlow_Forward.add((tx, t), Maximum_DCFlow_Forward_rule(m, tx, t))
+        m.Maximum_DCFlow_Reverse.add((tx, t), Maximum_DCFlow_Reverse_rule(m, tx, t))
+
+
+def post_iterate(m):
+    """
+    Add DC power flow limits for any lines and timepoints where the flow
+    exceeds the line capacity in the current solution. Returns True
+    (converged) when there are none.
+    """
+    if m.options.dc_flow_enforce_all:
+        return True
+    timepoints, flows, capacity = solution_flows(m)
+    lines = dc_network(m).lines
+    excess = np.abs(flows) - capacity
+    violated = [
+        (lines[i], timepoints[j])
+        for i, j in zip(*np.nonzero(excess > m.options.dc_flow_tolerance))
+    ]
+    violated = [k for k in violated if k not in m.DC_FLOW_ENFORCED_LINE_TPS]
+    add_limits(m, violated)
+    m.logger.info(
+        f"DC power flow screening: added limits for {len(violated)} "
+        f"overloaded line-timepoints ({len(m.DC_FLOW_ENFORCED_LINE_TPS)} of "
+        f"{len(m.TRANSMISSION_LINES) * len(m.TIMEPOINTS)} now enforced)."
+    )
+    return len(violated) == 0
+
+
+def save_iteration_state(m):
+    return list(m.DC_FLOW_ENFORCED_LINE_TPS)
+
+
+def load_iteration_state(m, enforced):
+    """Re-add the DC power flow limits generated before a checkpoint."""
+    add_limits(m, [k for k in enforced if k not in m.DC_FLOW_ENFORCED_LINE_TPS])
+
+
+def load_inputs(mod, switch_data, inputs_dir):
+    """
+    Files or columns marked with * are optional.
+
+    transmission_lines.csv
+        TRANSMISSION_LINE, ..., trans_reactance*
+
+    dc_flow_binding_lines.csv*
+        TRANSMISSION_LINE
+    """
+    switch_data.load_aug(
+        filename=os.path.join(inputs_dir, "transmission_lines.csv"),
+        optional_params=["trans_reactance"],
+        param=(mod.trans_reactance,),
+    )
+    switch_data.load_aug(
+        filename=os.path.join(inputs_dir, "dc_flow_binding_lines.csv"),
+        optional=True,
+        set=mod.DC_FLOW_BINDING_LINES,
+    )
+
+
+def post_solve(instance, outdir):
+    """
+    Export DC power flows on all lines in all timepoints, and a list of lines
+    whose flow limits were binding.
+
+    dc_flows.csv
+        TRANSMISSION_LINE, TIMEPOINT, DCFlow, TxCapacityNameplateAvailable
+
+    dc_flow_binding_lines.csv
+        TRANSMISSION_LINE
+    """
+    m = instance
+    timepoints, flows, capacity = solution_flows(m)
+    tp_pos = {t: j for j, t in enumerate(timepoints)}
+    line_pos = dc_network(m).line_pos
+    write_table(
+        m,
+        m.TRANSMISSION_LINES,
+        m.TIMEPOINTS,
+        output_file=os.path.join(outdir, "dc_flows.csv"),
+        headings=(
+            "TRANSMISSION_LINE",
+            "TIMEPOINT",
+            "DCFlow",
+            "TxCapacityNameplateAvailable",
+        ),
+        values=lambda m, tx, t: (
+            tx,
+            t,
+            flows[line_pos[tx], tp_pos[t]],
+            capacity[line_pos[tx], tp_pos[t]],
+        ),
+    )
+    # lines with no capacity have no flow, but their limits are not binding
+    tol = m.options.dc_flow_tolerance
+    binding = (capacity > tol) & (np.abs(flows) >= capacity - tol)
+    binding_lines = [tx for tx in m.TRANSMISSION_LINES if binding[line_pos[tx]].any()]
+    write_table(
+        m,
+        binding_lines,
+        output_file=os.path.join(outdir, "dc_flow_binding_lines.csv"),
+        headings=("TRANSMISSION_LINE",),
+        values=lambda m, tx: (tx,),
+    )
@@ -7,6 +7,7 @@ Switch model.
 """
 
 from pyomo.environ import *
+from switch_model.expression_views import ExpressionView
 
 dependencies = (
     "switch_model.timescales",
@@ -68,7 +69,7 @@ def define_components(mod):
         ),
     )
 
-    mod.TxPowerSent = Expression(
+    mod.TxPowerSent = ExpressionView(
         mod.TRANS_TIMEPOINTS,
         rule=lambda m, zone_from, zone_to, tp: (m.DispatchTx[zone_from, zone_to, tp]),
     )
@@ -20,6 +20,9 @@ API Synopsis:
 
     switch_model.upgrade.scan_and_upgrade(examples_dir)
 
+    # upgrade up to 8 directories at a time
+    switch_model.upgrade.scan_and_upgrade(examples_dir, jobs=8)
+
 """
 # Public interface
 from .manager import (
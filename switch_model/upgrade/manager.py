@@ -2,59 +2,141 @@
 # Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
 
 import argparse
+import concurrent.futures
+import importlib
 import os
+import re
 import shutil
-from pkg_resources import parse_version
 
 import switch_model
-from switch_model.utilities import rewrap
-
-from . import upgrade_2_0_0b1
-from . import upgrade_2_0_0b2
-from . import upgrade_2_0_0b4
-from . import upgrade_2_0_1
-from . import upgrade_2_0_4
-from . import upgrade_2_0_5
-from . import upgrade_2_0_6
-from . import upgrade_2_0_7
-from . import upgrade_2_0_9
-
-# Available upgrade code. This needs to be in consecutive order so
-# upgrade_inputs can incrementally apply the upgrades.
-upgrade_plugins = [
-    (mod, mod.upgrades_from, mod.upgrades_to)
-    for mod in [
-        upgrade_2_0_0b1,
-        upgrade_2_0_0b2,
-        upgrade_2_0_0b4,
-        upgrade_2_0_1,
-        upgrade_2_0_4,
-        upgrade_2_0_5,
-        upgrade_2_0_6,
-        upgrade_2_0_7,
-        upgrade_2_0_9,
-    ]
-]
+from switch_model.basic_utilities import rewrap
+
+from . import staging
+
+
+def find_upgrade_plugins():
+    """
+    Return a list of (module_name, upgrades_from, upgrades_to) tuples for the
+    upgrade modules in this package, in the order they should be applied.
+    module_name is a string, e.g., "upgrade_2_0_0b1", not the module itself;
+    the modules depend on pandas and Pyomo, so they are only imported when
+    they are needed (see load_plugin()). For the same reason, the versions
+    are read from the upgrades_from and upgrades_to assignments in the source
+    files.
+    """
+    plugin_dir = os.path.dirname(os.path.abspath(__file__))
+    plugins = dict()
+    for filename in sorted(os.listdir(plugin_dir)):
+        if not (filename.startswith("upgrade_") and filename.endswith(".py")):
+            continue
+        with open(os.path.join(plugin_dir, filename)) as f:
+            source = f.read()
+        versions = [
+            re.search(rf"^{var}\s*=\s*[\"']([^\"']+)[\"']", source, re.MULTILINE)
+            for var in ("upgrades_from", "upgrades_to")
+        ]
+        if None in versions:
+            raise ValueError(
+                f"Upgrade module {filename} must assign upgrades_from and "
+                "upgrades_to at the top level."
+            )
+        v_from, v_to = (v.group(1) for v in versions)
+        if v_from in plugins:
+            raise ValueError(
+                f"Upgrade modules {plugins[v_from][0]} and {filename[:-3]} "
+                f"both upgrade from version {v_from}."
+            )
+        plugins[v_from] = (filename[:-3], v_from, v_to)
+
+    # Chain the upgrades together, starting from the version that isn't
+    # produced by any of them, so upgrade_inputs can apply them incrementally.
+    starts = set(plugins) - {v_to for name, v_from, v_to in plugins.values()}
+    if len(starts) != 1:
+        raise ValueError(
+            "Upgrade modules do not form a single sequence of versions: "
+            + ", ".join(f"{n} ({f} -> {t})" for n, f, t in plugins.values())
+        )
+    ordered = [plugins.pop(starts.pop())]
+    while ordered[-1][2] in plugins:
+        ordered.append(plugins.pop(ordered[-1][2]))
+    if plugins:
+        raise ValueError(
+            "Upgrade modules do not form a single sequence of versions: "
+            + ", ".join(n for n, f, t in plugins.values())
+            + " can't be reached."
+        )
+    return ordered
+
+
+# Available upgrade code, as (module_name, upgrades_from, upgrades_to), in
+# consecutive order. The modules are imported by name with load_plugin().
+upgrade_plugins = find_upgrade_plugins()
 
 # Not every code revision requires an update; this is the last revision that did.
 last_required_update = upgrade_plugins[-1][-1]
 
-code_version = parse_version(switch_model.__version__)
 version_file = "switch_inputs_version.txt"
 # verbose = False
 verbose = True
 
 
+def load_plugin(name):
+    """Import and return the upgrade module with the specified name."""
+    return importlib.import_module("." + name, __package__)
+
+
+def parse_version(version):
+    # pkg_resources is slow to import, so use packaging directly if available
+    try:
+        from packaging.version import parse
+    except ImportError:
+        from pkg_resources import parse_version as parse
+    return parse(version)
+
+
 def scan_and_upgrade(
-    top_dir, inputs_dir_name="inputs", backup=True, assign_current_version=False
+    top_dir,
+    inputs_dir_name="inputs",
+    backup=True,
+    assign_current_version=False,
+    jobs=1,
 ):
+    """
+    Upgrade all the inputs directories found below top_dir. If jobs > 1, up to
+    that many directories are upgraded at the same time, in separate processes.
+    """
+    inputs_dirs = []
     for dirpath, dirnames, filenames in os.walk(top_dir):
         for dirname in dirnames:
             path = os.path.join(dirpath, dirname)
             if os.path.exists(os.path.join(path, inputs_dir_name, "modules.txt")):
-                upgrade_inputs(
-                    os.path.join(path, inputs_dir_name), backup, assign_current_version
+                inputs_dirs.append(os.path.join(path, inputs_dir_name))
+
+    if jobs > 1 and len(inputs_dirs) > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(jobs, len(inputs_dirs))
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _upgrade_inputs_in_worker,
+                    inputs_dir,
+                    backup,
+                    assign_current_version,
+                    verbose,
                 )
+                for inputs_dir in inputs_dirs
+            ]
+            for future in futures:
+                future.result()  # raise any errors
+    else:
+        for inputs_dir in inputs_dirs:
+            upgrade_inputs(inputs_dir, backup, assign_current_version)
+
+
+def _upgrade_inputs_in_worker(inputs_dir, backup, assign_current_version, verbosity):
+    # worker processes may not inherit the verbose setting from the parent
+    set_verbose(verbosity)
+    upgrade_inputs(inputs_dir, backup, assign_current_version)
 
 
 def get_input_version(inputs_dir):
@@ -68,13 +150,13 @@ def get_input_version(inputs_dir):
     Note: Raises an ValueError if the inputs directory has an unrecognized format.
     """
     version_path = os.path.join(inputs_dir, version_file)
-    if os.path.isfile(version_path):
-        with open(version_path, "r") as f:
+    if staging.isfile(version_path):
+        with staging.open(version_path, "r") as f:
             version = f.readline().strip()
     # Before we started storing version numbers in the inputs directory, we
     # had an input file named generator_info.tab. If that file exists, we are
     # dealing with version 2.0.0b0.
-    elif os.path.isfile(os.path.join(inputs_dir, "generator_info.tab")):
+    elif staging.isfile(os.path.join(inputs_dir, "generator_info.tab")):
         version = "2.0.0b0"
     else:
         raise ValueError(
@@ -89,7 +171,7 @@ def get_input_version(inputs_dir):
 
 def _write_input_version(inputs_dir, new_version):
     version_path = os.path.join(inputs_dir, version_file)
-    with open(version_path, "w") as f:
+    with staging.open(version_path, "w") as f:
         f.write(new_version + "\n")
 
 
@@ -132,14 +214,17 @@ def upgrade_inputs(inputs_dir, backup=True, assign_current_version=False):
         if backup:
             print_verbose("Backed up original inputs")
             _backup(inputs_dir)
-        # Successively apply the upgrade scripts as needed.
-        for upgrader, v_from, v_to in upgrade_plugins:
-            inputs_v = parse_version(get_input_version(inputs_dir))
-            # note: the next line catches datasets created by/for versions of Switch that
-            # didn't require input directory upgrades
-            if parse_version(v_from) <= inputs_v < parse_version(v_to):
-                print_verbose("Upgrading from " + v_from + " to " + v_to)
-                upgrader.upgrade_input_dir(inputs_dir)
+        # Successively apply the upgrade scripts as needed. The plugins work on
+        # an in-memory copy of the files, which is written to disk once, after
+        # the last upgrade succeeds.
+        with staging.staged_files():
+            for plugin, v_from, v_to in upgrade_plugins:
+                inputs_v = parse_version(get_input_version(inputs_dir))
+                # note: the next line catches datasets created by/for versions of Switch that
+                # didn't require input directory upgrades
+                if parse_version(v_from) <= inputs_v < parse_version(v_to):
+                    print_verbose("Upgrading from " + v_from + " to " + v_to)
+                    load_plugin(plugin).upgrade_input_dir(inputs_dir)
         upgraded = True
 
     if (
@@ -167,7 +252,11 @@ def main(args=None):
     set_verbose(args.verbose)
     if args.recursive:
         scan_and_upgrade(
-            ".", args.inputs_dir_name, args.backup, args.assign_current_version
+            ".",
+            args.inputs_dir_name,
+            args.backup,
+            args.assign_current_version,
+            args.jobs,
         )
     else:
         if not os.path.isdir(args.inputs_dir_name):
@@ -229,5 +318,14 @@ def add_parser_args(parser):
             "will not work if modules.txt is in the parent directory."
         ),
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Number of directories to upgrade at the same time with "
+            "--recursive (default is 1)."
+        ),
+    )
     parser.add_argument("--verbose", action="store_true", default=verbose)
     parser.add_argument("--quiet", dest="verbose", action="store_false")
@@ -1,9 +1,10 @@
 from __future__ import print_function
 
 import os
-from switch_model.upgrade.manager import upgrade_plugins
+from switch_model.upgrade.manager import upgrade_plugins, load_plugin
 
 upgrade_module, upgrade_from, upgrade_to = upgrade_plugins[-1]
+upgrade_module = load_plugin(upgrade_module)
 
 if __name__ == "__main__":
     print(
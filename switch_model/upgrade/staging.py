@@ -0,0 +1,194 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+"""
+In-memory staging area for input upgrades.
+
+The upgrade plugins read and write files through the functions in this module
+instead of calling open(), pandas.read_csv(), DataFrame.to_csv(), os.remove(),
+etc. directly. When staging is active (see staged_files(), used by
+switch_model.upgrade.upgrade_inputs()), each file is read from disk at most
+once, all changes made by the chain of plugins are kept in memory, and each
+changed file is written (or removed) only once, after the last plugin has
+finished. If an upgrade fails, nothing is written. When staging is not active,
+these functions simply operate on the files on disk.
+"""
+
+import fnmatch
+import glob as _glob
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+
+# currently active StagedFiles object, if any (upgrades in parallel run in
+# separate processes, so one per process is enough)
+active = None
+
+
+class StagedFiles(object):
+    def __init__(self):
+        # text of each file that has been read or written, keyed by absolute
+        # path; removed files are stored as None
+        self.files = dict()
+        # paths that need to be written or removed when flushing
+        self.changed = set()
+
+    def key(self, path):
+        return os.path.abspath(path)
+
+    def isfile(self, path):
+        k = self.key(path)
+        if k in self.files:
+            return self.files[k] is not None
+        return os.path.isfile(k)
+
+    def read(self, path):
+        k = self.key(path)
+        if k not in self.files:
+            with io.open(k) as f:
+                self.files[k] = f.read()
+        if self.files[k] is None:
+            raise FileNotFoundError(f"No such file or directory: '{path}'")
+        return self.files[k]
+
+    def write(self, path, text):
+        k = self.key(path)
+        self.files[k] = text
+        self.changed.add(k)
+
+    def remove(self, path):
+        self.read(path)  # raise an error if it doesn't exist
+        k = self.key(path)
+        self.files[k] = None
+        self.changed.add(k)
+
+    def glob(self, pattern):
+        pattern = self.key(pattern)
+        matches = {p for p in _glob.glob(pattern) if self.key(p) not in self.files}
+        matches.update(
+            p
+            for p, text in self.files.items()
+            if text is not None and fnmatch.fnmatch(p, pattern)
+        )
+        return sorted(matches)
+
+    def flush(self):
+        """Write all changed files to disk and remove deleted files."""
+        for k in sorted(self.changed):
+            if self.files[k] is None:
+                if os.path.isfile(k):
+                    os.remove(k)
+            else:
+                # newline="" keeps line endings produced by pandas as is
+                with io.open(k, "w", newline="") as f:
+                    f.write(self.files[k])
+        self.changed.clear()
+
+
+@contextmanager
+def staged_files():
+    """
+    Stage all file operations made through this module in memory, then write
+    them to disk when the context exits without an error. Nested calls share
+    the outer staging area.
+    """
+    global active
+    if active is not None:
+        yield active
+        return
+    active = StagedFiles()
+    try:
+        yield active
+        active.flush()
+    finally:
+        active = None
+
+
+def isfile(path):
+    if active is None:
+        return os.path.isfile(path)
+    return active.isfile(path)
+
+
+def exists(path):
+    if active is None or os.path.isdir(path):
+        return os.path.exists(path)
+    return active.isfile(path)
+
+
+def glob(pattern):
+    if active is None:
+        return _glob.glob(pattern)
+    return active.glob(pattern)
+
+
+def remove(path):
+    if active is None:
+        os.remove(path)
+    else:
+        active.remove(path)
+
+
+def move(old_path, new_path):
+    if active is None:
+        os.replace(old_path, new_path)
+    else:
+        active.write(new_path, active.read(old_path))
+        active.remove(old_path)
+
+
+class _StagedWriter(io.StringIO):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def close(self):
+        if not self.closed:
+            active.write(self.path, self.getvalue())
+        super().close()
+
+
+def open(path, mode="r"):
+    """Open a text file for reading ("r") or writing ("w")."""
+    if active is None:
+        return io.open(path, mode)
+    if mode == "r":
+        return io.StringIO(active.read(path))
+    elif mode == "w":
+        return _StagedWriter(path)
+    else:
+        raise ValueError(f"Unsupported mode for staged file: {mode}")
+
+
+def read_csv(path, **kwargs):
+    import pandas
+
+    if active is None:
+        return pandas.read_csv(path, **kwargs)
+    return pandas.read_csv(io.StringIO(active.read(path)), **kwargs)
+
+
+def to_csv(df, path, **kwargs):
+    if active is None:
+        df.to_csv(path, **kwargs)
+    else:
+        active.write(path, df.to_csv(None, **kwargs))
+
+
+@contextmanager
+def local_copy(path):
+    """
+    Yield the path of a file on disk with the current contents of `path`, for
+    use with code that can only read real files (e.g., Pyomo's DataPortal).
+    """
+    if active is None or active.key(path) not in active.changed:
+        yield path
+    else:
+        fd, tmp_path = tempfile.mkstemp(suffix=os.path.splitext(path)[1])
+        try:
+            with io.open(fd, "w") as f:
+                f.write(active.read(path))
+            yield tmp_path
+        finally:
+            os.remove(tmp_path)
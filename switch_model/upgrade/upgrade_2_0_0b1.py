@@ -26,10 +26,9 @@ Major changes are:
 """
 
 import os
-import shutil
 import pandas
-import argparse
 import switch_model.upgrade
+from switch_model.upgrade import staging
 
 upgrades_from = "2.0.0b0"
 upgrades_to = "2.0.0b1"
@@ -152,23 +151,23 @@ def upgrade_input_dir(inputs_dir):
     def rename_file(old_name, new_name, optional_file=True):
         old_path = os.path.join(inputs_dir, old_name)
         new_path = os.path.join(inputs_dir, new_name)
-        if optional_file and not os.path.isfile(old_path):
+        if optional_file and not staging.isfile(old_path):
             return
-        shutil.move(old_path, new_path)
+        staging.move(old_path, new_path)
 
     def rename_column(file_name, old_col_name, new_col_name, optional_file=True):
         path = os.path.join(inputs_dir, file_name)
-        if optional_file and not os.path.isfile(path):
+        if optional_file and not staging.isfile(path):
             return
-        df = pandas.read_csv(path, na_values=["."], sep=r"\s+", index_col=False)
+        df = staging.read_csv(path, na_values=["."], sep=r"\s+", index_col=False)
         df.rename(columns={old_col_name: new_col_name}, inplace=True)
-        df.to_csv(path, sep="\t", na_rep=".", index=False)
+        staging.to_csv(df, path, sep="\t", na_rep=".", index=False)
 
     rename_file("modules", "modules.txt")
     modules_path = os.path.join(inputs_dir, "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         modules_path = os.path.join(inputs_dir, "..", "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         raise RuntimeError(
             "Unable to find modules or modules.txt file for input directory '{}'. "
             "This file should be located in the input directory or its parent.".format(
@@ -179,7 +178,7 @@ def upgrade_input_dir(inputs_dir):
     ###
     # Upgrade module listings
     # Each line of the original file is either a module identifier or a comment
-    with open(modules_path) as f:
+    with staging.open(modules_path) as f:
         module_list = [line.strip() for line in f.read().splitlines()]
 
     # If the original file didn't specify either switch_mod or the list of
@@ -211,27 +210,32 @@ def upgrade_input_dir(inputs_dir):
         if module not in final_module_list:
             final_module_list.append(module)
 
-    with open(modules_path, "w") as f:
+    with staging.open(modules_path, "w") as f:
         for module in final_module_list:
             f.write(module + "\n")
 
     ###
     # Get load zone economic multipliers (if available), then drop that column.
     load_zone_path = os.path.join(inputs_dir, "load_zones.tab")
-    load_zone_df = pandas.read_csv(load_zone_path, na_values=["."], sep=r"\s+")
+    load_zone_df = staging.read_csv(load_zone_path, na_values=["."], sep=r"\s+")
     if "lz_cost_multipliers" in load_zone_df:
         load_zone_df["lz_cost_multipliers"].fillna(1)
     else:
         load_zone_df["lz_cost_multipliers"] = 1
     load_zone_keep_cols = [c for c in load_zone_df if c != "lz_cost_multipliers"]
-    load_zone_df.to_csv(
-        load_zone_path, sep="\t", na_rep=".", index=False, columns=load_zone_keep_cols
+    staging.to_csv(
+        load_zone_df,
+        load_zone_path,
+        sep="\t",
+        na_rep=".",
+        index=False,
+        columns=load_zone_keep_cols,
     )
 
     ###
     # Merge generator_info with project_info
     gen_info_path = os.path.join(inputs_dir, "generator_info.tab")
-    gen_info_df = pandas.read_csv(gen_info_path, na_values=["."], sep=r"\s+")
+    gen_info_df = staging.read_csv(gen_info_path, na_values=["."], sep=r"\s+")
     gen_info_col_renames = {
         "generation_technology": "proj_gen_tech",
         "g_energy_source": "proj_energy_source",
@@ -258,7 +262,7 @@ def upgrade_input_dir(inputs_dir):
         del gen_info_df[c]
     gen_info_df.rename(columns=gen_info_col_renames, inplace=True)
     proj_info_path = os.path.join(inputs_dir, "project_info.tab")
-    proj_info_df = pandas.read_csv(proj_info_path, na_values=["."], sep=r"\s+")
+    proj_info_df = staging.read_csv(proj_info_path, na_values=["."], sep=r"\s+")
     proj_info_df = pandas.merge(
         proj_info_df, gen_info_df, on="proj_gen_tech", how="left"
     )
@@ -301,16 +305,16 @@ def upgrade_input_dir(inputs_dir):
         "proj_ccs_energy_load",
     ]
     update_cols_with_defaults(proj_info_df, columns_with_defaults)
-    proj_info_df.to_csv(proj_info_path, sep="\t", na_rep=".", index=False)
-    os.remove(gen_info_path)
+    staging.to_csv(proj_info_df, proj_info_path, sep="\t", na_rep=".", index=False)
+    staging.remove(gen_info_path)
 
     ###
     # Merge gen_new_build_costs into proj_build_costs
 
     # Translate default generator costs into costs for each project
     gen_build_path = os.path.join(inputs_dir, "gen_new_build_costs.tab")
-    if os.path.isfile(gen_build_path):
-        gen_build_df = pandas.read_csv(gen_build_path, na_values=["."], sep=r"\s+")
+    if staging.isfile(gen_build_path):
+        gen_build_df = staging.read_csv(gen_build_path, na_values=["."], sep=r"\s+")
         new_col_names = {
             "generation_technology": "proj_gen_tech",
             "investment_period": "build_year",
@@ -347,8 +351,8 @@ def upgrade_input_dir(inputs_dir):
 
         # Merge the expanded gen_new_build_costs data into proj_build_costs
         project_build_path = os.path.join(inputs_dir, "proj_build_costs.tab")
-        if os.path.isfile(project_build_path):
-            project_build_df = pandas.read_csv(
+        if staging.isfile(project_build_path):
+            project_build_df = staging.read_csv(
                 project_build_path, na_values=["."], sep=r"\s+"
             )
             project_build_df = pandas.merge(
@@ -369,13 +373,15 @@ def upgrade_input_dir(inputs_dir):
             "proj_storage_energy_overnight_cost",
         ]
         update_cols_with_defaults(project_build_df, columns_with_defaults)
-        project_build_df.to_csv(project_build_path, sep="\t", na_rep=".", index=False)
-        os.remove(gen_build_path)
+        staging.to_csv(
+            project_build_df, project_build_path, sep="\t", na_rep=".", index=False
+        )
+        staging.remove(gen_build_path)
 
     # Merge gen_inc_heat_rates.tab into proj_inc_heat_rates.tab
     g_hr_path = os.path.join(inputs_dir, "gen_inc_heat_rates.tab")
-    if os.path.isfile(g_hr_path):
-        g_hr_df = pandas.read_csv(g_hr_path, na_values=["."], sep=r"\s+")
+    if staging.isfile(g_hr_path):
+        g_hr_df = staging.read_csv(g_hr_path, na_values=["."], sep=r"\s+")
         proj_hr_default = pandas.merge(
             g_hr_df,
             proj_info_df[["PROJECT", "proj_gen_tech"]],
@@ -391,8 +397,8 @@ def upgrade_input_dir(inputs_dir):
         }
         proj_hr_default.rename(columns=col_renames, inplace=True)
         proj_hr_path = os.path.join(inputs_dir, "proj_inc_heat_rates.tab")
-        if os.path.isfile(proj_hr_path):
-            proj_hr_df = pandas.read_csv(proj_hr_path, na_values=["."], sep=r"\s+")
+        if staging.isfile(proj_hr_path):
+            proj_hr_df = staging.read_csv(proj_hr_path, na_values=["."], sep=r"\s+")
             proj_hr_df = pandas.merge(
                 proj_hr_df, proj_hr_default, on="proj_gen_tech", how="left"
             )
@@ -412,8 +418,10 @@ def upgrade_input_dir(inputs_dir):
             "incremental_heat_rate_mbtu_per_mwhr",
             "fuel_use_rate_mmbtu_per_h",
         ]
-        proj_hr_df.to_csv(proj_hr_path, sep="\t", na_rep=".", index=False, columns=cols)
-        os.remove(g_hr_path)
+        staging.to_csv(
+            proj_hr_df, proj_hr_path, sep="\t", na_rep=".", index=False, columns=cols
+        )
+        staging.remove(g_hr_path)
 
     # Done with restructuring. Now apply component renaming.
 
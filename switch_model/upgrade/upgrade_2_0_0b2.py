@@ -10,6 +10,7 @@ Changes are:
 
 import os
 import switch_model.upgrade
+from switch_model.upgrade import staging
 
 upgrades_from = "2.0.0b1"
 upgrades_to = "2.0.0b2"
@@ -23,9 +24,9 @@ def upgrade_input_dir(inputs_dir):
     # Find modules.txt; it should be either in the inputs directory or in its
     # parent directory.
     modules_path = os.path.join(inputs_dir, "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         modules_path = os.path.join(inputs_dir, "..", "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         raise RuntimeError(
             "Unable to find modules or modules.txt file for input directory '{}'. "
             "This file should be located in the input directory or its parent.".format(
@@ -40,7 +41,7 @@ def upgrade_input_dir(inputs_dir):
     # This was updated 2019-04-01 to do this better.
     # TODO: this script is redundant with upgrade_2_0_0b1.py
     # and could be eliminated.
-    with open(modules_path) as f:
+    with staging.open(modules_path) as f:
         module_list = [line.strip() for line in f.read().splitlines()]
         final_module_list = [
             "switch_model" + line[10:]
@@ -49,7 +50,7 @@ def upgrade_input_dir(inputs_dir):
             for line in module_list
         ]
 
-    with open(modules_path, "w") as f:
+    with staging.open(modules_path, "w") as f:
         for module in final_module_list:
             f.write(module + "\n")
 
@@ -7,9 +7,9 @@ This just moves some modules, as listed in the rename_modules variable.
 """
 from __future__ import print_function
 
-import os, shutil, argparse
-import pandas
+import os
 import switch_model.upgrade
+from switch_model.upgrade import staging
 
 upgrades_from = "2.0.0b4"
 upgrades_to = "2.0.1"
@@ -56,18 +56,18 @@ def upgrade_input_dir(inputs_dir):
 def rename_file(old_name, new_name, optional_file=True):
     old_path = os.path.join(inputs_dir, old_name)
     new_path = os.path.join(inputs_dir, new_name)
-    if optional_file and not os.path.isfile(old_path):
+    if optional_file and not staging.isfile(old_path):
         return
-    shutil.move(old_path, new_path)
+    staging.move(old_path, new_path)
 
 
 def rename_column(file_name, old_col_name, new_col_name, optional_file=True):
     path = os.path.join(inputs_dir, file_name)
-    if optional_file and not os.path.isfile(path):
+    if optional_file and not staging.isfile(path):
         return
-    df = pandas.read_csv(path, na_values=["."], sep=r"\s+", index_col=False)
+    df = staging.read_csv(path, na_values=["."], sep=r"\s+", index_col=False)
     df.rename(columns={old_col_name: new_col_name}, inplace=True)
-    df.to_csv(path, sep="\t", na_rep=".", index=False)
+    staging.to_csv(df, path, sep="\t", na_rep=".", index=False)
 
 
 def item_list(items):
@@ -80,9 +80,9 @@ def update_modules(inputs_dir):
     standard locations) and return list of alerts for user."""
 
     modules_path = os.path.join(inputs_dir, "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         modules_path = os.path.join(inputs_dir, "..", "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         raise RuntimeError(
             "Unable to find modules or modules.txt file for input directory '{}'. "
             "This file should be located in the input directory or its parent.".format(
@@ -93,7 +93,7 @@ def update_modules(inputs_dir):
 
     # Upgrade module listings
     # Each line of the original file is either a module identifier or a comment
-    with open(modules_path) as f:
+    with staging.open(modules_path) as f:
         old_module_list = [line.strip() for line in f.read().splitlines()]
 
     # rename modules as needed
@@ -139,7 +139,7 @@ def update_modules(inputs_dir):
     # import pdb; pdb.set_trace()
 
     # write new modules list
-    with open(modules_path, "w") as f:
+    with staging.open(modules_path, "w") as f:
         for module in new_module_list:
             f.write(module + "\n")
 
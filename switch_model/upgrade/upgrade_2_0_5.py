@@ -7,9 +7,10 @@ or 2.0.3.) This doesn't actually do anything except update the data version
 number and show the module-change messages.
 """
 
-import os, shutil, argparse, glob
+import os
 import pandas
 import switch_model.upgrade
+from switch_model.upgrade import staging
 from pyomo.environ import DataPortal
 
 
@@ -40,7 +41,7 @@ def upgrade_input_dir(inputs_dir):
 
     # Convert all .tab input files to .csv (maybe it should
     # work with a list of specific files instead?)
-    for old_path in glob.glob(os.path.join(inputs_dir, "*.tab")):
+    for old_path in staging.glob(os.path.join(inputs_dir, "*.tab")):
         new_path = old_path[:-4] + ".csv"
         convert_tab_to_csv(old_path, new_path)
     # Convert certain .tab input files to .csv
@@ -55,7 +56,7 @@ def upgrade_input_dir(inputs_dir):
     ]:
         old_path = os.path.join(inputs_dir, f)
         new_path = old_path[:-4] + ".csv"
-        if os.path.exists(old_path):
+        if staging.exists(old_path):
             convert_dat_to_csv(old_path, new_path)
 
 
@@ -66,9 +67,9 @@ def convert_tab_to_csv(old_path, new_path):
         # Allow any whitespace as a delimiter because that is how ampl/pyomo .tab
         # files work, and some of our older examples use spaces instead of tabs
         # (e.g., tests/upgrade_dat/copperplate1/inputs/variable_capacity_factors.tab).
-        df = pandas.read_csv(old_path, na_values=["."], sep=r"\s+")
-        df.to_csv(new_path, sep=",", na_rep=".", index=False)
-        os.remove(old_path)
+        df = staging.read_csv(old_path, na_values=["."], sep=r"\s+")
+        staging.to_csv(df, new_path, sep=",", na_rep=".", index=False)
+        staging.remove(old_path)
     except Exception as e:
         print("\nERROR converting {} to {}:\n{}".format(old_path, new_path, e.message))
         raise
@@ -87,11 +88,12 @@ def convert_dat_to_csv(old_path, new_path):
 
     try:
         data = DataPortal(model=DummyModel())
-        data.load(filename=old_path)
+        with staging.local_copy(old_path) as path:
+            data.load(filename=path)
         # this happens to be in a pandas-friendly format
         df = pandas.DataFrame(data.data())
-        df.to_csv(new_path, sep=",", na_rep=".", index=False)
-        os.remove(old_path)
+        staging.to_csv(df, new_path, sep=",", na_rep=".", index=False)
+        staging.remove(old_path)
     except Exception as e:
         print("\nERROR converting {} to {}:\n{}".format(old_path, new_path, e.message))
         raise
@@ -101,18 +103,18 @@ def convert_dat_to_csv(old_path, new_path):
 def rename_file(old_name, new_name, optional_file=True):
     old_path = os.path.join(inputs_dir, old_name)
     new_path = os.path.join(inputs_dir, new_name)
-    if optional_file and not os.path.isfile(old_path):
+    if optional_file and not staging.isfile(old_path):
         return
-    shutil.move(old_path, new_path)
+    staging.move(old_path, new_path)
 
 
 def rename_column(file_name, old_col_name, new_col_name, optional_file=True):
     path = os.path.join(inputs_dir, file_name)
-    if optional_file and not os.path.isfile(path):
+    if optional_file and not staging.isfile(path):
         return
-    df = pandas.read_csv(path, na_values=["."], sep=",")  # for 2.0.5+
+    df = staging.read_csv(path, na_values=["."], sep=",")  # for 2.0.5+
     df.rename(columns={old_col_name: new_col_name}, inplace=True)
-    df.to_csv(path, sep=",", na_rep=".", index=False)
+    staging.to_csv(df, path, sep=",", na_rep=".", index=False)
 
 
 def item_list(items):
@@ -125,11 +127,11 @@ def update_modules(inputs_dir):
     standard locations) and return list of alerts for user."""
 
     modules_path = os.path.join(inputs_dir, "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         modules_path = os.path.join(inputs_dir, "..", "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         modules_path = "modules.txt"
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         raise RuntimeError(
             "Unable to find modules or modules.txt file for input directory '{}'. "
             "This file should be located in the input directory, its parent, or "
@@ -139,7 +141,7 @@ def update_modules(inputs_dir):
 
     # Upgrade module listings
     # Each line of the original file is either a module identifier or a comment
-    with open(modules_path) as f:
+    with staging.open(modules_path) as f:
         old_module_list = [line.strip() for line in f.read().splitlines()]
 
     # rename modules as needed
@@ -158,7 +160,7 @@ def update_modules(inputs_dir):
 
     if new_module_list != old_module_list:
         # write new modules list
-        with open(modules_path, "w") as f:
+        with staging.open(modules_path, "w") as f:
             for module in new_module_list:
                 f.write(module + "\n")
 
@@ -1,9 +1,8 @@
 # Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
 # Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
-import os, shutil, argparse, glob
-import pandas as pd
+import os
 import switch_model.upgrade
-from pyomo.environ import DataPortal
+from switch_model.upgrade import staging
 
 upgrades_from = "2.0.5"
 upgrades_to = "2.0.6"
@@ -41,18 +40,18 @@ def upgrade_input_dir(inputs_dir):
 def rename_file(old_name, new_name, optional_file=True):
     old_path = os.path.join(inputs_dir, old_name)
     new_path = os.path.join(inputs_dir, new_name)
-    if optional_file and not os.path.isfile(old_path):
+    if optional_file and not staging.isfile(old_path):
         return
-    shutil.move(old_path, new_path)
+    staging.move(old_path, new_path)
 
 
 def rename_column(file_name, old_col_name, new_col_name, optional_file=True):
     path = os.path.join(inputs_dir, file_name)
-    if optional_file and not os.path.isfile(path):
+    if optional_file and not staging.isfile(path):
         return
-    df = pd.read_csv(path, na_values=["."], sep=",")  # for 2.0.5+
+    df = staging.read_csv(path, na_values=["."], sep=",")  # for 2.0.5+
     df.rename(columns={old_col_name: new_col_name}, inplace=True)
-    df.to_csv(path, sep=",", na_rep=".", index=False)
+    staging.to_csv(df, path, sep=",", na_rep=".", index=False)
 
 
 def item_list(items):
@@ -65,11 +64,11 @@ def update_modules(inputs_dir):
     standard locations) and return list of alerts for user."""
 
     modules_path = os.path.join(inputs_dir, "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         modules_path = os.path.join(inputs_dir, "..", "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         modules_path = "modules.txt"
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         raise RuntimeError(
             "Unable to find modules or modules.txt file for input directory '{}'. "
             "This file should be located in the input directory, its parent, or "
@@ -79,7 +78,7 @@ def update_modules(inputs_dir):
 
     # Upgrade module listings
     # Each line of the original file is either a module identifier or a comment
-    with open(modules_path) as f:
+    with staging.open(modules_path) as f:
         old_module_list = [line.strip() for line in f.read().splitlines()]
 
     # rename modules as needed
@@ -98,7 +97,7 @@ def update_modules(inputs_dir):
 
     if new_module_list != old_module_list:
         # write new modules list
-        with open(modules_path, "w") as f:
+        with staging.open(modules_path, "w") as f:
             for module in new_module_list:
                 f.write(module + "\n")
 
@@ -1,8 +1,9 @@
 # Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
 # Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
-import os, shutil, argparse, glob
+import os
 import pandas as pd
 import switch_model.upgrade
+from switch_model.upgrade import staging
 from pyomo.environ import DataPortal
 
 upgrades_from = "2.0.6"
@@ -70,14 +71,14 @@ def upgrade_input_dir(inputs_dir):
 def rename_file(inputs_dir, old_name, new_name, optional_file=True):
     old_path = os.path.join(inputs_dir, old_name)
     new_path = os.path.join(inputs_dir, new_name)
-    if optional_file and not os.path.isfile(old_path):
+    if optional_file and not staging.isfile(old_path):
         pass
-    elif os.path.isfile(new_path) and not os.path.isfile(old_path):
+    elif staging.isfile(new_path) and not staging.isfile(old_path):
         switch_model.upgrade.print_verbose(
             f"Input file {old_name} was already renamed to {new_name}."
         )
     else:
-        shutil.move(old_path, new_path)
+        staging.move(old_path, new_path)
         switch_model.upgrade.print_verbose(
             f"Input file {old_name} has been renamed to {new_name}."
         )
@@ -87,12 +88,12 @@ def rename_column(
     inputs_dir, file_name, old_col_name, new_col_name, optional_file=True
 ):
     path = os.path.join(inputs_dir, file_name)
-    if optional_file and not os.path.isfile(path):
+    if optional_file and not staging.isfile(path):
         return
-    df = pd.read_csv(path, na_values=["."], sep=",")  # for 2.0.5+
+    df = staging.read_csv(path, na_values=["."], sep=",")  # for 2.0.5+
     if old_col_name in df.columns:
         df.rename(columns={old_col_name: new_col_name}, inplace=True)
-        df.to_csv(path, sep=",", na_rep=".", index=False)
+        staging.to_csv(df, path, sep=",", na_rep=".", index=False)
         switch_model.upgrade.print_verbose(
             f"Column {old_col_name} has been renamed to {new_col_name} in {file_name}."
         )
@@ -113,22 +114,26 @@ def move_column(
 ):
     old_path = os.path.join(inputs_dir, old_file_name)
     new_path = os.path.join(inputs_dir, new_file_name)
-    if optional_col and not os.path.isfile(old_path):
+    if optional_col and not staging.isfile(old_path):
         return
     # add dummy key to allow cross-joins
     fixed_join_cols = list(join_cols) + ["dummy_join_key"]
-    old_df = pd.read_csv(old_path, na_values=["."], sep=",").assign(dummy_join_key=0)
+    old_df = staging.read_csv(old_path, na_values=["."], sep=",").assign(
+        dummy_join_key=0
+    )
     # TODO: create new_path if it doesn't exist
-    new_df = pd.read_csv(new_path, na_values=["."], sep=",").assign(dummy_join_key=0)
+    new_df = staging.read_csv(new_path, na_values=["."], sep=",").assign(
+        dummy_join_key=0
+    )
     if old_col_name in old_df.columns:
         new_col = old_df.loc[:, fixed_join_cols + [old_col_name]].merge(
             new_df.loc[:, fixed_join_cols], on=fixed_join_cols
         )
         new_df[new_col_name] = new_col[old_col_name]
         new_df.drop("dummy_join_key", axis=1, inplace=True)
-        new_df.to_csv(new_path, sep=",", na_rep=".", index=False)
+        staging.to_csv(new_df, new_path, sep=",", na_rep=".", index=False)
         old_df.drop([old_col_name, "dummy_join_key"], axis=1, inplace=True)
-        old_df.to_csv(old_path, sep=",", na_rep=".", index=False)
+        staging.to_csv(old_df, old_path, sep=",", na_rep=".", index=False)
         switch_model.upgrade.print_verbose(
             f"Column {old_file_name} > {old_col_name} has been moved to {new_file_name} > {new_col_name}."
         )
@@ -151,11 +156,11 @@ def update_modules(inputs_dir):
     standard locations) and return list of alerts for user."""
 
     modules_path = os.path.join(inputs_dir, "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         modules_path = os.path.join(inputs_dir, "..", "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         modules_path = "modules.txt"
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         raise RuntimeError(
             "Unable to find modules or modules.txt file for input directory '{}'. "
             "This file should be located in the input directory, its parent, or "
@@ -165,7 +170,7 @@ def update_modules(inputs_dir):
 
     # Upgrade module listings
     # Each line of the original file is either a module identifier or a comment
-    with open(modules_path) as f:
+    with staging.open(modules_path) as f:
         old_module_list = [line.strip() for line in f.read().splitlines()]
 
     # rename modules as needed
@@ -184,7 +189,7 @@ def update_modules(inputs_dir):
 
     if new_module_list != old_module_list:
         # write new modules list
-        with open(modules_path, "w") as f:
+        with staging.open(modules_path, "w") as f:
             for module in new_module_list:
                 f.write(module + "\n")
 
@@ -202,7 +207,7 @@ def convert_gen_multiple_fuels_to_csv(inputs_dir):
     old_path = os.path.join(inputs_dir, "gen_multiple_fuels.dat")
     new_path = os.path.join(inputs_dir, "gen_multiple_fuels.csv")
 
-    if os.path.exists(old_path):
+    if staging.exists(old_path):
         old_df = read_dat_file(old_path)
         # df has one row for each gen; gen is the index and a list of fuels is the value
         # unpack list of allowed fuels for each generator
@@ -212,8 +217,8 @@ def convert_gen_multiple_fuels_to_csv(inputs_dir):
         new_df = pd.DataFrame.from_records(
             gen_fuels, columns=["GENERATION_PROJECT", "fuel"]
         )
-        new_df.to_csv(new_path, sep=",", na_rep=".", index=False)
-        os.remove(old_path)
+        staging.to_csv(new_df, new_path, sep=",", na_rep=".", index=False)
+        staging.remove(old_path)
 
 
 def read_dat_file(path):
@@ -229,7 +234,8 @@ def read_dat_file(path):
 
     try:
         data = DataPortal(model=DummyModel())
-        data.load(filename=path)
+        with staging.local_copy(path) as local_path:
+            data.load(filename=local_path)
         # this happens to be in a pd-friendly format
         df = pd.DataFrame(data.data())
     except Exception as e:
@@ -1,9 +1,8 @@
 # Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
 # Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
-import os, shutil, argparse, glob
-import pandas as pd
+import os
 import switch_model.upgrade
-from pyomo.environ import DataPortal
+from switch_model.upgrade import staging
 
 upgrades_from = "2.0.7"
 upgrades_to = "2.0.9"
@@ -93,14 +92,14 @@ def upgrade_input_dir(inputs_dir):
 def rename_file(inputs_dir, old_name, new_name, optional_file=True):
     old_path = os.path.join(inputs_dir, old_name)
     new_path = os.path.join(inputs_dir, new_name)
-    if optional_file and not os.path.isfile(old_path):
+    if optional_file and not staging.isfile(old_path):
         pass
-    elif os.path.isfile(new_path) and not os.path.isfile(old_path):
+    elif staging.isfile(new_path) and not staging.isfile(old_path):
         switch_model.upgrade.print_verbose(
             f"Input file {old_name} was already renamed to {new_name}."
         )
     else:
-        shutil.move(old_path, new_path)
+        staging.move(old_path, new_path)
         switch_model.upgrade.print_verbose(
             f"Input file {old_name} has been renamed to {new_name}."
         )
@@ -110,12 +109,12 @@ def rename_column(
     inputs_dir, file_name, old_col_name, new_col_name, optional_file=True
 ):
     path = os.path.join(inputs_dir, file_name)
-    if optional_file and not os.path.isfile(path):
+    if optional_file and not staging.isfile(path):
         return
-    df = pd.read_csv(path, na_values=["."], sep=",")  # for 2.0.5+
+    df = staging.read_csv(path, na_values=["."], sep=",")  # for 2.0.5+
     if old_col_name in df.columns:
         df.rename(columns={old_col_name: new_col_name}, inplace=True)
-        df.to_csv(path, sep=",", na_rep=".", index=False)
+        staging.to_csv(df, path, sep=",", na_rep=".", index=False)
         switch_model.upgrade.print_verbose(
             f"Column {old_col_name} has been renamed to {new_col_name} in {file_name}."
         )
@@ -136,22 +135,26 @@ def move_column(
 ):
     old_path = os.path.join(inputs_dir, old_file_name)
     new_path = os.path.join(inputs_dir, new_file_name)
-    if optional_col and not os.path.isfile(old_path):
+    if optional_col and not staging.isfile(old_path):
         return
     # add dummy key to allow cross-joins
     fixed_join_cols = list(join_cols) + ["dummy_join_key"]
-    old_df = pd.read_csv(old_path, na_values=["."], sep=",").assign(dummy_join_key=0)
+    old_df = staging.read_csv(old_path, na_values=["."], sep=",").assign(
+        dummy_join_key=0
+    )
     # TODO: create new_path if it doesn't exist
-    new_df = pd.read_csv(new_path, na_values=["."], sep=",").assign(dummy_join_key=0)
+    new_df = staging.read_csv(new_path, na_values=["."], sep=",").assign(
+        dummy_join_key=0
+    )
     if old_col_name in old_df.columns:
         new_col = old_df.loc[:, fixed_join_cols + [old_col_name]].merge(
             new_df.loc[:, fixed_join_cols], on=fixed_join_cols
         )
         new_df[new_col_name] = new_col[old_col_name]
         new_df.drop("dummy_join_key", axis=1, inplace=True)
-        new_df.to_csv(new_path, sep=",", na_rep=".", index=False)
+        staging.to_csv(new_df, new_path, sep=",", na_rep=".", index=False)
         old_df.drop([old_col_name, "dummy_join_key"], axis=1, inplace=True)
-        old_df.to_csv(old_path, sep=",", na_rep=".", index=False)
+        staging.to_csv(old_df, old_path, sep=",", na_rep=".", index=False)
         switch_model.upgrade.print_verbose(
             f"Column {old_file_name} > {old_col_name} has been moved to {new_file_name} > {new_col_name}."
         )
@@ -174,11 +177,11 @@ def update_modules(inputs_dir):
     standard locations) and return list of alerts for user."""
 
     modules_path = os.path.join(inputs_dir, "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         modules_path = os.path.join(inputs_dir, "..", "modules.txt")
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         modules_path = "modules.txt"
-    if not os.path.isfile(modules_path):
+    if not staging.isfile(modules_path):
         raise RuntimeError(
             "Unable to find modules or modules.txt file for input directory '{}'. "
             "This file should be located in the input directory, its parent, or "
@@ -188,7 +191,7 @@ def update_modules(inputs_dir):
 
     # Upgrade module listings
     # Each line of the original file is either a module identifier or a comment
-    with open(modules_path) as f:
+    with staging.open(modules_path) as f:
         old_module_list = [line.strip() for line in f.read().splitlines()]
 
     # rename modules as needed
@@ -207,7 +210,7 @@ def update_modules(inputs_dir):
 
     if new_module_list != old_module_list:
         # write new modules list
-        with open(modules_path, "w") as f:
+        with staging.open(modules_path, "w") as f:
             for module in new_module_list:
                 f.write(module + "\n")
 
@@ -225,9 +228,9 @@ def update_modules(inputs_dir):
 def move_hydro_initial_final_res_vol(inputs_dir):
     res_file = os.path.join(inputs_dir, "reservoirs.csv")
     res_ts_file = os.path.join(inputs_dir, "reservoir_ts_data.csv")
-    if os.path.exists(res_file):
-        res = pd.read_csv(res_file, na_values=".")
-        interp = pd.read_csv(os.path.join(inputs_dir, "timeseries.csv"))
+    if staging.exists(res_file):
+        res = staging.read_csv(res_file, na_values=".")
+        interp = staging.read_csv(os.path.join(inputs_dir, "timeseries.csv"))
         interp["dur"] = interp.eval(
             "ts_duration_of_tp * ts_num_tps * ts_scale_to_period"
         )
@@ -251,10 +254,10 @@ def move_hydro_initial_final_res_vol(inputs_dir):
         res_ts = res_ts[
             ["RESERVOIRS", "TIMESERIES", "res_initial_vol", "res_final_vol"]
         ]
-        res_ts.to_csv(res_ts_file, index=False, na_rep=".")
+        staging.to_csv(res_ts, res_ts_file, index=False, na_rep=".")
 
         res = res.drop(columns=["initial_res_vol", "final_res_vol"])
-        res.to_csv(res_file, index=False, na_rep=".")
+        staging.to_csv(res, res_file, index=False, na_rep=".")
 
         switch_model.upgrade.print_verbose()
         switch_model.upgrade.print_verbose(
@@ -6,20 +6,40 @@ Utility functions for Switch.
 """
 from __future__ import print_function, division
 
-import argparse
-import datetime
+import csv
 import importlib
+import itertools
 import os
 import re
 import sys
 import logging
-import time
 import types
-import textwrap
 
 from pyomo.environ import *
 import pyomo.opt, pyomo.version
 
+# lightweight helpers are defined separately so command-line tools can use
+# them without importing Pyomo; they are re-exported here for compatibility
+from switch_model.basic_utilities import (  # noqa: F401
+    string_types,
+    unique_list,
+    make_iterable,
+    StepTimer,
+    unwrap,
+    wrap,
+    rewrap,
+    InputError,
+    ExtendAction,
+    IncludeAction,
+    ExcludeAction,
+    _ArgumentParser,
+    approx_equal,
+    warn,
+    TeeStream,
+    LogOutput,
+    iteritems,
+)
+
 try:
     # sentinel for no value (at least for Param.default()) in newer versions of Pyomo
     NoValue = Param.NoValue
@@ -32,15 +52,6 @@ try:
 except ImportError:
     UnknownSetDimen = object()  # shouldn't ever match
 
-# Define string_types (same as six.string_types). This is useful for
-# distinguishing between strings and other iterables.
-try:
-    # Python 2
-    string_types = (basestring,)
-except NameError:
-    # Python 3
-    string_types = (str,)
-
 
 def define_AbstractModel(*module_list, **kwargs):
     # stub to provide old functionality as we move to a simpler calling convention
@@ -186,6 +197,12 @@ class SwitchAbstractModel(AbstractModel):
         except AttributeError:
             self.__num_min_data_checks = 0  # initialize
         new_data_check_name = "min_data_check_" + str(self.__num_min_data_checks)
+        # also check data from input files before the instance is constructed
+        # (see switch_model.input_checks)
+        try:
+            self.mandatory_components.extend(mandatory_components)
+        except AttributeError:
+            self.mandatory_components = list(mandatory_components)
         setattr(
             self,
             new_data_check_name,
@@ -194,6 +211,38 @@ class SwitchAbstractModel(AbstractModel):
             ),
         )
 
+    def check_range(self, param, gt=None, ge=None, lt=None, le=None):
+        """
+        Require all values of `param` to be greater than (gt), greater than
+        or equal to (ge), less than (lt) or less than or equal to (le) the
+        specified bounds. This is checked for all the data at once before the
+        instance is constructed (see switch_model.input_checks), so it is
+        faster than a `validate` rule for Params with many values.
+        """
+        from switch_model.input_checks import RangeCheck
+
+        self._add_input_check(RangeCheck(param, gt=gt, ge=ge, lt=lt, le=le))
+
+    def check_index(self, component, *sets):
+        """
+        Require each element of the index of `component` (a Set or indexed
+        Param) to be in the corresponding set in `sets`, e.g.,
+        `mod.check_index(mod.VARIABLE_GEN_TPS_RAW, mod.VARIABLE_GENS,
+        mod.TIMEPOINTS)`. This is a faster alternative to specifying `within`
+        for large Sets. Sets that are calculated from the inputs can be
+        specified as functions that accept a dict of raw input data and
+        return the valid elements; see switch_model.input_checks.
+        """
+        from switch_model.input_checks import IndexCheck
+
+        self._add_input_check(IndexCheck(component, sets))
+
+    def _add_input_check(self, check):
+        try:
+            self.input_checks.append(check)
+        except AttributeError:
+            self.input_checks = [check]
+
     def _initialize_component(self, *args, **kwargs):
         """
         This method is called to initialize each Pyomo component; we hook onto
@@ -226,11 +275,11 @@ class SwitchAbstractModel(AbstractModel):
             )
             self.__next_report_components_construction = next_report + 0.1
 
-    def load_inputs(self, inputs_dir=None, attach_data_portal=True):
+    def read_inputs(self, inputs_dir=None):
         """
-        Load input data using the appropriate modules and return a model
-        instance. This is implemented by calling the load_inputs() function of
-        each module, if the module has that function.
+        Read input data using the appropriate modules and return a DataPortal
+        holding the data. This is implemented by calling the load_inputs()
+        function of each module, if the module has that function.
         """
         if inputs_dir is None:
             inputs_dir = getattr(self.options, "inputs_dir", "inputs")
@@ -244,12 +293,34 @@ class SwitchAbstractModel(AbstractModel):
                 module.load_inputs(self, data, inputs_dir)
 
         self.logger.info(f"Data read in {timer.step_time():.2f} s.")
-        self.logger.info(f"\nConstructing model instance from data and rules...")
+        return data
 
-        if self.logger.isEnabledFor(logging.DEBUG):
-            instance = self.create_instance(data, report_timing=True)
-        else:
-            instance = self.create_instance(data, report_timing=False)
+    def load_inputs(self, inputs_dir=None, attach_data_portal=True, data=None):
+        """
+        Load input data using the appropriate modules and return a model
+        instance. If data is provided (a DataPortal from read_inputs()), it
+        is used instead of reading the inputs again.
+        """
+        if data is None:
+            data = self.read_inputs(inputs_dir)
+        timer = StepTimer()
+
+        # late import to minimize startup time
+        from switch_model import input_checks
+
+        disabled, deferred = input_checks.check_data(self, data)
+        self.logger.info(f"Input data checked in {timer.step_time():.2f} s.")
+
+        self.logger.info(f"\nConstructing model instance from data and rules...")
+        instance = None
+        try:
+            if self.logger.isEnabledFor(logging.DEBUG):
+                instance = self.create_instance(data, report_timing=True)
+            else:
+                instance = self.create_instance(data, report_timing=False)
+        finally:
+            input_checks.restore_checks(self, instance, disabled)
+        input_checks.check_instance(instance, deferred, data)
 
         if attach_data_portal:
             instance.DataPortal = data
@@ -318,63 +389,59 @@ class SwitchConcreteModel(ConcreteModel):
         if not os.path.exists(outputs_dir):
             os.makedirs(outputs_dir)
 
-        for module in self.get_modules():
-            if hasattr(module, "post_solve"):
-                module.post_solve(self, outputs_dir)
-
-
-def create_model(*args, **kwargs):
-    """Stub function to implement old functionality, now achieved via subclass."""
-    return SwitchAbstractModel(*args, **kwargs)
-
-
-def unique_list(seq):
-    """
-    Create a list with the unique elements from seq, preserving original order.
-
-    This is often useful instead of `set()` when creating Pyomo Sets from unique
-    members of a collection, since Pyomo >= 5.7 always creates ordered sets and
-    deprecates use of Python's unordered sets for initialization.
-    """
-    # from https://stackoverflow.com/a/17016257/
-    # Note that this solution depends on Python's order-preserving dicts
-    # in version 3.7+, which is fine since Switch requires Python >= 3.7.
-    return list(dict.fromkeys(seq))
+        if getattr(self.options, "results_db", False):
+            from switch_model.reporting.database import ResultsDB
 
-
-def make_iterable(item):
-    """Return an iterable for the one or more items passed."""
-    if isinstance(item, string_types):
-        i = iter([item])
-    else:
+            self.results_db = ResultsDB(self, outputs_dir)
         try:
-            # check if it's iterable
-            i = iter(item)
-        except TypeError:
-            i = iter([item])
-    return i
-
-
-class StepTimer(object):
-    """
-    Keep track of elapsed time for steps of a process.
-    Use timer = StepTimer() to create a timer, then retrieve elapsed time and/or
-    reset the timer at each step by calling timer.step_time()
-    """
+            for module in self.get_modules():
+                if hasattr(module, "post_solve"):
+                    module.post_solve(self, outputs_dir)
+            if hasattr(self, "results_db"):
+                self.results_db.finish(getattr(self, "run_start_time", None))
+        except Exception:
+            # discard the partial database, then report the original error
+            if hasattr(self, "results_db"):
+                self.results_db.abort()
+            raise
+        finally:
+            if hasattr(self, "results_db"):
+                del self.results_db
+
+    def solution_values(self, component):
+        """
+        Return a dict with the value of every element of `component` (a Var,
+        Expression, Objective or Param, or the name of one) in the current
+        solution, keyed by index. Expressions are compiled to sparse linear
+        maps and evaluated all at once, and the results are cached until the
+        model is solved again, so post-solve code in different modules can
+        share them. See switch_model.reporting.evaluate for details.
+        """
+        try:
+            evaluator = self._solution_evaluator
+        except AttributeError:
+            # late import to avoid circular dependency
+            from switch_model.reporting.evaluate import SolutionEvaluator
 
-    def __init__(self):
-        self.start_time = self.last_start = time.time()
+            evaluator = self._solution_evaluator = SolutionEvaluator(self)
+        return evaluator.solution_values(component)
 
-    def step_time(self):
+    def clear_solution_values(self):
         """
-        Reset timer to current time and return time elapsed since last step.
+        Discard values cached by solution_values(). This is called
+        automatically by switch_model.solve.solve(); code that changes the
+        solution or the model's parameters or expressions some other way
+        should call it too.
         """
-        last_start = self.last_start
-        self.last_start = now = time.time()
-        return now - last_start
+        try:
+            self._solution_evaluator.clear()
+        except AttributeError:
+            pass
+
 
-    def total_time(self):
-        return time.time() - self.start_time
+def create_model(*args, **kwargs):
+    """Stub function to implement old functionality, now achieved via subclass."""
+    return SwitchAbstractModel(*args, **kwargs)
 
 
 def save_inputs_as_dat(
@@ -396,8 +463,6 @@ def save_inputs_as_dat(
         '"{}"'.format(v) if isinstance(v, string_types) else "{}".format(str(v))
     )
     # helper function to create delimited lists from single items or iterables of any data type
-    from switch_model.reporting import make_iterable
-
     join_space = lambda items: " ".join(
         map(str, make_iterable(items))
     )  # space-separated list
@@ -420,6 +485,7 @@ def save_inputs_as_dat(
                 "ScalarSet",  # Pyomo >= 6.0
                 "OrderedScalarSet",
                 "AbstractOrderedScalarSet",
+                "CompactSet",  # switch_model.compact_sets
             }:
                 f.write(
                     "set {} := {};\n".format(component_name, join_space(component_data))
@@ -451,42 +517,6 @@ def save_inputs_as_dat(
                 )
 
 
-def unwrap(message, **kwargs):
-    """
-    Dedent and unwrap message, preserving double line breaks
-    """
-    # split paragraphs
-    paras = textwrap.dedent(message).split("\n\n")
-    # unwrap each paragraph
-    paras = [p.replace(" \n", " ").replace("\n", " ").strip() for p in paras]
-    return "\n\n".join(paras)
-
-
-def wrap(message, width=80, indent=0):
-    """
-    Wrap message, preserving double line breaks
-    """
-    ind = " " * indent
-    paras = message.split("\n\n")
-    paras = [
-        "\n".join(
-            textwrap.wrap(
-                p,
-                width=80,
-                initial_indent=ind,
-                subsequent_indent=ind,
-                replace_whitespace=False,
-            )
-        )
-        for p in paras
-    ]
-    return "\n\n".join(paras)
-
-
-def rewrap(message, **kwargs):
-    return wrap(unwrap(message), **kwargs)
-
-
 def check_mandatory_components(model, *mandatory_components):
     """
     Checks whether mandatory elements of a Pyomo model are populated,
@@ -569,21 +599,6 @@ def check_mandatory_components(model, *mandatory_components):
     return True
 
 
-class InputError(Exception):
-    """Exception raised for errors in the input.
-
-    Attributes:
-        expression -- input expression in which the error occurred
-        message -- explanation of the error
-    """
-
-    def __init__(self, value):
-        self.value = value
-
-    def __str__(self):
-        return str(self.value)
-
-
 def apply_input_aliases(switch_data, path):
     """
     Translate filenames based on --input-alias[es] arguments.
@@ -675,6 +690,17 @@ def load_aug(switch_data, optional=False, optional_params=[], **kwargs):
 
     # convert filename if needed
     kwargs["filename"] = apply_input_aliases(switch_data, kwargs["filename"])
+    # use a wide-matrix version of the file instead, if available
+    matrix_sets = kwargs.pop("matrix_sets", None)
+    matrix_path = find_matrix_file(kwargs["filename"], switch_data._model.logger)
+    if matrix_path is not None:
+        kwargs["filename"] = matrix_path
+        load_matrix(switch_data, sets=matrix_sets, **kwargs)
+        return
+    # use a columnar version of the file instead, if available
+    kwargs["filename"] = find_columnar_file(
+        kwargs["filename"], switch_data._model.logger
+    )
     # store filename in local variable for easier access
     path = kwargs["filename"]
 
@@ -701,24 +727,29 @@ def load_aug(switch_data, optional=False, optional_params=[], **kwargs):
 
     # copy optional_params to avoid side-effects when the list is altered below
     optional_params = list(optional_params)
-    # Parse header and first row
-    with open(path) as infile:
-        headers_line = infile.readline()
-        second_line = infile.readline()
-    file_is_empty = headers_line == ""
-    file_has_no_data_rows = second_line == ""
     suffix = path.split(".")[-1]
-    if suffix in {"tab", "tsv"}:
-        separator = "\t"
-    elif suffix == "csv":
-        separator = ","
+    if suffix in columnar_suffixes:
+        headers, num_rows = read_columnar_header(path)
+        file_is_empty = not headers
+        file_has_no_data_rows = num_rows == 0
     else:
-        raise InputError(
-            f"Unrecognized file type for input file {path}. Allowed file types "
-            "are .csv (preferred), .tab or .tsv."
-        )
-    # TODO: parse this more formally, e.g. using csv module
-    headers = headers_line.strip().split(separator)
+        # Parse header and first row
+        with open(path) as infile:
+            headers_line = infile.readline()
+            second_line = infile.readline()
+        file_is_empty = headers_line == ""
+        file_has_no_data_rows = second_line == ""
+        if suffix in {"tab", "tsv"}:
+            separator = "\t"
+        elif suffix == "csv":
+            separator = ","
+        else:
+            raise InputError(
+                f"Unrecognized file type for input file {path}. Allowed file "
+                "types are .csv (preferred), .tab, .tsv, .parquet or .feather."
+            )
+        # TODO: parse this more formally, e.g. using csv module
+        headers = headers_line.strip().split(separator)
     # Skip if the file is empty.
     if optional and file_is_empty:
         return
@@ -815,6 +846,15 @@ def load_aug(switch_data, optional=False, optional_params=[], **kwargs):
         except AttributeError:
             map = switch_data._model.param_column_map = dict()
         map[param.name] = (kwargs["filename"], col)
+    # and where the index columns and sets came from, for reporting by
+    # switch_model.input_checks
+    model = switch_data._model
+    if not hasattr(model, "input_file_index_columns"):
+        model.input_file_index_columns = dict()
+        model.input_set_files = dict()
+    model.input_file_index_columns[kwargs["filename"]] = kwargs["select"][:num_indexes]
+    if "index" in kwargs:
+        model.input_set_files[kwargs["index"].name] = kwargs["filename"]
 
     if optional and file_has_no_data_rows:
         # Skip the file.  Note that we are only doing this after having
@@ -826,7 +866,11 @@ def load_aug(switch_data, optional=False, optional_params=[], **kwargs):
     # All done with cleaning optional bits. Pass the updated arguments
     # into the DataPortal.load() function.
     try:
-        switch_data.load(**kwargs)
+        if suffix in columnar_suffixes:
+            kwargs["set_name"] = kwargs.pop("set", None)
+            load_columnar(switch_data, **kwargs)
+        else:
+            switch_data.load(**kwargs)
     except Exception as e:
         # Pyomo error messages can be very cryptic, so we at least make sure to
         # show which file is being read. Users can use --debug to try to dig a
@@ -842,270 +886,294 @@ def load_aug(switch_data, optional=False, optional_params=[], **kwargs):
         msg = str(e)
         if msg == "string index out of range":
             # This is usually caused by empty cells
-            switch_data._model.logger.error(
-                rewrap(
-                    """
+            switch_data._model.logger.error(rewrap("""
                     Please ensure there are no empty cells (,, on row or , at
                     end of line with nothing after it) or rows with the wrong
                     number of cells. Cells with no data should have a single
                     period (.) rather than being left empty.
-                    """
-                )
-            )
+                    """))
         raise
 
 
-# Define an argument parser that accepts the allow_abbrev flag to
-# prevent partial matches, even on versions of Python before 3.5.
-# See https://bugs.python.org/issue14910
-# This is needed because the parser may sometimes be called with only a subset
-# of the eventual argument list (e.g., to parse module-related arguments before
-# loading the modules and adding their arguments to the list), and without this
-# flag, the parser could match arguments that are meant to be used later
-# (It's not likely, but for example if the user specifies a flag "--exclude",
-# which will be consumed by one of their modules, the default parser would
-# match that to "--exclude-modules" during the early, partial parse.)
-if sys.version_info >= (3, 5):
-    _ArgumentParserAllowAbbrev = argparse.ArgumentParser
-else:
-    # patch ArgumentParser to accept the allow_abbrev flag
-    # (works on Python 2.7 and maybe others)
-    class _ArgumentParserAllowAbbrev(argparse.ArgumentParser):
-        def __init__(self, *args, **kwargs):
-            if not kwargs.get("allow_abbrev", True):
-                if hasattr(self, "_get_option_tuples"):
-                    # force self._get_option_tuples to return an empty list (of partial matches)
-                    # see https://bugs.python.org/issue14910#msg204678
-                    def new_get_option_tuples(self, option_string):
-                        return []
-
-                    self._get_option_tuples = types.MethodType(
-                        new_get_option_tuples, self
-                    )
-                else:
-                    raise RuntimeError(
-                        "Incompatible argparse module detected. This software requires "
-                        "Python 3.5 or later, or an earlier version of argparse that defines "
-                        "ArgumentParser._get_option_tuples()"
-                    )
-            # consume the allow_abbrev argument if present
-            kwargs.pop("allow_abbrev", None)
-            return argparse.ArgumentParser.__init__(self, *args, **kwargs)
-
-
-class ExtendAction(argparse.Action):
-    """Create or extend list with the provided items"""
-
-    # from https://stackoverflow.com/a/41153081/3830997
-    def __call__(self, parser, namespace, values, option_string=None):
-        items = getattr(namespace, self.dest) or []
-        items.extend(values)
-        setattr(namespace, self.dest, items)
-
-
-class IncludeAction(argparse.Action):
-    """Flag the specified items for inclusion in the model"""
-
-    def __call__(self, parser, namespace, values, option_string=None):
-        items = getattr(namespace, self.dest) or []
-        items.append(("include", values))
-        setattr(namespace, self.dest, items)
-
-
-class ExcludeAction(argparse.Action):
-    """Flag the specified items for exclusion from the model"""
-
-    def __call__(self, parser, namespace, values, option_string=None):
-        items = getattr(namespace, self.dest) or []
-        items.append(("exclude", values))
-        setattr(namespace, self.dest, items)
+# Input tables can also be stored in typed, columnar formats (Apache Parquet
+# or Feather/Arrow IPC). These are read with pyarrow, which is only imported
+# when needed. `switch convert-inputs` creates these files from csv files.
+columnar_suffixes = {"parquet", "feather"}
 
 
-# Test whether we need to issue warnings about the Python parsing bug.
-# (applies to at least Python 2.7.11 and 3.6.2)
-# This bug messes up solve-scenarios if the user specifies
-# --scenario x --solver-options-string="a=b c=d"
-test_parser = argparse.ArgumentParser()
-test_parser.add_argument("--arg1", nargs="+", default=[])
-bad_equal_parser = (
-    len(test_parser.parse_known_args(["--arg1", "a", "--arg2=a=1 b=2"])[1]) == 0
-)
+def find_columnar_file(path, logger=None):
+    """
+    Return the path of a .parquet or .feather file with the same name as the
+    .csv, .tab or .tsv file specified by `path`, if one exists and is not
+    older than the original file; otherwise return `path`. This allows
+    modules to request standard .csv files and use columnar versions when
+    available. If `logger` is provided, a warning is logged when an outdated
+    columnar file is skipped.
+    """
+    root, ext = os.path.splitext(path)
+    if ext not in {".csv", ".tab", ".tsv"}:
+        return path
+    for suffix in ["parquet", "feather"]:
+        alt_path = root + "." + suffix
+        if os.path.isfile(alt_path):
+            if os.path.isfile(path) and os.path.getmtime(path) > os.path.getmtime(
+                alt_path
+            ):
+                # the original file has been edited since it was converted
+                if logger is not None:
+                    logger.warning(
+                        f"{path} is newer than {alt_path}, so {path} will be "
+                        f"used. Re-create {alt_path} with `switch "
+                        "convert-inputs` to use the faster format again."
+                    )
+                continue
+            return alt_path
+    return path
 
 
-# TODO: merge the _ArgumentParserAllowAbbrev code into this class
-class _ArgumentParser(_ArgumentParserAllowAbbrev):
+def read_columnar_header(path):
     """
-    Custom version of ArgumentParser:
-    - warns about a bug in standard Python ArgumentParser for --arg="some words"
-    - allows use of 'extend', 'include' and 'exclude' actions to accumulate lists
-      with multiple calls
+    Return a list of column names and the number of rows in a .parquet or
+    .feather file, without reading the data.
     """
+    try:
+        import pyarrow.parquet, pyarrow.ipc
+    except ImportError:
+        raise InputError(
+            f"The pyarrow package is needed to read {path}. Please install it, "
+            "e.g., with `pip install pyarrow`."
+        )
+    if path.endswith(".parquet"):
+        meta = pyarrow.parquet.read_metadata(path)
+        return meta.schema.to_arrow_schema().names, meta.num_rows
+    else:
+        with pyarrow.ipc.open_file(path) as reader:
+            num_rows = sum(
+                reader.get_batch(i).num_rows for i in range(reader.num_record_batches)
+            )
+            return reader.schema.names, num_rows
 
-    def __init__(self, *args, **kwargs):
-        super(_ArgumentParser, self).__init__(*args, **kwargs)
-        self.register("action", "extend", ExtendAction)
-        self.register("action", "include", IncludeAction)
-        self.register("action", "exclude", ExcludeAction)
-
-    def parse_known_args(self, args=None, namespace=None):
-        # parse_known_args parses arguments like --list-arg a b --other-arg="something with space"
-        # as list_arg=['a', 'b', '--other-arg="something with space"'].
-        # See https://bugs.python.org/issue34390.
-        # We issue a warning to avoid this.
-        if bad_equal_parser and args is not None:
-            for a in args:
-                if a.startswith("--") and "=" in a:
-                    print(
-                        "Warning: argument '{}' may be parsed incorrectly. It is "
-                        "safer to use ' ' instead of '=' as a separator.".format(a)
-                    )
-                    time.sleep(2)  # give users a chance to see it
-        return super(_ArgumentParser, self).parse_known_args(args, namespace)
 
+def read_columnar_table(path, columns):
+    """
+    Read the specified columns from a .parquet or .feather file and return
+    a list of lists of native Python values, one per column. Missing values
+    are returned as None. Column types other than integers, floating point
+    numbers, booleans and strings (e.g., dates) are converted to strings.
+    """
+    import pyarrow, pyarrow.feather, pyarrow.parquet
 
-def approx_equal(a, b, tolerance=0.01):
-    return abs(a - b) <= (abs(a) + abs(b)) / 2.0 * tolerance
+    if path.endswith(".parquet"):
+        table = pyarrow.parquet.read_table(path, columns=columns)
+    else:
+        table = pyarrow.feather.read_table(path, columns=columns)
+    data = []
+    for col in columns:
+        col = table.column(col)
+        t = col.type
+        if not (
+            pyarrow.types.is_integer(t)
+            or pyarrow.types.is_floating(t)
+            or pyarrow.types.is_boolean(t)
+            or pyarrow.types.is_string(t)
+            or pyarrow.types.is_large_string(t)
+            or pyarrow.types.is_null(t)
+        ):
+            col = col.cast(pyarrow.string())
+        data.append(col.to_pylist())
+    return data
+
+
+def read_input_rows(path):
+    """
+    Read an input table and return a list of dicts of text values, one per
+    row, like csv.DictReader. This is for modules that parse input files
+    directly instead of via DataPortal. If a .parquet or .feather version of
+    the file exists, it is used instead, with missing values shown as ".".
+    """
+    path = find_columnar_file(path)
+    if os.path.splitext(path)[1][1:] in columnar_suffixes:
+        headers, num_rows = read_columnar_header(path)
+        cols = read_columnar_table(path, headers)
+        return [
+            {h: "." if v is None else str(v) for h, v in zip(headers, row)}
+            for row in zip(*cols)
+        ]
+    delimiter = "," if path.endswith(".csv") else "\t"
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f, delimiter=delimiter))
+
+
+def load_columnar(
+    switch_data, filename, select=None, param=(), index=None, set_name=None
+):
+    """
+    Load data from a .parquet or .feather file into DataPortal `switch_data`,
+    like DataPortal.load() does for .csv files. The values in the file are
+    stored directly, without converting them to and from text, and only the
+    selected columns are read. Missing values (nulls) are treated the same as
+    "." in .csv files. set_name is the Set (or its name) to load the rows
+    into, given as `set` when calling DataPortal.load().
+    """
+    data = switch_data._data.setdefault(None, {})
+    select = list(select or [])
+    if set_name is not None:
+        # load the selected columns (or all columns) as members of a set
+        if not isinstance(set_name, string_types):
+            set_name = set_name.local_name
+        if not select:
+            select = read_columnar_header(filename)[0]
+        cols = read_columnar_table(filename, select)
+        if None in itertools.chain(*cols):
+            raise InputError(f"Missing values found in {filename}.")
+        members = list(zip(*cols)) if len(cols) > 1 else cols[0]
+        data[set_name] = {None: members}
+        return
 
+    if not isinstance(param, (list, tuple)):
+        param = [param]
+    param_names = [p if isinstance(p, string_types) else p.local_name for p in param]
+    num_indexes = len(select) - len(param_names)
+    cols = read_columnar_table(filename, select)
+    index_cols, value_cols = cols[:num_indexes], cols[num_indexes:]
+    if num_indexes == 0:
+        # single row of scalar parameters
+        for p, vals in zip(param_names, value_cols):
+            if vals and vals[0] is not None:
+                data.setdefault(p, {})[None] = vals[0]
+        return
 
-def default_solver():
-    return pyomo.opt.SolverFactory("glpk")
+    if None in itertools.chain(*index_cols):
+        raise InputError(f"Missing values found in index columns of {filename}.")
+    keys = list(zip(*index_cols)) if num_indexes > 1 else index_cols[0]
+    if index is not None:
+        index_name = index if isinstance(index, string_types) else index.local_name
+        data[index_name] = {None: keys}
+    for p, vals in zip(param_names, value_cols):
+        # like DataPortal.load(), add to any values already loaded
+        data.setdefault(p, {}).update(
+            (k, v) for k, v in zip(keys, vals) if v is not None
+        )
 
 
-def warn(message):
+# Large tables indexed by two sets, e.g., variable_capacity_factors.csv
+# (GENERATION_PROJECT, timepoint) or loads.csv (LOAD_ZONE, TIMEPOINT), can
+# also be stored as a binary matrix in .npy format, with one row per member of
+# the second index set and one column per member of the first. The labels for
+# the rows and columns are stored in <name>_rows.csv and <name>_columns.csv.
+# The matrix is memory-mapped, so only the rows that are needed are read from
+# disk, and the operating system can share one cached copy between several
+# Switch processes. `switch convert-inputs --matrix` creates these files.
+def find_matrix_file(path, logger=None):
     """
-    Send warning message to sys.stderr.
-    Unlike warnings.warn, this does not add the current line of code to the message.
-    TODO: replace all calls to this with model.logger.warn()
+    Return the path of a .npy matrix with the same name as the .csv, .tab or
+    .tsv file specified by `path`, if one exists and is not older than the
+    original file; otherwise return None.
     """
-    sys.stderr.write("WARNING: " + message + "\n")
+    root, ext = os.path.splitext(path)
+    matrix_path = root + ".npy"
+    if ext not in {".csv", ".tab", ".tsv"} or not os.path.isfile(matrix_path):
+        return None
+    if os.path.isfile(path) and os.path.getmtime(path) > os.path.getmtime(
+        matrix_path
+    ):
+        # the original file has been edited since it was converted
+        if logger is not None:
+            logger.warning(
+                f"{path} is newer than {matrix_path}, so {path} will be used. "
+                f"Re-create {matrix_path} with `switch convert-inputs --matrix` "
+                "to use the faster format again."
+            )
+        return None
+    return matrix_path
 
 
-class TeeStream(object):
+def read_matrix_labels(path):
     """
-    Virtual stream that writes output to both stream1 and stream2. Attributes
-    of stream1 will be reported to callers if needed. For example, specifying
-    `sys.stdout=TeeStream(sys.stdout, log_file_handle)` will copy
-    output destined for sys.stdout to log_file_handle as well.
+    Read the row or column labels for a matrix from a single-column input
+    file, converting them the same way as Pyomo's DataPortal.
     """
+    from pyomo.dataportal.process_data import _process_token
 
-    def __init__(self, stream1, stream2):
-        self.stream1 = stream1
-        self.stream2 = stream2
-
-    def __getattr__(self, *args, **kwargs):
-        """
-        Provide stream1 attributes when attributes are requested for this class.
-        This supports code that assumes sys.stdout is an object with its own
-        methods, etc.
-        """
-        return getattr(self.stream1, *args, **kwargs)
-
-    def write(self, text):
-        self.stream1.write(text)
-        self.stream2.write(text)
-        return len(text)
-
-    def flush(self):
-        self.stream1.flush()
-        self.stream2.flush()
+    if not os.path.isfile(find_columnar_file(path)):
+        raise InputError(f"Labels file {path} is missing.")
+    return [_process_token(v) for row in read_input_rows(path) for v in row.values()]
 
 
-class LogOutput(object):
+def load_matrix(
+    switch_data, filename, sets=None, param=(), index=None, select=None, **kwargs
+):
     """
-    Copy output sent to stdout or stderr to a log file in the specified
-    directory. Takes no action if directory is None. Log file is named based on
-    the current date and time. Directory will be created if needed, and file
-    will have microseconds added to the name if needed to avoid overwriting
-    existing any existing file.
-
-    TODO:
-    - make this thread-aware (register and lookup an output stream for this
-      particular thread),
-    - accept model as argument instead of logs_dir and get the file name from
-      model.options or else create a name as shown here
-    - allow nesting (requesting same log file that is already open), so we can
-      wrap the body of solve.main but also wrap solve.solve, solve.presolve,
-      etc., so we can
-    - make sure it appends to existing files rather than replacing
-    - wrap all our API code (solve.main, solve.iterate, solve.solve,
-      model.pre_solve, model.post_solve, model.__init__, etc.) with
-      LogOutput(model) so that all log messages for one model will go to the
-      same file, even if multiple models are processed at the same time in
-      different threads or sequentially in the same thread.
-    - Alternatively, treat logging as app-specific rather than model-specific,
-      so switch solve or switch solve-scenarios identifies the active log file
-      and log level when it first starts, and sticks with that until it exits.
-    - Once all modules use loggers instead of print, it may be possible to have
-      this work by creating file handlers for the root logger, each of which has
-      a filter that only accepts messages if the current thread matches the
-      thread that created that logger (i.e., only accepts messages from the
-      thread that created it). Then the handler is removed when the block
-      finishes.
-
-    Note: Python/pyomo holds logging info on a singleton basis (in the logging module
-    for each pyomo module name), so we either need to
-        (1) patch the logging module to have/lookup different loggers per
-            thread, probably based on thread ID, then wrap our API with a logger
-            configuration (or stdout capture), so every operation on a particular
-            model is wrapped with logger configuration for that model; or
-        (2) treat logging as an application setting (either switch solve or
-            switch solve-scenarios), not a model setting, so we just start
-            logging/capture at startup and continue till the app exits; or
-        (3) like (1) but with locks on our API to prevent multithreading, so we
-            don't have to patch the logging module, just reconfigure the root logger
-            at the start of each function (but this precludes any multithreaded
-            loading/running of Switch models). (preferred)
+    Load a parameter (and optionally its index set) into DataPortal
+    `switch_data` from .npy matrix `filename`. The parameter is indexed by
+    (column label, row label). If `sets` is a pair of components (for the
+    columns and rows), only labels that have already been loaded for those
+    components are used, and only the matching rows are read from the file.
+    InputError is raised if the labels are duplicated or none of them match.
+    Missing values should be stored as NaN.
     """
+    import numpy
 
-    def __init__(self, logs_dir):
-        self.logs_dir = logs_dir
-
-    def __enter__(self):
-        """start copying output to log file"""
-        if self.logs_dir is not None:
-            log_file_path = self.make_file_path()
-            self.log_file = open(log_file_path, "w", buffering=1)
-            self.stdout = sys.stdout
-            self.stderr = sys.stderr
-            sys.stdout = TeeStream(sys.stdout, self.log_file)
-            # sys.stderr = TeeStream(sys.stderr, self.log_file)
-            print("logging output to " + str(log_file_path))
-
-    def __exit__(self, type, value, traceback):
-        """restore original output streams and close log file"""
-        if self.logs_dir is not None:
-            sys.stdout = self.stdout
-            sys.stderr = self.stderr
-            self.log_file.close()
-
-    def make_file_path(self):
-        """
-        Create a log file on disk and return the file name (guaranteed unique).
-        When this function returns, the file exists but is empty and closed.
-        """
-        path = lambda format: os.path.join(
-            self.logs_dir, datetime.datetime.now().strftime(format) + ".log"
+    root = filename[: -len(".npy")]
+    row_labels = read_matrix_labels(root + "_rows.csv")
+    col_labels = read_matrix_labels(root + "_columns.csv")
+    matrix = numpy.load(filename, mmap_mode="r")
+    if matrix.shape != (len(row_labels), len(col_labels)):
+        raise InputError(
+            f"{filename} has shape {matrix.shape}, but there are "
+            f"{len(row_labels)} row labels and {len(col_labels)} column labels."
         )
-        # make sure logs directory exists
-        if not os.path.exists(self.logs_dir):
-            os.makedirs(self.logs_dir)
-        file_path = path("%Y-%m-%d_%H-%M-%S")
-        while True:
-            try:
-                f = os.open(file_path, os.O_CREAT | os.O_EXCL)
-                # succeeded
-                os.close(f)
-                break
-            except FileExistsError:
-                # try again with microseconds in name and a little delay
-                file_path = path("%Y-%m-%d_%H-%M-%S.%f")
-        return file_path
-
-
-def iteritems(obj):
-    """Iterator of key, value pairs for obj;
-    equivalent to obj.items() on Python 3+ and obj.iteritems() on Python 2"""
-    try:
-        return obj.iteritems()
-    except AttributeError:  # Python 3+
-        return obj.items()
+    if not isinstance(param, (list, tuple)):
+        param = [param]
+    if len(param) != 1:
+        raise InputError(
+            f"{filename} can only be used for a single parameter, but "
+            f"{len(param)} were requested."
+        )
+    param_name = param[0] if isinstance(param[0], string_types) else param[0].local_name
+
+    data = switch_data._data.setdefault(None, {})
+    rows, cols = range(len(row_labels)), range(len(col_labels))
+    if sets is not None:
+        # only use labels that are members of the sets loaded so far, e.g.,
+        # a matrix may cover more timepoints than the current sample
+        for labels, s, kind in [
+            (row_labels, sets[1], "rows"),
+            (col_labels, sets[0], "columns"),
+        ]:
+            set_name = s if isinstance(s, string_types) else s.local_name
+            if set_name not in data:
+                continue
+            if len(set(labels)) < len(labels):
+                raise InputError(f"{root}_{kind}.csv has duplicate labels.")
+            members = set(data[set_name][None])
+            selected = [i for i, x in enumerate(labels) if x in members]
+            if members and not selected:
+                # probably the wrong file or labels of the wrong type
+                raise InputError(
+                    f"None of the labels in {root}_{kind}.csv are members of "
+                    f"{set_name}."
+                )
+            if len(selected) < len(labels):
+                switch_data._model.logger.info(
+                    f"Skipping {len(labels) - len(selected)} {kind} of "
+                    f"{filename} that are not members of {set_name}."
+                )
+                if kind == "rows":
+                    rows = selected
+                else:
+                    cols = selected
+    # read only the selected rows from the memory-mapped file
+    values = matrix[numpy.ix_(rows, cols)].T.ravel().tolist()
+    keys = ((col_labels[c], row_labels[r]) for c in cols for r in rows)
+    # NaN != NaN, so this omits missing values
+    param_data = {k: v for k, v in zip(keys, values) if v == v}
+
+    if index is not None:
+        index_name = index if isinstance(index, string_types) else index.local_name
+        data[index_name] = {None: list(param_data)}
+    data.setdefault(param_name, {}).update(param_data)
+
+
+def default_solver():
+    return pyomo.opt.SolverFactory("glpk")
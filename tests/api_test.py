@@ -0,0 +1,149 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import argparse
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import switch_model.api as api
+from switch_model.basic_utilities import _ArgumentParser
+from .examples_test import TOP_DIR
+
+
+class InfoServerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def serve(self, *lines):
+        """Send lines to `switch serve` over stdin and return the responses."""
+        env = dict(os.environ)
+        env["XDG_CACHE_HOME"] = os.path.join(self.temp_dir, "cache")
+        env["PYTHONPATH"] = os.pathsep.join(
+            [TOP_DIR] + [p for p in [env.get("PYTHONPATH")] if p]
+        )
+        result = subprocess.run(
+            [sys.executable, "-m", "switch_model.main", "serve"],
+            input="".join(line + "\n" for line in lines),
+            capture_output=True,
+            text=True,
+            cwd=self.temp_dir,
+            env=env,
+            timeout=300,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return [json.loads(line) for line in result.stdout.splitlines()]
+
+    def test_stdio_requests(self):
+        responses = self.serve(
+            json.dumps({"jsonrpc": "2.0", "id": 1, "method": "module_list"}),
+            json.dumps(
+                {
+                    "jsonrpc": "2.0",
+                    "id": 2,
+                    "method": "module_arguments",
+                    "params": {"module": "switch_model.solve"},
+                }
+            ),
+            json.dumps({"jsonrpc": "2.0", "id": 3, "method": "no_such_method"}),
+            "{not json",
+            json.dumps({"jsonrpc": "2.0", "id": 4, "method": "shutdown"}),
+        )
+        self.assertEqual(len(responses), 5)
+        module_list, module_arguments, unknown, bad_json, shutdown = responses
+
+        self.assertEqual(module_list["id"], 1)
+        self.assertIn("switch_model.timescales", module_list["result"])
+        self.assertIn("switch_model.balancing.load_zones", module_list["result"])
+
+        self.assertEqual(module_arguments["id"], 2)
+        self.assertIn("--solver", module_arguments["result"])
+        self.assertEqual(module_arguments["result"]["--solver"]["action"], "Store")
+
+        self.assertEqual(unknown["id"], 3)
+        self.assertEqual(unknown["error"]["code"], -32601)
+
+        self.assertIsNone(bad_json["id"])
+        self.assertEqual(bad_json["error"]["code"], -32700)
+
+        self.assertEqual(shutdown, {"jsonrpc": "2.0", "id": 4, "result": None})
+
+    def test_reload_errors_are_reported(self):
+        module_path = os.path.join(self.temp_dir, "api_test_local_module.py")
+        with open(module_path, "w") as f:
+            f.write("def define_components(m):\n    pass\n")
+        orig_dir = os.getcwd()
+        os.chdir(self.temp_dir)
+        sys.path.insert(0, self.temp_dir)
+        try:
+            import api_test_local_module
+
+            server = api.InfoServer()
+            with open(module_path, "w") as f:
+                f.write("def define_components(m):\n    pass +\n")
+            os.utime(module_path, ns=(0, 0))
+            request = {"jsonrpc": "2.0", "id": 1, "method": "module_list"}
+            response = server.handle_request(request)
+            self.assertEqual(response["error"]["code"], -32000)
+            self.assertIn("api_test_local_module", response["error"]["message"])
+
+            # the module is reloaded once it is fixed
+            with open(module_path, "w") as f:
+                f.write("def define_components(m):\n    pass\n\nfixed = True\n")
+            os.utime(module_path, ns=(10**9, 10**9))
+            response = server.handle_request(request)
+            self.assertIn("result", response)
+            self.assertTrue(api_test_local_module.fixed)
+        finally:
+            os.chdir(orig_dir)
+            sys.path.remove(self.temp_dir)
+            sys.modules.pop("api_test_local_module", None)
+
+
+class ModuleArgumentsTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+        self.orig_index = api.module_index
+        api.module_index = api.ModuleIndex(os.path.join(self.temp_dir, "index.json"))
+
+    def tearDown(self):
+        api.module_index = self.orig_index
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def imported_arguments(self, module):
+        parser = _ArgumentParser()
+        importlib.import_module(module).define_arguments(parser)
+        result = dict()
+        for arg in parser._actions:
+            if not isinstance(arg, argparse._HelpAction):
+                result.update(api.arg_dict(arg))
+        return result
+
+    def test_static_arguments_match_import(self):
+        # arguments found by parsing the source match the ones defined when
+        # the module is imported
+        checked = 0
+        for module in api.module_list():
+            if not module.startswith("switch_model."):
+                continue
+            info = api.module_index.get(api.find_module_file(module))
+            if not info["arguments"]:
+                continue
+            with self.subTest(module=module):
+                self.assertEqual(
+                    api.module_arguments(module), self.imported_arguments(module)
+                )
+            checked += 1
+        self.assertGreater(checked, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from switch_model.benchmark import compare_results, main
+from .examples_test import available_solver
+
+
+def make_results(time, memory, objective):
+    return {
+        "cases": [
+            {
+                "name": "base_z1_g2_t4_p1",
+                "objective": objective,
+                "phases": {
+                    "construct": {"time": time, "peak_memory_mb": memory},
+                    "solve": {"time": 0.01, "peak_memory_mb": 50.0},
+                },
+            }
+        ]
+    }
+
+
+class CompareResultsTest(unittest.TestCase):
+    def test_compare_results(self):
+        baseline = make_results(2.0, 100.0, 1000.0)
+        # within the tolerances
+        self.assertEqual(
+            compare_results(baseline, make_results(2.4, 110.0, 1000.0), 0.25, 0.15),
+            [],
+        )
+        # large fractional changes that are too small to count
+        self.assertEqual(
+            compare_results(
+                make_results(0.01, 1.0, 1000.0),
+                make_results(0.05, 5.0, 1000.0),
+                0.25,
+                0.15,
+            ),
+            [],
+        )
+        self.assertEqual(
+            compare_results(baseline, make_results(3.0, 150.0, 1001.0), 0.25, 0.15),
+            [
+                "base_z1_g2_t4_p1 construct: time 3.00 s vs. 2.00 s (+50%)",
+                "base_z1_g2_t4_p1 construct: peak memory 150 MB vs. 100 MB (+50%)",
+                "base_z1_g2_t4_p1: objective 1001.0 vs. 1000.0",
+            ],
+        )
+        # cases that are not in the baseline are skipped, but baseline cases
+        # that were not run are regressions
+        other = make_results(3.0, 150.0, 1001.0)
+        other["cases"][0]["name"] = "commit_z1_g2_t4_p1"
+        self.assertEqual(
+            compare_results(baseline, other, 0.25, 0.15),
+            ["base_z1_g2_t4_p1: missing from results"],
+        )
+        other["cases"].extend(make_results(2.0, 100.0, 1000.0)["cases"])
+        self.assertEqual(compare_results(baseline, other, 0.25, 0.15), [])
+
+    def test_failed_case(self):
+        # a case that failed in the solve phase has no solve results or
+        # objective
+        baseline = make_results(2.0, 100.0, 1000.0)
+        failed = make_results(2.0, 100.0, 1000.0)
+        (case,) = failed["cases"]
+        case["error"] = "solve phase failed: RuntimeError: no solver"
+        del case["phases"]["solve"]
+        del case["objective"]
+        self.assertEqual(
+            compare_results(baseline, failed, 0.25, 0.15),
+            [
+                "base_z1_g2_t4_p1: solve phase failed: RuntimeError: no solver",
+                "base_z1_g2_t4_p1 solve: phase did not run",
+                "base_z1_g2_t4_p1: no objective vs. 1000.0",
+            ],
+        )
+
+
+@unittest.skipIf(available_solver() is None, "no solver available")
+class BenchmarkBaselineTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def run_benchmark(self, output, *extra_args):
+        """Run a tiny benchmark and return the exit status and printed output."""
+        stdout = io.StringIO()
+        args = [
+            "--scale",
+            "1",
+            "2",
+            "4",
+            "1",
+            "--stacks",
+            "base",
+            "--output",
+            output,
+            "--solver",
+            available_solver(),
+        ] + list(extra_args)
+        status = 0
+        with contextlib.redirect_stdout(stdout):
+            try:
+                main(args)
+            except SystemExit as e:
+                status = e.code
+        return status, stdout.getvalue()
+
+    def test_baseline(self):
+        baseline_file = os.path.join(self.temp_dir, "baseline.json")
+        self.assertEqual(self.run_benchmark(baseline_file)[0], 0)
+        status, output = self.run_benchmark(
+            os.path.join(self.temp_dir, "same.json"), "--baseline", baseline_file
+        )
+        self.assertEqual(status, 0)
+        self.assertIn(f"No regressions compared to {baseline_file}.", output)
+
+        # make the baseline use much less memory and find a different objective
+        with open(baseline_file) as f:
+            baseline = json.load(f)
+        (case,) = baseline["cases"]
+        case["phases"]["solve"]["peak_memory_mb"] = 1.0
+        case["objective"] *= 2
+        with open(baseline_file, "w") as f:
+            json.dump(baseline, f)
+        status, output = self.run_benchmark(
+            os.path.join(self.temp_dir, "worse.json"), "--baseline", baseline_file
+        )
+        self.assertEqual(status, 1)
+        self.assertIn(f"Regressions compared to {baseline_file}:", output)
+        self.assertIn("  base_z1_g2_t4_p1 solve: peak memory ", output)
+        self.assertIn("MB vs. 1 MB (+", output)
+        self.assertIn("  base_z1_g2_t4_p1: objective ", output)
+
+    def test_phase_failure(self):
+        # an unknown solver makes the solve phase fail in the worker process
+        baseline_file = os.path.join(self.temp_dir, "baseline.json")
+        self.assertEqual(self.run_benchmark(baseline_file)[0], 0)
+        failed_file = os.path.join(self.temp_dir, "failed.json")
+        for extra_args in [[], ["--baseline", baseline_file]]:
+            status, output = self.run_benchmark(
+                failed_file, "--solver", "no_such_solver", *extra_args
+            )
+            self.assertEqual(status, 1)
+            with open(failed_file) as f:
+                (case,) = json.load(f)["cases"]
+            self.assertTrue(case["error"].startswith("solve phase failed: "))
+            self.assertNotIn("solve", case["phases"])
+            self.assertIn("  base_z1_g2_t4_p1: solve phase failed: ", output)
+        self.assertIn(f"Regressions compared to {baseline_file}:", output)
+        self.assertIn("  base_z1_g2_t4_p1 solve: phase did not run", output)
+        self.assertIn("  base_z1_g2_t4_p1 post_solve: phase did not run", output)
+        self.assertIn("  base_z1_g2_t4_p1: no objective vs. ", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
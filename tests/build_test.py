@@ -0,0 +1,112 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import switch_model.solve
+from .examples_test import copy_example, update_csv
+
+
+def load_instance(example_dir, *extra_args):
+    args = [
+        "--inputs-dir",
+        os.path.join(example_dir, "inputs"),
+        "--log-level",
+        "error",
+    ] + list(extra_args)
+    model = switch_model.solve.create_model(
+        switch_model.solve.get_module_list(args), args=args
+    )
+    return model.load_inputs()
+
+
+def can_operate(m, g, bld_yr, period):
+    """Rule-based test of whether a vintage can run in a period."""
+    online = m.period_start[bld_yr] if bld_yr in m.PERIODS else bld_yr
+    retirement = online + m.gen_max_age[g]
+    if bld_yr == period:
+        return True
+    elif m.options.retire_time == "late":
+        return online <= m.period_start[period] < retirement
+    elif m.options.retire_time == "mid":
+        mid_period = m.period_start[period] + 0.5 * m.period_length_years[period]
+        return online <= mid_period <= retirement
+    else:
+        return online < m.period_end[period] <= retirement
+
+
+class BuildLifecycleTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def assert_lifecycle_sets(self, m):
+        # compare with sets built by scanning GEN_BLD_YRS for each generator,
+        # build year and period
+        periods_for_bld_yr = {
+            (g, b): [p for p in m.PERIODS if can_operate(m, g, b, p)]
+            for g, b in m.GEN_BLD_YRS
+        }
+        for (g, b), periods in periods_for_bld_yr.items():
+            self.assertEqual(list(m.PERIODS_FOR_GEN_BLD_YR[g, b]), periods, (g, b))
+        for g in m.GENERATION_PROJECTS:
+            for p in m.PERIODS:
+                self.assertEqual(
+                    list(m.BLD_YRS_FOR_GEN_PERIOD[g, p]),
+                    [
+                        b
+                        for (_g, b) in m.GEN_BLD_YRS
+                        if _g == g and p in periods_for_bld_yr[_g, b]
+                    ],
+                    (g, p),
+                )
+        self.assertEqual(
+            list(m.GEN_BLD_SUSPEND_YRS),
+            [(g, b, p) for (g, b) in m.GEN_BLD_YRS for p in periods_for_bld_yr[g, b]],
+        )
+        # the temporary lifecycle index is discarded after construction
+        self.assertFalse(hasattr(m, "gen_build_lifecycle_dict"))
+        self.assertFalse(hasattr(m, "gen_period_builds_dict"))
+
+    def test_lifecycle_sets(self):
+        example = copy_example("3zone_toy", self.temp_dir)
+        for retire in ["early", "mid", "late"]:
+            with self.subTest(retire=retire):
+                self.assert_lifecycle_sets(load_instance(example, "--retire", retire))
+
+    def test_suspended_and_retired_builds(self):
+        example = copy_example("3zone_toy", self.temp_dir)
+
+        # N-NG_CC (built 2008) retires during the study, S-NG_GT's 1990 build
+        # retires before it starts, and some projects can be suspended or
+        # retired early
+        def update_gen(row):
+            if row["GENERATION_PROJECT"] == "N-NG_CC":
+                row["gen_max_age"] = "15"
+                row["gen_can_retire_early"] = "1"
+            elif row["GENERATION_PROJECT"] == "S-NG_GT":
+                row["gen_max_age"] = "20"
+            elif row["GENERATION_PROJECT"] == "N-Geothermal":
+                row["gen_can_suspend"] = "1"
+
+        update_csv(
+            os.path.join(example, "inputs", "gen_info.csv"),
+            update_gen,
+            new_columns=["gen_can_suspend", "gen_can_retire_early"],
+        )
+        for retire in ["early", "mid", "late"]:
+            with self.subTest(retire=retire):
+                m = load_instance(example, "--retire", retire)
+                self.assert_lifecycle_sets(m)
+                self.assertEqual(list(m.PERIODS_FOR_GEN_BLD_YR["S-NG_GT", 1990]), [])
+                self.assertNotIn(2030, m.PERIODS_FOR_GEN_BLD_YR["N-NG_CC", 2008])
+                self.assertIn(("N-Geothermal", 2000, 2020), m.GEN_BLD_SUSPEND_YRS)
+
+
+if __name__ == "__main__":
+    unittest.main()
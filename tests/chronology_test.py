@@ -0,0 +1,139 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import switch_model.solve
+
+from .examples_test import (
+    available_solver,
+    copy_example,
+    solve_example,
+    update_csv,
+    write_file,
+)
+
+
+def make_two_day_storage_case(dest_dir):
+    """
+    Copy examples/storage into dest_dir and split its single timeseries into a
+    sunny day with little load and a dark day with steady load, each with
+    half the original weight. Geothermal is made very expensive, so the
+    cheapest way to serve the dark day is solar power stored on the sunny
+    day, which is only possible if storage is linked between the days.
+    Returns the path of the copy.
+    """
+    example = copy_example("storage", dest_dir)
+    inputs = os.path.join(example, "inputs")
+    write_file(
+        os.path.join(inputs, "timeseries.csv"),
+        "TIMESERIES,ts_period,ts_duration_of_tp,ts_num_tps,ts_scale_to_period\n"
+        "sunny,2020,12,2,1826.25\n"
+        "dark,2020,12,2,1826.25\n",
+    )
+    write_file(
+        os.path.join(inputs, "timepoints.csv"),
+        "timepoint_id,timestamp,timeseries\n"
+        "1,2025011512,sunny\n"
+        "2,2025011600,sunny\n"
+        "3,2025011612,dark\n"
+        "4,2025011700,dark\n",
+    )
+    write_file(
+        os.path.join(inputs, "loads.csv"),
+        "LOAD_ZONE,TIMEPOINT,zone_demand_mw\n"
+        "South,1,0.5\n"
+        "South,2,0.5\n"
+        "South,3,2.0\n"
+        "South,4,2.0\n",
+    )
+    write_file(
+        os.path.join(inputs, "variable_capacity_factors.csv"),
+        "GENERATION_PROJECT,timepoint,gen_max_capacity_factor\n"
+        "S-Central_PV-1,1,0.61\n"
+        "S-Central_PV-1,2,0.0\n"
+        "S-Central_PV-1,3,0.0\n"
+        "S-Central_PV-1,4,0.0\n",
+    )
+
+    def expand_pv(row):
+        if row["GENERATION_PROJECT"] == "S-Central_PV-1":
+            row["gen_capacity_limit_mw"] = "100"
+
+    def expensive_geothermal(row):
+        if row["GENERATION_PROJECT"] == "S-Geothermal":
+            row["gen_overnight_cost"] = "50000000.0"
+
+    update_csv(os.path.join(inputs, "gen_info.csv"), expand_pv)
+    update_csv(os.path.join(inputs, "gen_build_costs.csv"), expensive_geothermal)
+    return example
+
+
+def write_chronology(inputs, days):
+    write_file(
+        os.path.join(inputs, "chronology.csv"),
+        "CHRONOLOGICAL_DAY,timeseries\n"
+        + "".join("{},{}\n".format(i + 1, ts) for i, ts in enumerate(days)),
+    )
+
+
+@unittest.skipIf(available_solver() is None, "no solver available")
+class ChronologyTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="switch_test_")
+        self.example = make_two_day_storage_case(self.tmpdir)
+        self.inputs = os.path.join(self.example, "inputs")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def load(self):
+        args = ["--inputs-dir", self.inputs, "--quiet"]
+        module_list = switch_model.solve.get_module_list(args)
+        return switch_model.solve.create_model(module_list, args=args).load_inputs()
+
+    def test_linked_storage_shifts_energy_between_days(self):
+        unlinked_cost = solve_example(self.example)
+
+        write_chronology(self.inputs, ["sunny", "dark"] * 5)
+        linked_cost, m = solve_example(self.example, return_instance=True)
+
+        # storage moves solar power from the sunny day to the dark day instead
+        # of building more geothermal, which is cheaper
+        self.assertLess(linked_cost, unlinked_cost * 0.99)
+        self.assertEqual(set(m.LINKED_TIMESERIES), {"sunny", "dark"})
+        sunny_start = m.StateOfChargeStartOfDay["Battery_Storage", 1].value
+        dark_start = m.StateOfChargeStartOfDay["Battery_Storage", 2].value
+        self.assertGreater(dark_start - sunny_start, 1.0)
+        # the dark day uses the energy carried over from the sunny day
+        self.assertAlmostEqual(
+            m.StateOfChargeStartOfDay["Battery_Storage", 3].value,
+            sunny_start,
+            places=4,
+        )
+
+    def test_unknown_timeseries(self):
+        write_chronology(self.inputs, ["sunny", "cloudy"] * 5)
+        with self.assertRaises(ValueError) as cm:
+            self.load()
+        self.assertIn("validate_chronology_timeseries", str(cm.exception))
+
+    def test_days_out_of_proportion(self):
+        # both timeseries have the same weight, but sunny is used for more days
+        write_chronology(self.inputs, ["sunny", "sunny", "dark"] * 4)
+        with self.assertRaises(ValueError) as cm:
+            self.load()
+        self.assertIn("validate_chronology_weights", str(cm.exception))
+
+    def test_timeseries_missing_from_chronology(self):
+        write_chronology(self.inputs, ["sunny"] * 10)
+        with self.assertRaises(ValueError) as cm:
+            self.load()
+        self.assertIn("validate_chronology_weights", str(cm.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
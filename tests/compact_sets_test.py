@@ -0,0 +1,99 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import unittest
+
+from pyomo.environ import AbstractModel, Set, Var
+
+from switch_model.compact_sets import CompactSet, CompactTuples
+
+ROWS = ["gen_b", "gen_a", "gen_c", "gen_d"]
+COLS = [10, 20, 30, 40, 50]
+# gen_c has no members; gen_d's members are not in increasing order
+MEMBERS = [[10, 20, 30], [30, 40, 50], [], [50, 10]]
+FUELS = {"gen_b": ["Gas"], "gen_a": ["Coal", "Gas"], "gen_c": ["Oil"], "gen_d": []}
+
+
+class CompactSetsTest(unittest.TestCase):
+    def make_model(self):
+        m = AbstractModel()
+        m.GENS = Set(dimen=1, initialize=ROWS)
+        m.TPS = Set(dimen=1, initialize=COLS)
+        m.GEN_TPS = CompactSet(
+            dimen=2,
+            initialize=lambda m: CompactTuples.from_rows(m.GENS, m.TPS, MEMBERS),
+        )
+        m.PLAIN_GEN_TPS = Set(
+            dimen=2,
+            initialize=[(g, t) for g, ts in zip(ROWS, MEMBERS) for t in ts],
+        )
+        m.SUBSET_ROWS = ["gen_d", "gen_b", "gen_c"]
+        m.GEN_TPS_SUBSET = CompactSet(
+            dimen=2, initialize=lambda m: m.GEN_TPS.tuples.subset(m.SUBSET_ROWS)
+        )
+        m.PLAIN_GEN_TPS_SUBSET = Set(
+            dimen=2,
+            initialize=lambda m: [
+                (g, t) for g in m.SUBSET_ROWS for (g2, t) in m.PLAIN_GEN_TPS if g2 == g
+            ],
+        )
+        m.GEN_TP_FUELS = CompactSet(
+            dimen=3,
+            initialize=lambda m: m.GEN_TPS.tuples.subset(
+                ROWS, extras=[FUELS[g] for g in ROWS]
+            ),
+        )
+        m.PLAIN_GEN_TP_FUELS = Set(
+            dimen=3,
+            initialize=lambda m: [
+                (g, t, f) for (g, t) in m.PLAIN_GEN_TPS for f in FUELS[g]
+            ],
+        )
+        m.DispatchGen = Var(m.GEN_TPS)
+        return m.create_instance()
+
+    def assert_same_set(self, compact, plain):
+        self.assertEqual(len(compact), len(plain))
+        self.assertEqual(list(compact), list(plain))
+        self.assertEqual(compact.dimen, plain.dimen)
+        for i, item in enumerate(plain, start=1):
+            self.assertIn(item, compact)
+            self.assertEqual(compact.ord(item), i)
+            self.assertEqual(compact.at(i), item)
+        self.assertEqual(compact.first(), plain.first())
+        self.assertEqual(compact.last(), plain.last())
+
+    def test_membership_and_order(self):
+        m = self.make_model()
+        self.assert_same_set(m.GEN_TPS, m.PLAIN_GEN_TPS)
+        self.assert_same_set(m.GEN_TPS_SUBSET, m.PLAIN_GEN_TPS_SUBSET)
+        self.assert_same_set(m.GEN_TP_FUELS, m.PLAIN_GEN_TP_FUELS)
+
+    def test_non_members(self):
+        m = self.make_model()
+        for item in [
+            ("gen_a", 10),  # row and column exist, but not this combination
+            ("gen_c", 10),  # row has no members
+            ("gen_x", 10),  # unknown row
+            ("gen_b", 60),  # unknown column
+            ("gen_b",),  # wrong dimension
+            "gen_b",
+            ("gen_b", 10, "Gas"),
+            (["unhashable"], 10),
+        ]:
+            self.assertNotIn(item, m.GEN_TPS)
+        self.assertNotIn(("gen_a", 30), m.GEN_TPS_SUBSET)
+        self.assertNotIn(("gen_b", 10, "Coal"), m.GEN_TP_FUELS)
+        self.assertNotIn(("gen_b", 10), m.GEN_TP_FUELS)
+
+    def test_indexed_components(self):
+        m = self.make_model()
+        self.assertEqual(list(m.DispatchGen.keys()), list(m.PLAIN_GEN_TPS))
+        self.assertEqual(m.GEN_TPS.tuples.row("gen_d"), [50, 10])
+        self.assertEqual(m.GEN_TPS.tuples.row("gen_c"), [])
+        with self.assertRaises(KeyError):
+            m.DispatchGen["gen_a", 10]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+from pyomo.environ import Param, Set
+
+import switch_model.solve
+from switch_model.convert_inputs import convert_inputs_dir, convert_matrices
+from switch_model.utilities import InputError, find_columnar_file, find_matrix_file
+from .examples_test import copy_example, update_csv
+
+
+def load_instance(example_dir):
+    args = [
+        "--inputs-dir",
+        os.path.join(example_dir, "inputs"),
+        "--log-level",
+        "error",
+    ]
+    model = switch_model.solve.create_model(
+        switch_model.solve.get_module_list(args), args=args
+    )
+    return model.load_inputs()
+
+
+@unittest.skipIf(
+    importlib.util.find_spec("pyarrow") is None, "pyarrow is not installed"
+)
+class ConvertInputsTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        # columnar inputs give the same sets and parameters as the .csv files
+        example = copy_example("3zone_toy", self.temp_dir)
+        expected = load_instance(example)
+        # "." in the .csv file means no value
+        self.assertNotIn("N-Geothermal", expected.gen_full_load_heat_rate)
+        self.assertNotIn("N-Coal_IGCC", expected.gen_capacity_limit_mw)
+
+        for fmt in ["parquet", "feather"]:
+            with self.subTest(format=fmt):
+                converted = copy_example("3zone_toy", os.path.join(self.temp_dir, fmt))
+                inputs_dir = os.path.join(converted, "inputs")
+                self.assertGreater(convert_inputs_dir(inputs_dir, fmt, True), 10)
+                self.assertFalse(
+                    os.path.exists(os.path.join(inputs_dir, "gen_info.csv"))
+                )
+                instance = load_instance(converted)
+                for c in expected.component_objects((Set, Param)):
+                    actual = getattr(instance, c.name)
+                    if c.ctype is Set:
+                        self.assertEqual(list(actual), list(c), c.name)
+                    else:
+                        self.assertEqual(
+                            dict(actual.sparse_items()),
+                            dict(c.sparse_items()),
+                            c.name,
+                        )
+
+    def test_outdated_columnar_file(self):
+        # a .csv file that was edited after conversion is used instead of
+        # the outdated columnar copy
+        example = copy_example("3zone_toy", self.temp_dir)
+        inputs_dir = os.path.join(example, "inputs")
+        convert_inputs_dir(inputs_dir, "parquet", False)
+        loads_file = os.path.join(inputs_dir, "loads.csv")
+        update_csv(loads_file, set_north_load)
+        parquet_time = os.path.getmtime(os.path.join(inputs_dir, "loads.parquet"))
+        os.utime(loads_file, (parquet_time + 10, parquet_time + 10))
+        self.assertEqual(find_columnar_file(loads_file), loads_file)
+        self.assertEqual(
+            find_columnar_file(os.path.join(inputs_dir, "gen_info.csv")),
+            os.path.join(inputs_dir, "gen_info.parquet"),
+        )
+        self.assertEqual(load_instance(example).zone_demand_mw["North", 1], 123.0)
+
+
+def set_north_load(row):
+    if row["LOAD_ZONE"] == "North" and row["TIMEPOINT"] == "1":
+        row["zone_demand_mw"] = "123"
+
+
+class MatrixInputsTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def assert_same_params(self, instance, expected):
+        for p in ["zone_demand_mw", "gen_max_capacity_factor"]:
+            self.assertEqual(
+                dict(getattr(instance, p).sparse_items()),
+                dict(getattr(expected, p).sparse_items()),
+                p,
+            )
+
+    def test_matrix_inputs(self):
+        # .npy matrices give the same parameters as the .csv files
+        example = copy_example("3zone_toy", self.temp_dir)
+        expected = load_instance(example)
+        inputs_dir = os.path.join(example, "inputs")
+        files = ["loads.csv", "variable_capacity_factors.csv"]
+        self.assertEqual(convert_matrices(inputs_dir, files, True), 2)
+        self.assert_same_params(load_instance(example), expected)
+
+        # rows for timepoints that are not in the model are skipped, e.g.,
+        # when one matrix is shared by several timepoint samples
+        matrix_file = os.path.join(inputs_dir, "loads.npy")
+        matrix = numpy.load(matrix_file)
+        numpy.save(matrix_file, numpy.vstack([matrix, matrix[:1]]))
+        rows_file = os.path.join(inputs_dir, "loads_rows.csv")
+        with open(rows_file, "a") as f:
+            f.write("99\n")
+        self.assert_same_params(load_instance(example), expected)
+
+        # labels that can't be used are reported
+        with open(rows_file) as f:
+            rows = f.read()
+        for labels_file, old, new, message in [
+            (
+                os.path.join(inputs_dir, "loads_columns.csv"),
+                "Central",
+                "North",
+                "loads_columns.csv has duplicate labels",
+            ),
+            (
+                rows_file,
+                "\n",
+                "x\n",
+                "None of the labels in {} are members of TIMEPOINTS".format(
+                    os.path.join(inputs_dir, "loads_rows.csv")
+                ),
+            ),
+        ]:
+            with open(labels_file) as f:
+                labels = f.read()
+            with open(labels_file, "w") as f:
+                f.write(labels.replace(old, new))
+            with self.assertRaises(InputError) as cm:
+                load_instance(example)
+            self.assertIn(message, str(cm.exception))
+            with open(labels_file, "w") as f:
+                f.write(labels)
+
+    def test_outdated_matrix(self):
+        # a .csv file that was edited after conversion is used instead of
+        # the outdated matrix
+        example = copy_example("3zone_toy", self.temp_dir)
+        inputs_dir = os.path.join(example, "inputs")
+        loads_file = os.path.join(inputs_dir, "loads.csv")
+        self.assertEqual(convert_matrices(inputs_dir, ["loads.csv"]), 1)
+        self.assertEqual(
+            find_matrix_file(loads_file), os.path.join(inputs_dir, "loads.npy")
+        )
+        update_csv(loads_file, set_north_load)
+        matrix_time = os.path.getmtime(os.path.join(inputs_dir, "loads.npy"))
+        os.utime(loads_file, (matrix_time + 10, matrix_time + 10))
+        self.assertIsNone(find_matrix_file(loads_file))
+        self.assertEqual(load_instance(example).zone_demand_mw["North", 1], 123.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
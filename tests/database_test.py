@@ -0,0 +1,103 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import switch_model.reporting.database as database
+from .examples_test import available_solver, copy_example, solve_example, update_csv
+
+
+@unittest.skipIf(available_solver() is None, "no solver available")
+class ConsolidateTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+        self.example = copy_example("copperplate0", self.temp_dir)
+        self.runs_dir = os.path.join(self.temp_dir, "runs")
+        self.output = os.path.join(self.temp_dir, "all_results.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def run_scenario(self, name, *args):
+        return solve_example(
+            self.example,
+            "--results-db",
+            "--scenario-name",
+            name,
+            *args,
+            outputs_dir=os.path.join(self.runs_dir, name),
+        )
+
+    def consolidate(self):
+        with redirect_stdout(io.StringIO()) as out:
+            database.main([self.runs_dir, "--output", self.output])
+        return out.getvalue()
+
+    def query(self, sql):
+        conn = sqlite3.connect(self.output)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def test_consolidate(self):
+        # a second scenario with higher loads
+        inputs = os.path.join(self.example, "inputs")
+        shutil.copy(
+            os.path.join(inputs, "loads.csv"), os.path.join(inputs, "loads_high.csv")
+        )
+
+        def raise_load(row):
+            row["zone_demand_mw"] = str(1.5 * float(row["zone_demand_mw"]))
+
+        update_csv(os.path.join(inputs, "loads_high.csv"), raise_load)
+        costs = {
+            "base": self.run_scenario("base"),
+            "high_load": self.run_scenario(
+                "high_load", "--input-alias", "loads.csv=loads_high.csv"
+            ),
+        }
+        self.assertNotAlmostEqual(costs["base"], costs["high_load"])
+        for name in costs:
+            self.assertTrue(
+                os.path.exists(os.path.join(self.runs_dir, name, "results.sqlite"))
+            )
+
+        self.assertIn("Merged 2 of 2 scenario(s)", self.consolidate())
+        self.assertEqual(
+            sorted(self.query("SELECT scenario FROM scenarios")),
+            [("base",), ("high_load",)],
+        )
+        total_costs = dict(
+            self.query("SELECT scenario, value FROM run_info WHERE key='total_cost'")
+        )
+        for name, cost in costs.items():
+            self.assertAlmostEqual(total_costs[name], cost, delta=1e-6 * abs(cost))
+        # tables from each run are combined, with a scenario column
+        loads = self.query(
+            "SELECT scenario, COUNT(*) FROM load_balance GROUP BY scenario"
+        )
+        self.assertEqual(len(loads), 2)
+        self.assertEqual(loads[0][1], loads[1][1])
+
+        # scenarios that were already merged are skipped
+        self.assertIn("Merged 0 of 2 scenario(s)", self.consolidate())
+        self.assertEqual(len(self.query("SELECT * FROM scenarios")), 2)
+
+        # re-running a scenario replaces its results
+        self.run_scenario("high_load", "--input-alias", "loads.csv=loads_high.csv")
+        self.assertIn("Merged 1 of 2 scenario(s)", self.consolidate())
+        self.assertEqual(
+            self.query("SELECT COUNT(*) FROM load_balance WHERE scenario='high_load'"),
+            [(loads[0][1],)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
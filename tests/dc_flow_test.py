@@ -0,0 +1,70 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+from .examples_test import available_solver, copy_example, solve_example
+
+DC_FLOW = "switch_model.transmission.transport.dc_flow"
+
+
+@unittest.skipIf(available_solver() is None, "no solver available")
+class DCFlowTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_lazy_screening(self):
+        # adding line limits as needed gives the same answer as enforcing
+        # them on all lines in all timepoints from the start
+        example = copy_example("3zone_toy", self.temp_dir)
+        # close the loop, so flows divide between parallel paths
+        with open(os.path.join(example, "inputs", "transmission_lines.csv"), "a") as f:
+            f.write("N-S,North,South,150,0.95,4\n")
+
+        transport_cost = solve_example(example)
+        full_cost, full = solve_example(
+            example,
+            "--include-module",
+            DC_FLOW,
+            "--dc-flow-enforce-all",
+            return_instance=True,
+        )
+        lazy_cost, lazy = solve_example(
+            example, "--include-module", DC_FLOW, return_instance=True
+        )
+        # make sure the DC flow limits are binding
+        self.assertGreater(full_cost, transport_cost * (1 + 1e-6))
+        self.assertAlmostEqual(lazy_cost, full_cost, delta=1e-6 * abs(full_cost))
+        self.assertLess(
+            len(lazy.DC_FLOW_ENFORCED_LINE_TPS), len(full.DC_FLOW_ENFORCED_LINE_TPS)
+        )
+
+        # binding lines are fully loaded in at least one timepoint
+        outputs_dir = os.path.join(example, "outputs")
+        with open(os.path.join(outputs_dir, "dc_flow_binding_lines.csv")) as f:
+            binding = [r["TRANSMISSION_LINE"] for r in csv.DictReader(f)]
+        with open(os.path.join(outputs_dir, "dc_flows.csv")) as f:
+            flows = list(csv.DictReader(f))
+        self.assertTrue(binding)
+        for tx in binding:
+            self.assertTrue(
+                any(
+                    r["TRANSMISSION_LINE"] == tx
+                    and float(r["TxCapacityNameplateAvailable"]) > 0
+                    and abs(float(r["DCFlow"]))
+                    >= float(r["TxCapacityNameplateAvailable"]) - 1e-4
+                    for r in flows
+                ),
+                tx,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import argparse
+import logging
+import unittest
+
+from pyomo.environ import (
+    ConcreteModel,
+    Constraint,
+    NonNegativeReals,
+    Objective,
+    SolverFactory,
+    Var,
+)
+from pyomo.opt import SolverResults, TerminationCondition
+
+from switch_model.balancing.diagnose_infeasibility import (
+    DiagnosisError,
+    constraint_families,
+    family_deletion_filter,
+    find_conflicting_constraints,
+    set_family_active,
+)
+
+SOLVER = "appsi_highs"
+
+
+def infeasible_model():
+    """
+    Small model where x >= 5 (Min_X[2]) conflicts with x + y <= 5.5 (Max_Sum),
+    given the bounds on y; the other constraints are not part of the conflict.
+    """
+    m = ConcreteModel()
+    m.options = argparse.Namespace(solver_options_string="")
+    m.logger = logging.getLogger("switch_test")
+    m.x = Var(within=NonNegativeReals)
+    m.y = Var(within=NonNegativeReals, bounds=(1, 10))
+    m.z = Var(within=NonNegativeReals)
+    m.Min_X = Constraint([1, 2], rule=lambda m, i: m.x >= [0, 1, 5][i])
+    m.Max_Sum = Constraint(expr=m.x + m.y <= 5.5)
+    m.Max_Z = Constraint(expr=m.z <= 100)
+    m.Link_Z = Constraint(expr=m.z >= m.x)
+    m.Cost = Objective(expr=m.x + m.y + m.z)
+    return m
+
+
+class FakeSolver(object):
+    """Solver that always stops at a time limit."""
+
+    def solve(self, m, **kwargs):
+        results = SolverResults()
+        results.solver.termination_condition = TerminationCondition.maxTimeLimit
+        return results
+
+
+class DiagnoseInfeasibilityTest(unittest.TestCase):
+    @unittest.skipUnless(SolverFactory(SOLVER).available(), f"{SOLVER} needed")
+    def test_find_conflicting_constraints(self):
+        m = infeasible_model()
+        m.solver = SolverFactory(SOLVER)
+        conflicts = find_conflicting_constraints(m)
+        self.assertEqual(
+            set(conflicts), {("Min_X", 2), ("Max_Sum", None), ("y_bounds", None)}
+        )
+        # the model is restored afterwards
+        self.assertTrue(all(c.active for c in m.Min_X.values()))
+        self.assertEqual(m.y.bounds, (1, 10))
+        self.assertTrue(m.Cost.active)
+
+    @unittest.skipUnless(SolverFactory(SOLVER).available(), f"{SOLVER} needed")
+    def test_parallel_diagnosis(self):
+        # testing families in worker processes finds the same conflict
+        m = infeasible_model()
+        m.solver = SolverFactory(SOLVER)
+        families = constraint_families(m)
+        self.assertGreater(len(families), 3)
+        self.assertEqual(
+            family_deletion_filter(m, families, workers=2),
+            {"Min_X", "Max_Sum", "y_bounds"},
+        )
+        # families that are not needed are left inactive
+        self.assertTrue(m.Max_Sum.active)
+        self.assertFalse(m.Max_Z.active)
+        self.assertFalse(m.Link_Z.active)
+        for family in families.values():
+            set_family_active(family, True)
+
+        conflicts = find_conflicting_constraints(m, workers=2)
+        self.assertEqual(
+            set(conflicts), {("Min_X", 2), ("Max_Sum", None), ("y_bounds", None)}
+        )
+        self.assertEqual(m.y.bounds, (1, 10))
+
+    @unittest.skipUnless(SolverFactory(SOLVER).available(), f"{SOLVER} needed")
+    def test_feasible_model(self):
+        m = infeasible_model()
+        m.solver = SolverFactory(SOLVER)
+        m.Max_Sum.deactivate()
+        self.assertIsNone(find_conflicting_constraints(m))
+
+    def test_time_limit_aborts_diagnosis(self):
+        m = infeasible_model()
+        m.solver = FakeSolver()
+        with self.assertRaises(DiagnosisError):
+            find_conflicting_constraints(m)
+        self.assertTrue(m.Cost.active)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyomo.environ import value
+
+from .examples_test import available_solver, copy_example, solve_example
+
+
+def duplicate_gen(path, gen, new_gen):
+    """Add a copy of each row for project gen in a .csv file, for new_gen."""
+    with open(path) as f:
+        reader = csv.DictReader(f)
+        headers = reader.fieldnames
+        copies = [
+            dict(r, GENERATION_PROJECT=new_gen)
+            for r in reader
+            if r["GENERATION_PROJECT"] == gen
+        ]
+    for row in copies:
+        if "gen_dbid" in row:
+            row["gen_dbid"] = "99"
+    with open(path, "a", newline="") as f:
+        writer = csv.DictWriter(f, headers, lineterminator="\n")
+        writer.writerows(copies)
+
+
+@unittest.skipIf(available_solver() is None, "no solver available")
+class DiscreteCommitTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_cluster_unit_commitment(self):
+        # identical projects share one commitment variable per timepoint
+        # and give the same answer as committing each one separately
+        example = copy_example(
+            os.path.join("production_cost_models", "discrete_unit_commit"),
+            self.temp_dir,
+        )
+        for f in ["gen_info.csv", "gen_build_predetermined.csv", "gen_build_costs.csv"]:
+            duplicate_gen(os.path.join(example, "inputs", f), "S-NG_CC", "S-NG_CC-2")
+
+        separate_cost, separate = solve_example(example, return_instance=True)
+        clustered_cost, clustered = solve_example(
+            example, "--cluster-unit-commitment", return_instance=True
+        )
+        self.assertAlmostEqual(
+            clustered_cost, separate_cost, delta=1e-6 * abs(separate_cost)
+        )
+        self.assertEqual(list(separate.DISCRETE_GEN_CLUSTERS), ["S-NG_CC", "S-NG_CC-2"])
+        self.assertEqual(list(clustered.DISCRETE_GEN_CLUSTERS), ["S-NG_CC"])
+        self.assertEqual(
+            list(clustered.GENS_IN_DISCRETE_CLUSTER["S-NG_CC"]),
+            ["S-NG_CC", "S-NG_CC-2"],
+        )
+
+        # committed units are divided among the projects in the cluster
+        with open(os.path.join(example, "outputs", "gen_commit_units.csv")) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), len(clustered.DISCRETE_GEN_TPS))
+        self.assertGreater(sum(value(v) for v in clustered.CommitGenUnits.values()), 0)
+        for t in clustered.TIMEPOINTS:
+            units = [int(r["CommitGenUnits"]) for r in rows if r["timepoint"] == str(t)]
+            self.assertEqual(len(units), 2)
+            self.assertTrue(all(u >= 0 for u in units))
+            self.assertEqual(
+                sum(units), round(value(clustered.CommitGenUnits["S-NG_CC", t]))
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
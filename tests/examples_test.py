@@ -1,6 +1,7 @@
 # Copyright 2016 The Switch Authors. All rights reserved.
 # Licensed under the Apache License, Version 2, which is in the LICENSE file.
 
+import csv
 import os
 import shutil
 import sys
@@ -47,6 +48,80 @@ def find_example_dirs():
                 yield path
 
 
+def available_solver():
+    """
+    Return the name of a solver that can be used by tests that solve models,
+    or None if none is available.
+    """
+    from pyomo.environ import SolverFactory
+
+    for solver in ["appsi_highs", "glpk", "cbc", "cplex", "gurobi"]:
+        if SolverFactory(solver).available(exception_flag=False):
+            return solver
+    return None
+
+
+def copy_example(example, dest_dir):
+    """
+    Copy the example in examples/<example> to dest_dir (without outputs), so
+    tests can change the inputs. Returns the path of the copy.
+    """
+    dest = os.path.join(dest_dir, os.path.basename(example))
+    shutil.copytree(
+        os.path.join(TOP_DIR, "examples", example),
+        dest,
+        ignore=shutil.ignore_patterns("outputs"),
+    )
+    return dest
+
+
+def update_csv(path, update_row, new_columns=[]):
+    """
+    Call update_row(row) to change each row (a dict) of a .csv file, adding
+    any new_columns that are not already in the file (with missing values).
+    """
+    with open(path) as f:
+        reader = csv.DictReader(f)
+        headers = reader.fieldnames + [
+            c for c in new_columns if c not in reader.fieldnames
+        ]
+        rows = list(reader)
+    for row in rows:
+        update_row(row)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, headers, restval=".", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def solve_example(example_dir, *extra_args, outputs_dir=None, return_instance=False):
+    """
+    Solve the model in example_dir with available_solver() and any extra
+    command-line arguments. Returns the total cost (objective function value),
+    or a tuple of the total cost and the solved instance if return_instance
+    is True.
+    """
+    if outputs_dir is None:
+        outputs_dir = os.path.join(example_dir, "outputs")
+    args = switch_model.solve.get_option_file_args(
+        dir=example_dir,
+        extra_args=[
+            "--inputs-dir",
+            os.path.join(example_dir, "inputs"),
+            "--outputs-dir",
+            outputs_dir,
+            "--solver",
+            available_solver(),
+            "--log-level",
+            "error",
+        ]
+        + list(extra_args),
+    )
+    instance = switch_model.solve.main(args)
+    total_cost = float(read_file(os.path.join(outputs_dir, "total_cost.txt")))
+    return (total_cost, instance) if return_instance else total_cost
+
+
 def get_expectation_path(example_dir):
     expectation_file = os.path.join(example_dir, "outputs", "total_cost.txt")
     if not os.path.isfile(expectation_file):
@@ -0,0 +1,85 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import contextlib
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from pyomo.environ import Expression
+
+import switch_model.generators.core.commit.operate
+import switch_model.generators.core.dispatch
+import switch_model.generators.core.no_commit
+import switch_model.transmission.transport.dispatch
+from switch_model.expression_views import ExpressionView
+from .examples_test import available_solver, copy_example, read_file, solve_example
+
+VIEW_MODULES = [
+    switch_model.generators.core.commit.operate,
+    switch_model.generators.core.dispatch,
+    switch_model.generators.core.no_commit,
+    switch_model.transmission.transport.dispatch,
+]
+
+
+@unittest.skipIf(available_solver() is None, "no solver available")
+class ExpressionViewsTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_saved_expressions(self):
+        # --save-expressions all writes the same values for ExpressionViews
+        # as for regular Expressions built with the same rules
+        for example in [
+            "3zone_toy",
+            os.path.join("production_cost_models", "unit_commit"),
+        ]:
+            with self.subTest(example=example):
+                example_dir = copy_example(
+                    example, os.path.join(self.temp_dir, os.path.basename(example))
+                )
+                views_dir = os.path.join(example_dir, "views")
+                eager_dir = os.path.join(example_dir, "eager")
+                _, instance = solve_example(
+                    example_dir,
+                    "--save-expressions",
+                    "all",
+                    outputs_dir=views_dir,
+                    return_instance=True,
+                )
+                with contextlib.ExitStack() as stack:
+                    for module in VIEW_MODULES:
+                        stack.enter_context(
+                            mock.patch.object(module, "ExpressionView", Expression)
+                        )
+                    _, eager = solve_example(
+                        example_dir,
+                        "--save-expressions",
+                        "all",
+                        outputs_dir=eager_dir,
+                        return_instance=True,
+                    )
+                views = [
+                    c.name
+                    for c in instance.component_objects(Expression)
+                    if isinstance(c, ExpressionView)
+                ]
+                self.assertGreater(len(views), 1)
+                for name in views:
+                    self.assertNotIsInstance(getattr(eager, name), ExpressionView)
+                for name in views:
+                    self.assertEqual(
+                        read_file(os.path.join(views_dir, name + ".csv")),
+                        read_file(os.path.join(eager_dir, name + ".csv")),
+                        name,
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
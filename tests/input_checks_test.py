@@ -0,0 +1,108 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyomo.environ import AbstractModel, DataPortal, NonNegativeReals, Param, Set
+
+import switch_model.solve
+from switch_model import input_checks
+from switch_model.utilities import InputError
+from .examples_test import copy_example, update_csv
+
+
+class InputChecksTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+        self.example = copy_example("copperplate0", self.temp_dir)
+        self.gen_info = os.path.join(self.example, "inputs", "gen_info.csv")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def load_inputs(self):
+        args = [
+            "--inputs-dir",
+            os.path.join(self.example, "inputs"),
+            "--log-level",
+            "error",
+        ]
+        model = switch_model.solve.create_model(
+            switch_model.solve.get_module_list(args), args=args
+        )
+        return model.load_inputs()
+
+    def test_describe(self):
+        self.assertEqual(
+            input_checks.RangeCheck(None, gt=0, integer=True).describe(),
+            "an integer > 0",
+        )
+        self.assertEqual(
+            input_checks.RangeCheck(None, ge=0, le=1).describe(),
+            "a number >= 0 and <= 1",
+        )
+        self.assertEqual(input_checks.RangeCheck(None).describe(), "a number")
+
+    def test_bad_values(self):
+        # a non-numeric value and an out-of-range value are both reported,
+        # with the file, column and line
+        def bad_values(row):
+            if row["GENERATION_PROJECT"] == "S-NG_CC":
+                row["gen_max_age"] = "abc"
+                row["gen_scheduled_outage_rate"] = "-0.04"
+
+        update_csv(self.gen_info, bad_values)
+        with self.assertRaises(InputError) as cm:
+            self.load_inputs()
+        message = str(cm.exception)
+        self.assertIn(
+            "1 value(s) of gen_max_age are not an integer > 0 (read from "
+            f"'gen_max_age' column of {self.gen_info})\n"
+            "    'S-NG_CC': 'abc' (line 3)",
+            message,
+        )
+        self.assertIn(
+            "1 value(s) of gen_scheduled_outage_rate are not a number >= 0 and "
+            f"<= 1 (read from 'gen_scheduled_outage_rate' column of {self.gen_info})\n"
+            "    'S-NG_CC': -0.04 (line 3)",
+            message,
+        )
+
+    def test_missing_column(self):
+        with open(self.gen_info) as f:
+            rows = [line.split(",") for line in f.read().splitlines()]
+        col = rows[0].index("gen_max_age")
+        with open(self.gen_info, "w") as f:
+            for row in rows:
+                f.write(",".join(row[:col] + row[col + 1 :]) + "\n")
+        with self.assertRaises(InputError) as cm:
+            self.load_inputs()
+        self.assertEqual(
+            str(cm.exception),
+            f"Required column gen_max_age not found in file {self.gen_info}.",
+        )
+
+    def test_calculated_values(self):
+        # values calculated by an initialize rule are checked after
+        # construction, even though the input values were not re-checked
+        m = AbstractModel()
+        m.A = Set(initialize=[1, 2, 3])
+        m.p = Param(m.A, within=NonNegativeReals, initialize={3: -1.0})
+        data = DataPortal(model=m)
+        data["p"] = {1: 1.0, 2: 2.0}
+        disabled, deferred = input_checks.check_data(m, data)
+        self.assertEqual(disabled, [(m.p, NonNegativeReals)])
+        instance = m.create_instance(data)
+        input_checks.restore_checks(m, instance, disabled)
+        with self.assertRaises(InputError) as cm:
+            input_checks.check_instance(instance, deferred, data)
+        self.assertIn(
+            "1 value(s) of p are not a number >= 0\n    3: -1.0", str(cm.exception)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from .examples_test import (
+    available_solver,
+    copy_example,
+    solve_example,
+    update_csv,
+)
+
+
+@unittest.skipIf(available_solver() is None, "no solver available")
+class PlanningReservesTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_row_generation(self):
+        # adding planning reserve rows as needed gives the same answer as
+        # enforcing the requirement in every timepoint
+        example = copy_example("planning_reserves", self.temp_dir)
+
+        # raise the night-time load in the South zone, so the requirement
+        # binds in a timepoint that is not enforced at first
+        def raise_load(row):
+            if row["LOAD_ZONE"] == "South" and row["TIMEPOINT"] == "3":
+                row["zone_demand_mw"] = "9.5"
+
+        update_csv(os.path.join(example, "inputs", "loads.csv"), raise_load)
+
+        full_cost, full = solve_example(example, return_instance=True)
+        lazy_cost, lazy = solve_example(
+            example,
+            "--planning-reserve-row-generation",
+            "--planning-reserve-initial-timepoints",
+            "1",
+            return_instance=True,
+        )
+        self.assertAlmostEqual(lazy_cost, full_cost, delta=1e-6 * abs(full_cost))
+        self.assertEqual(len(full.PRR_ENFORCED_TIMEPOINTS), len(full.PRR_TIMEPOINTS))
+        # a row was added for the night-time timepoint, but not all were needed
+        self.assertIn(("system_planning_reserve", 3), lazy.PRR_ENFORCED_TIMEPOINTS)
+        self.assertLess(len(lazy.PRR_ENFORCED_TIMEPOINTS), len(lazy.PRR_TIMEPOINTS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+import switch_model.hawaii.scenario_data as scenario_data
+
+
+class ScenarioDataTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+        self.db = os.path.join(self.temp_dir, "switch.sqlite")
+        con = sqlite3.connect(self.db)
+        con.execute("CREATE TABLE fuel_costs (fuel TEXT, year INTEGER, price REAL)")
+        con.executemany(
+            "INSERT INTO fuel_costs VALUES (?, ?, ?)",
+            [("LSFO", 2020, 12.5), ("LSFO", 2025, 13.0), ("Diesel oil", 2020, None)],
+        )
+        con.commit()
+        con.close()
+        self.orig_database = scenario_data.sqlite_database
+        scenario_data.configure_database({"sqlite_database": self.db})
+
+    def tearDown(self):
+        scenario_data.sqlite_database = self.orig_database
+        shutil.rmtree(self.temp_dir)
+
+    def queries(self, args):
+        queries = []
+        scenario_data.add_query(
+            queries,
+            os.path.join(self.temp_dir, "fuel_cost.csv"),
+            "SELECT fuel, year, price FROM fuel_costs "
+            "WHERE year IN %(years)s ORDER BY fuel, year;",
+            args,
+        )
+        scenario_data.add_one_row_literal(
+            queries,
+            os.path.join(self.temp_dir, "financials.csv"),
+            ["base_financial_year", "interest_rate"],
+            args,
+        )
+        return queries
+
+    def read(self, file):
+        with open(os.path.join(self.temp_dir, file)) as f:
+            return f.read()
+
+    def test_db_cursor(self):
+        cur = scenario_data.db_cursor()
+        cur.execute("SELECT COUNT(*) FROM fuel_costs")
+        self.assertEqual(cur.fetchone(), (3,))
+
+    def test_write_queries(self):
+        args = {
+            "years": (2020, 2025),
+            "base_financial_year": 2020,
+            "interest_rate": 0.06,
+        }
+        scenario_data.write_queries(self.queries(args), args)
+        self.assertEqual(
+            self.read("fuel_cost.csv"),
+            'fuel,year,price\n"Diesel oil",2020,.\nLSFO,2020,12.5\nLSFO,2025,13.0\n',
+        )
+        self.assertEqual(
+            self.read("financials.csv"),
+            "base_financial_year,interest_rate\n2020,0.06\n",
+        )
+
+        # unchanged queries are skipped; changed ones are re-run
+        with open(os.path.join(self.temp_dir, "fuel_cost.csv"), "w") as f:
+            f.write("marker\n")
+        with open(os.path.join(self.temp_dir, "financials.csv"), "w") as f:
+            f.write("marker\n")
+        args["interest_rate"] = 0.05
+        scenario_data.write_queries(self.queries(args), args)
+        self.assertEqual(self.read("fuel_cost.csv"), "marker\n")
+        self.assertEqual(
+            self.read("financials.csv"),
+            "base_financial_year,interest_rate\n2020,0.05\n",
+        )
+
+        # everything is re-run if the cache is disabled
+        args["use_query_cache"] = False
+        scenario_data.write_queries(self.queries(args), args)
+        self.assertTrue(self.read("fuel_cost.csv").startswith("fuel,year,price\n"))
+
+
+class FakeCursor(object):
+    """Stand-in for a psycopg2 cursor, returning `rows` for any query."""
+
+    def __init__(self, connection, name=None, withhold=False):
+        self.connection = connection
+        self.name = name
+        self.withhold = withhold
+        self.closed = False
+        self.description = [("fuel",), ("price",)]
+        connection.cursors.append(self)
+
+    def mogrify(self, query, arguments):
+        return (query % {k: repr(v) for k, v in arguments.items()}).encode()
+
+    def execute(self, query):
+        if b"bad_table" in query:
+            raise RuntimeError("relation bad_table does not exist")
+        self.connection.queries.append(query)
+        self.pending = list(self.connection.rows)
+
+    def fetchmany(self, size):
+        self.connection.batch_sizes.append(size)
+        batch, self.pending = self.pending[:size], self.pending[size:]
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection(object):
+    def __init__(self, rows):
+        self.rows = rows
+        self.autocommit = False
+        self.cursors = []
+        self.queries = []
+        self.batch_sizes = []
+
+    def set_session(self, readonly, autocommit):
+        self.autocommit = autocommit
+
+    def cursor(self, name=None, withhold=False):
+        return FakeCursor(self, name, withhold)
+
+
+class FakePool(object):
+    """Stand-in for psycopg2.pool.ThreadedConnectionPool."""
+
+    def __init__(self, rows):
+        self.connection = FakeConnection(rows)
+        self.lock = threading.Lock()
+        self.borrowed = 0
+
+    def getconn(self):
+        with self.lock:
+            self.borrowed += 1
+        return self.connection
+
+    def putconn(self, c):
+        with self.lock:
+            self.borrowed -= 1
+
+
+class PostgresQueriesTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+        self.orig = (
+            scenario_data.sqlite_database,
+            scenario_data.pool,
+            scenario_data.con,
+        )
+        self.pool = FakePool([("LSFO", 12.5), ("Diesel oil", None), ("ULSD", 20.0)])
+        # use the fake pool instead of connecting to a postgresql server
+        scenario_data.sqlite_database = ""
+        scenario_data.pool = self.pool
+        scenario_data.con = None
+        # db_cursor() keeps one connection for preparing queries; only count
+        # the ones borrowed after that
+        scenario_data.db_cursor()
+        self.pool.borrowed = 0
+
+    def tearDown(self):
+        (
+            scenario_data.sqlite_database,
+            scenario_data.pool,
+            scenario_data.con,
+        ) = self.orig
+        shutil.rmtree(self.temp_dir)
+
+    def path(self, file):
+        return os.path.join(self.temp_dir, file)
+
+    def queries(self, table="fuel_costs", year=2020):
+        queries = []
+        for file in ["fuel_cost.csv", "fuel_cost_2.csv"]:
+            scenario_data.add_query(
+                queries,
+                self.path(file),
+                "SELECT fuel, price FROM " + table + " WHERE year = %(year)s;",
+                {"year": year},
+            )
+        return queries
+
+    def test_write_table_streams_rows(self):
+        query = b"SELECT fuel, price FROM fuel_costs;"
+        scenario_data.write_table(self.path("fuel_cost.csv"), query, batch_size=2)
+        with open(self.path("fuel_cost.csv")) as f:
+            self.assertEqual(
+                f.read(), 'fuel,price\nLSFO,12.5\n"Diesel oil",.\nULSD,20.0\n'
+            )
+        connection = self.pool.connection
+        (cursor,) = [c for c in connection.cursors if c.name]
+        # named, server-side cursor that is read in batches and then closed
+        self.assertTrue(cursor.name.startswith("switch_"))
+        self.assertTrue(cursor.withhold)
+        self.assertEqual(connection.batch_sizes, [2, 2, 2])
+        self.assertTrue(cursor.closed)
+        self.assertTrue(connection.autocommit)
+        self.assertEqual(self.pool.borrowed, 0)
+
+    def test_errors_return_connection(self):
+        with self.assertRaises(RuntimeError):
+            scenario_data.write_queries(self.queries(table="bad_table"), {})
+        self.assertEqual(self.pool.borrowed, 0)
+        cursors = [c for c in self.pool.connection.cursors if c.name]
+        self.assertEqual(len(cursors), 2)
+        self.assertTrue(all(c.closed for c in cursors))
+        self.assertFalse(os.path.exists(self.path("fuel_cost.csv")))
+
+    def test_query_cache(self):
+        connection = self.pool.connection
+        scenario_data.write_queries(self.queries(), {})
+        self.assertEqual(len(connection.queries), 2)
+        self.assertEqual(self.pool.borrowed, 0)
+        with open(self.path("query_cache.json")) as f:
+            self.assertEqual(sorted(json.load(f)), ["fuel_cost.csv", "fuel_cost_2.csv"])
+
+        # same queries on the same database are skipped
+        scenario_data.write_queries(self.queries(), {})
+        self.assertEqual(len(connection.queries), 2)
+
+        # changed queries are re-run, unless the cache is disabled
+        scenario_data.write_queries(self.queries(year=2025), {})
+        self.assertEqual(len(connection.queries), 4)
+        scenario_data.write_queries(self.queries(year=2025), {"use_query_cache": False})
+        self.assertEqual(len(connection.queries), 6)
+        self.assertTrue(all(c.closed for c in connection.cursors if c.name))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from pyomo.environ import Constraint, Objective, Var, value
+
+import switch_model.hawaii.smooth_dispatch as smooth_dispatch
+from switch_model.hawaii.smooth_dispatch import (
+    smooth_by_timeseries,
+    timepoint_position,
+)
+from .examples_test import available_solver, copy_example, solve_example
+
+
+@unittest.skipIf(available_solver() is None, "no solver available")
+class SmoothDispatchTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_serial_and_parallel(self):
+        # smoothing the timeseries in one process or several gives the same
+        # dispatch
+        example = copy_example("3zone_toy", self.temp_dir)
+        _, m = solve_example(example, return_instance=True)
+        self.assertEqual(timepoint_position(m, m.DispatchTx), 2)
+        self.assertEqual(timepoint_position(m, m.GenFuelUseRate), 1)
+        self.assertIsNone(timepoint_position(m, m.BuildGen))
+        # a linear smoothing objective that uses variables not in the cost
+        m.Smooth = Objective(
+            expr=sum(m.DispatchTx.values()) + sum(m.WithdrawFromCentralGrid.values())
+        )
+        m.Smooth.deactivate()
+        original = [
+            (v, v.value) for v in m.component_data_objects(Var) if v.value is not None
+        ]
+
+        results = []
+        for workers in [1, 2]:
+            for v, val in original:
+                v.set_value(val, skip_validation=True)
+            m.options.smooth_dispatch_workers = workers
+            self.assertTrue(smooth_by_timeseries(m, m.Smooth))
+            results.append({v.name: v.value for v, _ in original})
+        self.assertTrue(all(not v.fixed for v, _ in original))
+        for name, val in results[0].items():
+            self.assertAlmostEqual(results[1][name], val, places=9, msg=name)
+
+    def solve_smoothed(self, example):
+        """
+        Solve example with --smooth-dispatch and check that smoothing reduces
+        the smoothing objective. Returns the instance and the final value of
+        the smoothing objective.
+        """
+        smooth_values = []
+
+        def record_smoothing(m):
+            # the main solve is free to choose any IncreaseSmoothedValue above
+            # the step in each smoothed value, so start from spurious ones
+            for v in m.IncreaseSmoothedValue.values():
+                v.set_value(v.value + 1)
+            smooth_values.append(value(m.Smooth_Free_Variables))
+            real_smooth_dispatch(m)
+            smooth_values.append(value(m.Smooth_Free_Variables))
+
+        real_smooth_dispatch = smooth_dispatch.smooth_dispatch
+        with mock.patch.object(smooth_dispatch, "smooth_dispatch", record_smoothing):
+            _, m = solve_example(
+                example,
+                "--include-module",
+                "switch_model.hawaii.smooth_dispatch",
+                "--smooth-dispatch",
+                "--smooth-dispatch-workers",
+                "1",
+                return_instance=True,
+            )
+        self.assertEqual(len(smooth_values), 2)
+        self.assertLess(
+            smooth_values[1], smooth_values[0] - len(m.IncreaseSmoothedValue) / 2
+        )
+        return m, smooth_values[1]
+
+    def assert_feasible(self, m):
+        for c in m.component_data_objects(Constraint, active=True):
+            body = value(c.body)
+            if c.has_lb():
+                self.assertGreaterEqual(body, value(c.lower) - 1e-6, msg=c.name)
+            if c.has_ub():
+                self.assertLessEqual(body, value(c.upper) + 1e-6, msg=c.name)
+
+    def test_smooth_dispatch_option(self):
+        example = copy_example("3zone_toy", self.temp_dir)
+        cost = solve_example(example)
+        m, _ = self.solve_smoothed(example)
+        self.assertTrue(m.options.smooth_dispatch)
+        self.assertTrue(m.Minimize_System_Cost.active)
+        self.assertFalse(m.Smooth_Free_Variables.active)
+        self.assertAlmostEqual(value(m.Minimize_System_Cost) / cost, 1, places=9)
+        self.assert_feasible(m)
+        self.assertTrue(all(not v.fixed for v in m.component_data_objects(Var)))
+
+    def test_whole_model_fallback(self):
+        # if the model can't be split by timeseries, the whole model is
+        # re-solved with the smoothing objective
+        example = copy_example("3zone_toy", self.temp_dir)
+        cost = solve_example(example)
+        m, by_timeseries = self.solve_smoothed(example)
+        with mock.patch.object(
+            smooth_dispatch, "build_smoothing_subproblems", return_value=None
+        ) as build, mock.patch.object(
+            smooth_dispatch, "pre_smooth_solve", wraps=smooth_dispatch.pre_smooth_solve
+        ) as pre_smooth_solve:
+            m, whole_model = self.solve_smoothed(example)
+        build.assert_called_once()
+        pre_smooth_solve.assert_called_once()
+        self.assertTrue(m.Minimize_System_Cost.active)
+        self.assertFalse(m.Smooth_Free_Variables.active)
+        self.assertAlmostEqual(value(m.Minimize_System_Cost) / cost, 1, places=9)
+        self.assert_feasible(m)
+        self.assertTrue(all(not v.fixed for v in m.component_data_objects(Var)))
+        # the whole-model solve only fixes the cost, so it can smooth at least
+        # as much as the timeseries problems, which also fix investments
+        self.assertLessEqual(whole_model, by_timeseries + 1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from pyomo.environ import Var
+
+import switch_model.solve
+from .examples_test import (
+    available_solver,
+    copy_example,
+    solve_example,
+    update_csv,
+)
+
+
+@unittest.skipIf(available_solver() is None, "no solver available")
+class ResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_resume_iterated_model(self):
+        # resuming an interrupted iterated model gives the same answer as
+        # running it without interruption
+        example = copy_example("planning_reserves", self.temp_dir)
+
+        # make the planning reserve requirement bind in a timepoint that is
+        # not enforced in the first iteration
+        def raise_load(row):
+            if row["LOAD_ZONE"] == "South" and row["TIMEPOINT"] == "3":
+                row["zone_demand_mw"] = "9.5"
+
+        update_csv(os.path.join(example, "inputs", "loads.csv"), raise_load)
+        args = [
+            "--planning-reserve-row-generation",
+            "--planning-reserve-initial-timepoints",
+            "1",
+        ]
+
+        full_dir = os.path.join(self.temp_dir, "full")
+        full_cost, full = solve_example(
+            example, *args, outputs_dir=full_dir, return_instance=True
+        )
+        # checkpoints are only saved on request
+        self.assertFalse(
+            os.path.exists(os.path.join(full_dir, "iteration_checkpoint.pickle"))
+        )
+
+        # stop after the first iteration, then resume from its checkpoint
+        outputs_dir = os.path.join(self.temp_dir, "interrupted")
+        first_cost = solve_example(
+            example,
+            *args,
+            "--max-iter",
+            "1",
+            "--iteration-checkpoint",
+            outputs_dir=outputs_dir,
+        )
+        self.assertTrue(
+            os.path.exists(os.path.join(outputs_dir, "iteration_checkpoint.pickle"))
+        )
+        self.assertLess(first_cost, full_cost * (1 - 1e-6))
+        resumed_cost, resumed = solve_example(
+            example, *args, "--resume", outputs_dir=outputs_dir, return_instance=True
+        )
+
+        self.assertAlmostEqual(resumed_cost, full_cost, delta=1e-6 * abs(full_cost))
+        # the resumed run continued from the second iteration
+        self.assertGreater(full.iteration_number, 0)
+        self.assertEqual(resumed.iteration_number, full.iteration_number)
+        self.assertEqual(
+            set(resumed.PRR_ENFORCED_TIMEPOINTS), set(full.PRR_ENFORCED_TIMEPOINTS)
+        )
+
+
+@unittest.skipIf(available_solver() is None, "no solver available")
+class WarmStartTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def solve_with_warm_start(self, example, source_dir, outputs_dir):
+        """
+        Solve example with --warm-start-from source_dir, and return the total
+        cost, the solved instance and the variable values when the solver was
+        called.
+        """
+        start_values = {}
+        solve = switch_model.solve.solve
+
+        def record_start_values(m):
+            if not start_values:
+                start_values.update(
+                    (v.name, v.value) for v in m.component_data_objects(Var)
+                )
+            return solve(m)
+
+        with mock.patch.object(switch_model.solve, "solve", record_start_values):
+            cost, instance = solve_example(
+                example,
+                "--warm-start-from",
+                source_dir,
+                outputs_dir=outputs_dir,
+                return_instance=True,
+            )
+        return cost, instance, start_values
+
+    def test_warm_start_from_values_and_csvs(self):
+        example = copy_example("3zone_toy", self.temp_dir)
+        pickle_dir = os.path.join(self.temp_dir, "pickle")
+        csv_dir = os.path.join(self.temp_dir, "csv")
+        cost, base = solve_example(
+            example,
+            "--save-solution-file",
+            outputs_dir=pickle_dir,
+            return_instance=True,
+        )
+        self.assertTrue(
+            os.path.exists(os.path.join(pickle_dir, "variable_values.pickle"))
+        )
+        solve_example(example, outputs_dir=csv_dir)
+        self.assertFalse(
+            os.path.exists(os.path.join(csv_dir, "variable_values.pickle"))
+        )
+        solution = {v.name: v.value for v in base.component_data_objects(Var)}
+
+        for source_dir in [pickle_dir, csv_dir]:
+            with self.subTest(source=os.path.basename(source_dir)):
+                warm_cost, _, start_values = self.solve_with_warm_start(
+                    example, source_dir, os.path.join(source_dir, "warm")
+                )
+                self.assertAlmostEqual(warm_cost, cost, delta=1e-6 * abs(cost))
+                # every variable started from the prior solution (csv values
+                # are rounded slightly when they are written)
+                for name, val in solution.items():
+                    if val is None:
+                        continue
+                    self.assertAlmostEqual(
+                        start_values[name], val, delta=1e-5 * max(1, abs(val))
+                    )
+
+    def test_warm_start_from_sibling_scenario(self):
+        example = copy_example("3zone_toy", self.temp_dir)
+        base_dir = os.path.join(self.temp_dir, "base")
+        solve_example(example, outputs_dir=base_dir)
+
+        # the sibling scenario has an extra project, so the index sets of
+        # its variables differ from the base scenario
+        inputs_dir = os.path.join(example, "inputs")
+        for file, keep in [
+            ("gen_info.csv", lambda row: True),
+            ("gen_build_costs.csv", lambda row: row["build_year"] != "2000"),
+        ]:
+            with open(os.path.join(inputs_dir, file)) as f:
+                reader = csv.DictReader(f)
+                headers = reader.fieldnames
+                copies = [
+                    dict(row, GENERATION_PROJECT="S-NG_CC-2")
+                    for row in reader
+                    if row["GENERATION_PROJECT"] == "S-NG_CC" and keep(row)
+                ]
+            with open(os.path.join(inputs_dir, file), "a", newline="") as f:
+                csv.DictWriter(f, headers, lineterminator="\n").writerows(copies)
+
+        cold_cost = solve_example(
+            example, outputs_dir=os.path.join(self.temp_dir, "cold")
+        )
+        warm_cost, instance, start_values = self.solve_with_warm_start(
+            example, base_dir, os.path.join(self.temp_dir, "warm")
+        )
+        self.assertAlmostEqual(warm_cost, cold_cost, delta=1e-6 * abs(cold_cost))
+        # matching variables were assigned, but not the new project's
+        self.assertIsNotNone(start_values["BuildGen[S-NG_CC,2020]"])
+        self.assertIsNone(start_values["BuildGen[S-NG_CC-2,2020]"])
+        self.assertIn(("S-NG_CC-2", 2020), instance.BuildGen)
+
+
+if __name__ == "__main__":
+    unittest.main()
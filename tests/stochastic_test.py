@@ -0,0 +1,101 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyomo.environ import Binary, ConcreteModel, Integers, NonNegativeReals, Var
+
+import switch_model.stochastic as stochastic
+from .examples_test import TOP_DIR, available_solver, copy_example, read_file
+
+
+@unittest.skipIf(available_solver() is None, "no solver available")
+class StochasticTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def solve(self, example_dir, outputs_dir, *extra_args):
+        stochastic.main(
+            [
+                "--inputs-dir",
+                os.path.join(example_dir, "inputs"),
+                "--scenario-tree",
+                os.path.join(example_dir, "scenario_tree.csv"),
+                "--outputs-dir",
+                outputs_dir,
+                "--solver",
+                available_solver(),
+                "--log-level",
+                "error",
+            ]
+            + list(extra_args)
+        )
+        return float(read_file(os.path.join(outputs_dir, "total_cost.txt")))
+
+    def test_extensive_form_matches_runef(self):
+        example = os.path.join(TOP_DIR, "examples", "3zone_toy_stochastic_PySP")
+        cost = self.solve(example, os.path.join(self.temp_dir, "outputs"))
+        # objective reported by PySP's runef for the same model
+        runef_output = read_file(
+            os.path.join(example, "outputs-runef", "runef-stdoutput.txt")
+        )
+        runef_cost = float(runef_output.split("EF objective:")[1].split()[0])
+        self.assertAlmostEqual(cost, runef_cost, delta=1e-6 * runef_cost)
+
+    def test_progressive_hedging_converges(self):
+        # three fuel-cost scenarios for a one-zone model, which lead to
+        # different investments when solved separately
+        example = copy_example("copperplate0", self.temp_dir)
+        for tag, price in [("low", 1), ("high", 20)]:
+            with open(
+                os.path.join(example, "inputs", f"fuel_cost_{tag}.csv"), "w"
+            ) as f:
+                f.write("load_zone,fuel,period,fuel_cost\n")
+                f.write(f"South,NaturalGas,2020,{price}\n")
+        with open(os.path.join(example, "scenario_tree.csv"), "w") as f:
+            f.write("scenario,probability,arguments\n")
+            f.write("low,0.3,--input-alias fuel_cost.csv=fuel_cost_low.csv\n")
+            f.write("mid,0.4,\n")
+            f.write("high,0.3,--input-alias fuel_cost.csv=fuel_cost_high.csv\n")
+
+        ef_cost = self.solve(example, os.path.join(self.temp_dir, "ef"))
+        # default settings, with scenarios divided between two processes
+        ph_cost = self.solve(
+            example,
+            os.path.join(self.temp_dir, "ph"),
+            "--stochastic-method",
+            "ph",
+            "--ph-workers",
+            "2",
+            "--ph-max-iter",
+            "50",
+        )
+        self.assertAlmostEqual(ph_cost, ef_cost, delta=1e-6 * ef_cost)
+        for s in ["low", "mid", "high"]:
+            self.assertTrue(
+                os.path.exists(os.path.join(self.temp_dir, "ph", s, "gen_cap.csv"))
+            )
+
+
+class FirstStageValueTest(unittest.TestCase):
+    def test_first_stage_value(self):
+        m = ConcreteModel()
+        m.binary = Var(within=Binary)
+        m.units = Var(within=Integers, bounds=(0, 5))
+        m.capacity = Var(within=NonNegativeReals)
+        self.assertEqual(stochastic.first_stage_value(m.binary, 0.6), 1)
+        self.assertEqual(stochastic.first_stage_value(m.binary, 0.4), 0)
+        self.assertEqual(stochastic.first_stage_value(m.units, 2.5000001), 3)
+        self.assertEqual(stochastic.first_stage_value(m.units, 5.4), 5)
+        self.assertEqual(stochastic.first_stage_value(m.capacity, 2.25), 2.25)
+        self.assertEqual(stochastic.first_stage_value(m.capacity, -1e-9), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+import switch_model.sweep as sweep
+from .examples_test import (
+    available_solver,
+    copy_example,
+    solve_example,
+    update_csv,
+)
+
+
+@unittest.skipIf(available_solver() is None, "no solver available")
+class SweepTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_sweep_matches_direct_solves(self):
+        # a two-point sweep on one instance gives the same results as solving
+        # the model separately with each set of inputs
+        example = copy_example("copperplate0", self.temp_dir)
+        sweep_file = os.path.join(self.temp_dir, "sweep.csv")
+        with open(sweep_file, "w") as f:
+            f.write("point,parameter,index,value,multiplier\n")
+            f.write("double_fuel,fuel_cost,,,2\n")
+            f.write("high_load,zone_demand_mw,South 2,6.5,\n")
+        outputs_dir = os.path.join(self.temp_dir, "sweep_outputs")
+        sweep.main(
+            [
+                "--sweep-file",
+                sweep_file,
+                "--inputs-dir",
+                os.path.join(example, "inputs"),
+                "--outputs-dir",
+                outputs_dir,
+                "--solver",
+                available_solver(),
+                "--log-level",
+                "error",
+            ]
+        )
+        with open(os.path.join(outputs_dir, "sweep_summary.csv")) as f:
+            swept = {r["point"]: float(r["total_cost"]) for r in csv.DictReader(f)}
+
+        def double_fuel(row):
+            row["fuel_cost"] = str(2 * float(row["fuel_cost"]))
+
+        def high_load(row):
+            if row["TIMEPOINT"] == "2":
+                row["zone_demand_mw"] = "6.5"
+
+        direct = dict()
+        for point, update_row, file in [
+            ("double_fuel", double_fuel, "fuel_cost.csv"),
+            ("high_load", high_load, "loads.csv"),
+        ]:
+            point_example = copy_example(
+                "copperplate0", os.path.join(self.temp_dir, point)
+            )
+            update_csv(os.path.join(point_example, "inputs", file), update_row)
+            direct[point] = solve_example(point_example)
+            self.assertTrue(
+                os.path.exists(os.path.join(outputs_dir, point, "total_cost.txt"))
+            )
+
+        self.assertEqual(set(swept), set(direct))
+        for point, cost in direct.items():
+            self.assertAlmostEqual(swept[point], cost, delta=1e-6 * abs(cost))
+        # the points really are different from each other
+        self.assertNotAlmostEqual(
+            swept["double_fuel"], swept["high_load"], delta=1e-3 * abs(cost)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
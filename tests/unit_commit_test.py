@@ -0,0 +1,51 @@
+# Copyright (c) 2015-2024 The Switch Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0, which is in the LICENSE file.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from .examples_test import (
+    available_solver,
+    copy_example,
+    solve_example,
+    update_csv,
+)
+
+
+@unittest.skipIf(available_solver() is None, "no solver available")
+class UnitCommitTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="switch_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_min_up_down_formulations(self):
+        # the cumulative formulation gives the same answer as the window one
+        example = copy_example(
+            os.path.join("production_cost_models", "unit_commit"), self.temp_dir
+        )
+
+        base = solve_example(example)
+
+        def add_min_times(row):
+            if row["GENERATION_PROJECT"] in {"S-NG_CC", "S-NG_GT"}:
+                row["gen_min_uptime"] = "18"
+                row["gen_min_downtime"] = "18"
+
+        update_csv(
+            os.path.join(example, "inputs", "gen_info.csv"),
+            add_min_times,
+            new_columns=["gen_min_uptime", "gen_min_downtime"],
+        )
+        window = solve_example(example, "--min-up-down-formulation", "window")
+        cumulative = solve_example(example, "--min-up-down-formulation", "cumulative")
+        # make sure the constraints are binding
+        self.assertGreater(window, base * 1.001)
+        self.assertAlmostEqual(window, cumulative, delta=1e-6 * abs(window))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -100,8 +100,23 @@ def make_test(example_dir):
     )
 
 
+class UpgradePluginsTest(unittest.TestCase):
+    def test_plugin_versions(self):
+        # versions read from the plugin source match the imported modules
+        manager = switch_model.upgrade.manager
+        prev_to = None
+        for name, v_from, v_to in manager.upgrade_plugins:
+            plugin = manager.load_plugin(name)
+            self.assertEqual((plugin.upgrades_from, plugin.upgrades_to), (v_from, v_to))
+            if prev_to is not None:
+                self.assertEqual(v_from, prev_to)
+            prev_to = v_to
+        self.assertEqual(manager.last_required_update, prev_to)
+
+
 def load_tests(loader, tests, pattern):
     suite = unittest.TestSuite()
+    suite.addTests(loader.loadTestsFromTestCase(UpgradePluginsTest))
     for example_dir in find_example_dirs(os.path.join(TOP_DIR, "tests", "upgrade_dat")):
         if get_expectation_path(example_dir):
             suite.addTest(make_test(example_dir))
@@ -112,6 +112,30 @@ class UtilitiesTest(unittest.TestCase):
             mod.create_instance()
         logger.setLevel(orig_log_level)
 
+    def test_solution_values(self):
+        from switch_model.utilities import SwitchAbstractModel
+        from pyomo.environ import Param, Set, Var, Expression
+
+        mod = SwitchAbstractModel(module_list=[], args=[])
+        mod.set_A = Set(initialize=[1, 2, 3], dimen=1)
+        mod.price = Param(mod.set_A, initialize={1: 2.0, 2: 3.0, 3: 4.0})
+        mod.x = Var(mod.set_A)
+        mod.cost = Expression(mod.set_A, rule=lambda m, a: m.price[a] * m.x[a] + 1)
+        mod.total = Expression(rule=lambda m: sum(m.cost[a] for a in m.set_A))
+        mod.ratio = Expression(mod.set_A, rule=lambda m, a: m.x[a] / m.x[1])
+        m = mod.create_instance()
+        for a in m.set_A:
+            m.x[a] = 10.0 * a
+        compare(m.solution_values(m.cost), {1: 21.0, 2: 61.0, 3: 121.0})
+        compare(m.solution_values("total"), {None: 203.0})
+        compare(m.solution_values(m.ratio), {1: 1.0, 2: 2.0, 3: 3.0})
+        compare(m.solution_values(m.x), {1: 10.0, 2: 20.0, 3: 30.0})
+        # values are cached until cleared (normally by solve.solve())
+        m.x[1] = 0.0
+        compare(m.solution_values(m.cost)[1], 21.0)
+        m.clear_solution_values()
+        compare(m.solution_values(m.cost)[1], 1.0)
+
 
 if __name__ == "__main__":
     unittest.main()